@@ -1,17 +1,29 @@
+import time
+_waktu_mulai_run = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib
-from datetime import datetime
+from datetime import datetime, timedelta
+import functools
 import json
-import pickle
 from io import BytesIO
-from PIL import Image
 import os
 
-# Set matplotlib to use non-GUI backend
-matplotlib.use('Agg')
+from edumerdeka.bandwidth import (MODE_HEMAT_DEFAULT, PengukurPayload, catat_payload, pasang_pengukur,
+                                  pengukur_aktif, ukur_fragment)
+from edumerdeka.cache_grafik import CacheGrafik, adalah_svg
+from edumerdeka.grafik import (buat_grafik_benchmark, buat_grafik_proyeksi, buat_heatmap_skenario,
+                               buat_pie_chart_gaya_belajar, buat_timeline_portofolio, buat_visualisasi_karakter)
+from edumerdeka.kalkulasi import (adjust_kesulitan_adaptif, hitung_daya_serap, hitung_skor_karakter,
+                                  hitung_tp_dikuasai)
+from edumerdeka.learning_path import DIMENSI_PANCASILA, GAYA_BELAJAR, MATA_PELAJARAN, rekomendasi_learning_path
+from edumerdeka.penyimpanan import PenyimpananSQLite
+from edumerdeka.startup import catat_run, laporan_startup
+
+# Dependency berat (pandas, numpy, matplotlib, PIL, pickle, fpdf) diimpor lazy di
+# fungsi/tab yang membutuhkannya agar cold start tidak menunggu semuanya termuat.
+
+# Set matplotlib to use non-GUI backend (berlaku saat pyplot pertama kali diimpor)
+os.environ.setdefault("MPLBACKEND", "Agg")
 
 # Configure page
 st.set_page_config(
@@ -21,8 +33,39 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS untuk tampilan profesional dan mobile-friendly
-st.markdown("""
+# Ukur bytes yang dikirim ke browser di rerun ini (dilaporkan di akhir script)
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+pengukur_payload = PengukurPayload()
+pasang_pengukur(get_script_run_ctx(), pengukur_payload)
+
+def pengukur():
+    """Pengukur payload yang aktif: milik fragment yang sedang dijalankan sendiri, atau milik rerun penuh"""
+    return pengukur_aktif(get_script_run_ctx()) or pengukur_payload
+
+def fragment_terukur(fungsi):
+    """`st.fragment` yang payload-nya diukur dan dilaporkan sendiri saat hanya fragment ini yang dijalankan ulang"""
+    @functools.wraps(fungsi)
+    def jalankan(*args, **kwargs):
+        with ukur_fragment(get_script_run_ctx(), fungsi.__name__,
+                           st.session_state.get('mode_hemat', False)) as pengukur_fragment:
+            try:
+                return fungsi(*args, **kwargs)
+            finally:
+                if pengukur_fragment is not None:
+                    st.session_state.payload_terakhir = pengukur_fragment.ringkasan()
+    return st.fragment(jalankan)
+
+mode_hemat = st.sidebar.toggle("📶 Mode Hemat Data",
+                               value=MODE_HEMAT_DEFAULT or st.query_params.get("hemat") == "1",
+                               key="mode_hemat",
+                               help="Untuk koneksi 2G/3G: grafik diganti tabel, hanya satu bagian yang dimuat, "
+                                    "tanpa CSS dekoratif")
+pengukur_payload.mode_hemat = mode_hemat
+
+# Custom CSS untuk tampilan profesional dan mobile-friendly (dilewati di mode hemat data)
+if not mode_hemat:
+    st.markdown("""
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -72,7 +115,7 @@ st.markdown("""
         color: #666;
     }
 </style>
-""", unsafe_allow_html=True)
+    """, unsafe_allow_html=True)
 
 # Initialize session state
 if 'data_siswa' not in st.session_state:
@@ -83,110 +126,232 @@ if 'portofolio' not in st.session_state:
     st.session_state.portofolio = {}
 if 'projek_p5' not in st.session_state:
     st.session_state.projek_p5 = {}
+if 'hasil_asesmen_kelas' not in st.session_state:
+    st.session_state.hasil_asesmen_kelas = None
+if 'sesi_cat' not in st.session_state:
+    st.session_state.sesi_cat = None
 
-# Fungsi helper untuk kalkulasi
-def hitung_daya_serap(tp_dikuasai, total_tp):
-    """Menghitung daya serap berdasarkan TP yang dikuasai"""
-    if total_tp == 0:
-        return 0
-    return (tp_dikuasai / total_tp) * 100
+@st.cache_resource(show_spinner=False)
+def cache_grafik():
+    """Cache grafik bersama untuk semua sesi dalam proses server"""
+    return CacheGrafik(maks_bytes=int(os.environ.get("EDUMERDEKA_CACHE_GRAFIK_MB", "64")) * 1024 * 1024)
 
-def hitung_skor_karakter(dimensi_scores):
-    """Menghitung rata-rata skor karakter dari 6 dimensi Profil Pelajar Pancasila"""
-    if not dimensi_scores:
-        return 0
-    return sum(dimensi_scores.values()) / len(dimensi_scores)
-
-def hitung_kemajuan_karakter(skor_awal, skor_akhir):
-    """Menghitung persentase kemajuan karakter"""
-    if skor_awal == 0:
-        return 0
-    return ((skor_akhir - skor_awal) / skor_awal) * 100
-
-def hitung_ketercapaian_atp(materi_dikuasai, target_atp):
-    """Menghitung persentase ketercapaian ATP"""
-    if target_atp == 0:
-        return 0
-    return (materi_dikuasai / target_atp) * 100
-
-def adjust_kesulitan_adaptif(persentase_benar):
-    """Menyesuaikan tingkat Bloom berdasarkan jawaban benar"""
-    if persentase_benar > 70:
-        return "+1 level (meningkat)"
-    elif persentase_benar < 40:
-        return "-1 level (menurun)"
+def tampilkan_grafik(jenis, data, pembuat):
+    """Menampilkan grafik dari cache; figure hanya dibuat ulang jika datanya berubah.
+
+    Di mode hemat data, data grafik ditampilkan sebagai tabel dan grafik versi
+    ringkas (SVG atau PNG ber-DPI rendah) hanya dikirim jika diminta.
+    """
+    if not mode_hemat:
+        isi = cache_grafik().ambil_atau_render(jenis, data, pembuat)
+        pengukur().catat_media(len(isi))
+        st.image(isi, use_container_width=True)
+        return
+    
+    import pandas as pd
+    
+    if all(isinstance(nilai, (list, tuple)) for nilai in data.values()):
+        st.dataframe(pd.DataFrame(data), use_container_width=True)
     else:
-        return "Tetap"
-
-def generate_learning_path_prompt(fase, mata_pelajaran, skor_bloom, gaya_belajar, target_pancasila):
-    """Generate prompt untuk LLM (placeholder untuk future API integration)"""
-    prompt = f"""Buat path belajar untuk:
-- Fase: {fase}
-- Mata Pelajaran: {mata_pelajaran}
-- Skor Bloom saat ini: {skor_bloom}
-- Gaya Belajar: {gaya_belajar}
-- Target Profil Pelajar Pancasila: {target_pancasila}
-
-Berikan rekomendasi materi, aktivitas, dan projek yang sesuai."""
-    return prompt
-
-def buat_visualisasi_karakter(dimensi_scores):
-    """Membuat bar chart untuk skor karakter per dimensi"""
-    fig, ax = plt.subplots(figsize=(10, 6))
-    dimensi = list(dimensi_scores.keys())
-    scores = list(dimensi_scores.values())
-    
-    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
-    bars = ax.bar(dimensi, scores, color=colors[:len(dimensi)])
-    
-    ax.set_ylabel('Skor (0-10)', fontsize=12)
-    ax.set_title('Breakdown Skor Karakter per Dimensi Profil Pelajar Pancasila', fontsize=14, fontweight='bold')
-    ax.set_ylim(0, 10)
-    ax.grid(axis='y', alpha=0.3)
-    
-    # Tambahkan nilai di atas bar
-    for bar in bars:
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height,
-                f'{height:.1f}',
-                ha='center', va='bottom', fontweight='bold')
-    
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    return fig
-
-def buat_pie_chart_gaya_belajar(gaya_belajar_dist):
-    """Membuat pie chart distribusi gaya belajar"""
-    fig, ax = plt.subplots(figsize=(8, 8))
-    colors = ['#ff9999', '#66b3ff', '#99ff99']
-    explode = (0.05, 0.05, 0.05)
-    
-    ax.pie(gaya_belajar_dist.values(), labels=gaya_belajar_dist.keys(), 
-           autopct='%1.1f%%', startangle=90, colors=colors, explode=explode,
-           textprops={'fontsize': 12, 'fontweight': 'bold'})
-    ax.set_title('Distribusi Gaya Belajar Siswa', fontsize=14, fontweight='bold')
-    plt.tight_layout()
-    return fig
-
-def buat_timeline_portofolio(data_kemajuan):
-    """Membuat timeline kemajuan siswa"""
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
-    if data_kemajuan:
-        tanggal = list(data_kemajuan.keys())
-        scores = list(data_kemajuan.values())
-        
-        ax.plot(tanggal, scores, marker='o', linewidth=2, markersize=8, color='#1f77b4')
-        ax.fill_between(range(len(scores)), scores, alpha=0.3, color='#1f77b4')
-        
-        ax.set_xlabel('Periode', fontsize=12)
-        ax.set_ylabel('Skor Kemajuan', fontsize=12)
-        ax.set_title('Timeline Kemajuan Belajar Siswa', fontsize=14, fontweight='bold')
-        ax.grid(True, alpha=0.3)
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-    
-    return fig
+        st.dataframe(pd.DataFrame({'Nilai': list(data.values())}, index=list(data.keys())),
+                     use_container_width=True)
+    
+    if st.toggle("📊 Tampilkan grafik", key=f"grafik_hemat_{jenis}"):
+        isi = cache_grafik().ambil_atau_render(jenis, data, pembuat, format="ringkas")
+        if adalah_svg(isi):
+            # SVG dikirim inline di pesan (sudah terhitung), PNG lewat endpoint media
+            st.image(isi.decode("utf-8"))
+        else:
+            pengukur().catat_media(len(isi))
+            st.image(isi)
+
+def rerun_dengan_pesan(pesan, tab):
+    """Menyimpan pesan sukses untuk `tab` lalu menjalankan ulang seluruh app.
+
+    Dipakai oleh fragment yang mengubah data milik tab lain, karena rerun fragment
+    hanya menggambar ulang panelnya sendiri.
+    """
+    st.session_state[f'pesan_flash_{tab}'] = pesan
+    st.rerun(scope="app")
+
+def rerun_fragment():
+    """Menjalankan ulang fragment yang sedang dirender saja.
+
+    scope="fragment" hanya sah pada rerun fragment; pada rerun penuh dipakai
+    rerun biasa (Streamlit menolak scope fragment di luar rerun fragment).
+    """
+    if getattr(get_script_run_ctx(), 'fragment_ids_this_run', None):
+        st.rerun(scope="fragment")
+    st.rerun()
+
+def tampilkan_pesan_flash(tab):
+    pesan = st.session_state.pop(f'pesan_flash_{tab}', None)
+    if pesan:
+        st.success(pesan)
+
+@st.cache_resource(show_spinner=False)
+def penyimpanan():
+    """Database SQLite bersama untuk semua sesi (koneksi dibuka per thread)"""
+    return PenyimpananSQLite()
+
+@st.cache_resource(show_spinner=False)
+def penyinkron():
+    """Sinkronisasi otomatis ke server (EDUMERDEKA_SYNC_URL); None jika belum dikonfigurasi"""
+    from edumerdeka.sinkron import URL_SINKRON, KlienSinkron, SinkronOtomatis
+    
+    if not URL_SINKRON:
+        return None
+    return SinkronOtomatis(KlienSinkron(penyimpanan(), URL_SINKRON))
+
+def simpan_ke_database(tabel, konteks_siswa, data):
+    """Menyimpan satu entry untuk siswa aktif; dilewati jika nama siswa belum diisi"""
+    if not konteks_siswa['nama_siswa']:
+        return False
+    penyimpanan().simpan(tabel, {**data, **konteks_siswa})
+    return True
+
+def muat_riwayat_siswa(konteks_siswa):
+    """Memuat data terakhir siswa dari database setiap kali siswa aktif di sidebar berganti"""
+    kunci = (konteks_siswa['nama_siswa'], konteks_siswa['kelas'])
+    if not kunci[0] or st.session_state.get('siswa_aktif') == kunci:
+        return
+    st.session_state.siswa_aktif = kunci
+    
+    riwayat = penyimpanan().riwayat_siswa(*kunci)
+    st.session_state.riwayat_tersimpan = {tabel: len(baris) for tabel, baris in riwayat.items()}
+    
+    if riwayat['asesmen']:
+        terakhir = riwayat['asesmen'][0]
+        st.session_state.hasil_asesmen = {
+            'nama_siswa': kunci[0],
+            **{k: terakhir[k] for k in ('jumlah_soal', 'tp_dikuasai', 'daya_serap',
+                                        'jawaban_benar_persen', 'rekomendasi_bloom', 'tanggal')}
+        }
+    if riwayat['projek_p5']:
+        terakhir = riwayat['projek_p5'][0]
+        st.session_state.projek_p5 = {
+            k: terakhir[k] for k in ('nama_projek', 'tema', 'mata_pelajaran', 'durasi', 'progress',
+                                     'dimensi_scores', 'skor_karakter', 'jurnal', 'tanggal')
+        }
+    if riwayat['portofolio']:
+        st.session_state.portofolio[kunci[0]] = [
+            {k: entry[k] for k in ('tanggal', 'periode', 'narasi', 'kompetensi', 'karya', 'karya_hash')}
+            for entry in reversed(riwayat['portofolio'])
+        ]
+
+@st.cache_resource(show_spinner=False)
+def penyimpanan_karya():
+    """Blob store file karya portofolio (berbasis hash isi) di folder data"""
+    from edumerdeka.karya import PenyimpananKarya
+    
+    return PenyimpananKarya()
+
+def proses_unggahan_karya(uploaded_karya):
+    """Memproses file karya sekali per unggahan; rerun berikutnya memakai metadata yang tersimpan"""
+    from edumerdeka.karya import KaryaError
+    
+    karya = st.session_state.get('karya_terunggah')
+    if karya is None or karya['file_id'] != uploaded_karya.file_id:
+        try:
+            info = penyimpanan_karya().simpan(uploaded_karya.getvalue(), uploaded_karya.name, uploaded_karya.type)
+            error = None
+        except KaryaError as e:
+            info, error = None, str(e)
+        karya = st.session_state.karya_terunggah = {'file_id': uploaded_karya.file_id, 'info': info, 'error': error}
+    if karya['error']:
+        st.error(f"❌ {karya['error']}")
+    return karya['info']
+
+def proses_unggahan_bank_soal(uploaded_file):
+    """Memuat bank soal sekali per unggahan (cache Parquet berdasarkan isi file); None jika tidak valid"""
+    from edumerdeka.bank_soal import BankSoalError, muat_bank_soal
+    
+    bank = st.session_state.get('bank_soal_terunggah')
+    if bank is None or bank['file_id'] != uploaded_file.file_id:
+        try:
+            hasil, error = muat_bank_soal(uploaded_file.getvalue()), None
+        except BankSoalError as e:
+            hasil, error = None, str(e)
+        bank = st.session_state.bank_soal_terunggah = {'file_id': uploaded_file.file_id, 'hasil': hasil,
+                                                       'error': error}
+    if bank['error']:
+        st.error(f"❌ {bank['error']}")
+    return bank['hasil']
+
+@st.cache_resource(show_spinner=False)
+def muat_bank_cat(hash_bank, _df_soal):
+    """Bank soal IRT dibuat sekali per isi file (`hash_bank`) dan dipakai bersama oleh semua sesi"""
+    from edumerdeka.cat import BankItemIRT
+    
+    return BankItemIRT.dari_dataframe(_df_soal)
+
+@st.cache_resource(show_spinner=False)
+def indeks_bank_soal(hash_bank, _df_soal):
+    """Indeks soal per tingkat Bloom/TP/fase, dibuat sekali per isi file dan dipakai bersama semua sesi"""
+    from edumerdeka.indeks_soal import IndeksBankSoal
+    
+    return IndeksBankSoal.dari_dataframe(_df_soal)
+
+@st.cache_resource(show_spinner=False)
+def layanan_generasi():
+    """Lapisan generasi LLM bersama (cache disk + coalescing); backend lokal stub"""
+    from edumerdeka.generasi import LayananGenerasi
+    
+    return LayananGenerasi()
+
+@st.cache_resource(show_spinner=False)
+def optimasi_waktu():
+    """Solver alokasi waktu bersama; solusi profil yang sama dipakai ulang antar sesi"""
+    from edumerdeka.optimasi import OptimasiWaktu
+    
+    return OptimasiWaktu()
+
+@st.cache_resource(show_spinner=False)
+def sketsa_kabupaten():
+    """Sketsa benchmark kabupaten (file gabungan beberapa sekolah), jika dikonfigurasi"""
+    from edumerdeka.benchmark import SketsaKabupaten
+    
+    return SketsaKabupaten()
+
+@st.cache_resource(show_spinner=False)
+def mesin_peringatan(tahun_ajaran, semester):
+    """Mesin threshold alert satu periode untuk seluruh sekolah; diperbarui inkremental antar sesi"""
+    from edumerdeka.peringatan import MesinPeringatan
+    
+    return MesinPeringatan(penyimpanan(), tahun_ajaran, semester)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def riwayat_proyeksi(kelas, versi_data):
+    """Riwayat daya serap per siswa satu kelas; `versi_data` (watermark tabel asesmen)
+    membuat cache kedaluwarsa setiap ada asesmen yang ditambah atau diganti"""
+    from edumerdeka.proyeksi import riwayat_dari_penyimpanan
+    
+    return riwayat_dari_penyimpanan(penyimpanan(), kelas)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def proyeksi_kelas(kelas, versi_data, semester_awal, kunci_siswa, daya_serap_sekarang, delta_serap):
+    """Proyeksi Monte Carlo seluruh kelas dalam satu panggilan, termasuk pergeseran
+    What-If siswa aktif; siswa tanpa riwayat tersimpan memakai hasil asesmen sesi ini"""
+    from edumerdeka.proyeksi import proyeksi_kohort
+    
+    riwayat = riwayat_proyeksi(kelas, versi_data)
+    if daya_serap_sekarang and semester_awal is not None and not riwayat.get(kunci_siswa):
+        riwayat[kunci_siswa] = {semester_awal: [daya_serap_sekarang]}
+    geser = {kunci_siswa: delta_serap} if delta_serap else None
+    return proyeksi_kohort(riwayat, semester_awal=semester_awal, geser=geser)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def sweep_skenario_kelas(kelas, tahun_ajaran, semester, versi_data, kunci_siswa, daya_serap_sekarang, minat):
+    """Sweep What-If seluruh kelas dari asesmen terakhir tiap siswa; siswa aktif tanpa data
+    tersimpan memakai hasil asesmen sesi ini"""
+    from edumerdeka.optimasi import profil_dari_penyimpanan
+    from edumerdeka.skenario import sweep_kelas
+    
+    daftar_profil = profil_dari_penyimpanan(penyimpanan(), tahun_ajaran, semester, kelas or None)
+    daya_serap = [p['daya_serap'] for p in daftar_profil]
+    if daya_serap_sekarang and kunci_siswa not in {(p['nama_siswa'], p['kelas']) for p in daftar_profil}:
+        daya_serap.append(daya_serap_sekarang)
+    return sweep_kelas(daya_serap, minat=minat)
 
 # Header
 st.markdown('<div class="main-header">📚 EduMerdeka Optimizer</div>', unsafe_allow_html=True)
@@ -248,19 +413,51 @@ fase_kurikulum = st.sidebar.selectbox("Fase Kurikulum Merdeka",
                                        "Fase F (Kelas 11-12)"],
                                       help="Pilih fase sesuai tingkat kelas")
 
+# Konteks siswa aktif untuk penyimpanan persisten
+konteks_siswa = {
+    'nama_siswa': nama_siswa,
+    'kelas': kelas,
+    'tahun_ajaran': tahun_ajaran,
+    'semester': semester,
+    'fase': fase_kurikulum,
+    'nip_guru': nip_guru,
+}
+muat_riwayat_siswa(konteks_siswa)
+
+if nama_siswa and 'riwayat_tersimpan' in st.session_state:
+    jumlah = st.session_state.riwayat_tersimpan
+    st.sidebar.caption(f"📂 Tersimpan: {jumlah['asesmen']} asesmen • {jumlah['projek_p5']} projek P5 "
+                       f"• {jumlah['portofolio']} entry portofolio")
+
 # Main Tabs
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+DAFTAR_TAB = [
     "🎯 Asesmen Diagnostik",
     "🛤️ Learning Path",
     "🎨 Projek P5",
     "📁 E-Portofolio",
     "📊 Dashboard Analisis",
     "💾 Export & Integrasi"
-])
+]
+
+if mode_hemat:
+    # Semua tab Streamlit dirender sekaligus; di mode hemat hanya bagian yang dipilih yang dikirim
+    tab_dipilih = st.radio("Bagian", DAFTAR_TAB, horizontal=True, key="tab_hemat", label_visibility="collapsed")
+    tab1, tab2, tab3, tab4, tab5, tab6 = [st.container() if nama == tab_dipilih else None for nama in DAFTAR_TAB]
+else:
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(DAFTAR_TAB)
+
+def tampilkan_tab(wadah, fungsi_tab, *args):
+    """Merender isi tab ke wadahnya; tab yang tidak dipilih di mode hemat dilewati"""
+    if wadah is not None:
+        with wadah:
+            fungsi_tab(*args)
 
 # TAB 1: Asesmen Diagnostik Adaptif
-with tab1:
+@fragment_terukur
+def tab_asesmen_diagnostik(konteks_siswa):
+    nama_siswa = konteks_siswa['nama_siswa']
     st.header("🎯 Asesmen Diagnostik Adaptif")
+    tampilkan_pesan_flash("asesmen")
     
     st.markdown("""
     <div class="info-box">
@@ -292,20 +489,131 @@ with tab1:
         else:
             uploaded_file = st.file_uploader("Upload file CSV (format: nomor,soal,tingkat_bloom,jawaban_benar)",
                                             type=['csv'])
-            if uploaded_file:
-                df_soal = pd.read_csv(uploaded_file)
+            bank_soal = proses_unggahan_bank_soal(uploaded_file) if uploaded_file else None
+            if bank_soal is not None:
+                import pandas as pd
+                
+                df_soal = bank_soal['df']
                 st.write("Preview data:")
                 st.dataframe(df_soal.head())
+                st.caption(f"{len(df_soal):,} soal valid dari {bank_soal['jumlah_baris']:,} baris • "
+                           + ("dibuka dari cache" if bank_soal['dari_cache'] else f"diparsing ({bank_soal['mesin']})")
+                           + f" dalam {bank_soal['waktu_ms']:.0f} ms")
+                if bank_soal['jumlah_error']:
+                    st.warning(f"⚠️ {bank_soal['jumlah_error']:,} baris dilewati karena tidak valid")
+                    with st.expander("Detail baris tidak valid"):
+                        st.dataframe(pd.DataFrame(bank_soal['error'], columns=["Baris", "Alasan"]),
+                                     use_container_width=True, hide_index=True)
+                
+                with st.expander("🎲 Rakit Form Tes"):
+                    from edumerdeka.asesmen import LEVEL_BLOOM
+                    
+                    indeks_soal = indeks_bank_soal(bank_soal['hash'], df_soal)
+                    level_form = st.multiselect("Tingkat Bloom", list(LEVEL_BLOOM), default=["C2", "C3", "C4"],
+                                                key="form_bloom")
+                    col_tp, col_fase, col_jumlah = st.columns(3)
+                    with col_tp:
+                        tp_form = st.selectbox("TP", ["(Semua)"] + [tp for tp in indeks_soal.daftar_tp if tp],
+                                               key="form_tp")
+                    with col_fase:
+                        fase_form = st.selectbox("Fase", ["(Semua)"] + [f for f in indeks_soal.daftar_fase if f],
+                                                 key="form_fase")
+                    with col_jumlah:
+                        jumlah_per_level = st.number_input("Soal per level", min_value=1, max_value=50, value=5,
+                                                           key="form_jumlah")
+                    if st.button("🎲 Rakit Form", key="form_rakit") and level_form:
+                        spesifikasi = [{'tingkat_bloom': level, 'jumlah': int(jumlah_per_level),
+                                        'tp': None if tp_form == "(Semua)" else tp_form,
+                                        'fase': None if fase_form == "(Semua)" else fase_form}
+                                       for level in level_form]
+                        try:
+                            mulai = time.perf_counter()
+                            posisi_form = indeks_soal.rakit_form(spesifikasi)
+                            st.session_state.form_tes = {'hash': bank_soal['hash'], 'posisi': posisi_form,
+                                                         'waktu_us': (time.perf_counter() - mulai) * 1e6}
+                        except ValueError as e:
+                            st.error(f"❌ {str(e)}")
+                    form_tes = st.session_state.get('form_tes')
+                    if form_tes is not None and form_tes['hash'] == bank_soal['hash']:
+                        st.dataframe(df_soal.iloc[form_tes['posisi']], use_container_width=True, hide_index=True)
+                        st.caption(f"{len(form_tes['posisi'])} soal dirakit dari {indeks_soal.jumlah_item:,} soal "
+                                   f"({len(indeks_soal.jumlah):,} strata) dalam {form_tes['waktu_us']:.0f} µs")
                 jumlah_soal = len(df_soal)
-                jawaban_benar = st.slider("Persentase Jawaban Benar (%)", 
-                                          min_value=0, max_value=100, value=60, step=5)
+                
+                mode_cat = st.checkbox("Mode CAT (soal dipilih satu per satu sesuai kemampuan)",
+                                       help="Computerized Adaptive Testing berbasis IRT 1PL/2PL")
+                if mode_cat:
+                    try:
+                        bank_cat = muat_bank_cat(bank_soal['hash'], df_soal)
+                    except (KeyError, ValueError) as e:
+                        st.error(f"Error menyiapkan bank soal CAT: {str(e)}")
+                        bank_cat = None
+                    
+                    if bank_cat is not None:
+                        sesi_cat = st.session_state.sesi_cat
+                        from edumerdeka.cat import SesiCAT
+                        
+                        if sesi_cat is None or sesi_cat.bank is not bank_cat or st.button("🔄 Mulai Ulang CAT"):
+                            sesi_cat = st.session_state.sesi_cat = SesiCAT(bank_cat)
+                        
+                        item = sesi_cat.item_berikutnya()
+                        if item is not None:
+                            soal_aktif = df_soal.iloc[item]
+                            st.write(f"**Soal {len(sesi_cat.riwayat) + 1}** "
+                                     f"(No. {soal_aktif.get('nomor', item + 1)}, {soal_aktif.get('tingkat_bloom', '-')})")
+                            st.write(soal_aktif.get('soal', ''))
+                            col_benar, col_salah = st.columns(2)
+                            with col_benar:
+                                if st.button("✅ Benar", key="cat_benar"):
+                                    sesi_cat.catat_jawaban(True)
+                                    rerun_fragment()
+                            with col_salah:
+                                if st.button("❌ Salah", key="cat_salah"):
+                                    sesi_cat.catat_jawaban(False)
+                                    rerun_fragment()
+                        else:
+                            st.success("✅ Tes adaptif selesai")
+                        
+                        ringkasan_cat = sesi_cat.ringkasan()
+                        st.caption(f"Estimasi kemampuan θ = {ringkasan_cat['theta']:.2f} "
+                                   f"(SE {ringkasan_cat['se']:.2f}) • setara {ringkasan_cat['level_bloom']}")
+                        jumlah_soal = max(ringkasan_cat['jumlah_soal'], 1)
+                        jawaban_benar = ringkasan_cat['jawaban_benar_persen']
+                    else:
+                        jawaban_benar = 60
+                else:
+                    jawaban_benar = st.slider("Persentase Jawaban Benar (%)", 
+                                              min_value=0, max_value=100, value=60, step=5)
+                
+                st.write("**Asesmen Satu Kelas:**")
+                uploaded_jawaban = st.file_uploader("Upload matriks jawaban kelas (CSV: nama_siswa + satu kolom per nomor soal)",
+                                                    type=['csv'], key="jawaban_kelas",
+                                                    help="Isi sel dengan pilihan jawaban siswa; jawaban dibandingkan dengan kunci bank soal")
+                jawaban_sudah_diskor = st.checkbox("Matriks sudah diskor (1 = benar, 0 = salah)", key="jawaban_sudah_diskor",
+                                                   help="Centang hanya jika sel berisi 1/0, bukan kode pilihan jawaban")
+                if uploaded_jawaban and st.button("🏫 Proses Asesmen Kelas"):
+                    from edumerdeka.asesmen import proses_asesmen_kelas
+                    
+                    try:
+                        df_hasil_kelas = proses_asesmen_kelas(pd.read_csv(uploaded_jawaban), df_soal,
+                                                              sudah_diskor=jawaban_sudah_diskor or None)
+                        st.session_state.hasil_asesmen_kelas = df_hasil_kelas
+                        
+                        tanggal_asesmen = datetime.now().strftime("%Y-%m-%d %H:%M")
+                        penyimpanan().simpan_batch('asesmen', [
+                            {**baris, **konteks_siswa, 'nama_siswa': str(baris['nama_siswa']), 'tanggal': tanggal_asesmen}
+                            for baris in df_hasil_kelas.to_dict('records')
+                        ])
+                        st.success(f"✅ Asesmen {len(df_hasil_kelas)} siswa berhasil diproses dan disimpan!")
+                    except (KeyError, ValueError) as e:
+                        st.error(f"Error memproses matriks jawaban: {str(e)}")
             else:
                 jumlah_soal = 10
                 jawaban_benar = 60
         
         if st.button("🔍 Proses Asesmen", type="primary"):
             # Hitung hasil asesmen
-            tp_dikuasai = int((jawaban_benar / 100) * jumlah_soal)
+            tp_dikuasai = hitung_tp_dikuasai(jawaban_benar, jumlah_soal)
             daya_serap = hitung_daya_serap(tp_dikuasai, jumlah_soal)
             adjust = adjust_kesulitan_adaptif(jawaban_benar)
             
@@ -320,7 +628,11 @@ with tab1:
                 'tanggal': datetime.now().strftime("%Y-%m-%d %H:%M")
             }
             
-            st.success("✅ Asesmen berhasil diproses!")
+            if simpan_ke_database('asesmen', konteks_siswa, st.session_state.hasil_asesmen):
+                rerun_dengan_pesan("✅ Asesmen berhasil diproses dan disimpan!", "asesmen")
+            else:
+                rerun_dengan_pesan("✅ Asesmen berhasil diproses! (Isi Nama Siswa di sidebar agar tersimpan permanen)",
+                                   "asesmen")
     
     with col2:
         st.subheader("Informasi Bloom")
@@ -350,9 +662,27 @@ with tab1:
             st.metric("Rekomendasi Tingkat", hasil['rekomendasi_bloom'])
         
         st.info(f"📅 Waktu Asesmen: {hasil['tanggal']}")
+    
+    # Hasil Asesmen Kelas
+    if st.session_state.hasil_asesmen_kelas is not None:
+        st.subheader("🏫 Hasil Asesmen Kelas")
+        df_kelas = st.session_state.hasil_asesmen_kelas
+        
+        col_a, col_b, col_c = st.columns(3)
+        with col_a:
+            st.metric("Jumlah Siswa", f"{len(df_kelas)}")
+        with col_b:
+            st.metric("Rata-rata Daya Serap", f"{df_kelas['daya_serap'].mean():.1f}%")
+        with col_c:
+            st.metric("Perlu Remedial", f"{(df_kelas['rekomendasi_bloom'] == '-1 level (menurun)').sum()}")
+        
+        st.dataframe(df_kelas, use_container_width=True)
+
+tampilkan_tab(tab1, tab_asesmen_diagnostik, konteks_siswa)
 
 # TAB 2: Learning Path Generator
-with tab2:
+@fragment_terukur
+def tab_learning_path(fase_kurikulum):
     st.header("🛤️ Learning Path Generator")
     
     st.markdown("""
@@ -370,24 +700,19 @@ with tab2:
         with col1:
             st.subheader("Input Profil Belajar")
             
-            mata_pelajaran = st.selectbox("Mata Pelajaran",
-                                         ["Matematika", "Bahasa Indonesia", "IPA", "IPS",
-                                          "Bahasa Inggris", "Pendidikan Pancasila", "PJOK",
-                                          "Seni & Budaya", "Informatika"],
+            mata_pelajaran = st.selectbox("Mata Pelajaran", MATA_PELAJARAN,
                                          help="Pilih mata pelajaran")
             
-            gaya_belajar = st.radio("Gaya Belajar Dominan",
-                                   ["Visual", "Auditori", "Kinestetik"],
-                                   help="Berdasarkan kuesioner atau observasi")
+            gaya_belajar = st.radio("Gaya Belajar Dominan", GAYA_BELAJAR,
+                                   help="Berdasarkan kuesioner atau observasi",
+                                   key="gaya_belajar")
             
             st.write("**Minat Siswa** (berdasarkan interaksi konten):")
             minat_persen = st.slider("Tingkat Minat pada Materi (%)", 
                                     min_value=0, max_value=100, value=70, step=5)
             
             st.write("**Target Profil Pelajar Pancasila:**")
-            dimensi_target = st.multiselect("Dimensi yang Difokuskan",
-                                           ["Beriman & Bertakwa", "Mandiri", "Bergotong Royong",
-                                            "Berkebinekaan Global", "Bernalar Kritis", "Kreatif"],
+            dimensi_target = st.multiselect("Dimensi yang Difokuskan", DIMENSI_PANCASILA,
                                            default=["Mandiri", "Bernalar Kritis"])
         
         with col2:
@@ -397,62 +722,107 @@ with tab2:
                 st.metric("Daya Serap Saat Ini", f"{hasil['daya_serap']:.1f}%")
                 st.info(f"Rekomendasi: {hasil['rekomendasi_bloom']}")
         
+        st.toggle("🤖 Sertakan narasi LLM", key="lp_narasi",
+                  help="Prompt identik dalam satu kelas hanya dikirim sekali ke backend (respons di-cache)")
+        
         if st.button("🚀 Generate Learning Path", type="primary"):
             # Generate learning path
-            prompt = generate_learning_path_prompt(
-                fase_kurikulum, mata_pelajaran, 
-                st.session_state.hasil_asesmen['daya_serap'],
-                gaya_belajar, ", ".join(dimensi_target)
+            learning_path = rekomendasi_learning_path(
+                fase_kurikulum, mata_pelajaran, st.session_state.hasil_asesmen['daya_serap'],
+                gaya_belajar, dimensi_target, minat_persen
             )
             
-            # Simulasi rekomendasi (placeholder untuk LLM API)
-            rekomendasi_materi = [
-                f"Modul 1: Penguatan dasar {mata_pelajaran} (Level C2-C3)",
-                f"Modul 2: Aktivitas {gaya_belajar.lower()} interaktif",
-                f"Modul 3: Projek berbasis {dimensi_target[0] if dimensi_target else 'karakter'}",
-                f"Modul 4: Asesmen formatif lanjutan",
-                f"Modul 5: Pengayaan dan tantangan tingkat tinggi"
-            ]
-            
             st.success("✅ Learning Path berhasil di-generate!")
             
             st.subheader("📚 Rekomendasi Materi Adaptif")
-            for i, materi in enumerate(rekomendasi_materi, 1):
+            for i, materi in enumerate(learning_path['materi'], 1):
                 st.write(f"{i}. {materi}")
             
             # Actionable Recommendations
             st.markdown("---")
             st.subheader("💡 Actionable Recommendations")
             
-            rekomendasi_aksi = []
-            
-            if st.session_state.hasil_asesmen['daya_serap'] < 70:
-                rekomendasi_aksi.append("📉 Tambah sesi remedial untuk meningkatkan daya serap minimal 15%")
-            
-            if gaya_belajar == "Visual":
-                rekomendasi_aksi.append("🎨 Sesuaikan konten dengan lebih banyak diagram, infografis, dan video")
-            elif gaya_belajar == "Kinestetik":
-                rekomendasi_aksi.append("🤸 Tambah aktivitas hands-on, eksperimen, dan praktik langsung")
-            
-            if minat_persen < 60:
-                rekomendasi_aksi.append("🎯 Tingkatkan engagement dengan gamifikasi atau topik kontekstual")
-            
-            if dimensi_target:
-                rekomendasi_aksi.append(f"🌟 Fokus pada projek yang mengembangkan {dimensi_target[0]} melalui kolaborasi")
-            
-            for rekomendasi in rekomendasi_aksi:
+            for rekomendasi in learning_path['aksi']:
                 st.info(rekomendasi)
             
+            if st.session_state.get('lp_narasi'):
+                with st.expander("🤖 Narasi LLM", expanded=True):
+                    st.write(layanan_generasi().generate(learning_path['prompt']))
+                    stat = layanan_generasi().statistik()
+                    st.caption(f"Hit rate cache {stat['hit_rate']:.0%} · {stat['panggilan_backend']} panggilan backend "
+                               f"dari {stat['permintaan']} permintaan")
+            
             # Visualisasi distribusi gaya belajar (contoh data kelas)
             st.subheader("📊 Distribusi Gaya Belajar Kelas")
             gaya_dist = {"Visual": 45, "Auditori": 30, "Kinestetik": 25}
-            fig = buat_pie_chart_gaya_belajar(gaya_dist)
-            st.pyplot(fig)
-            plt.close()
+            tampilkan_grafik("gaya_belajar", gaya_dist, buat_pie_chart_gaya_belajar)
+    
+    # Learning path seluruh kelas dari indeks lokal: satu lookup per siswa, tanpa koneksi
+    st.markdown("---")
+    st.subheader("👥 Learning Path Seluruh Kelas")
+    
+    col_kelas1, col_kelas2 = st.columns(2)
+    with col_kelas1:
+        mapel_kelas = st.selectbox("Mata Pelajaran Kelas", MATA_PELAJARAN, key="lp_kelas_mapel")
+    with col_kelas2:
+        gaya_kelas = st.selectbox("Gaya Belajar Default", GAYA_BELAJAR, key="lp_kelas_gaya")
+    st.caption("Dimensi fokus tiap siswa: dimensi P5 dengan skor terendah dari projek terakhirnya.")
+    
+    if st.button(f"⚡ Generate untuk Kelas {kelas or '(tanpa kelas)'}", key="lp_kelas"):
+        from edumerdeka.learning_path import indeks_learning_path
+        from edumerdeka.optimasi import profil_dari_penyimpanan
+        
+        mulai = time.perf_counter()
+        daftar_profil = profil_dari_penyimpanan(penyimpanan(), kelas=kelas)
+        hasil_kelas = indeks_learning_path().rekomendasi_kelas(daftar_profil, mapel_kelas, gaya_kelas)
+        if st.session_state.get('lp_narasi') and hasil_kelas:
+            from edumerdeka.learning_path import generate_learning_path_prompt
+            
+            daftar_narasi = layanan_generasi().generate_banyak([
+                generate_learning_path_prompt(profil['fase'], mapel_kelas, h['daya_serap'], gaya_kelas,
+                                              h['dimensi'] or '')
+                for profil, h in zip(daftar_profil, hasil_kelas)])
+            for h, narasi in zip(hasil_kelas, daftar_narasi):
+                h['narasi'] = narasi
+        durasi_ms = (time.perf_counter() - mulai) * 1000
+        
+        if not hasil_kelas:
+            st.info("📭 Belum ada asesmen tersimpan untuk kelas ini.")
+        else:
+            import pandas as pd
+            
+            df_kelas = pd.DataFrame([{
+                'Nama': h['nama_siswa'],
+                'Daya Serap (%)': round(h['daya_serap'], 1),
+                'Band': h['band'],
+                'Dimensi Fokus': h['dimensi'] or '-',
+                'Modul 1': h['materi'][0],
+                'Aksi Utama': h['aksi'][0],
+            } for h in hasil_kelas])
+            st.success(f"✅ Learning path {len(hasil_kelas)} siswa di-generate dalam {durasi_ms:.0f} ms")
+            st.dataframe(df_kelas, use_container_width=True, hide_index=True)
+            if 'narasi' in hasil_kelas[0]:
+                stat = layanan_generasi().statistik()
+                st.caption(f"🤖 Narasi LLM: {stat['panggilan_backend']} panggilan backend dari {stat['permintaan']} "
+                           f"permintaan (hit rate {stat['hit_rate']:.0%}, hemat ±${stat['biaya_dihemat']:.4f})")
+            st.download_button(
+                label="⬇️ Download CSV",
+                data=pd.DataFrame([{**{k: h[k] for k in ('nama_siswa', 'kelas', 'daya_serap', 'band', 'dimensi')},
+                                    'materi': " | ".join(h['materi']), 'aksi': " | ".join(h['aksi']),
+                                    **({'narasi': h['narasi']} if 'narasi' in h else {})}
+                                   for h in hasil_kelas]).to_csv(index=False),
+                file_name=f"learning_path_{kelas or 'kelas'}.csv",
+                mime="text/csv",
+                key="lp_kelas_unduh"
+            )
+
+tampilkan_tab(tab2, tab_learning_path, fase_kurikulum)
 
 # TAB 3: Projek P5
-with tab3:
+@fragment_terukur
+def tab_projek_p5(konteks_siswa):
     st.header("🎨 Modul Projek Penguatan Profil Pelajar Pancasila (P5)")
+    tampilkan_pesan_flash("p5")
     
     st.markdown("""
     <div class="info-box">
@@ -544,24 +914,37 @@ with tab3:
             'tanggal': datetime.now().strftime("%Y-%m-%d")
         }
         
-        st.success("✅ Projek P5 berhasil disimpan!")
+        if simpan_ke_database('projek_p5', konteks_siswa, st.session_state.projek_p5):
+            rerun_dengan_pesan("✅ Projek P5 berhasil disimpan!", "p5")
+        else:
+            rerun_dengan_pesan("✅ Projek P5 berhasil disimpan! (Isi Nama Siswa di sidebar agar tersimpan permanen)", "p5")
+    
+    if st.session_state.projek_p5:
+        p5 = st.session_state.projek_p5
+        dimensi_scores = p5['dimensi_scores']
         
         # Tampilkan hasil
-        st.metric("Skor Karakter Total", f"{skor_karakter_rata:.1f}/10",
+        st.metric("Skor Karakter Total", f"{p5['skor_karakter']:.1f}/10",
                  delta=f"Gabungan 6 dimensi")
         
         # Visualisasi
-        fig = buat_visualisasi_karakter(dimensi_scores)
-        st.pyplot(fig)
-        plt.close()
+        tampilkan_grafik("karakter", dimensi_scores, buat_visualisasi_karakter)
         
         # Rekomendasi
         dimensi_terendah = min(dimensi_scores, key=dimensi_scores.get)
         st.warning(f"💡 Rekomendasi: Tambah aktivitas yang mengembangkan dimensi '{dimensi_terendah}' "
                   f"untuk meningkatkan skor karakter hingga 20%")
 
+tampilkan_tab(tab3, tab_projek_p5, konteks_siswa)
+
 # TAB 4: E-Portofolio
-with tab4:
+# Pilihan rentang timeline portofolio -> jumlah hari (None = semua)
+RENTANG_TIMELINE = {"Semua": None, "12 Bulan Terakhir": 365, "6 Bulan Terakhir": 182}
+ENTRY_PER_HALAMAN = 5
+
+@fragment_terukur
+def tab_e_portofolio(konteks_siswa):
+    nama_siswa = konteks_siswa['nama_siswa']
     st.header("📁 E-Portofolio Kemajuan")
     
     st.markdown("""
@@ -579,13 +962,20 @@ with tab4:
                                          type=['jpg', 'jpeg', 'png', 'pdf'],
                                          help="Format: JPG, PNG, PDF (max 10MB)")
         
+        info_karya = None
         if uploaded_karya:
-            file_type = uploaded_karya.type
+            info_karya = proses_unggahan_karya(uploaded_karya)
             
-            if 'image' in file_type:
-                image = Image.open(uploaded_karya)
-                st.image(image, caption="Preview Karya", use_container_width=True)
-            elif 'pdf' in file_type:
+            if info_karya and info_karya['jenis'] == 'gambar':
+                # Preview memakai thumbnail; salinan tampilan (resolusi terbatas) hanya dikirim jika diminta
+                if st.toggle("🔍 Tampilkan ukuran penuh", key="karya_ukuran_penuh"):
+                    st.image(penyimpanan_karya().data_uri(info_karya['hash'], thumbnail=False),
+                             caption="Preview Karya", use_container_width=True)
+                else:
+                    st.image(penyimpanan_karya().data_uri(info_karya['hash']), caption="Preview Karya")
+                st.caption(f"{info_karya['bytes_asli'] / 1024:.0f} KB → thumbnail "
+                           f"{info_karya['bytes_thumbnail'] / 1024:.0f} KB (metadata EXIF dihapus)")
+            elif info_karya:
                 st.success(f"✅ PDF berhasil diupload: {uploaded_karya.name}")
             
             judul_karya = st.text_input("Judul Karya", placeholder="Contoh: Karya Seni Kolase")
@@ -616,7 +1006,8 @@ with tab4:
                 'periode': periode,
                 'narasi': narasi_kemajuan,
                 'kompetensi': kompetensi_yang_berkembang,
-                'karya': uploaded_karya.name if uploaded_karya else None
+                'karya': uploaded_karya.name if uploaded_karya else None,
+                'karya_hash': info_karya['hash'] if info_karya else None
             }
             
             if nama_siswa not in st.session_state.portofolio:
@@ -624,26 +1015,37 @@ with tab4:
             
             st.session_state.portofolio[nama_siswa].append(entry_portofolio)
             
-            st.success("✅ Entry portofolio berhasil disimpan!")
+            if simpan_ke_database('portofolio', konteks_siswa, entry_portofolio):
+                st.success("✅ Entry portofolio berhasil disimpan!")
+            else:
+                st.success("✅ Entry portofolio berhasil disimpan! (Isi Nama Siswa di sidebar agar tersimpan permanen)")
     
     with col2:
         st.subheader("Timeline Kemajuan")
         
-        # Simulasi data timeline
-        if st.session_state.portofolio and nama_siswa in st.session_state.portofolio:
-            st.write(f"**Total Entry:** {len(st.session_state.portofolio[nama_siswa])}")
-            
-            # Timeline visualization
-            timeline_data = {
-                "Jan 2026": 65,
-                "Feb 2026": 72,
-                "Mar 2026": 78,
-                "Apr 2026": 85
-            }
+        from edumerdeka.deret_waktu import data_timeline, muat_deret
+        
+        rentang = st.selectbox("Rentang Waktu", list(RENTANG_TIMELINE), key="rentang_timeline")
+        dari = None
+        if RENTANG_TIMELINE[rentang]:
+            dari = (datetime.now() - timedelta(days=RENTANG_TIMELINE[rentang])).strftime("%Y-%m-%d")
+        deret = muat_deret(penyimpanan(), nama_siswa, konteks_siswa['kelas'], dari=dari) if nama_siswa else {}
+        
+        if deret:
+            jumlah_titik = {seri: len(tanggal) for seri, (tanggal, _) in deret.items()}
+            st.write(" · ".join(f"**{seri}:** {n}" for seri, n in jumlah_titik.items()))
             
-            fig = buat_timeline_portofolio(timeline_data)
-            st.pyplot(fig)
-            plt.close()
+            # Riwayat panjang di-downsample (LTTB) agar jumlah titik grafik tetap terbatas
+            timeline_data = data_timeline(deret)
+            tampilkan_grafik("timeline_portofolio", timeline_data, buat_timeline_portofolio)
+            if len(timeline_data['Tanggal']) < sum(jumlah_titik.values()):
+                st.caption(f"{sum(jumlah_titik.values()):,} titik diringkas menjadi "
+                           f"{len(timeline_data['Tanggal']):,} titik (LTTB)")
+        elif dari and nama_siswa and muat_deret(penyimpanan(), nama_siswa, konteks_siswa['kelas']):
+            st.info(f"Tidak ada data pada rentang {rentang.lower()}.")
+        elif st.session_state.portofolio and nama_siswa in st.session_state.portofolio:
+            st.write(f"**Total Entry:** {len(st.session_state.portofolio[nama_siswa])}")
+            st.info("Timeline dibuat dari data tersimpan. Isi Nama Siswa di sidebar agar entry tersimpan permanen.")
         else:
             st.info("Belum ada data portofolio. Silakan tambahkan entry pertama.")
     
@@ -652,84 +1054,93 @@ with tab4:
         st.markdown("---")
         st.subheader("📊 Summary E-Portofolio")
         
-        entries = st.session_state.portofolio[nama_siswa]
+        # Terbaru lebih dulu, per halaman
+        entries = st.session_state.portofolio[nama_siswa][::-1]
+        jumlah_halaman = (len(entries) - 1) // ENTRY_PER_HALAMAN + 1
+        halaman = 1
+        if jumlah_halaman > 1:
+            halaman = st.number_input(f"Halaman (dari {jumlah_halaman})", min_value=1, max_value=jumlah_halaman,
+                                      value=1, step=1, key="halaman_portofolio")
+        awal = (halaman - 1) * ENTRY_PER_HALAMAN
         
-        for i, entry in enumerate(entries[-3:], 1):  # Tampilkan 3 terakhir
-            with st.expander(f"Entry {i} - {entry['tanggal']} ({entry['periode']})"):
+        for i, entry in enumerate(entries[awal:awal + ENTRY_PER_HALAMAN], awal + 1):
+            with st.expander(f"Entry {len(entries) - i + 1} - {entry['tanggal']} ({entry['periode']})"):
                 st.write(f"**Narasi:** {entry['narasi']}")
                 st.write(f"**Kompetensi:** {', '.join(entry['kompetensi'])}")
                 if entry['karya']:
                     st.write(f"**Karya:** {entry['karya']}")
+                    info_entry = None if mode_hemat else penyimpanan_karya().info(entry.get('karya_hash'))
+                    if info_entry and info_entry['jenis'] == 'gambar':
+                        st.image(penyimpanan_karya().data_uri(info_entry['hash']))
 
-# TAB 5: Dashboard Analisis
-with tab5:
-    st.header("📊 Dashboard Analisis & Decision Making")
-    
-    st.markdown("""
-    <div class="info-box">
-    Analisis komprehensif dengan visualisasi, simulasi skenario, dan benchmark comparison.
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Ringkasan Metrics
-    st.subheader("📈 Key Performance Indicators")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    daya_serap_current = st.session_state.hasil_asesmen.get('daya_serap', 0) if st.session_state.hasil_asesmen else 0
-    skor_karakter_current = st.session_state.projek_p5.get('skor_karakter', 0) * 10 if st.session_state.projek_p5 else 0
-    
-    with col1:
-        st.metric("Daya Serap Kognitif", 
-                 f"{daya_serap_current:.1f}%",
-                 delta="±10% CI",
-                 help="Tingkat pemahaman TP dengan confidence interval")
-    
-    with col2:
-        # Simulasi ketercapaian ATP
-        ketercapaian_atp = hitung_ketercapaian_atp(8, 10)  # 8 dari 10 materi
-        st.metric("Ketercapaian ATP", 
-                 f"{ketercapaian_atp:.0f}%",
-                 delta="+15% dari bulan lalu",
-                 help="Persentase materi ATP yang sudah dikuasai")
-    
-    with col3:
-        st.metric("Skor Karakter", 
-                 f"{skor_karakter_current:.0f}/100",
-                 delta="+8 poin",
-                 help="Gabungan 6 dimensi Profil Pelajar Pancasila")
-    
-    with col4:
-        # Simulasi minat
-        minat_avg = 75
-        st.metric("Minat & Engagement", 
-                 f"{minat_avg}%",
-                 delta="+5%",
-                 help="Berdasarkan interaksi dengan konten")
-    
-    # Threshold Alerts
-    st.markdown("---")
+tampilkan_tab(tab4, tab_e_portofolio, konteks_siswa)
+
+# Panel Dashboard yang interaktif dirender sebagai fragment terpisah, sehingga
+# menggeser slider What-If tidak menjalankan ulang tab lain maupun panel Benchmark
+@fragment_terukur
+def panel_peringatan(ketercapaian_atp, skor_karakter_current, daya_serap_current):
     st.subheader("⚠️ Threshold Alerts")
     
-    alerts = []
-    
-    if ketercapaian_atp < 70:
-        alerts.append(("warning", f"🔴 Ketercapaian ATP ({ketercapaian_atp:.0f}%) di bawah threshold 70%"))
-    
-    if skor_karakter_current < 50:
-        alerts.append(("warning", f"🔴 Skor Karakter ({skor_karakter_current:.0f}) di bawah threshold 50"))
-    
-    if daya_serap_current < 60:
-        alerts.append(("warning", f"🔴 Daya Serap ({daya_serap_current:.1f}%) perlu peningkatan"))
-    
+    from edumerdeka.peringatan import INDIKATOR, evaluasi_nilai, muat_aturan, validasi_aturan
+    
+    # Ambang dapat diubah per sesi; default dari EDUMERDEKA_ATURAN_PERINGATAN
+    aturan_default = muat_aturan()
+    with st.expander("⚙️ Atur Threshold", expanded=False):
+        kolom_ambang = st.columns(len(aturan_default))
+        aturan = validasi_aturan([
+            {'indikator': indikator, 'operator': operator,
+             'ambang': kolom.number_input(f"{INDIKATOR[indikator][0]} {operator}", min_value=0.0, max_value=100.0,
+                                          value=ambang, step=5.0, key=f"ambang_{i}_{indikator}_{operator}")}
+            for i, (kolom, (indikator, operator, ambang)) in enumerate(zip(kolom_ambang, aturan_default))
+        ])
+    
+    alerts = evaluasi_nilai(aturan, {'ketercapaian_atp': ketercapaian_atp, 'skor_karakter': skor_karakter_current,
+                                     'daya_serap': daya_serap_current})
     if not alerts:
         st.success("✅ Semua indikator dalam kondisi baik!")
     else:
-        for alert_type, message in alerts:
+        for message in alerts:
             st.warning(message)
     
+    # Siswa perlu intervensi di seluruh sekolah, dari data tersimpan periode ini
+    st.write("**🚨 Siswa Perlu Intervensi**")
+    kelas_alert = st.text_input("Kelas", value="", placeholder="Kosongkan untuk seluruh sekolah", key="alert_kelas")
+    mesin = mesin_peringatan(tahun_ajaran, semester)
+    daftar = mesin.daftar_intervensi(aturan, kelas=kelas_alert or None)
+    ringkasan = mesin.ringkasan(kelas_alert or None)
+    if not ringkasan['jumlah_siswa']:
+        st.caption(f"Belum ada data tersimpan untuk {kelas_alert or 'sekolah'} ({tahun_ajaran} - {semester}).")
+        return
+    
+    col_alert1, col_alert2, col_alert3 = st.columns(3)
+    col_alert1.metric("Siswa Dipantau", f"{ringkasan['jumlah_siswa']:,}")
+    col_alert2.metric("Perlu Intervensi", f"{ringkasan['perlu_intervensi']:,}",
+                      delta=f"{ringkasan['perlu_intervensi'] / ringkasan['jumlah_siswa']:.0%}", delta_color="off")
+    col_alert3.metric("Evaluasi Terakhir", f"{mesin.statistik['waktu_ms']:.0f} ms",
+                      delta=f"{mesin.statistik['pass_inkremental']} inkremental", delta_color="off")
+    st.caption(" · ".join(f"{INDIKATOR[indikator][0]} {operator} {ambang:g}: {jumlah:,} siswa"
+                          for (indikator, operator, ambang), jumlah in ringkasan['per_aturan'].items()))
+    
+    if daftar:
+        import pandas as pd
+        
+        df_alert = pd.DataFrame([{
+            'Nama': d['nama_siswa'], 'Kelas': d['kelas'], 'Skor Risiko': d['skor_risiko'],
+            'Peringatan': d['jumlah_peringatan'],
+            **{INDIKATOR[k][0]: d[k] for k in INDIKATOR},
+        } for d in daftar])
+        st.dataframe(df_alert.head(100), use_container_width=True, hide_index=True)
+        st.download_button(
+            label=f"⬇️ Download CSV ({len(df_alert):,} siswa)",
+            data=df_alert.to_csv(index=False),
+            file_name=f"siswa_perlu_intervensi_{kelas_alert or 'sekolah'}_{datetime.now().strftime('%Y%m%d')}.csv",
+            mime="text/csv",
+            key="alert_unduh"
+        )
+
+@fragment_terukur
+def panel_simulasi_proyeksi(daya_serap_current, minat_avg):
     # Scenario Simulation (What-If)
-    st.markdown("---")
     st.subheader("🔮 Scenario Simulation (What-If Analysis)")
     
     st.write("Simulasikan perubahan parameter untuk melihat dampaknya terhadap learning path:")
@@ -767,110 +1178,346 @@ with tab5:
         if delta_minat > 15:
             st.success("✅ Engagement meningkat, pertahankan strategi")
     
-    # Multi-semester Projection
+    # Multi-semester Projection (ikut fragment What-If karena memakai delta_serap)
     st.markdown("---")
     st.subheader("📅 Multi-Semester Projection")
     
-    st.write("Proyeksi kemajuan berdasarkan tren saat ini:")
+    st.write("Proyeksi dari riwayat daya serap tersimpan (tren per siswa, disesuaikan dengan tren kelas) "
+             "dengan rentang ketidakpastian dari simulasi Monte Carlo:")
     
-    # Simulasi proyeksi
-    semester_current = daya_serap_current
-    semester_1 = semester_current + (delta_serap * 0.5)
-    semester_2 = semester_1 + (delta_serap * 0.3)
+    from edumerdeka.proyeksi import AMBANG_RISIKO, data_grafik, indeks_semester
     
-    projection_data = {
-        "Semester Ini": semester_current,
-        "Semester +1": min(semester_1, 100),
-        "Semester +2": min(semester_2, 100)
-    }
+    kunci_siswa = (nama_siswa or "Siswa Ini", kelas)
+    hasil = proyeksi_kelas(kelas, penyimpanan().watermark('asesmen', 'daya_serap'), indeks_semester(tahun_ajaran, semester),
+                           kunci_siswa, float(daya_serap_current), float(delta_serap))
+    
+    if kunci_siswa in hasil['siswa']:
+        i = hasil['siswa'].index(kunci_siswa)
+        tampilkan_grafik("proyeksi", data_grafik(hasil['persentil'], i), buat_grafik_proyeksi)
+        st.caption(f"Median dan rentang 90% dari {hasil['jumlah_draw']:,} simulasi · "
+                   f"{hasil['jumlah_titik'][i]} semester riwayat · peluang di bawah {AMBANG_RISIKO}% "
+                   f"pada Semester +{hasil['horizon']}: {hasil['peluang_di_bawah_ambang'][i]:.0%}")
+    else:
+        st.info("📭 Belum ada riwayat daya serap untuk siswa ini. Lakukan asesmen terlebih dahulu.")
+    
+    if len(hasil['siswa']) > 1:
+        import pandas as pd
+        
+        st.markdown(f"**Proyeksi Kelas {kelas or '(tanpa kelas)'}** ({len(hasil['siswa'])} siswa)")
+        h = hasil['horizon']
+        berisiko = hasil['peluang_di_bawah_ambang'] >= 0.5
+        
+        col_kelas1, col_kelas2, col_kelas3 = st.columns(3)
+        col_kelas1.metric("Rata-rata Kelas Semester Ini", f"{hasil['kelas'][50][0]:.1f}%")
+        col_kelas2.metric(f"Rata-rata Kelas Semester +{h}", f"{hasil['kelas'][50][h]:.1f}%",
+                          delta=f"{hasil['kelas'][50][h] - hasil['kelas'][50][0]:+.1f}%",
+                          help=f"Rentang 90%: {hasil['kelas'][5][h]:.1f}% - {hasil['kelas'][95][h]:.1f}%")
+        col_kelas3.metric(f"Siswa Berisiko (<{AMBANG_RISIKO}%)", f"{int(berisiko.sum())}",
+                          help=f"Peluang daya serap di bawah {AMBANG_RISIKO}% pada Semester +{h} minimal 50%")
+        
+        with st.expander("📋 Proyeksi per Siswa"):
+            df_proyeksi = pd.DataFrame({
+                'Nama': [nama for nama, _ in hasil['siswa']],
+                'Semester Ini (%)': hasil['persentil'][50][:, 0].round(1),
+                f'Semester +{h} (%)': hasil['persentil'][50][:, h].round(1),
+                f'P5 Semester +{h} (%)': hasil['persentil'][5][:, h].round(1),
+                f'Peluang <{AMBANG_RISIKO}%': (hasil['peluang_di_bawah_ambang'] * 100).round(0),
+            }).sort_values(f'Peluang <{AMBANG_RISIKO}%', ascending=False)
+            st.dataframe(df_proyeksi, use_container_width=True, hide_index=True)
+    
+    st.caption(f"⚡ Proyeksi {len(hasil['siswa'])} siswa × {hasil['jumlah_draw']:,} simulasi "
+               f"dihitung dalam {hasil['waktu_ms']:.0f} ms")
+
+@fragment_terukur
+def panel_sweep_skenario(daya_serap_current, minat_avg):
+    st.subheader("🧮 Sweep Skenario Kelas")
+    st.write("Prediksi perubahan level Bloom seluruh kelas untuk semua kombinasi perubahan daya serap, "
+             "minat dan jam belajar tambahan, dihitung sekaligus:")
+    
+    from edumerdeka.skenario import LEVEL_BLOOM, METRIK_SKENARIO, data_heatmap, matriks_transisi
+    
+    hasil = sweep_skenario_kelas(kelas, tahun_ajaran, semester, penyimpanan().watermark('asesmen', 'daya_serap'),
+                                 (nama_siswa or "Siswa Ini", kelas), float(daya_serap_current), minat_avg)
+    if not hasil['jumlah_siswa']:
+        st.info(f"📭 Belum ada asesmen tersimpan untuk kelas {kelas or '(tanpa kelas)'} ({tahun_ajaran} - {semester}).")
+        return
+    
+    col_sweep1, col_sweep2 = st.columns(2)
+    with col_sweep1:
+        metrik = st.selectbox("Tampilkan", list(METRIK_SKENARIO), format_func=METRIK_SKENARIO.get,
+                              key="sweep_metrik")
+    with col_sweep2:
+        jam = st.select_slider("Jam Belajar Tambahan per Minggu", options=hasil['jam_tambahan'].tolist(),
+                               format_func=lambda j: f"{j:g} jam", key="sweep_jam")
+    
+    tampilkan_grafik(f"sweep_{metrik}", data_heatmap(hasil, metrik, jam), buat_heatmap_skenario)
+    st.caption(f"{METRIK_SKENARIO[metrik]} · {hasil['jumlah_skenario']:,} skenario × {hasil['jumlah_siswa']:,} "
+               f"siswa dalam {hasil['waktu_ms']:.1f} ms")
+    
+    with st.expander("🔍 Transisi Level Bloom per Skenario"):
+        import numpy as np
+        import pandas as pd
+        
+        col_det1, col_det2 = st.columns(2)
+        delta_serap = col_det1.select_slider("Δ Daya Serap", options=hasil['delta_serap'].tolist(), value=0.0,
+                                             format_func=lambda d: f"{d:+g}%", key="sweep_delta_serap")
+        delta_minat = col_det2.select_slider("Δ Minat", options=hasil['delta_minat'].tolist(), value=0.0,
+                                             format_func=lambda d: f"{d:+g}%", key="sweep_delta_minat")
+        matriks = matriks_transisi(hasil, hasil['delta_serap'].tolist().index(delta_serap),
+                                   hasil['delta_minat'].tolist().index(delta_minat),
+                                   hasil['jam_tambahan'].tolist().index(jam))
+        st.dataframe(pd.DataFrame(matriks, index=[f"Dari {l}" for l in LEVEL_BLOOM],
+                                  columns=[f"Ke {l}" for l in LEVEL_BLOOM]), use_container_width=True)
+        naik = int(matriks[np.triu_indices(len(LEVEL_BLOOM), 1)].sum())
+        turun = int(matriks[np.tril_indices(len(LEVEL_BLOOM), -1)].sum())
+        st.caption(f"{naik} siswa naik level · {turun} siswa turun level · "
+                   f"{hasil['jumlah_siswa'] - naik - turun} tetap")
+
+@fragment_terukur
+def panel_benchmark(daya_serap_current, ketercapaian_atp, skor_karakter_current):
+    st.subheader("📊 Comparison vs Benchmark")
     
-    fig, ax = plt.subplots(figsize=(10, 5))
-    semesters = list(projection_data.keys())
-    values = list(projection_data.values())
+    from edumerdeka.benchmark import benchmark_siswa
+    from edumerdeka.grafik import LABEL_BENCHMARK
     
-    ax.plot(semesters, values, marker='o', linewidth=2, markersize=10, color='#2ca02c')
-    ax.fill_between(range(len(values)), values, alpha=0.3, color='#2ca02c')
-    ax.set_ylabel('Daya Serap (%)', fontsize=12)
-    ax.set_title('Proyeksi Kemajuan Daya Serap', fontsize=14, fontweight='bold')
-    ax.set_ylim(0, 100)
-    ax.grid(True, alpha=0.3)
+    # Benchmark dari sketsa kuantil yang diperbarui setiap kali data tersimpan
+    benchmark = benchmark_siswa(penyimpanan(), {'daya_serap': daya_serap_current, 'skor_karakter': skor_karakter_current},
+                                kelas, tahun_ajaran, semester, sketsa_kabupaten())
     
-    for i, v in enumerate(values):
-        ax.text(i, v + 3, f'{v:.1f}%', ha='center', fontweight='bold')
+    def rata(tingkat, metrik):
+        nilai = benchmark[tingkat][metrik]['rata_rata']
+        return None if nilai is None else round(nilai, 1)
     
-    plt.tight_layout()
-    st.pyplot(fig)
-    plt.close()
+    # Ketercapaian ATP dari mesin peringatan (rumus yang sama dengan kartu KPI), hanya untuk data sekolah ini
+    mesin = mesin_peringatan(tahun_ajaran, semester)
+    atp_benchmark = {'kelas': mesin.rata_rata_indikator('ketercapaian_atp', kelas),
+                     'sekolah': mesin.rata_rata_indikator('ketercapaian_atp')}
     
-    # Comparison vs Benchmark
-    st.markdown("---")
-    st.subheader("📊 Comparison vs Benchmark")
+    def rata_atp(tingkat):
+        nilai = atp_benchmark.get(tingkat)
+        return None if nilai is None else round(nilai, 1)
     
     col_bench1, col_bench2 = st.columns(2)
     
     with col_bench1:
-        # Data benchmark (dari Kemdikbud/PMM)
         benchmark_data = {
-            "Kategori": ["Siswa Ini", "Rata-rata Kelas", "Rata-rata Nasional"],
-            "Daya Serap (%)": [daya_serap_current, 72, 75],
-            "Ketercapaian ATP (%)": [ketercapaian_atp, 78, 80],
-            "Skor Karakter": [skor_karakter_current, 68, 70]
+            "Kategori": [LABEL_BENCHMARK['siswa']] + [LABEL_BENCHMARK[t] for t in benchmark],
+            "Daya Serap (%)": [round(daya_serap_current, 1)] + [rata(t, 'daya_serap') for t in benchmark],
+            "Ketercapaian ATP (%)": [ketercapaian_atp] + [rata_atp(t) for t in benchmark],
+            "Skor Karakter": [round(skor_karakter_current, 1)] + [rata(t, 'skor_karakter') for t in benchmark],
         }
         
+        import pandas as pd
+        
         df_benchmark = pd.DataFrame(benchmark_data)
-        st.dataframe(df_benchmark, use_container_width=True)
+        st.dataframe(df_benchmark, use_container_width=True, hide_index=True)
+        
+        # Posisi siswa di setiap tingkat
+        for tingkat, hasil in benchmark.items():
+            bagian = []
+            for metrik, nama in (('daya_serap', "Daya Serap"), ('skor_karakter', "Skor Karakter")):
+                if hasil[metrik]['persentil'] is not None:
+                    bagian.append(f"{nama} P{hasil[metrik]['persentil']:.0f} "
+                                  f"(median {hasil[metrik]['p50']:.1f}, n={hasil[metrik]['jumlah']:,})")
+            if bagian:
+                st.caption(f"📍 {LABEL_BENCHMARK[tingkat].replace('Rata-rata ', '')}: " + " · ".join(bagian))
+        if not any(hasil['daya_serap']['jumlah'] for hasil in benchmark.values()):
+            st.caption("Belum ada asesmen tersimpan untuk dijadikan benchmark.")
     
     with col_bench2:
         # Visualisasi comparison
-        fig, ax = plt.subplots(figsize=(8, 6))
+        data_grafik_benchmark = {
+            'siswa': [round(daya_serap_current, 1), ketercapaian_atp, round(skor_karakter_current, 1)],
+            **{t: [rata(t, 'daya_serap'), rata_atp(t), rata(t, 'skor_karakter')] for t in benchmark},
+        }
+        tampilkan_grafik("benchmark", data_grafik_benchmark, buat_grafik_benchmark)
+
+@fragment_terukur
+def panel_optimasi(daya_serap_current):
+    st.subheader("⚙️ Optimization Suggestion")
+    
+    from edumerdeka.optimasi import GAYA_BELAJAR, JAM_DEFAULT, SKOR_KARAKTER_MIN_DEFAULT
+    
+    col_opt1, col_opt2, col_opt3 = st.columns(3)
+    with col_opt1:
+        jam_tersedia = st.slider("Waktu Tersedia (jam/minggu)", 1.0, 20.0, JAM_DEFAULT, 0.5, key="opt_jam")
+    with col_opt2:
+        skor_karakter_min = st.slider("Skor Karakter Minimal", 0, 100, int(SKOR_KARAKTER_MIN_DEFAULT), 5,
+                                      key="opt_karakter")
+    with col_opt3:
+        gaya_default = st.session_state.get('gaya_belajar', "Visual")
+        gaya_belajar = st.selectbox("Gaya Belajar", GAYA_BELAJAR, index=GAYA_BELAJAR.index(gaya_default),
+                                    key="opt_gaya")
+    
+    dimensi_scores = st.session_state.projek_p5.get('dimensi_scores') if st.session_state.projek_p5 else None
+    if not dimensi_scores:
+        st.caption("Belum ada penilaian P5; skor dimensi dianggap 5/10.")
+    
+    hasil = optimasi_waktu().optimasi(daya_serap_current, gaya_belajar, dimensi_scores,
+                                      jam_tersedia, skor_karakter_min)
+    
+    st.write(f"Berdasarkan optimasi MILP (constraint: waktu ≤{jam_tersedia:g} jam/minggu, "
+             f"skor karakter ≥{skor_karakter_min}):")
+    
+    if not hasil['alokasi']:
+        st.warning(f"⚠️ Solver tidak menemukan alokasi (status: {hasil['status']})")
+        return
+    
+    for alokasi in hasil['alokasi']:
+        if alokasi['jenis'] == 'ATP':
+            st.success(f"✅ Alokasi {alokasi['jam']:g} jam/minggu untuk {alokasi['aktivitas']} "
+                       f"→ estimasi +{alokasi['dampak']:.1f}% daya serap")
+        else:
+            st.success(f"✅ Alokasi {alokasi['jam']:g} jam/minggu untuk {alokasi['aktivitas']} "
+                       f"→ estimasi +{alokasi['dampak']:.1f} poin dimensi {alokasi['target']}")
+    
+    if not hasil['target_karakter_tercapai']:
+        st.warning(f"⚠️ Skor karakter {skor_karakter_min} belum tercapai dengan waktu yang tersedia "
+                   f"(estimasi {hasil['estimasi_skor_karakter']:.0f}); tambah jam projek P5")
+    
+    col_est1, col_est2, col_est3 = st.columns(3)
+    col_est1.metric("Estimasi Daya Serap", f"{hasil['estimasi_daya_serap']:.1f}%",
+                    delta=f"{hasil['estimasi_daya_serap'] - daya_serap_current:+.1f}%")
+    col_est2.metric("Estimasi Skor Karakter", f"{hasil['estimasi_skor_karakter']:.0f}/100")
+    col_est3.metric("Total Waktu", f"{hasil['total_jam']:g} jam/minggu")
+    st.caption(f"Solver: {hasil['status']} • "
+               + ("dari cache" if hasil['dari_cache'] else f"{hasil['waktu_solve_ms']:.0f} ms"))
+
+@fragment_terukur
+def panel_optimasi_kohort(kelas, tahun_ajaran, semester):
+    st.subheader("🏫 Optimasi Kohort")
+    st.write("Alokasi waktu untuk semua siswa tersimpan; siswa dengan profil yang sama di-solve sekali saja.")
+    
+    from edumerdeka.optimasi import GAYA_BELAJAR
+    
+    col_koh1, col_koh2 = st.columns(2)
+    with col_koh1:
+        kelas_kohort = st.text_input("Kelas", value=kelas, placeholder="Kosongkan untuk seluruh sekolah",
+                                     key="kohort_kelas")
+    with col_koh2:
+        gaya_default = st.selectbox("Gaya Belajar Default", GAYA_BELAJAR, key="kohort_gaya",
+                                    help="Dipakai untuk siswa yang belum memiliki data gaya belajar")
+    
+    if st.button("⚙️ Jalankan Optimasi Kohort"):
+        import pandas as pd
         
-        categories = ['Daya Serap', 'Ketercapaian ATP', 'Skor Karakter']
-        siswa = [daya_serap_current, ketercapaian_atp, skor_karakter_current]
-        kelas = [72, 78, 68]
-        nasional = [75, 80, 70]
+        from edumerdeka.optimasi import baris_hasil_kohort, optimasi_kohort, profil_dari_penyimpanan
         
-        x = np.arange(len(categories))
-        width = 0.25
+        daftar_profil = profil_dari_penyimpanan(penyimpanan(), tahun_ajaran, semester, kelas_kohort or None)
+        if not daftar_profil:
+            st.warning(f"Belum ada asesmen tersimpan untuk {kelas_kohort or 'sekolah'} "
+                       f"({tahun_ajaran} - {semester})")
+            return
         
-        ax.bar(x - width, siswa, width, label='Siswa Ini', color='#1f77b4')
-        ax.bar(x, kelas, width, label='Rata-rata Kelas', color='#ff7f0e')
-        ax.bar(x + width, nasional, width, label='Rata-rata Nasional', color='#2ca02c')
+        bar_progres = st.progress(0.0, text="Menyusun model...")
         
-        ax.set_ylabel('Skor', fontsize=12)
-        ax.set_title('Perbandingan Performance', fontsize=14, fontweight='bold')
-        ax.set_xticks(x)
-        ax.set_xticklabels(categories)
-        ax.legend()
-        ax.grid(axis='y', alpha=0.3)
+        def perbarui_progres(selesai, total):
+            bar_progres.progress(selesai / total, text=f"{selesai}/{total} model selesai")
+        
+        hasil_siswa, laporan = optimasi_kohort(daftar_profil, optimasi_waktu(), gaya_default=gaya_default,
+                                               progres=perbarui_progres)
+        bar_progres.empty()
+        
+        col_lap1, col_lap2, col_lap3, col_lap4 = st.columns(4)
+        col_lap1.metric("Siswa", f"{laporan['jumlah_siswa']:,}")
+        col_lap2.metric("Model Unik", laporan['jumlah_model'], delta=f"{laporan['jumlah_kohort']} kohort",
+                        delta_color="off")
+        col_lap3.metric("Cache Hit", f"{laporan['hit_rate_cache']:.0%}")
+        col_lap4.metric("Waktu Total", f"{laporan['waktu_total_ms'] / 1000:.1f} s",
+                        delta=f"{laporan['jumlah_worker']} worker", delta_color="off")
+        st.caption(f"{laporan['model_di_solve']} model di-solve (total {laporan['total_waktu_solve_ms']:.0f} ms, "
+                   f"maks {laporan['maks_waktu_solve_ms']:.0f} ms) • {laporan['model_dari_cache']} dari cache")
+        
+        df_kohort = pd.DataFrame(baris_hasil_kohort(hasil_siswa))
+        st.dataframe(df_kohort.head(100), use_container_width=True)
+        st.download_button(
+            label=f"⬇️ Download CSV ({len(df_kohort):,} siswa)",
+            data=df_kohort.to_csv(index=False),
+            file_name=f"optimasi_kohort_{kelas_kohort or 'sekolah'}_{datetime.now().strftime('%Y%m%d')}.csv",
+            mime="text/csv"
+        )
+
+# TAB 5: Dashboard Analisis (panel interaktifnya berupa fragment)
+def tab_dashboard_analisis():
+    st.header("📊 Dashboard Analisis & Decision Making")
+    
+    st.markdown("""
+    <div class="info-box">
+    Analisis komprehensif dengan visualisasi, simulasi skenario, dan benchmark comparison.
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Ringkasan Metrics
+    st.subheader("📈 Key Performance Indicators")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    daya_serap_current = st.session_state.hasil_asesmen.get('daya_serap', 0) if st.session_state.hasil_asesmen else 0
+    skor_karakter_current = st.session_state.projek_p5.get('skor_karakter', 0) * 10 if st.session_state.projek_p5 else 0
+    
+    with col1:
+        st.metric("Daya Serap Kognitif", 
+                 f"{daya_serap_current:.1f}%",
+                 delta="±10% CI",
+                 help="Tingkat pemahaman TP dengan confidence interval")
+    
+    with col2:
+        # Sama dengan daftar intervensi: asesmen tersimpan periode ini yang mencapai KKTP,
+        # atau asesmen sesi ini jika siswa belum punya data tersimpan
+        from edumerdeka.peringatan import KKTP, ketercapaian_atp as hitung_ketercapaian
         
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+        indikator_tersimpan = (mesin_peringatan(tahun_ajaran, semester).indikator_siswa(nama_siswa, kelas)
+                               if nama_siswa else {})
+        ketercapaian_atp = indikator_tersimpan.get('ketercapaian_atp')
+        if ketercapaian_atp is None and st.session_state.hasil_asesmen:
+            ketercapaian_atp = hitung_ketercapaian([daya_serap_current])
+        st.metric("Ketercapaian ATP", 
+                 "-" if ketercapaian_atp is None else f"{ketercapaian_atp:.0f}%",
+                 help=f"Persentase asesmen periode ini dengan daya serap minimal KKTP ({KKTP}%)")
+    
+    with col3:
+        st.metric("Skor Karakter", 
+                 f"{skor_karakter_current:.0f}/100",
+                 delta="+8 poin",
+                 help="Gabungan 6 dimensi Profil Pelajar Pancasila")
+    
+    with col4:
+        # Simulasi minat
+        minat_avg = 75
+        st.metric("Minat & Engagement", 
+                 f"{minat_avg}%",
+                 delta="+5%",
+                 help="Berdasarkan interaksi dengan konten")
     
-    # Optimization Suggestion (using PuLP concept)
+    # Threshold Alerts
     st.markdown("---")
-    st.subheader("⚙️ Optimization Suggestion")
+    panel_peringatan(ketercapaian_atp, skor_karakter_current, daya_serap_current)
     
-    st.write("""
-    Berdasarkan analisis optimasi (constraint: waktu <10 jam/minggu, skor karakter >50):
-    """)
+    # Scenario Simulation (What-If) & Multi-semester Projection
+    st.markdown("---")
+    panel_simulasi_proyeksi(daya_serap_current, minat_avg)
     
-    optimization_results = [
-        "✅ Alokasi 3 jam/minggu untuk projek Bergotong Royong → estimasi +15% dimensi karakter",
-        "✅ Tambah 2 jam konten visual → estimasi +10% daya serap untuk gaya belajar visual",
-        "✅ Prioritaskan materi ATP dengan ROI tertinggi → efisiensi +20%",
-        "⚠️ Kurangi aktivitas repetitif, fokus pada aplikasi praktis"
-    ]
+    st.markdown("---")
+    panel_sweep_skenario(daya_serap_current, minat_avg)
     
-    for result in optimization_results:
-        if "✅" in result:
-            st.success(result)
-        else:
-            st.warning(result)
+    # Comparison vs Benchmark
+    st.markdown("---")
+    panel_benchmark(daya_serap_current, ketercapaian_atp, skor_karakter_current)
+    
+    # Optimization Suggestion (PuLP)
+    st.markdown("---")
+    panel_optimasi(daya_serap_current)
+    
+    st.markdown("---")
+    panel_optimasi_kohort(kelas, tahun_ajaran, semester)
+
+tampilkan_tab(tab5, tab_dashboard_analisis)
 
 # TAB 6: Export & Integrasi
-with tab6:
+@fragment_terukur
+def tab_export_integrasi(nama_siswa, kelas, tahun_ajaran, semester):
     st.header("💾 Export & Integrasi")
+    tampilkan_pesan_flash("export")
     
     st.markdown("""
     <div class="info-box">
@@ -888,6 +1535,8 @@ with tab6:
         
         if st.button("📊 Export Data Asesmen (CSV)"):
             if st.session_state.hasil_asesmen:
+                import pandas as pd
+                
                 df_export = pd.DataFrame([st.session_state.hasil_asesmen])
                 csv = df_export.to_csv(index=False)
                 
@@ -903,6 +1552,8 @@ with tab6:
         
         if st.button("📊 Export Data P5 (Excel)"):
             if st.session_state.projek_p5:
+                import pandas as pd
+                
                 # Flatten nested dict for Excel
                 df_p5 = pd.DataFrame([{
                     'Nama Projek': st.session_state.projek_p5.get('nama_projek', ''),
@@ -933,47 +1584,16 @@ with tab6:
         
         if st.button("📄 Generate Laporan PDF"):
             try:
-                from fpdf import FPDF
+                from edumerdeka.laporan import buat_laporan_pdf
                 
-                pdf = FPDF()
-                pdf.add_page()
-                
-                # Header
-                pdf.set_font("Arial", 'B', 16)
-                pdf.cell(0, 10, "LAPORAN KEMAJUAN BELAJAR", ln=True, align='C')
-                pdf.set_font("Arial", '', 12)
-                pdf.cell(0, 10, f"Nama Siswa: {nama_siswa}", ln=True)
-                pdf.cell(0, 10, f"Kelas: {kelas}", ln=True)
-                pdf.cell(0, 10, f"Tahun Ajaran: {tahun_ajaran} - Semester {semester}", ln=True)
-                pdf.ln(10)
-                
-                # Hasil Asesmen
-                if st.session_state.hasil_asesmen:
-                    pdf.set_font("Arial", 'B', 14)
-                    pdf.cell(0, 10, "Hasil Asesmen Diagnostik", ln=True)
-                    pdf.set_font("Arial", '', 12)
-                    hasil = st.session_state.hasil_asesmen
-                    pdf.cell(0, 8, f"Daya Serap: {hasil['daya_serap']:.1f}%", ln=True)
-                    pdf.cell(0, 8, f"TP Dikuasai: {hasil['tp_dikuasai']}/{hasil['jumlah_soal']}", ln=True)
-                    pdf.ln(5)
-                
-                # Projek P5
-                if st.session_state.projek_p5:
-                    pdf.set_font("Arial", 'B', 14)
-                    pdf.cell(0, 10, "Projek P5", ln=True)
-                    pdf.set_font("Arial", '', 12)
-                    p5 = st.session_state.projek_p5
-                    pdf.cell(0, 8, f"Nama Projek: {p5.get('nama_projek', '')}", ln=True)
-                    pdf.cell(0, 8, f"Skor Karakter: {p5.get('skor_karakter', 0):.1f}/10", ln=True)
-                    pdf.ln(5)
-                
-                # Footer
-                pdf.set_font("Arial", 'I', 10)
-                pdf.cell(0, 10, f"Dibuat: {datetime.now().strftime('%Y-%m-%d %H:%M')}", ln=True)
-                pdf.cell(0, 10, "EduMerdeka Optimizer - aryhharyanto@proton.me", ln=True)
-                
-                # Save to bytes
-                pdf_output = pdf.output(dest='S').encode('latin-1')
+                pdf_output = buat_laporan_pdf({
+                    'nama_siswa': nama_siswa,
+                    'kelas': kelas,
+                    'tahun_ajaran': tahun_ajaran,
+                    'semester': semester,
+                    'hasil_asesmen': st.session_state.hasil_asesmen,
+                    'projek_p5': st.session_state.projek_p5
+                })
                 
                 st.download_button(
                     label="⬇️ Download PDF",
@@ -987,28 +1607,161 @@ with tab6:
                 st.error("Module fpdf tidak tersedia. Install dengan: pip install fpdf")
             except Exception as e:
                 st.error(f"Error generating PDF: {str(e)}")
+        
+        st.write("**Laporan PDF Satu Kelas:**")
+        
+        if st.button("📚 Generate Laporan Kelas (ZIP)", disabled=not kelas,
+                     help="Laporan semua siswa di kelas sidebar, dari data asesmen & P5 tersimpan"):
+            try:
+                import tempfile
+                
+                from edumerdeka.laporan import data_laporan_kelas, tulis_zip_laporan
+                
+                daftar_data = data_laporan_kelas(penyimpanan(), kelas, tahun_ajaran, semester)
+                if not daftar_data:
+                    st.warning(f"Belum ada data tersimpan untuk kelas {kelas} ({tahun_ajaran} - {semester})")
+                else:
+                    bar_progres = st.progress(0.0, text="Menyiapkan laporan...")
+                    
+                    def perbarui_progres(selesai, total):
+                        bar_progres.progress(selesai / total, text=f"{selesai}/{total} laporan selesai")
+                    
+                    with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as file_zip:
+                        jumlah_laporan = tulis_zip_laporan(daftar_data, file_zip, progres=perbarui_progres)
+                    try:
+                        with open(file_zip.name, 'rb') as f:
+                            st.download_button(
+                                label=f"⬇️ Download ZIP ({jumlah_laporan} laporan)",
+                                data=f,
+                                file_name=f"laporan_kelas_{kelas}_{datetime.now().strftime('%Y%m%d')}.zip",
+                                mime="application/zip"
+                            )
+                    finally:
+                        os.remove(file_zip.name)
+                    st.success(f"✅ {jumlah_laporan} laporan PDF siap diunduh!")
+                
+            except ImportError:
+                st.error("Module fpdf tidak tersedia. Install dengan: pip install fpdf")
+            except Exception as e:
+                st.error(f"Error generating PDF: {str(e)}")
+    
+    # Export sekolah (streaming dari database)
+    st.markdown("---")
+    st.subheader("🏫 Export Data Sekolah")
+    st.write("Export seluruh data tersimpan per chunk, dengan memori tetap rendah berapa pun jumlah barisnya.")
+    
+    col_ekspor1, col_ekspor2, col_ekspor3 = st.columns(3)
+    
+    with col_ekspor1:
+        jenis_data = st.selectbox("Data", ["Asesmen", "Projek P5", "Portofolio"], key="ekspor_jenis")
+        format_ekspor = st.radio("Format", ["CSV", "XLSX"], horizontal=True, key="ekspor_format")
+    
+    with col_ekspor2:
+        filter_kelas = st.text_input("Filter Kelas", value=kelas, placeholder="Kosongkan untuk semua kelas",
+                                     key="ekspor_kelas")
+        filter_tahun = st.selectbox("Filter Tahun Ajaran", ["Semua", "2024/2025", "2025/2026", "2026/2027"],
+                                    key="ekspor_tahun")
+    
+    with col_ekspor3:
+        filter_semester = st.selectbox("Filter Semester", ["Semua", "Ganjil", "Genap"], key="ekspor_semester")
+        filter_fase = st.selectbox("Filter Fase (khusus asesmen)",
+                                   ["Semua", "Fase A (Kelas 1-2)", "Fase B (Kelas 3-4)", "Fase C (Kelas 5-6)",
+                                    "Fase D (Kelas 7-9)", "Fase E (Kelas 10)", "Fase F (Kelas 11-12)"],
+                                   key="ekspor_fase", disabled=jenis_data != "Asesmen")
+    
+    if st.button("📦 Siapkan Export Sekolah"):
+        import tempfile
+        
+        from edumerdeka.ekspor import FORMAT_EKSPOR
+        
+        tabel = {"Asesmen": "asesmen", "Projek P5": "projek_p5", "Portofolio": "portofolio"}[jenis_data]
+        fungsi_ekspor, mime = FORMAT_EKSPOR[format_ekspor.lower()]
+        filter_ekspor = {
+            'kelas': filter_kelas or None,
+            'tahun_ajaran': None if filter_tahun == "Semua" else filter_tahun,
+            'semester': None if filter_semester == "Semua" else filter_semester,
+        }
+        if tabel == 'asesmen' and filter_fase != "Semua":
+            filter_ekspor['fase'] = filter_fase
+        
+        # Tulis ke file sementara di disk agar memori server tidak ikut membesar saat export dibuat
+        with tempfile.NamedTemporaryFile(suffix=f".{format_ekspor.lower()}", delete=False) as file_ekspor:
+            jumlah_baris = fungsi_ekspor(penyimpanan(), tabel, file_ekspor, **filter_ekspor)
+        try:
+            with open(file_ekspor.name, 'rb') as f:
+                st.download_button(
+                    label=f"⬇️ Download {format_ekspor} ({jumlah_baris:,} baris)",
+                    data=f,
+                    file_name=f"{tabel}_{filter_kelas or 'sekolah'}_{datetime.now().strftime('%Y%m%d')}.{format_ekspor.lower()}",
+                    mime=mime
+                )
+        finally:
+            os.remove(file_ekspor.name)
+        st.success(f"✅ Export {jumlah_baris:,} baris siap diunduh!")
     
     # Integrasi Section
     st.markdown("---")
     st.subheader("🔌 Future Integration Hooks")
     
     st.info("""
-    **API Endpoints Terencana:**
-    - `/api/asesmen` - POST data asesmen dari sistem eksternal
+    **REST API** (jalankan `python -m edumerdeka.api --port 8000`, database yang sama dengan app ini):
+    - `/api/asesmen` - POST bulk data asesmen dari sistem eksternal (ribuan siswa per request), GET stream NDJSON
     - `/api/learning-path` - GET rekomendasi learning path
     - `/api/p5` - GET/POST data projek P5
-    - `/api/export` - GET data untuk integrasi dengan e-Rapor
+    - `/api/export` - GET data untuk integrasi dengan e-Rapor (CSV/XLSX)
     
     **Integrasi PMM (Platform Merdeka Mengajar):**
     - Ambil data ATP resmi dari Kemdikbud
     - Ambil contoh soal asesmen diagnostik
     - Benchmark data nasional (tanpa kirim data balik)
-    
-    **Offline Mode:**
-    - Data disimpan lokal (cache) untuk akses tanpa internet
-    - Auto-sync saat koneksi tersedia
     """)
     
+    # Offline Mode: log operasi lokal + sinkronisasi batch
+    st.markdown("---")
+    st.subheader("📡 Offline Mode & Sinkronisasi")
+    st.write("Data disimpan lokal untuk akses tanpa internet dan dikirim otomatis "
+             "dalam batch terkompresi saat koneksi tersedia.")
+    
+    from edumerdeka.sinkron import SinkronError, jumlah_tertunda
+    
+    sinkron = penyinkron()
+    col_sync1, col_sync2 = st.columns(2)
+    
+    if sinkron is None:
+        col_sync2.metric("Server Sinkronisasi", "Belum diatur")
+        st.caption("Atur `EDUMERDEKA_SYNC_URL` untuk mengaktifkan auto-sync. Untuk uji coba lokal jalankan "
+                   "`python -m edumerdeka.server_sinkron --port 8765`.")
+    else:
+        keterangan_sync = st.empty()
+        if st.button("🔄 Sinkronkan Sekarang", disabled=sinkron.sedang_berjalan()):
+            try:
+                with st.spinner("Menyinkronkan..."):
+                    hasil_sync = sinkron.klien.sinkronkan()
+                sinkron.hasil_terakhir, sinkron.error_terakhir = hasil_sync, None
+                pesan = (f"✅ Sinkronisasi selesai: {hasil_sync['terkirim']} operasi terkirim, "
+                         f"{hasil_sync['diterapkan']} diterima dari perangkat lain")
+                if hasil_sync['kalah_konflik']:
+                    pesan += f", {hasil_sync['kalah_konflik']} konflik diselesaikan"
+                st.success(pesan)
+            except SinkronError as e:
+                sinkron.error_terakhir = str(e)
+                st.error(f"❌ {str(e)}")
+        
+        # Status diisi setelah tombol agar langsung mencerminkan sinkronisasi manual
+        if sinkron.error_terakhir:
+            col_sync2.metric("Status", "Offline")
+            keterangan_sync.caption(f"Percobaan terakhir gagal: {sinkron.error_terakhir}")
+        elif sinkron.hasil_terakhir:
+            hasil_sync = sinkron.hasil_terakhir
+            col_sync2.metric("Status", "Tersinkron")
+            keterangan_sync.caption(
+                f"Terakhir: {hasil_sync['terkirim']} terkirim, {hasil_sync['diterapkan']} diterima "
+                f"({hasil_sync['round_trip']} round trip, "
+                f"{(hasil_sync['bytes_kirim'] + hasil_sync['bytes_terima']) / 1024:.1f} KB)")
+        else:
+            col_sync2.metric("Status", "Menunggu")
+    col_sync1.metric("Operasi Belum Terkirim", f"{jumlah_tertunda(penyimpanan()):,}")
+    
     # Logging & Analytics
     st.markdown("---")
     st.subheader("📊 Usage Analytics (Anonymized)")
@@ -1032,47 +1785,100 @@ with tab6:
     
     col_save, col_load = st.columns(2)
     
+    from edumerdeka.snapshot import SnapshotError, baca_snapshot, buat_snapshot, normalisasi_data
+    
+    session_data = {
+        'data_siswa': st.session_state.data_siswa,
+        'hasil_asesmen': st.session_state.hasil_asesmen,
+        'portofolio': st.session_state.portofolio,
+        'projek_p5': st.session_state.projek_p5
+    }
+    basis_snapshot = st.session_state.get('basis_snapshot')
+    
     with col_save:
+        simpan_delta = st.checkbox("Hanya perubahan sejak snapshot terakhir (delta)",
+                                   disabled=basis_snapshot is None,
+                                   help="File delta jauh lebih kecil; untuk memuatnya, muat dulu snapshot basisnya")
+        
         if st.button("💾 Save Current Session"):
-            session_data = {
-                'data_siswa': st.session_state.data_siswa,
-                'hasil_asesmen': st.session_state.hasil_asesmen,
-                'portofolio': st.session_state.portofolio,
-                'projek_p5': st.session_state.projek_p5,
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            # Save to pickle for offline use
-            session_file = f"session_{nama_siswa}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pkl"
-            with open(f"/home/claude/{session_file}", 'wb') as f:
-                pickle.dump(session_data, f)
+            # Snapshot disusun di memori: JSON terkompresi berversi, tanpa file sementara
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            if simpan_delta and basis_snapshot is not None:
+                isi_snapshot = buat_snapshot(session_data, basis=basis_snapshot, timestamp=timestamp)
+                jenis_snapshot = "delta"
+            else:
+                isi_snapshot = buat_snapshot(session_data, timestamp=timestamp)
+                jenis_snapshot = "penuh"
+            # Salinan, bukan referensi: data sesi diubah in-place (mis. portofolio di-append) setelah ini
+            st.session_state.basis_snapshot = normalisasi_data(session_data)
             
-            with open(f"/home/claude/{session_file}", 'rb') as f:
-                st.download_button(
-                    label="⬇️ Download Session File",
-                    data=f,
-                    file_name=session_file,
-                    mime="application/octet-stream"
-                )
+            session_file = f"session_{nama_siswa}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{jenis_snapshot}.edms"
+            st.download_button(
+                label=f"⬇️ Download Session File ({len(isi_snapshot) / 1024:.1f} KB)",
+                data=isi_snapshot,
+                file_name=session_file,
+                mime="application/octet-stream"
+            )
             
             st.success("✅ Session berhasil disimpan!")
     
     with col_load:
-        uploaded_session = st.file_uploader("Upload Session File (.pkl)", type=['pkl'])
-        if uploaded_session:
+        uploaded_session = st.file_uploader("Upload Session File (.edms)", type=['edms'])
+        # file_id mencegah file yang sama dimuat ulang di setiap rerun
+        if uploaded_session and st.session_state.get('snapshot_dimuat') != uploaded_session.file_id:
             try:
-                session_data = pickle.load(uploaded_session)
+                data_dimuat, info_snapshot = baca_snapshot(uploaded_session.getvalue(), basis=basis_snapshot)
                 
-                st.session_state.data_siswa = session_data.get('data_siswa', {})
-                st.session_state.hasil_asesmen = session_data.get('hasil_asesmen', {})
-                st.session_state.portofolio = session_data.get('portofolio', {})
-                st.session_state.projek_p5 = session_data.get('projek_p5', {})
+                st.session_state.data_siswa = data_dimuat['data_siswa']
+                st.session_state.hasil_asesmen = data_dimuat['hasil_asesmen']
+                st.session_state.portofolio = data_dimuat['portofolio']
+                st.session_state.projek_p5 = data_dimuat['projek_p5']
+                st.session_state.basis_snapshot = normalisasi_data(data_dimuat)
+                st.session_state.snapshot_dimuat = uploaded_session.file_id
                 
-                st.success(f"✅ Session berhasil dimuat! (dari {session_data.get('timestamp', 'N/A')})")
-                st.experimental_rerun()
-            except Exception as e:
+                rerun_dengan_pesan(f"✅ Session berhasil dimuat! (dari {info_snapshot.get('timestamp') or 'N/A'})", "export")
+            except SnapshotError as e:
                 st.error(f"Error loading session: {str(e)}")
 
+tampilkan_tab(tab6, tab_export_integrasi, nama_siswa, kelas, tahun_ajaran, semester)
+
+# Auto-sync di thread latar, paling sering sekali per interval
+if penyinkron() is not None:
+    penyinkron().picu()
+
+# Statistik performa server (dihitung setelah semua tab dirender)
+with st.sidebar.expander("⚡ Performa Server", expanded=False):
+    stat_cache = cache_grafik().statistik()
+    st.write("**Cache Grafik**")
+    st.write(f"Hit: {stat_cache['hit']} • Miss: {stat_cache['miss']} "
+             f"• Hit rate: {stat_cache['hit_rate']:.0%}")
+    st.write(f"{stat_cache['jumlah_grafik']} grafik • {stat_cache['total_bytes'] / 1024:.0f} KB "
+             f"• Eviksi: {stat_cache['eviksi']}")
+    
+    stat_optimasi = optimasi_waktu().statistik()
+    st.write("**Cache Optimasi**")
+    st.write(f"{stat_optimasi['jumlah_model']} model • Hit rate: {stat_optimasi['hit_rate']:.0%} "
+             f"• Rata-rata solve: {stat_optimasi['rata_waktu_solve_ms']:.0f} ms")
+    
+    payload = st.session_state.get('payload_terakhir')
+    st.write("**Payload per Rerun**")
+    if payload:
+        st.write(f"Sebelumnya ({payload.get('jenis', 'rerun penuh')}): {payload['total_bytes'] / 1024:.1f} KB "
+                 f"(budget {payload['budget_bytes'] / 1024:.0f} KB, mode {'hemat' if payload['mode_hemat'] else 'normal'})"
+                 + ("" if payload.get('pesan_terukur', True) else " • hanya media terukur"))
+    else:
+        st.write("Payload sedang diukur pada render ini")
+    
+    startup = laporan_startup()
+    st.write("**Waktu Render**")
+    if startup['cold_start_ms'] is not None:
+        st.write(f"Cold start: {startup['cold_start_ms']:.0f} ms "
+                 f"(budget {startup['budget_cold_start_ms']:.0f} ms)")
+        st.write(f"Render sebelumnya: {startup['render_terakhir_ms']:.0f} ms "
+                 f"(budget {startup['budget_render_ms']:.0f} ms)")
+    else:
+        st.write("Cold start sedang diukur pada render ini")
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -1084,3 +1890,7 @@ st.markdown("""
     </p>
 </div>
 """, unsafe_allow_html=True)
+
+# Catat bytes yang dikirim dan durasi run ini (run pertama di proses = cold start)
+st.session_state.payload_terakhir = catat_payload(pengukur_payload)
+catat_run(_waktu_mulai_run)
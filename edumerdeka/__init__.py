@@ -0,0 +1,66 @@
+"""Modul inti EduMerdeka Optimizer yang dapat dipakai ulang di luar UI Streamlit.
+
+Re-export di bawah dimuat lazy agar `import edumerdeka` tidak langsung menarik
+NumPy/pandas; submodul baru diimpor saat atributnya pertama kali diakses.
+Tidak ada modul di paket ini yang mengimpor Streamlit; job batch tersedia lewat
+`python -m edumerdeka` (lihat `edumerdeka.cli`).
+"""
+import importlib
+
+_EKSPOR = {
+    "adjust_kesulitan_adaptif_batch": "edumerdeka.asesmen",
+    "hitung_daya_serap_batch": "edumerdeka.asesmen",
+    "persentase_per_kelompok": "edumerdeka.asesmen",
+    "proses_asesmen_kelas": "edumerdeka.asesmen",
+    "skor_matriks_jawaban": "edumerdeka.asesmen",
+    "BankItemIRT": "edumerdeka.cat",
+    "MesinCAT": "edumerdeka.cat",
+    "SesiCAT": "edumerdeka.cat",
+    "muat_bank_soal": "edumerdeka.bank_soal",
+    "SketsaKuantil": "edumerdeka.benchmark",
+    "benchmark_siswa": "edumerdeka.benchmark",
+    "CacheGrafik": "edumerdeka.cache_grafik",
+    "lttb": "edumerdeka.deret_waktu",
+    "muat_deret": "edumerdeka.deret_waktu",
+    "LayananGenerasi": "edumerdeka.generasi",
+    "buat_grafik_benchmark": "edumerdeka.grafik",
+    "buat_grafik_proyeksi": "edumerdeka.grafik",
+    "buat_heatmap_skenario": "edumerdeka.grafik",
+    "buat_pie_chart_gaya_belajar": "edumerdeka.grafik",
+    "buat_timeline_portofolio": "edumerdeka.grafik",
+    "buat_visualisasi_karakter": "edumerdeka.grafik",
+    "adjust_kesulitan_adaptif": "edumerdeka.kalkulasi",
+    "hitung_daya_serap": "edumerdeka.kalkulasi",
+    "hitung_kemajuan_karakter": "edumerdeka.kalkulasi",
+    "hitung_ketercapaian_atp": "edumerdeka.kalkulasi",
+    "hitung_skor_karakter": "edumerdeka.kalkulasi",
+    "buat_laporan_pdf": "edumerdeka.laporan",
+    "tulis_zip_laporan": "edumerdeka.laporan",
+    "IndeksBankSoal": "edumerdeka.indeks_soal",
+    "IndeksLearningPath": "edumerdeka.learning_path",
+    "indeks_learning_path": "edumerdeka.learning_path",
+    "rekomendasi_learning_path": "edumerdeka.learning_path",
+    "PenyimpananKarya": "edumerdeka.karya",
+    "OptimasiWaktu": "edumerdeka.optimasi",
+    "optimasi_kohort": "edumerdeka.optimasi",
+    "PenyimpananSQLite": "edumerdeka.penyimpanan",
+    "MesinPeringatan": "edumerdeka.peringatan",
+    "proyeksi_kohort": "edumerdeka.proyeksi",
+    "riwayat_dari_penyimpanan": "edumerdeka.proyeksi",
+    "KlienSinkron": "edumerdeka.sinkron",
+    "sweep_kelas": "edumerdeka.skenario",
+}
+
+__all__ = sorted(_EKSPOR)
+
+
+def __getattr__(nama):
+    if nama not in _EKSPOR:
+        raise AttributeError(f"module 'edumerdeka' has no attribute '{nama}'")
+    nilai = getattr(importlib.import_module(_EKSPOR[nama]), nama)
+    globals()[nama] = nilai
+    return nilai
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
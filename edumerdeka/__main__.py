@@ -0,0 +1,5 @@
+import sys
+
+from edumerdeka.cli import main
+
+sys.exit(main())
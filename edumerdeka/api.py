@@ -0,0 +1,607 @@
+"""REST API asinkron (Starlette/ASGI) untuk integrasi LMS dan e-Rapor.
+
+Endpoint memakai kalkulasi dan database SQLite yang sama dengan UI Streamlit:
+
+- `POST /api/asesmen`: ribuan hasil asesmen per request, berupa ringkasan per siswa
+  atau bank soal + matriks jawaban yang diskor sekaligus dengan NumPy
+- `GET /api/asesmen`, `GET /api/p5`: data dialirkan sebagai NDJSON per chunk
+- `POST /api/p5`: banyak projek P5 sekaligus
+- `GET /api/learning-path`: learning path dari asesmen terakhir seorang siswa, atau seluruh kelas
+- `GET /api/export`: export CSV (dialirkan) atau XLSX untuk e-Rapor
+
+Akses database dan kalkulasi berjalan di pool thread berukuran tetap. Setiap thread
+memegang satu koneksi SQLite yang dipakai ulang, sehingga event loop tidak pernah
+terblokir. Stream (NDJSON, export) memakai pool terpisah sehingga klien yang lambat
+mengunduh tidak menahan worker untuk request tulis. Penulisan diserialkan (SQLite hanya punya satu penulis), pembacaan
+berjalan paralel (WAL). Data yang masuk lewat API ikut tercatat di log operasi
+sinkronisasi seperti penyimpanan dari UI.
+
+Jalankan: `python -m edumerdeka.api --port 8000`; `--benchmark` mengukur req/s.
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import gzip
+import hmac
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from edumerdeka.ekspor import FORMAT_EKSPOR, iter_csv
+from edumerdeka.kalkulasi import hitung_skor_karakter
+from edumerdeka.learning_path import GAYA_BELAJAR, rekomendasi_learning_path
+from edumerdeka.penyimpanan import KOLOM_JSON, KOLOM_KONTEKS, KOLOM_TABEL, PenyimpananSQLite, kolom_ekspor
+
+UKURAN_POOL = int(os.environ.get("EDUMERDEKA_API_POOL", "4"))
+UKURAN_POOL_STREAM = int(os.environ.get("EDUMERDEKA_API_POOL_STREAM", "4"))
+TOKEN_API = os.environ.get("EDUMERDEKA_API_TOKEN", "")
+
+MAKS_BYTES_BODY = 32 * 1024 * 1024
+MAKS_BARIS_BULK = 50_000
+UKURAN_CHUNK_STREAM = 2000
+# Chunk yang boleh menunggu dikirim per stream; pembaca database berhenti jika klien lambat
+ANTREAN_STREAM = 4
+
+DIMENSI_TARGET_DEFAULT = ("Mandiri", "Bernalar Kritis")
+
+_SELESAI = object()
+
+
+class ApiError(ValueError):
+    """Request tidak valid; `status` adalah kode HTTP yang dikembalikan"""
+
+    def __init__(self, pesan, status=400):
+        super().__init__(pesan)
+        self.status = status
+
+
+class PoolPenyimpanan:
+    """Pool thread berukuran tetap di atas PenyimpananSQLite: satu koneksi per thread worker.
+
+    Produsen stream berjalan di executor sendiri (`ukuran_stream` thread); stream
+    yang melebihi kapasitas itu mengantre tanpa mengambil worker request lain.
+    """
+
+    def __init__(self, penyimpanan, ukuran=UKURAN_POOL, ukuran_stream=UKURAN_POOL_STREAM):
+        self.penyimpanan = penyimpanan
+        self.ukuran = ukuran
+        self._executor = ThreadPoolExecutor(ukuran, thread_name_prefix="edumerdeka-api")
+        self._executor_stream = ThreadPoolExecutor(ukuran_stream, thread_name_prefix="edumerdeka-api-stream")
+        self._kunci_tulis = threading.Lock()
+
+    async def jalankan(self, fungsi, *args):
+        """Menjalankan `fungsi(pool, *args)` di thread worker"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fungsi, self, *args))
+
+    async def alirkan(self, fungsi_iter, *args):
+        """Menjalankan generator `fungsi_iter(pool, *args)` di satu thread stream dan meneruskan hasilnya"""
+        loop = asyncio.get_running_loop()
+        antrean = asyncio.Queue(ANTREAN_STREAM)
+        berhenti = threading.Event()
+
+        def kirim(item):
+            asyncio.run_coroutine_threadsafe(antrean.put(item), loop).result()
+
+        def produsen():
+            try:
+                for item in fungsi_iter(self, *args):
+                    if berhenti.is_set():
+                        return
+                    kirim(item)
+            except Exception as e:
+                if not berhenti.is_set():
+                    kirim(e)
+                return
+            if not berhenti.is_set():
+                kirim(_SELESAI)
+
+        loop.run_in_executor(self._executor_stream, produsen)
+        try:
+            while True:
+                item = await antrean.get()
+                if item is _SELESAI:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Klien putus atau stream selesai: hentikan produsen dan lepaskan put yang menunggu
+            berhenti.set()
+            while not antrean.empty():
+                antrean.get_nowait()
+
+    def simpan_batch(self, tabel, baris):
+        with self._kunci_tulis:
+            return self.penyimpanan.simpan_batch(tabel, baris)
+
+    def tutup(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor_stream.shutdown(wait=False, cancel_futures=True)
+
+
+def _baca_json(body, terkompres=False):
+    if terkompres:
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(body)) as f:
+                body = f.read(MAKS_BYTES_BODY + 1)
+        except (OSError, EOFError) as e:
+            raise ApiError(f"Body gzip tidak valid: {e}") from e
+        if len(body) > MAKS_BYTES_BODY:
+            raise ApiError("Body melebihi batas ukuran", 413)
+    try:
+        payload = json.loads(body)
+    except ValueError as e:
+        raise ApiError(f"Body bukan JSON yang valid: {e}") from e
+    if not isinstance(payload, dict):
+        raise ApiError("Body harus berupa objek JSON")
+    return payload
+
+
+def _daftar_baris(payload, kunci):
+    baris = payload.get(kunci)
+    if not isinstance(baris, list) or not baris:
+        raise ApiError(f"'{kunci}' harus berupa list yang tidak kosong")
+    if len(baris) > MAKS_BARIS_BULK:
+        raise ApiError(f"Maksimal {MAKS_BARIS_BULK:,} baris per request", 413)
+    if not all(isinstance(b, dict) for b in baris):
+        raise ApiError(f"Setiap elemen '{kunci}' harus berupa objek")
+    return baris
+
+
+def _hasil_asesmen_ringkas(df_input):
+    """Daya serap dan rekomendasi Bloom dari ringkasan per siswa (jumlah_soal + persen benar)"""
+    import numpy as np
+    import pandas as pd
+
+    from edumerdeka.asesmen import (adjust_kesulitan_adaptif_batch, hitung_daya_serap_batch,
+                                    hitung_tp_dikuasai_batch)
+
+    for kolom in ('jumlah_soal', 'jawaban_benar_persen'):
+        if kolom not in df_input.columns:
+            raise ApiError(f"Setiap asesmen wajib berisi '{kolom}'")
+    jumlah_soal = pd.to_numeric(df_input['jumlah_soal'], errors='coerce').to_numpy(dtype=float)
+    persen = pd.to_numeric(df_input['jawaban_benar_persen'], errors='coerce').to_numpy(dtype=float)
+    tidak_valid = np.flatnonzero(~(jumlah_soal > 0) | ~((persen >= 0) & (persen <= 100)))
+    if len(tidak_valid):
+        raise ApiError(f"jumlah_soal/jawaban_benar_persen tidak valid pada baris {tidak_valid[:10].tolist()}")
+
+    if 'tp_dikuasai' in df_input.columns:
+        tp_dikuasai = pd.to_numeric(df_input['tp_dikuasai'], errors='coerce').to_numpy(dtype=float)
+        diisi = df_input['tp_dikuasai'].notna().to_numpy()
+        tidak_valid = np.flatnonzero(diisi & ~((tp_dikuasai >= 0) & (tp_dikuasai <= jumlah_soal)
+                                               & (np.mod(tp_dikuasai, 1) == 0)))
+        if len(tidak_valid):
+            raise ApiError(f"tp_dikuasai harus bilangan bulat 0..jumlah_soal pada baris {tidak_valid[:10].tolist()}")
+        tp_dihitung = hitung_tp_dikuasai_batch(persen, jumlah_soal)
+        tp_dikuasai = np.where(diisi, tp_dikuasai, tp_dihitung).astype(int)
+    else:
+        tp_dikuasai = hitung_tp_dikuasai_batch(persen, jumlah_soal)
+
+    return pd.DataFrame({
+        'nama_siswa': df_input['nama_siswa'].to_numpy(),
+        'jumlah_soal': jumlah_soal.astype(int),
+        'tp_dikuasai': tp_dikuasai,
+        'daya_serap': hitung_daya_serap_batch(tp_dikuasai, jumlah_soal),
+        'jawaban_benar_persen': persen,
+        'rekomendasi_bloom': adjust_kesulitan_adaptif_batch(persen),
+    })
+
+
+def _lengkapi_konteks(hasil, df_input, payload, kolom_tambahan):
+    """Konteks per baris (jika ada di input) atau dari level atas payload"""
+    for kolom in KOLOM_KONTEKS + kolom_tambahan:
+        default = payload.get(kolom) or ''
+        if kolom == 'tanggal' and not default:
+            default = datetime.now().strftime("%Y-%m-%d %H:%M")
+        if kolom in df_input.columns:
+            hasil[kolom] = df_input[kolom].fillna(default).astype(str).to_numpy()
+        else:
+            hasil[kolom] = str(default)
+    return hasil
+
+
+def proses_bulk_asesmen(pool, body, terkompres=False, detail=False):
+    """Memproses dan menyimpan satu request `POST /api/asesmen`; mengembalikan ringkasan"""
+    import pandas as pd
+
+    from edumerdeka.asesmen import proses_asesmen_kelas
+
+    payload = _baca_json(body, terkompres)
+    if 'jawaban' in payload:
+        # Mode matriks: bank soal + jawaban mentah setiap siswa, diskor dalam satu pass
+        df_input = pd.DataFrame(_daftar_baris(payload, 'jawaban'))
+        df_soal = pd.DataFrame(_daftar_baris(payload, 'soal'))
+        sudah_diskor = payload.get('sudah_diskor')
+        if sudah_diskor is not None and not isinstance(sudah_diskor, bool):
+            raise ApiError("'sudah_diskor' harus boolean")
+        try:
+            hasil = proses_asesmen_kelas(df_input, df_soal, sudah_diskor=sudah_diskor)
+        except (KeyError, ValueError) as e:
+            raise ApiError(f"Matriks jawaban tidak valid: {e}") from e
+    else:
+        df_input = pd.DataFrame(_daftar_baris(payload, 'asesmen'))
+        if 'nama_siswa' not in df_input.columns:
+            raise ApiError("Setiap asesmen wajib berisi 'nama_siswa'")
+        hasil = _hasil_asesmen_ringkas(df_input)
+
+    hasil['nama_siswa'] = hasil['nama_siswa'].astype(str).str.strip()
+    if (hasil['nama_siswa'] == '').any() or df_input['nama_siswa'].isna().any():
+        raise ApiError("nama_siswa tidak boleh kosong")
+    hasil = _lengkapi_konteks(hasil, df_input, payload, ('fase', 'nip_guru', 'tanggal'))
+
+    baris = hasil.to_dict('records')
+    disimpan = pool.simpan_batch('asesmen', baris)
+
+    ringkasan = {
+        'disimpan': disimpan,
+        'rata_rata_daya_serap': round(float(hasil['daya_serap'].mean()), 2),
+        'rekomendasi_bloom': {str(k): int(v) for k, v in hasil['rekomendasi_bloom'].value_counts().items()},
+    }
+    if detail:
+        ringkasan['hasil'] = json.loads(
+            hasil[['nama_siswa', 'tp_dikuasai', 'daya_serap', 'rekomendasi_bloom']].to_json(orient='records'))
+    return ringkasan
+
+
+def _teks(nilai, kolom, i):
+    """Nilai kolom teks satu baris P5: string, angka (diubah ke string) atau None"""
+    if nilai is None or isinstance(nilai, str):
+        return nilai
+    if isinstance(nilai, (int, float)) and not isinstance(nilai, bool):
+        return str(nilai)
+    raise ApiError(f"{kolom} harus berupa teks (baris {i})")
+
+
+def _bilangan_bulat(nilai, kolom, i, maks=None):
+    """Nilai kolom bilangan bulat non-negatif satu baris P5, atau None"""
+    if nilai is None:
+        return None
+    if isinstance(nilai, bool) or not isinstance(nilai, (int, float)) or nilai != int(nilai) or nilai < 0 \
+            or (maks is not None and nilai > maks):
+        rentang = f"0..{maks}" if maks is not None else "non-negatif"
+        raise ApiError(f"{kolom} harus bilangan bulat {rentang} (baris {i})")
+    return int(nilai)
+
+
+def proses_bulk_p5(pool, body, terkompres=False):
+    """Memproses dan menyimpan satu request `POST /api/p5`; mengembalikan ringkasan"""
+    payload = _baca_json(body, terkompres)
+    sekarang = datetime.now().strftime("%Y-%m-%d")
+    baris = []
+    for i, projek in enumerate(_daftar_baris(payload, 'projek')):
+        nama = str(projek.get('nama_siswa') or '').strip()
+        dimensi_scores = projek.get('dimensi_scores') or {}
+        if not nama:
+            raise ApiError(f"nama_siswa tidak boleh kosong (baris {i})")
+        if not isinstance(dimensi_scores, dict) or not dimensi_scores or not all(
+                isinstance(v, (int, float)) and not isinstance(v, bool) for v in dimensi_scores.values()):
+            raise ApiError(f"dimensi_scores harus berupa objek dimensi -> angka yang tidak kosong (baris {i})")
+        mata_pelajaran = projek.get('mata_pelajaran')
+        if mata_pelajaran is not None and (not isinstance(mata_pelajaran, list)
+                                           or not all(isinstance(m, str) for m in mata_pelajaran)):
+            raise ApiError(f"mata_pelajaran harus berupa list teks (baris {i})")
+        data = {k: _teks(projek.get(k), k, i) for k in ('nama_projek', 'tema', 'jurnal')}
+        data.update({k: _teks(projek.get(k) or payload.get(k) or '', k, i) for k in KOLOM_KONTEKS + ('tanggal',)})
+        data.update(nama_siswa=nama, mata_pelajaran=mata_pelajaran, dimensi_scores=dimensi_scores,
+                    durasi=_bilangan_bulat(projek.get('durasi'), 'durasi', i),
+                    progress=_bilangan_bulat(projek.get('progress'), 'progress', i, maks=100),
+                    skor_karakter=hitung_skor_karakter(dimensi_scores),
+                    tanggal=data['tanggal'] or sekarang)
+        baris.append(data)
+    disimpan = pool.simpan_batch('projek_p5', baris)
+    return {'disimpan': disimpan,
+            'rata_rata_skor_karakter': round(sum(b['skor_karakter'] for b in baris) / len(baris), 2)}
+
+
+def learning_path_siswa(pool, nama_siswa, kelas, mata_pelajaran, gaya_belajar, dimensi_target, minat, fase):
+    riwayat = pool.penyimpanan.riwayat_siswa(nama_siswa, kelas, batas=1)
+    if not riwayat['asesmen']:
+        raise ApiError(f"Belum ada asesmen untuk siswa '{nama_siswa}'", 404)
+    asesmen = riwayat['asesmen'][0]
+    hasil = rekomendasi_learning_path(fase or asesmen['fase'], mata_pelajaran, asesmen['daya_serap'],
+                                      gaya_belajar, dimensi_target, minat)
+    hasil['asesmen'] = {k: asesmen[k] for k in ('tanggal', 'daya_serap', 'rekomendasi_bloom')}
+    return hasil
+
+
+def learning_path_kelas(pool, kelas, mata_pelajaran, gaya_belajar, dimensi_target, minat, fase):
+    """Learning path semua siswa satu kelas dari asesmen terakhir masing-masing"""
+    from edumerdeka.learning_path import indeks_learning_path
+    from edumerdeka.optimasi import profil_dari_penyimpanan
+
+    daftar_profil = profil_dari_penyimpanan(pool.penyimpanan, kelas=kelas)
+    if not daftar_profil:
+        raise ApiError(f"Belum ada asesmen untuk kelas '{kelas}'", 404)
+    if fase:
+        daftar_profil = [{**profil, 'fase': fase} for profil in daftar_profil]
+    siswa = indeks_learning_path().rekomendasi_kelas(daftar_profil, mata_pelajaran, gaya_belajar,
+                                                     dimensi_target, minat)
+    return {'kelas': kelas, 'jumlah_siswa': len(siswa), 'siswa': siswa}
+
+
+def iter_ndjson(pool, tabel, filter):
+    """Baris satu tabel sebagai NDJSON (satu objek per baris), per chunk bytes"""
+    kolom = kolom_ekspor(tabel)
+    indeks_json = [i for i, k in enumerate(kolom) if k in KOLOM_JSON]
+    for chunk in pool.penyimpanan.iter_data(tabel, ukuran_chunk=UKURAN_CHUNK_STREAM, **filter):
+        potongan = []
+        for baris in chunk:
+            data = dict(zip(kolom, baris))
+            for i in indeks_json:
+                if baris[i] is not None:
+                    data[kolom[i]] = json.loads(baris[i])
+            potongan.append(json.dumps(data, ensure_ascii=False))
+        yield ("\n".join(potongan) + "\n").encode("utf-8")
+
+
+def iter_export(pool, tabel, format_ekspor, filter):
+    if format_ekspor == 'csv':
+        yield from iter_csv(pool.penyimpanan, tabel, **filter)
+        return
+    fungsi_ekspor, _ = FORMAT_EKSPOR[format_ekspor]
+    with tempfile.TemporaryFile() as f:
+        fungsi_ekspor(pool.penyimpanan, tabel, f, **filter)
+        f.seek(0)
+        while True:
+            potongan = f.read(256 * 1024)
+            if not potongan:
+                break
+            yield potongan
+
+
+def _filter_query(request, tabel):
+    """Filter konteks dari query string; hanya kolom yang didukung `iter_data`"""
+    kolom = KOLOM_KONTEKS + (('fase',) if tabel == 'asesmen' else ())
+    return {k: request.query_params[k] for k in kolom if request.query_params.get(k)}
+
+
+async def _baca_body(request):
+    if int(request.headers.get('content-length') or 0) > MAKS_BYTES_BODY:
+        raise ApiError("Body melebihi batas ukuran", 413)
+    body = bytearray()
+    async for potongan in request.stream():
+        body += potongan
+        if len(body) > MAKS_BYTES_BODY:
+            raise ApiError("Body melebihi batas ukuran", 413)
+    return bytes(body), request.headers.get('content-encoding', '').lower() == 'gzip'
+
+
+def _endpoint(fungsi):
+    """Pemeriksaan token (jika EDUMERDEKA_API_TOKEN diset) dan ApiError menjadi respons JSON"""
+    @functools.wraps(fungsi)
+    async def handler(request):
+        token = request.app.state.token
+        if token:
+            diberikan = request.headers.get('authorization', '')
+            diberikan = diberikan[len('Bearer '):] if diberikan.startswith('Bearer ') else diberikan
+            if not hmac.compare_digest(diberikan.encode(), token.encode()):
+                return JSONResponse({'error': 'token tidak valid'}, status_code=401)
+        try:
+            return await fungsi(request, request.app.state.pool)
+        except ApiError as e:
+            return JSONResponse({'error': str(e)}, status_code=e.status)
+    return handler
+
+
+def _stream_ndjson(pool, tabel, filter):
+    return StreamingResponse(pool.alirkan(iter_ndjson, tabel, filter), media_type="application/x-ndjson")
+
+
+@_endpoint
+async def api_asesmen(request, pool):
+    if request.method == 'GET':
+        return _stream_ndjson(pool, 'asesmen', _filter_query(request, 'asesmen'))
+    body, terkompres = await _baca_body(request)
+    detail = request.query_params.get('detail') == '1'
+    return JSONResponse(await pool.jalankan(proses_bulk_asesmen, body, terkompres, detail), status_code=201)
+
+
+@_endpoint
+async def api_p5(request, pool):
+    if request.method == 'GET':
+        return _stream_ndjson(pool, 'projek_p5', _filter_query(request, 'projek_p5'))
+    body, terkompres = await _baca_body(request)
+    return JSONResponse(await pool.jalankan(proses_bulk_p5, body, terkompres), status_code=201)
+
+
+@_endpoint
+async def api_learning_path(request, pool):
+    q = request.query_params
+    # Tanpa nama_siswa: learning path seluruh kelas
+    satu_siswa = bool(q.get('nama_siswa'))
+    if not satu_siswa and 'kelas' not in q:
+        raise ApiError("Parameter 'nama_siswa' atau 'kelas' wajib diisi")
+    gaya_belajar = q.get('gaya_belajar', GAYA_BELAJAR[0] if satu_siswa else None)
+    if gaya_belajar is not None and gaya_belajar not in GAYA_BELAJAR:
+        raise ApiError(f"gaya_belajar harus salah satu dari: {', '.join(GAYA_BELAJAR)}")
+    dimensi = q.get('dimensi')
+    dimensi_target = [d.strip() for d in dimensi.split(',') if d.strip()] if dimensi else None
+    try:
+        minat = float(q.get('minat', 70))
+    except ValueError as e:
+        raise ApiError("Parameter 'minat' harus berupa angka") from e
+    if not satu_siswa:
+        return JSONResponse(await pool.jalankan(learning_path_kelas, q['kelas'], q.get('mata_pelajaran', 'Matematika'),
+                                                gaya_belajar, dimensi_target, minat, q.get('fase')))
+    dimensi_target = dimensi_target or list(DIMENSI_TARGET_DEFAULT)
+    hasil = await pool.jalankan(learning_path_siswa, q['nama_siswa'], q.get('kelas', ''),
+                                q.get('mata_pelajaran', 'Matematika'), gaya_belajar, dimensi_target,
+                                minat, q.get('fase'))
+    return JSONResponse(hasil)
+
+
+@_endpoint
+async def api_export(request, pool):
+    tabel = request.query_params.get('tabel', 'asesmen')
+    format_ekspor = request.query_params.get('format', 'csv')
+    if tabel not in KOLOM_TABEL:
+        raise ApiError(f"Tabel harus salah satu dari: {', '.join(KOLOM_TABEL)}")
+    if format_ekspor not in FORMAT_EKSPOR:
+        raise ApiError(f"Format harus salah satu dari: {', '.join(FORMAT_EKSPOR)}")
+    _, mime = FORMAT_EKSPOR[format_ekspor]
+    return StreamingResponse(
+        pool.alirkan(iter_export, tabel, format_ekspor, _filter_query(request, tabel)), media_type=mime,
+        headers={'Content-Disposition': f'attachment; filename="edumerdeka_{tabel}.{format_ekspor}"'})
+
+
+def buat_app(penyimpanan=None, ukuran_pool=UKURAN_POOL, token=TOKEN_API, ukuran_pool_stream=UKURAN_POOL_STREAM):
+    """Aplikasi ASGI siap dijalankan dengan uvicorn"""
+    pool = PoolPenyimpanan(penyimpanan or PenyimpananSQLite(), ukuran_pool, ukuran_pool_stream)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        pool.tutup()
+
+    app = Starlette(
+        routes=[
+            Route("/api/asesmen", api_asesmen, methods=["GET", "POST"]),
+            Route("/api/learning-path", api_learning_path, methods=["GET"]),
+            Route("/api/p5", api_p5, methods=["GET", "POST"]),
+            Route("/api/export", api_export, methods=["GET"]),
+        ],
+        middleware=[Middleware(GZipMiddleware, minimum_size=1024)],
+        lifespan=lifespan,
+    )
+    app.state.pool = pool
+    app.state.token = token
+    return app
+
+
+def _contoh_bulk_asesmen(ukuran, kelas):
+    return json.dumps({
+        'kelas': kelas, 'tahun_ajaran': '2025/2026', 'semester': 'Ganjil', 'fase': 'Fase D',
+        'asesmen': [{'nama_siswa': f"Siswa {i:05d}", 'jumlah_soal': 20, 'jawaban_benar_persen': (i * 7) % 101}
+                    for i in range(ukuran)],
+    }).encode("utf-8")
+
+
+def benchmark(url, jumlah_request=200, konkurensi=8, ukuran_bulk=1000, token=TOKEN_API):
+    """Mengukur req/s dan latensi setiap endpoint terhadap server yang berjalan di `url`.
+
+    Skenario bulk POST dijalankan lebih dulu agar skenario baca punya data.
+    Mengembalikan list dict hasil per skenario.
+    """
+    import http.client
+    import urllib.parse
+    from concurrent.futures import ThreadPoolExecutor as PoolKlien
+
+    alamat = urllib.parse.urlsplit(url)
+    header_dasar = {'Authorization': f"Bearer {token}"} if token else {}
+    kelas = f"BENCH-{int(time.time())}"
+    body_bulk = _contoh_bulk_asesmen(ukuran_bulk, kelas)
+    skenario = [
+        (f"POST /api/asesmen (bulk {ukuran_bulk})", "POST", "/api/asesmen", body_bulk,
+         max(jumlah_request // 10, konkurensi), ukuran_bulk),
+        ("GET /api/learning-path", "GET",
+         "/api/learning-path?" + urllib.parse.urlencode({'nama_siswa': 'Siswa 00001', 'kelas': kelas}),
+         None, jumlah_request, 1),
+        (f"GET /api/learning-path (kelas {ukuran_bulk})", "GET",
+         "/api/learning-path?" + urllib.parse.urlencode({'kelas': kelas}),
+         None, max(jumlah_request // 10, konkurensi), ukuran_bulk),
+        (f"GET /api/asesmen (stream {ukuran_bulk} baris)", "GET",
+         "/api/asesmen?" + urllib.parse.urlencode({'kelas': kelas + "-STREAM"}),
+         None, jumlah_request, ukuran_bulk),
+    ]
+    lokal = threading.local()
+
+    def satu_request(metode, jalur, body):
+        conn = getattr(lokal, 'conn', None)
+        if conn is None:
+            conn = lokal.conn = http.client.HTTPConnection(alamat.hostname, alamat.port, timeout=60)
+        header = dict(header_dasar)
+        if body is not None:
+            header['Content-Type'] = 'application/json'
+        mulai = time.perf_counter()
+        conn.request(metode, jalur, body=body, headers=header)
+        respons = conn.getresponse()
+        isi = respons.read()
+        if respons.status >= 300:
+            raise RuntimeError(f"{metode} {jalur} -> HTTP {respons.status}: {isi[:200]!r}")
+        return time.perf_counter() - mulai
+
+    # Kelas terpisah berisi tepat `ukuran_bulk` baris untuk skenario stream
+    satu_request("POST", "/api/asesmen", _contoh_bulk_asesmen(ukuran_bulk, kelas + "-STREAM"))
+
+    hasil = []
+    with PoolKlien(konkurensi) as klien:
+        for nama, metode, jalur, body, jumlah, baris_per_request in skenario:
+            mulai = time.perf_counter()
+            latensi = sorted(klien.map(lambda _: satu_request(metode, jalur, body), range(jumlah)))
+            durasi = time.perf_counter() - mulai
+            hasil.append({
+                'skenario': nama,
+                'request': jumlah,
+                'req_per_s': jumlah / durasi,
+                'p50_ms': latensi[len(latensi) // 2] * 1000,
+                'p95_ms': latensi[int(len(latensi) * 0.95) - 1] * 1000,
+                'baris_per_s': jumlah * baris_per_request / durasi if baris_per_request else None,
+            })
+    return hasil
+
+
+def _jalankan_benchmark(args):
+    import socket
+
+    import uvicorn
+
+    with tempfile.TemporaryDirectory() as direktori, socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+        s.close()
+        app = buat_app(PenyimpananSQLite(os.path.join(direktori, "benchmark.db")), args.pool, token="")
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+        try:
+            hasil = benchmark(f"http://127.0.0.1:{port}", args.request, args.konkurensi, args.ukuran_bulk, token="")
+        finally:
+            server.should_exit = True
+            thread.join()
+
+    print(f"{'Skenario':<40} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'baris/s':>10}")
+    for h in hasil:
+        baris_per_s = f"{h['baris_per_s']:,.0f}" if h['baris_per_s'] else "-"
+        print(f"{h['skenario']:<40} {h['req_per_s']:>8.1f} {h['p50_ms']:>8.1f} {h['p95_ms']:>8.1f} {baris_per_s:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="REST API EduMerdeka (ASGI)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db", default=None, help="File SQLite (default: EDUMERDEKA_DB)")
+    parser.add_argument("--pool", type=int, default=UKURAN_POOL, help="Jumlah thread/koneksi database")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Ukur req/s terhadap server sementara dengan database kosong, lalu keluar")
+    parser.add_argument("--request", type=int, default=200, help="Request per skenario benchmark")
+    parser.add_argument("--konkurensi", type=int, default=8, help="Klien paralel pada benchmark")
+    parser.add_argument("--ukuran-bulk", type=int, default=1000, help="Asesmen per request bulk pada benchmark")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        _jalankan_benchmark(args)
+        return
+
+    import uvicorn
+
+    penyimpanan = PenyimpananSQLite(args.db) if args.db else PenyimpananSQLite()
+    uvicorn.run(buat_app(penyimpanan, args.pool), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Kalkulasi asesmen diagnostik batch untuk satu kelas atau sekolah sekaligus.
+
+Semua fungsi di sini bekerja pada matriks siswa × soal sehingga ribuan siswa dan
+ratusan soal diproses dalam satu pass NumPy, tanpa loop Python per siswa.
+"""
+import numpy as np
+import pandas as pd
+
+from edumerdeka.kalkulasi import AMBANG_NAIK, AMBANG_TURUN
+
+LEVEL_BLOOM = ["C1", "C2", "C3", "C4", "C5", "C6"]
+
+REKOMENDASI_BLOOM = np.array(["-1 level (menurun)", "Tetap", "+1 level (meningkat)"], dtype=object)
+
+# Persentase benar minimal pada soal-soal satu TP agar TP tersebut dianggap dikuasai
+AMBANG_TP = 75
+
+
+def normalisasi_bloom(tingkat_bloom):
+    """Mengubah label Bloom seperti 'c3' atau 'C3 (Menerapkan)' menjadi 'C3'"""
+    return pd.Series(tingkat_bloom, dtype="string").str.strip().str.upper().str[:2].to_numpy(dtype=object)
+
+
+def _teks_jawaban(nilai):
+    """Jawaban/kunci sebagai teks kapital; angka bulat ditulis tanpa '.0' agar kode opsi 2 cocok dengan kunci '2'"""
+    nilai = pd.Series(nilai)
+    if pd.api.types.is_numeric_dtype(nilai) and not pd.api.types.is_bool_dtype(nilai):
+        angka = nilai.astype(float)
+        if ((angka % 1 == 0) | angka.isna()).all():
+            nilai = angka.astype("Int64")
+    return nilai.astype("string").str.strip().str.upper()
+
+
+def skor_matriks_jawaban(jawaban, kunci=None):
+    """Mengubah matriks jawaban siswa × soal menjadi matriks benar/salah (bool).
+
+    Jika `kunci` diberikan, setiap sel dibandingkan dengan kunci jawaban per soal
+    (juga untuk kode opsi berupa angka). Tanpa `kunci`, jawaban harus sudah diskor
+    (1/0 atau True/False); nilai lain menghasilkan ValueError. Sel kosong selalu
+    dihitung salah.
+    """
+    jawaban = pd.DataFrame(jawaban)
+    if kunci is None:
+        arr = jawaban.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        tidak_valid = (np.isnan(arr) & jawaban.notna().to_numpy()) | ~np.isin(np.nan_to_num(arr, nan=0.0), (0, 1))
+        if tidak_valid.any():
+            baris, kolom = np.argwhere(tidak_valid)[0]
+            raise ValueError(f"Matriks jawaban tanpa kunci harus sudah diskor (1/0); ditemukan "
+                             f"'{jawaban.iat[baris, kolom]}' di soal {jawaban.columns[kolom]}")
+        return arr == 1
+
+    arr = jawaban.apply(_teks_jawaban).to_numpy(dtype=object, na_value="")
+    kunci = _teks_jawaban(kunci).to_numpy(dtype=object, na_value=None)
+    return arr == kunci[np.newaxis, :]
+
+
+def hitung_daya_serap_batch(tp_dikuasai, total_tp):
+    """Versi vektor dari kalkulasi.hitung_daya_serap untuk banyak siswa sekaligus"""
+    tp_dikuasai = np.asarray(tp_dikuasai, dtype=float)
+    total_tp = np.broadcast_to(np.asarray(total_tp, dtype=float), tp_dikuasai.shape)
+    hasil = np.zeros_like(tp_dikuasai)
+    np.divide(tp_dikuasai * 100, total_tp, out=hasil, where=total_tp != 0)
+    return hasil
+
+
+def hitung_tp_dikuasai_batch(jawaban_benar_persen, jumlah_soal):
+    """Versi vektor dari kalkulasi.hitung_tp_dikuasai untuk banyak siswa sekaligus"""
+    persen = np.asarray(jawaban_benar_persen, dtype=float)
+    return np.trunc(persen / 100 * np.asarray(jumlah_soal, dtype=float)).astype(int)
+
+
+def adjust_kesulitan_adaptif_batch(persentase_benar):
+    """Versi vektor dari kalkulasi.adjust_kesulitan_adaptif untuk banyak siswa sekaligus"""
+    p = np.asarray(persentase_benar, dtype=float)
+    idx = np.where(p > AMBANG_NAIK, 2, np.where(p < AMBANG_TURUN, 0, 1))
+    return REKOMENDASI_BLOOM[idx]
+
+
+def persentase_per_kelompok(benar, label):
+    """Persentase benar tiap siswa per kelompok soal (mis. level Bloom atau TP).
+
+    Dihitung sebagai satu perkalian matriks benar (siswa × soal) dengan matriks
+    indikator (soal × kelompok). Mengembalikan (daftar_kelompok, matriks_persen).
+    """
+    kategori, kode = np.unique(np.asarray(label, dtype=object).astype(str), return_inverse=True)
+    indikator = np.zeros((len(kode), len(kategori)), dtype=np.float32)
+    indikator[np.arange(len(kode)), kode] = 1
+    jumlah_per_kelompok = indikator.sum(axis=0)
+    persen = (np.asarray(benar, dtype=np.float32) @ indikator) * (100.0 / jumlah_per_kelompok)
+    return kategori, persen
+
+
+def proses_asesmen_kelas(df_jawaban, df_soal, kolom_nama="nama_siswa", sudah_diskor=None):
+    """Memproses asesmen diagnostik seluruh kelas dalam satu pass.
+
+    `df_jawaban` berisi satu baris per siswa: kolom `nama_siswa` lalu satu kolom per
+    `nomor` soal. `df_soal` mengikuti format CSV bank soal
+    (nomor,soal,tingkat_bloom,jawaban_benar) dan boleh memiliki kolom `tp`.
+    Tanpa kolom `tp`, setiap soal dihitung sebagai satu TP seperti pada input manual.
+
+    Jawaban selalu dibandingkan dengan `jawaban_benar` jika bank soal memilikinya;
+    matriks 1/0 yang sudah diskor dipakai apa adanya hanya jika bank soal tanpa
+    kunci atau `sudah_diskor=True`.
+
+    Mengembalikan DataFrame dengan kolom yang sama seperti `hasil_asesmen` per siswa,
+    ditambah persentase benar per level Bloom.
+    """
+    kolom_soal = [str(n) for n in df_soal["nomor"]]
+    df_jawaban = df_jawaban.rename(columns=lambda c: str(c).strip())
+    hilang = [k for k in kolom_soal if k not in df_jawaban.columns]
+    if hilang:
+        raise ValueError(f"Kolom soal tidak ditemukan di matriks jawaban: {', '.join(hilang[:10])}")
+    if kolom_nama not in df_jawaban.columns:
+        raise ValueError(f"Kolom '{kolom_nama}' tidak ditemukan di matriks jawaban")
+
+    jawaban = df_jawaban[kolom_soal]
+    ada_kunci = "jawaban_benar" in df_soal.columns and _teks_jawaban(df_soal["jawaban_benar"]).fillna('').ne('').any()
+    if sudah_diskor is None:
+        sudah_diskor = not ada_kunci
+    if not sudah_diskor and not ada_kunci:
+        raise ValueError("Bank soal tidak memiliki jawaban_benar untuk menskor matriks jawaban")
+    kunci = None if sudah_diskor else df_soal["jawaban_benar"].to_numpy()
+    benar = skor_matriks_jawaban(jawaban, kunci)
+
+    jumlah_soal = benar.shape[1]
+    persen_benar = hitung_daya_serap_batch(benar.sum(axis=1), jumlah_soal)
+
+    if "tp" in df_soal.columns:
+        _, persen_tp = persentase_per_kelompok(benar, df_soal["tp"].to_numpy())
+        tp_dikuasai = (persen_tp >= AMBANG_TP).sum(axis=1)
+        total_tp = persen_tp.shape[1]
+    else:
+        tp_dikuasai = benar.sum(axis=1)
+        total_tp = jumlah_soal
+
+    hasil = pd.DataFrame({
+        "nama_siswa": df_jawaban[kolom_nama].to_numpy(),
+        "jumlah_soal": jumlah_soal,
+        "total_tp": total_tp,
+        "tp_dikuasai": tp_dikuasai,
+        "daya_serap": hitung_daya_serap_batch(tp_dikuasai, total_tp),
+        "jawaban_benar_persen": persen_benar,
+        "rekomendasi_bloom": adjust_kesulitan_adaptif_batch(persen_benar),
+    })
+
+    if "tingkat_bloom" in df_soal.columns:
+        level, persen_bloom = persentase_per_kelompok(benar, normalisasi_bloom(df_soal["tingkat_bloom"]))
+        for i, nama_level in enumerate(level):
+            hasil[f"persen_{nama_level}"] = persen_bloom[:, i]
+
+    return hasil
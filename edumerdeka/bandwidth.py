@@ -0,0 +1,136 @@
+"""Pengukuran bytes yang dikirim ke browser per rerun terhadap budget payload.
+
+Setiap ForwardMsg yang dikirim script dihitung ukuran protobuf-nya (sebelum
+kompresi websocket), ditambah bytes media yang dilayani terpisah lewat HTTP
+(gambar PNG grafik). Angka ini dipakai untuk membuktikan bahwa mode hemat data
+tetap nyaman di koneksi 2G/3G.
+
+Rerun penuh diukur dari awal sampai akhir script; rerun yang hanya menjalankan
+satu fragment diukur dan dilaporkan per fragment (`ukur_fragment`). Pesan
+dihitung lewat pengirim internal `ScriptRunContext._enqueue`, yang hanya
+dipasang pada versi Streamlit yang sudah diuji; di luar itu hanya bytes media
+yang terukur dan laporan menandai pesan sebagai tidak terukur.
+"""
+import logging
+import os
+from contextlib import contextmanager
+
+logger = logging.getLogger("edumerdeka.bandwidth")
+
+BUDGET_PAYLOAD_KB = float(os.environ.get("EDUMERDEKA_BUDGET_PAYLOAD_KB", "150"))
+MODE_HEMAT_DEFAULT = os.environ.get("EDUMERDEKA_MODE_HEMAT", "0") == "1"
+# Rentang versi Streamlit [min, maks) yang pengirim pesan internalnya sudah diuji
+VERSI_STREAMLIT_DIDUKUNG = ((1, 37), (2, 0))
+
+
+def _versi_streamlit_didukung():
+    import streamlit
+
+    try:
+        versi = tuple(int(bagian) for bagian in streamlit.__version__.split('.')[:2])
+    except ValueError:
+        return False
+    return VERSI_STREAMLIT_DIDUKUNG[0] <= versi < VERSI_STREAMLIT_DIDUKUNG[1]
+
+
+class PengukurPayload:
+    """Akumulator bytes yang dikirim selama satu rerun (penuh atau satu fragment)"""
+
+    def __init__(self, mode_hemat=False, jenis="rerun penuh"):
+        self.mode_hemat = mode_hemat
+        self.jenis = jenis
+        self.pesan_terukur = False
+        self.bytes_pesan = 0
+        self.bytes_media = 0
+        self.jumlah_pesan = 0
+
+    def catat_pesan(self, pesan):
+        self.bytes_pesan += pesan.ByteSize()
+        self.jumlah_pesan += 1
+
+    def catat_media(self, jumlah_bytes):
+        self.bytes_media += jumlah_bytes
+
+    @property
+    def total_bytes(self):
+        return self.bytes_pesan + self.bytes_media
+
+    def ringkasan(self):
+        return {
+            'jenis': self.jenis,
+            'mode_hemat': self.mode_hemat,
+            'pesan_terukur': self.pesan_terukur,
+            'bytes_pesan': self.bytes_pesan,
+            'bytes_media': self.bytes_media,
+            'jumlah_pesan': self.jumlah_pesan,
+            'total_bytes': self.total_bytes,
+            'budget_bytes': BUDGET_PAYLOAD_KB * 1024,
+        }
+
+
+def pasang_pengukur(ctx, pengukur):
+    """Menjadikan `pengukur` pengukur aktif `ctx` (ScriptRunContext Streamlit) dan menghitung setiap ForwardMsg-nya.
+
+    Context dipakai ulang oleh semua rerun di thread script yang sama, sehingga
+    fungsi pengirim hanya dibungkus sekali dan pengukurnya diganti setiap rerun.
+    Mengembalikan False jika pesan tidak dapat diukur (tanpa context, atau versi
+    Streamlit di luar `VERSI_STREAMLIT_DIDUKUNG`); bytes media tetap dicatat.
+    """
+    if ctx is None:
+        return False
+    ctx._pengukur_payload = pengukur
+    if getattr(ctx, '_enqueue_asli', None) is None:
+        if not _versi_streamlit_didukung() or not callable(getattr(ctx, '_enqueue', None)):
+            return False
+        kirim_asli = ctx._enqueue
+
+        def kirim(pesan):
+            pengukur_aktif = getattr(ctx, '_pengukur_payload', None)
+            if pengukur_aktif is not None:
+                pengukur_aktif.catat_pesan(pesan)
+            kirim_asli(pesan)
+
+        ctx._enqueue_asli = kirim_asli
+        ctx._enqueue = kirim
+    pengukur.pesan_terukur = True
+    return True
+
+
+def pengukur_aktif(ctx):
+    """Pengukur yang sedang menerima bytes untuk `ctx`, atau None"""
+    return getattr(ctx, '_pengukur_payload', None) if ctx is not None else None
+
+
+@contextmanager
+def ukur_fragment(ctx, nama, mode_hemat=False):
+    """Mengukur dan melaporkan satu rerun yang hanya menjalankan fragment `nama`.
+
+    Saat fragment ikut dalam rerun penuh, bytes-nya sudah masuk pengukur rerun
+    itu dan context ini tidak melakukan apa-apa. Menghasilkan pengukur fragment
+    (atau None); ringkasannya tersedia di `pengukur.ringkasan()` setelah blok selesai.
+    """
+    if ctx is None or not getattr(ctx, 'fragment_ids_this_run', None):
+        yield None
+        return
+    pengukur = PengukurPayload(mode_hemat, jenis=f"fragment {nama}")
+    pasang_pengukur(ctx, pengukur)
+    try:
+        yield pengukur
+    finally:
+        # Pesan di luar fragment (jika ada) tidak lagi dihitung ke fragment ini maupun rerun penuh lama
+        ctx._pengukur_payload = None
+        catat_payload(pengukur)
+
+
+def catat_payload(pengukur):
+    """Melaporkan payload satu rerun ke log; di atas budget dicatat sebagai WARNING"""
+    total_kb = pengukur.total_bytes / 1024
+    dalam_budget = total_kb <= BUDGET_PAYLOAD_KB
+    logger.log(
+        logging.INFO if dalam_budget else logging.WARNING,
+        "Payload %s %.1f KB (%s pesan, media %.1f KB, mode %s; budget %.0f KB, %s)",
+        pengukur.jenis, total_kb, pengukur.jumlah_pesan if pengukur.pesan_terukur else "tidak terukur",
+        pengukur.bytes_media / 1024, "hemat" if pengukur.mode_hemat else "normal", BUDGET_PAYLOAD_KB,
+        "OK" if dalam_budget else "MELEBIHI BUDGET",
+    )
+    return pengukur.ringkasan()
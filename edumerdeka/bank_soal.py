@@ -0,0 +1,309 @@
+"""Pemuatan bank soal CSV yang divalidasi per baris dan di-cache sebagai Parquet.
+
+CSV dibaca per chunk dengan semua kolom sebagai teks (pyarrow jika tersedia,
+selain itu modul csv), lalu setiap chunk divalidasi secara vektor:
+kolom wajib `nomor,soal,tingkat_bloom,jawaban_benar`, nomor bilangan bulat
+positif dan unik, tingkat Bloom C1-C6, serta `a`/`b` numerik jika ada. Baris
+yang tidak valid dilewati dan dilaporkan beserta nomor baris awalnya di file
+(baris kosong dan sel bertanda kutip yang memuat baris baru ikut dihitung).
+
+Bank hasil parsing disimpan sebagai file Parquet bernama hash SHA-256 isi CSV
+(laporan validasi ikut di metadata file), sehingga file yang sama dari sesi
+atau proses mana pun dibuka ulang tanpa parsing.
+"""
+import codecs
+import csv
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from edumerdeka.asesmen import LEVEL_BLOOM, normalisasi_bloom
+from edumerdeka.penyimpanan import DIREKTORI_DATA
+
+DIREKTORI_CACHE_DEFAULT = os.path.join(DIREKTORI_DATA, "bank_soal")
+
+KOLOM_WAJIB = ('nomor', 'soal', 'tingkat_bloom', 'jawaban_benar')
+# Kolom opsional yang divalidasi sebagai angka; kolom lain (mis. `tp`) disimpan sebagai teks
+KOLOM_ANGKA = ('a', 'b')
+
+UKURAN_CHUNK = 50_000
+MAKS_LAPORAN_ERROR = 100
+# Naikkan jika aturan validasi atau skema hasil berubah, agar cache lama tidak dipakai
+VERSI_CACHE = 2
+_KUNCI_METADATA = b"edumerdeka.bank_soal"
+
+
+class BankSoalError(ValueError):
+    """File bank soal tidak dapat dipakai (bukan CSV, kolom wajib hilang, atau tidak ada soal valid)"""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.csv
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def hash_isi(isi):
+    return hashlib.sha256(isi).hexdigest()
+
+
+def _header(isi):
+    try:
+        baris_pertama = isi.split(b"\n", 1)[0].decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise BankSoalError("File bank soal harus CSV berenkode UTF-8") from e
+    header = next(csv.reader([baris_pertama.strip("\r")]), [])
+    return [kolom.strip() for kolom in header]
+
+
+def _pembaca_csv(isi, **kwargs):
+    return csv.reader(io.TextIOWrapper(io.BytesIO(isi), encoding="utf-8", newline=""), **kwargs)
+
+
+def _iter_chunk(isi, header, ukuran_chunk, baris_rusak):
+    """DataFrame per chunk dengan semua kolom sebagai teks (None/NaN untuk sel kosong).
+
+    Baris dengan jumlah kolom yang salah dilewati dan dicatat ke `baris_rusak`
+    sebagai nomor rekaman CSV: header = 1, baris kosong tidak dihitung dan sel
+    multi-baris tetap satu rekaman (None jika parser tidak memberikannya).
+    """
+    pa = _pyarrow()
+    if pa is not None:
+        def lewati(baris):
+            baris_rusak.append(baris.number)
+            return 'skip'
+
+        opsi_baca = pa.csv.ReadOptions(column_names=header, skip_rows=1,
+                                       block_size=max(ukuran_chunk * 64, 1 << 20))
+        opsi_parse = pa.csv.ParseOptions(invalid_row_handler=lewati)
+        opsi_konversi = pa.csv.ConvertOptions(column_types={k: pa.string() for k in header},
+                                              strings_can_be_null=True)
+        try:
+            reader = pa.csv.open_csv(io.BytesIO(isi), read_options=opsi_baca, parse_options=opsi_parse,
+                                     convert_options=opsi_konversi)
+            for batch in reader:
+                yield batch.to_pandas()
+        except pa.ArrowInvalid as e:
+            raise BankSoalError(f"CSV bank soal tidak valid: {e}") from e
+        return
+    # Tanpa pyarrow: modul csv (parser pandas tidak memberi posisi baris rusak), penomoran sama dengan pyarrow
+    kumpulan, nomor = [], 0
+    try:
+        for rekaman in _pembaca_csv(isi, skipinitialspace=True):
+            if not rekaman:
+                continue
+            nomor += 1
+            if nomor == 1:
+                continue
+            if len(rekaman) != len(header):
+                baris_rusak.append(nomor)
+                continue
+            kumpulan.append(rekaman)
+            if len(kumpulan) == ukuran_chunk:
+                yield pd.DataFrame(kumpulan, columns=header)
+                kumpulan = []
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise BankSoalError(f"CSV bank soal tidak valid: {e}") from e
+    if kumpulan:
+        yield pd.DataFrame(kumpulan, columns=header)
+
+
+def _nomor_rekaman(indeks, baris_rusak):
+    """Nomor rekaman CSV (header = 1) dari indeks baris data, dengan memperhitungkan baris rusak yang dilewati"""
+    rekaman = indeks + 2
+    for rusak in baris_rusak:
+        if rusak <= rekaman:
+            rekaman += 1
+    return rekaman
+
+
+def _baris_file(isi, daftar_rekaman):
+    """{nomor rekaman: nomor baris file tempat rekaman dimulai}.
+
+    File dibaca ulang dengan modul csv hanya sampai rekaman terbesar yang
+    diminta; hanya dipanggil jika ada error.
+    """
+    diminta = set(daftar_rekaman)
+    if not diminta:
+        return {}
+    peta, nomor, akhir = {}, 0, 0
+    pembaca = _pembaca_csv(isi)
+    for rekaman in pembaca:
+        awal, akhir = akhir + 1, pembaca.line_num
+        if not rekaman:
+            continue
+        nomor += 1
+        if nomor in diminta:
+            peta[nomor] = awal
+            if len(peta) == len(diminta):
+                break
+    return peta
+
+
+def _validasi_chunk(df, nomor_terlihat):
+    """(DataFrame valid bertipe, array alasan per baris atau None jika valid)"""
+    teks = {k: df[k].fillna('').astype(str).str.strip() for k in KOLOM_WAJIB}
+    nomor = pd.to_numeric(teks['nomor'], errors='coerce').to_numpy(dtype=float)
+    bloom = normalisasi_bloom(teks['tingkat_bloom'])
+    aturan = [
+        (~(np.isfinite(nomor) & (nomor > 0) & (np.mod(nomor, 1) == 0)), "nomor bukan bilangan bulat positif"),
+        ((teks['soal'] == '').to_numpy(), "soal kosong"),
+        (~np.isin(bloom, LEVEL_BLOOM), "tingkat_bloom bukan C1-C6"),
+        ((teks['jawaban_benar'] == '').to_numpy(), "jawaban_benar kosong"),
+    ]
+    angka = {}
+    for kolom in KOLOM_ANGKA:
+        if kolom in df.columns:
+            nilai_teks = df[kolom].fillna('').astype(str).str.strip()
+            angka[kolom] = pd.to_numeric(nilai_teks, errors='coerce').to_numpy(dtype=float)
+            aturan.append((~np.isfinite(angka[kolom]), f"{kolom} bukan angka"))
+    if 'a' in angka:
+        aturan.append((angka['a'] <= 0, "a harus lebih dari 0"))
+
+    alasan = np.full(len(df), None, dtype=object)
+    # Aturan pertama yang dilanggar yang dilaporkan
+    for mask, pesan in reversed(aturan):
+        alasan[mask] = pesan
+    # Nomor ganda (di chunk ini atau chunk sebelumnya): yang pertama dipertahankan
+    seri_nomor = pd.Series(np.where(pd.isna(alasan), nomor, np.nan))
+    duplikat = (seri_nomor.duplicated() | seri_nomor.isin(nomor_terlihat)).to_numpy() & pd.isna(alasan)
+    alasan[duplikat] = "nomor duplikat"
+
+    valid = pd.isna(alasan)
+    nomor_terlihat.update(nomor[valid].tolist())
+    hasil = pd.DataFrame({
+        'nomor': nomor[valid].astype(np.int64),
+        'soal': teks['soal'].to_numpy()[valid],
+        'tingkat_bloom': bloom[valid],
+        'jawaban_benar': teks['jawaban_benar'].to_numpy()[valid],
+    })
+    for kolom in df.columns:
+        if kolom in KOLOM_WAJIB:
+            continue
+        if kolom in angka:
+            hasil[kolom] = angka[kolom][valid]
+        else:
+            hasil[kolom] = df[kolom].fillna('').astype(str).str.strip().to_numpy()[valid]
+    return hasil, alasan
+
+
+def parse_bank_soal(isi, ukuran_chunk=UKURAN_CHUNK):
+    """Parsing dan validasi CSV bank soal dari bytes.
+
+    Mengembalikan dict berisi `df` (soal valid, `nomor` int64, `tingkat_bloom`
+    'C1'-'C6', `a`/`b` float), `jumlah_baris`, `jumlah_error`, `error` (maks
+    `MAKS_LAPORAN_ERROR` pasangan [nomor baris file, alasan]; header = baris 1,
+    None jika tidak diketahui) dan `mesin` parser. BankSoalError jika file
+    tidak dapat dipakai.
+    """
+    if isi.startswith(codecs.BOM_UTF8):
+        isi = isi[len(codecs.BOM_UTF8):]
+    header = _header(isi)
+    hilang = [k for k in KOLOM_WAJIB if k not in header]
+    if hilang:
+        raise BankSoalError(f"Kolom wajib tidak ada: {', '.join(hilang)} "
+                            f"(format: {','.join(KOLOM_WAJIB)}[,tp,a,b])")
+    if len(set(header)) != len(header):
+        raise BankSoalError("Nama kolom CSV bank soal tidak boleh ganda")
+
+    bagian, salah_validasi, jumlah_error, jumlah_baris = [], [], 0, 0
+    baris_rusak, nomor_terlihat = [], set()
+    for chunk in _iter_chunk(isi, header, ukuran_chunk, baris_rusak):
+        hasil, alasan = _validasi_chunk(chunk, nomor_terlihat)
+        salah = np.flatnonzero(~pd.isna(alasan))
+        jumlah_error += len(salah)
+        for i in salah[:max(MAKS_LAPORAN_ERROR - len(salah_validasi), 0)].tolist():
+            salah_validasi.append((jumlah_baris + i, alasan[i]))
+        jumlah_baris += len(chunk)
+        bagian.append(hasil)
+
+    rusak_bernomor = sorted(b for b in baris_rusak if b is not None)
+    error = [[_nomor_rekaman(i, rusak_bernomor), alasan] for i, alasan in salah_validasi]
+    error += [[b, "jumlah kolom tidak sesuai header"] for b in baris_rusak[:MAKS_LAPORAN_ERROR]]
+    error = sorted(error, key=lambda e: e[0] or 0)[:MAKS_LAPORAN_ERROR]
+    peta_baris = _baris_file(isi, [b for b, _ in error if b is not None])
+    error = [[peta_baris.get(b), alasan] for b, alasan in error]
+    jumlah_error += len(baris_rusak)
+    jumlah_baris += len(baris_rusak)
+
+    df = pd.concat(bagian, ignore_index=True) if bagian else pd.DataFrame(columns=list(KOLOM_WAJIB))
+    if df.empty:
+        contoh = "; ".join(f"baris {b}: {a}" for b, a in error[:3])
+        raise BankSoalError("Tidak ada soal valid di file bank soal" + (f" ({contoh})" if contoh else ""))
+    return {'df': df, 'jumlah_baris': jumlah_baris, 'jumlah_error': jumlah_error, 'error': error,
+            'mesin': 'pyarrow' if _pyarrow() is not None else 'csv'}
+
+
+def _path_cache(direktori, kunci):
+    return os.path.join(direktori, f"{kunci}.parquet")
+
+
+def _baca_cache(path):
+    pa = _pyarrow()
+    if pa is None or not os.path.exists(path):
+        return None
+    try:
+        tabel = pa.parquet.read_table(path)
+        laporan = json.loads(tabel.schema.metadata[_KUNCI_METADATA])
+    except (OSError, KeyError, TypeError, ValueError, pa.ArrowException):
+        # File cache rusak atau terpotong: parsing ulang
+        return None
+    return {'df': tabel.to_pandas(), **laporan, 'mesin': 'parquet'}
+
+
+def _tulis_cache(path, hasil):
+    pa = _pyarrow()
+    if pa is None:
+        return
+    laporan = {k: hasil[k] for k in ('jumlah_baris', 'jumlah_error', 'error')}
+    tabel = pa.Table.from_pandas(hasil['df'], preserve_index=False)
+    tabel = tabel.replace_schema_metadata({**(tabel.schema.metadata or {}),
+                                           _KUNCI_METADATA: json.dumps(laporan).encode("utf-8")})
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Ditulis ke file sementara lalu di-rename agar pembaca lain tidak melihat file setengah jadi
+    fd, path_sementara = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        pa.parquet.write_table(tabel, path_sementara, compression="zstd")
+        os.replace(path_sementara, path)
+    except OSError:
+        if os.path.exists(path_sementara):
+            os.remove(path_sementara)
+        raise
+
+
+def muat_bank_soal(isi, direktori_cache=DIREKTORI_CACHE_DEFAULT, ukuran_chunk=UKURAN_CHUNK):
+    """Bank soal dari bytes CSV, dari cache Parquet jika isi yang sama pernah dimuat.
+
+    Selain isi `parse_bank_soal`, hasil berisi `hash` isi file, `dari_cache`
+    dan `waktu_ms`. Tanpa pyarrow, cache dilewati dan file selalu diparsing.
+    """
+    mulai = time.perf_counter()
+    kunci = hash_isi(isi)
+    path = _path_cache(direktori_cache, f"{kunci}-v{VERSI_CACHE}") if direktori_cache else None
+    hasil = _baca_cache(path) if path else None
+    dari_cache = hasil is not None
+    if hasil is None:
+        hasil = parse_bank_soal(isi, ukuran_chunk)
+        if path:
+            try:
+                _tulis_cache(path, hasil)
+            except OSError:
+                # Cache hanya percepatan; bank tetap dapat dipakai
+                pass
+    return {**hasil, 'hash': kunci, 'dari_cache': dari_cache, 'waktu_ms': (time.perf_counter() - mulai) * 1000}
+
+
+def baca_file_bank_soal(path, **kwargs):
+    with open(path, 'rb') as f:
+        return muat_bank_soal(f.read(), **kwargs)
@@ -0,0 +1,262 @@
+"""Benchmark kelas, sekolah dan kabupaten dari sketsa kuantil yang dapat digabung.
+
+Setiap metrik (daya serap, skor karakter) berskala 0-100, sehingga sketsanya
+berupa histogram beresolusi tetap (0,5 poin): menambah satu nilai O(1), dua
+sketsa digabung dengan menjumlahkan hitungannya, dan nilai yang dihapus (mis.
+diganti saat sinkronisasi) cukup dikurangkan. Kuantil dan persentil siswa
+dibaca dari histogram dengan galat maksimal 0,25 poin, tanpa memindai ulang
+data asesmen.
+
+Sketsa disimpan per (metrik, kelas, tahun ajaran, semester) di tabel
+`sketsa_benchmark` dan diperbarui di transaksi yang sama dengan insert data,
+lihat `PenyimpananSQLite.sisipkan`. Sketsa sekolah adalah gabungan sketsa
+kelasnya; sketsa kabupaten adalah gabungan file sketsa dari beberapa sekolah
+(`python -m edumerdeka benchmark`).
+"""
+import json
+import os
+import struct
+from array import array
+
+RESOLUSI = 0.5
+JUMLAH_BIN = int(100 / RESOLUSI) + 1
+VERSI_SKETSA = 1
+
+# metrik -> (tabel, kolom, faktor skala ke 0-100)
+METRIK_BENCHMARK = {
+    'daya_serap': ('asesmen', 'daya_serap', 1),
+    'skor_karakter': ('projek_p5', 'skor_karakter', 10),
+}
+
+PATH_KABUPATEN = os.environ.get("EDUMERDEKA_BENCHMARK_KABUPATEN", "")
+
+_HEADER = struct.Struct("<dd")
+
+
+class SketsaKuantil:
+    """Histogram 0-100 beresolusi tetap yang dapat digabung dan dikurangi"""
+
+    __slots__ = ('hitungan', 'total', 'total_kuadrat')
+
+    def __init__(self, hitungan=None, total=0.0, total_kuadrat=0.0):
+        self.hitungan = array('q', hitungan if hitungan is not None else bytes(8 * JUMLAH_BIN))
+        self.total = total
+        self.total_kuadrat = total_kuadrat
+
+    @staticmethod
+    def _bin(nilai):
+        return min(max(int(round(nilai / RESOLUSI)), 0), JUMLAH_BIN - 1)
+
+    def tambah(self, nilai, bobot=1):
+        """Menambah satu nilai; `bobot` -1 menghapus nilai yang pernah ditambahkan"""
+        nilai = min(max(float(nilai), 0.0), 100.0)
+        self.hitungan[self._bin(nilai)] += bobot
+        self.total += bobot * nilai
+        self.total_kuadrat += bobot * nilai * nilai
+        return self
+
+    def gabung(self, lain):
+        for i, jumlah in enumerate(lain.hitungan):
+            if jumlah:
+                self.hitungan[i] += jumlah
+        self.total += lain.total
+        self.total_kuadrat += lain.total_kuadrat
+        return self
+
+    @property
+    def jumlah(self):
+        return sum(self.hitungan)
+
+    def rata_rata(self):
+        n = self.jumlah
+        return self.total / n if n > 0 else None
+
+    def simpangan_baku(self):
+        n = self.jumlah
+        if n < 2:
+            return None
+        rata = self.total / n
+        return max(self.total_kuadrat / n - rata * rata, 0.0) ** 0.5
+
+    def kuantil(self, q):
+        """Nilai pada kuantil `q` (0-1), None jika sketsa kosong"""
+        n = self.jumlah
+        if n <= 0:
+            return None
+        target = q * (n - 1)
+        kumulatif = 0
+        for i, jumlah in enumerate(self.hitungan):
+            kumulatif += jumlah
+            if kumulatif > target:
+                return i * RESOLUSI
+        return 100.0
+
+    def persentil(self, nilai):
+        """Persentase nilai di sketsa yang lebih kecil dari `nilai` (nilai sama dihitung setengah)"""
+        n = self.jumlah
+        if n <= 0:
+            return None
+        indeks = self._bin(nilai)
+        di_bawah = sum(self.hitungan[:indeks])
+        return (di_bawah + self.hitungan[indeks] / 2) / n * 100
+
+    def ringkasan(self):
+        return {'jumlah': self.jumlah, 'rata_rata': self.rata_rata(), 'simpangan_baku': self.simpangan_baku(),
+                **{f'p{int(q * 100)}': self.kuantil(q) for q in (0.25, 0.5, 0.75)}}
+
+    def ke_bytes(self):
+        return _HEADER.pack(self.total, self.total_kuadrat) + self.hitungan.tobytes()
+
+    @classmethod
+    def dari_bytes(cls, data):
+        total, total_kuadrat = _HEADER.unpack_from(data)
+        hitungan = array('q')
+        hitungan.frombytes(data[_HEADER.size:])
+        return cls(hitungan, total, total_kuadrat)
+
+    def ke_dict(self):
+        """Bentuk JSON ringkas: hanya bin yang berisi"""
+        return {'total': self.total, 'total_kuadrat': self.total_kuadrat,
+                'hitungan': {str(i): n for i, n in enumerate(self.hitungan) if n}}
+
+    @classmethod
+    def dari_dict(cls, data):
+        sketsa = cls(total=float(data['total']), total_kuadrat=float(data['total_kuadrat']))
+        for i, n in data['hitungan'].items():
+            sketsa.hitungan[int(i)] = int(n)
+        return sketsa
+
+
+def _nilai_metrik(tabel, data):
+    """Pasangan (metrik, nilai 0-100) dari satu baris data tabel"""
+    for metrik, (tabel_metrik, kolom, skala) in METRIK_BENCHMARK.items():
+        if tabel_metrik == tabel and data.get(kolom) is not None:
+            yield metrik, float(data[kolom]) * skala
+
+
+def perbarui_sketsa(conn, tabel, daftar_baris, bobot=1):
+    """Menambah (`bobot` 1) atau mengurangi (-1) baris data ke sketsa di transaksi `conn`"""
+    perubahan = {}
+    for data in daftar_baris:
+        for metrik, nilai in _nilai_metrik(tabel, data):
+            kunci = (metrik, data.get('kelas') or '', data.get('tahun_ajaran') or '', data.get('semester') or '')
+            perubahan.setdefault(kunci, []).append(nilai)
+    for kunci, daftar_nilai in perubahan.items():
+        baris = conn.execute("SELECT data FROM sketsa_benchmark WHERE metrik = ? AND kelas = ? "
+                             "AND tahun_ajaran = ? AND semester = ?", kunci).fetchone()
+        sketsa = SketsaKuantil.dari_bytes(baris[0]) if baris else SketsaKuantil()
+        for nilai in daftar_nilai:
+            sketsa.tambah(nilai, bobot)
+        conn.execute("INSERT INTO sketsa_benchmark (metrik, kelas, tahun_ajaran, semester, data) "
+                     "VALUES (?, ?, ?, ?, ?) ON CONFLICT (metrik, kelas, tahun_ajaran, semester) "
+                     "DO UPDATE SET data = excluded.data", kunci + (sketsa.ke_bytes(),))
+
+
+def bangun_ulang_sketsa(conn):
+    """Membangun ulang semua sketsa dari tabel data (database lama atau setelah perbaikan manual)"""
+    conn.execute("DELETE FROM sketsa_benchmark")
+    for tabel, kolom, _ in set(METRIK_BENCHMARK.values()):
+        cursor = conn.execute(f"SELECT kelas, tahun_ajaran, semester, {kolom} FROM {tabel} "
+                              f"WHERE {kolom} IS NOT NULL")
+        while True:
+            chunk = cursor.fetchmany(5000)
+            if not chunk:
+                break
+            perbarui_sketsa(conn, tabel, [{'kelas': b[0], 'tahun_ajaran': b[1], 'semester': b[2], kolom: b[3]}
+                                          for b in chunk])
+
+
+def ekspor_sketsa_sekolah(penyimpanan, path):
+    """Menulis sketsa sekolah (gabungan semua kelas) per metrik dan periode ke file JSON"""
+    sketsa = {}
+    for metrik, tahun_ajaran, semester, data in penyimpanan.koneksi().execute(
+            "SELECT metrik, tahun_ajaran, semester, data FROM sketsa_benchmark"):
+        kunci = f"{metrik}|{tahun_ajaran}|{semester}"
+        sketsa.setdefault(kunci, SketsaKuantil()).gabung(SketsaKuantil.dari_bytes(data))
+    _tulis_file_sketsa(sketsa, path, jumlah_sekolah=1)
+    return len(sketsa)
+
+
+def gabung_file_sketsa(daftar_path, path_output):
+    """Menggabungkan file sketsa beberapa sekolah (atau kabupaten) menjadi satu file"""
+    sketsa, jumlah_sekolah = {}, 0
+    for path in daftar_path:
+        isi = _baca_file_sketsa(path)
+        jumlah_sekolah += isi['jumlah_sekolah']
+        for kunci, s in isi['sketsa'].items():
+            sketsa.setdefault(kunci, SketsaKuantil()).gabung(s)
+    _tulis_file_sketsa(sketsa, path_output, jumlah_sekolah)
+    return jumlah_sekolah
+
+
+def _tulis_file_sketsa(sketsa, path, jumlah_sekolah):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'versi': VERSI_SKETSA, 'resolusi': RESOLUSI, 'jumlah_sekolah': jumlah_sekolah,
+                   'sketsa': {kunci: s.ke_dict() for kunci, s in sorted(sketsa.items())}}, f)
+
+
+def _baca_file_sketsa(path):
+    with open(path, encoding='utf-8') as f:
+        isi = json.load(f)
+    if isi.get('versi') != VERSI_SKETSA or isi.get('resolusi') != RESOLUSI:
+        raise ValueError(f"Format file sketsa tidak didukung: {path}")
+    return {'jumlah_sekolah': int(isi.get('jumlah_sekolah', 1)),
+            'sketsa': {kunci: SketsaKuantil.dari_dict(s) for kunci, s in isi['sketsa'].items()}}
+
+
+class SketsaKabupaten:
+    """Sketsa kabupaten dari file gabungan, dibaca ulang hanya jika file berubah"""
+
+    def __init__(self, path=PATH_KABUPATEN):
+        self.path = path
+        self._mtime = None
+        self._isi = {'jumlah_sekolah': 0, 'sketsa': {}}
+
+    def _muat(self):
+        if not self.path or not os.path.exists(self.path):
+            return self._isi
+        mtime = os.path.getmtime(self.path)
+        if mtime != self._mtime:
+            self._isi, self._mtime = _baca_file_sketsa(self.path), mtime
+        return self._isi
+
+    def sketsa(self, metrik, tahun_ajaran=None, semester=None):
+        hasil = SketsaKuantil()
+        for kunci, s in self._muat()['sketsa'].items():
+            m, ta, sm = kunci.split('|')
+            if m == metrik and tahun_ajaran in (None, ta) and semester in (None, sm):
+                hasil.gabung(s)
+        return hasil
+
+    @property
+    def jumlah_sekolah(self):
+        return self._muat()['jumlah_sekolah']
+
+
+def benchmark_siswa(penyimpanan, nilai_siswa, kelas, tahun_ajaran=None, semester=None, kabupaten=None):
+    """Rata-rata, sebaran dan persentil siswa per tingkat untuk setiap metrik.
+
+    `nilai_siswa` adalah {metrik: nilai 0-100}. Mengembalikan {tingkat: {metrik:
+    ringkasan + 'persentil'}} untuk tingkat `kelas`, `sekolah` dan `kabupaten`
+    (jika file sketsa kabupaten tersedia). Periode dengan data kosong
+    memakai semua periode.
+    """
+    hasil = {}
+    for tingkat in ('kelas', 'sekolah', 'kabupaten'):
+        if tingkat == 'kabupaten' and (kabupaten is None or not kabupaten.jumlah_sekolah):
+            continue
+        hasil[tingkat] = {}
+        for metrik in METRIK_BENCHMARK:
+            if tingkat == 'kabupaten':
+                ambil = lambda ta, sm: kabupaten.sketsa(metrik, ta, sm)
+            else:
+                filter_kelas = kelas if tingkat == 'kelas' else None
+                ambil = lambda ta, sm: penyimpanan.sketsa(metrik, filter_kelas, ta, sm)
+            sketsa = ambil(tahun_ajaran, semester)
+            if not sketsa.jumlah and (tahun_ajaran or semester):
+                sketsa = ambil(None, None)
+            ringkasan = sketsa.ringkasan()
+            nilai = nilai_siswa.get(metrik)
+            ringkasan['persentil'] = sketsa.persentil(nilai) if nilai is not None else None
+            hasil[tingkat][metrik] = ringkasan
+    return hasil
@@ -0,0 +1,127 @@
+"""Cache LRU untuk grafik yang sudah dirender menjadi PNG/SVG.
+
+Kunci cache adalah hash dari jenis grafik dan data inputnya, sehingga grafik
+yang identik tidak pernah dirasterisasi ulang di rerun Streamlit berikutnya.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+# Batas ukuran (inci) dan DPI grafik versi hemat data
+UKURAN_MAKS_RINGKAS = (6.0, 3.5)
+DPI_RINGKAS = 60
+
+
+def kunci_grafik(jenis, data, **opsi):
+    """Hash stabil dari jenis grafik, data input dan opsi render"""
+    payload = json.dumps([jenis, data, opsi], sort_keys=True, default=_ke_json, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _ke_json(nilai):
+    if hasattr(nilai, "tolist"):
+        return nilai.tolist()
+    return str(nilai)
+
+
+def render_figure(fig, format="png", dpi=100):
+    """Mengenkode figure matplotlib menjadi bytes lalu menutupnya"""
+    import matplotlib.pyplot as plt
+
+    buffer = BytesIO()
+    try:
+        fig.savefig(buffer, format=format, dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_ringkas(fig):
+    """Versi hemat data: ukuran figure dibatasi lalu dipilih yang lebih kecil antara
+    SVG (teks tetap teks) dan PNG ber-DPI rendah. Figure ditutup setelahnya.
+    """
+    import matplotlib
+
+    lebar, tinggi = fig.get_size_inches()
+    skala = min(1.0, UKURAN_MAKS_RINGKAS[0] / lebar, UKURAN_MAKS_RINGKAS[1] / tinggi)
+    fig.set_size_inches(lebar * skala, tinggi * skala)
+
+    buffer = BytesIO()
+    with matplotlib.rc_context({'svg.fonttype': 'none'}):
+        fig.savefig(buffer, format="svg", bbox_inches="tight", metadata={'Date': None})
+    svg = buffer.getvalue()
+    png = render_figure(fig, format="png", dpi=DPI_RINGKAS)
+    # SVG dikirim inline sebagai base64 (+33%), PNG lewat endpoint media
+    return svg if len(svg) * 4 / 3 < len(png) else png
+
+
+def adalah_svg(nilai):
+    return nilai[:5] in (b"<?xml", b"<svg ")
+
+
+class CacheGrafik:
+    """Cache grafik terenkode dengan eviksi LRU berdasarkan total ukuran bytes"""
+
+    def __init__(self, maks_bytes=32 * 1024 * 1024):
+        self.maks_bytes = maks_bytes
+        self.total_bytes = 0
+        self.hit = 0
+        self.miss = 0
+        self.eviksi = 0
+        self._data = OrderedDict()
+        self._kunci = threading.Lock()
+
+    def ambil(self, kunci):
+        with self._kunci:
+            nilai = self._data.get(kunci)
+            if nilai is None:
+                self.miss += 1
+                return None
+            self._data.move_to_end(kunci)
+            self.hit += 1
+            return nilai
+
+    def simpan(self, kunci, nilai):
+        ukuran = len(nilai)
+        if ukuran > self.maks_bytes:
+            return
+        with self._kunci:
+            lama = self._data.pop(kunci, None)
+            if lama is not None:
+                self.total_bytes -= len(lama)
+            self._data[kunci] = nilai
+            self.total_bytes += ukuran
+            while self.total_bytes > self.maks_bytes:
+                _, dibuang = self._data.popitem(last=False)
+                self.total_bytes -= len(dibuang)
+                self.eviksi += 1
+
+    def ambil_atau_render(self, jenis, data, pembuat, format="png", dpi=100):
+        """Mengembalikan bytes grafik dari cache, atau memanggil `pembuat(data)` sekali jika belum ada.
+
+        `format="ringkas"` menghasilkan versi hemat data (lihat `render_ringkas`).
+        """
+        kunci = kunci_grafik(jenis, data, format=format, dpi=dpi)
+        nilai = self.ambil(kunci)
+        if nilai is None:
+            fig = pembuat(data)
+            nilai = render_ringkas(fig) if format == "ringkas" else render_figure(fig, format=format, dpi=dpi)
+            self.simpan(kunci, nilai)
+        return nilai
+
+    def statistik(self):
+        with self._kunci:
+            total = self.hit + self.miss
+            return {
+                'hit': self.hit,
+                'miss': self.miss,
+                'hit_rate': self.hit / total if total else 0.0,
+                'eviksi': self.eviksi,
+                'jumlah_grafik': len(self._data),
+                'total_bytes': self.total_bytes,
+            }
+
+    def __len__(self):
+        return len(self._data)
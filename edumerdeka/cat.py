@@ -0,0 +1,211 @@
+"""Computerized Adaptive Testing (CAT) berbasis IRT 1PL/2PL.
+
+Bank soal disimpan sebagai array parameter (a, b) yang read-only sehingga satu
+objek `BankItemIRT` bisa dipakai bersama oleh ratusan sesi dalam satu proses.
+Informasi item dihitung sekali di grid kemampuan (theta) dan disimpan sebagai
+urutan item terbaik per titik grid, sehingga memilih soal berikutnya cukup
+membaca indeks yang sudah terurut.
+"""
+import threading
+
+import numpy as np
+
+from edumerdeka.asesmen import LEVEL_BLOOM, normalisasi_bloom
+
+# Tingkat kesulitan (b) default per level Bloom jika bank soal tidak punya kolom `b`
+BLOOM_KE_B = dict(zip(LEVEL_BLOOM, np.linspace(-2.5, 2.5, len(LEVEL_BLOOM))))
+
+GRID_THETA = np.linspace(-4.0, 4.0, 81)
+_LANGKAH_GRID = GRID_THETA[1] - GRID_THETA[0]
+_LOG_PRIOR = -0.5 * GRID_THETA ** 2
+
+
+def peluang_benar(theta, a, b):
+    """Peluang menjawab benar menurut model 2PL (1PL jika a = 1)"""
+    return 1.0 / (1.0 + np.exp(-a * (theta - b)))
+
+
+def informasi_item(theta, a, b):
+    """Fisher information item pada kemampuan theta"""
+    p = peluang_benar(theta, a, b)
+    return a * a * p * (1.0 - p)
+
+
+def level_bloom_dari_theta(theta):
+    """Level Bloom yang tingkat kesulitannya paling dekat dengan kemampuan theta"""
+    return min(BLOOM_KE_B, key=lambda level: abs(BLOOM_KE_B[level] - theta))
+
+
+class BankItemIRT:
+    """Bank soal IRT dengan tabel informasi yang sudah dihitung di grid theta"""
+
+    def __init__(self, a, b, nomor=None, tingkat_bloom=None, top_k=512):
+        self.a = np.ascontiguousarray(a, dtype=np.float64)
+        self.b = np.ascontiguousarray(b, dtype=np.float64)
+        self.jumlah_item = len(self.b)
+        self.nomor = np.asarray(nomor if nomor is not None else np.arange(1, self.jumlah_item + 1))
+        self.tingkat_bloom = tingkat_bloom
+        self.urutan = self._hitung_urutan_informasi(min(top_k, self.jumlah_item))
+        for arr in (self.a, self.b, self.urutan):
+            arr.setflags(write=False)
+
+    @classmethod
+    def dari_dataframe(cls, df_soal, **kwargs):
+        """Membuat bank dari DataFrame soal.
+
+        Kolom `b` (kesulitan) dan `a` (daya beda) dipakai jika ada. Tanpa `b`,
+        kesulitan diturunkan dari `tingkat_bloom`; tanpa `a`, model menjadi 1PL.
+        """
+        bloom = normalisasi_bloom(df_soal["tingkat_bloom"]) if "tingkat_bloom" in df_soal.columns else None
+        if "b" in df_soal.columns:
+            b = df_soal["b"].to_numpy(dtype=float)
+        elif bloom is not None:
+            b = np.array([BLOOM_KE_B.get(level, 0.0) for level in bloom])
+        else:
+            raise ValueError("Bank soal membutuhkan kolom 'b' atau 'tingkat_bloom'")
+        a = df_soal["a"].to_numpy(dtype=float) if "a" in df_soal.columns else np.ones(len(b))
+        nomor = df_soal["nomor"].to_numpy() if "nomor" in df_soal.columns else None
+        return cls(a, b, nomor=nomor, tingkat_bloom=bloom, **kwargs)
+
+    def _hitung_urutan_informasi(self, top_k, ukuran_blok=16):
+        """Menyimpan top_k item paling informatif (terurut) untuk setiap titik grid"""
+        urutan = np.empty((len(GRID_THETA), top_k), dtype=np.int32)
+        for mulai in range(0, len(GRID_THETA), ukuran_blok):
+            theta = GRID_THETA[mulai:mulai + ukuran_blok, np.newaxis]
+            info = informasi_item(theta, self.a, self.b)
+            if top_k < self.jumlah_item:
+                kandidat = np.argpartition(-info, top_k - 1, axis=1)[:, :top_k]
+            else:
+                kandidat = np.broadcast_to(np.arange(self.jumlah_item), info.shape)
+            info_kandidat = np.take_along_axis(info, kandidat, axis=1)
+            urut = np.argsort(-info_kandidat, axis=1, kind="stable")
+            urutan[mulai:mulai + ukuran_blok] = np.take_along_axis(kandidat, urut, axis=1)
+        return urutan
+
+    def pilih_item(self, theta, dipakai, rng=None, randomesque=1):
+        """Memilih item dengan informasi maksimum di theta yang belum dipakai.
+
+        `randomesque` > 1 memilih acak di antara beberapa item terbaik untuk
+        membatasi paparan soal yang sama ke semua peserta.
+        """
+        g = int(np.clip(round((theta - GRID_THETA[0]) / _LANGKAH_GRID), 0, len(GRID_THETA) - 1))
+        kandidat = []
+        for idx in self.urutan[g]:
+            if idx not in dipakai:
+                kandidat.append(int(idx))
+                if len(kandidat) >= randomesque:
+                    break
+
+        if not kandidat:
+            if len(dipakai) >= self.jumlah_item:
+                return None
+            # Semua item teratas sudah dipakai, hitung ulang untuk seluruh bank
+            info = informasi_item(GRID_THETA[g], self.a, self.b)
+            info[list(dipakai)] = -np.inf
+            return int(np.argmax(info))
+
+        if len(kandidat) == 1 or rng is None:
+            return kandidat[0]
+        return kandidat[rng.integers(len(kandidat))]
+
+
+class SesiCAT:
+    """State satu peserta tes: item yang sudah diberikan dan posterior kemampuan"""
+
+    def __init__(self, bank, maks_soal=30, se_target=0.3, randomesque=1, seed=None):
+        self.bank = bank
+        self.maks_soal = maks_soal
+        self.se_target = se_target
+        self.randomesque = randomesque
+        self.rng = np.random.default_rng(seed)
+        self.log_posterior = _LOG_PRIOR.copy()
+        self.dipakai = set()
+        self.riwayat = []
+        self.theta = 0.0
+        self.se = 1.0
+        self.item_aktif = None
+
+    def item_berikutnya(self):
+        """Mengembalikan indeks item berikutnya, atau None jika tes selesai"""
+        if self.selesai:
+            return None
+        if self.item_aktif is None:
+            self.item_aktif = self.bank.pilih_item(self.theta, self.dipakai, self.rng, self.randomesque)
+        return self.item_aktif
+
+    def catat_jawaban(self, benar, item=None):
+        """Mencatat jawaban untuk item aktif dan memperbarui estimasi EAP.
+
+        ValueError jika tes sudah selesai atau item sudah pernah dijawab, agar
+        klik ganda tidak menghitung satu item dua kali di posterior.
+        """
+        if self.selesai:
+            raise ValueError("Tes adaptif sudah selesai")
+        item = self.item_aktif if item is None else item
+        if item is None:
+            raise ValueError("Tidak ada item aktif untuk dijawab")
+        if item in self.dipakai:
+            raise ValueError(f"Item {item} sudah dijawab")
+
+        p = peluang_benar(GRID_THETA, self.bank.a[item], self.bank.b[item])
+        self.log_posterior += np.log(p if benar else 1.0 - p)
+        posterior = np.exp(self.log_posterior - self.log_posterior.max())
+        posterior /= posterior.sum()
+        self.theta = float(GRID_THETA @ posterior)
+        self.se = float(np.sqrt(((GRID_THETA - self.theta) ** 2) @ posterior))
+
+        self.dipakai.add(item)
+        self.riwayat.append((item, bool(benar)))
+        self.item_aktif = None
+        return self.theta, self.se
+
+    @property
+    def selesai(self):
+        return (len(self.riwayat) >= self.maks_soal
+                or (bool(self.riwayat) and self.se <= self.se_target)
+                or len(self.dipakai) >= self.bank.jumlah_item)
+
+    @property
+    def persentase_benar(self):
+        if not self.riwayat:
+            return 0
+        return sum(benar for _, benar in self.riwayat) / len(self.riwayat) * 100
+
+    def ringkasan(self):
+        return {
+            'theta': self.theta,
+            'se': self.se,
+            'jumlah_soal': len(self.riwayat),
+            'jawaban_benar_persen': self.persentase_benar,
+            'level_bloom': level_bloom_dari_theta(self.theta),
+        }
+
+
+class MesinCAT:
+    """Mengelola banyak sesi CAT yang berbagi satu bank soal dalam satu proses"""
+
+    def __init__(self, bank, **opsi_sesi):
+        self.bank = bank
+        self.opsi_sesi = opsi_sesi
+        self._sesi = {}
+        self._kunci = threading.Lock()
+
+    def mulai(self, id_peserta, **opsi):
+        sesi = SesiCAT(self.bank, **{**self.opsi_sesi, **opsi})
+        with self._kunci:
+            self._sesi[id_peserta] = sesi
+        return sesi.item_berikutnya()
+
+    def jawab(self, id_peserta, benar):
+        """Mencatat jawaban peserta lalu mengembalikan item berikutnya (None jika selesai)"""
+        sesi = self._sesi[id_peserta]
+        sesi.catat_jawaban(benar)
+        return sesi.item_berikutnya()
+
+    def akhiri(self, id_peserta):
+        with self._kunci:
+            sesi = self._sesi.pop(id_peserta)
+        return sesi.ringkasan()
+
+    def __len__(self):
+        return len(self._sesi)
@@ -0,0 +1,321 @@
+"""CLI batch untuk job malam: asesmen, skor P5, optimasi, export dan laporan satu sekolah.
+
+Semua perintah berjalan dalam satu proses tanpa Streamlit, memakai database dan
+kalkulasi yang sama dengan UI. Contoh:
+
+    python -m edumerdeka asesmen --soal bank_soal.csv jawaban/*.csv --tahun-ajaran 2025/2026 --semester Ganjil
+    python -m edumerdeka p5 nilai_p5.csv --tahun-ajaran 2025/2026 --semester Ganjil
+    python -m edumerdeka optimasi --output alokasi.csv
+    python -m edumerdeka ekspor --tabel asesmen --format xlsx --output asesmen.xlsx
+    python -m edumerdeka laporan --output-dir laporan/
+    python -m edumerdeka learning-path --kelas 7A --mata-pelajaran IPA --output learning_path_7A.csv
+    python -m edumerdeka benchmark --output sekolah_a.json
+    python -m edumerdeka benchmark --gabung sekolah_*.json --output kabupaten.json
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+from edumerdeka.kalkulasi import hitung_skor_karakter
+from edumerdeka.learning_path import DIMENSI_PANCASILA, GAYA_BELAJAR
+from edumerdeka.penyimpanan import KOLOM_TABEL, PenyimpananSQLite
+
+
+def _cetak(pesan):
+    print(pesan, file=sys.stderr)
+
+
+def _konteks(args):
+    return {'tahun_ajaran': args.tahun_ajaran or '', 'semester': args.semester or ''}
+
+
+def _tulis_csv(df, path):
+    df.to_csv(path, index=False)
+    _cetak(f"Hasil ditulis ke {path}")
+
+
+def perintah_asesmen(args, penyimpanan):
+    """Memproses matriks jawaban per kelas (satu file CSV per kelas) dengan bank soal yang sama"""
+    import pandas as pd
+
+    from edumerdeka.asesmen import proses_asesmen_kelas
+    from edumerdeka.bank_soal import baca_file_bank_soal
+
+    bank_soal = baca_file_bank_soal(args.soal)
+    df_soal = bank_soal['df']
+    _cetak(f"Bank soal {args.soal}: {len(df_soal):,} soal valid"
+           + (" (dari cache)" if bank_soal['dari_cache'] else ""))
+    for baris, alasan in bank_soal['error'][:10]:
+        _cetak(f"  baris {baris if baris is not None else '?'}: {alasan}")
+    if bank_soal['jumlah_error'] > 10:
+        _cetak(f"  ... {bank_soal['jumlah_error'] - 10:,} baris tidak valid lainnya")
+    tanggal = datetime.now().strftime("%Y-%m-%d %H:%M")
+    semua_hasil = []
+    for path in args.jawaban:
+        df_jawaban = pd.read_csv(path)
+        hasil = proses_asesmen_kelas(df_jawaban, df_soal, sudah_diskor=args.sudah_diskor or None)
+        # Kelas dari kolom `kelas` di file, --kelas, atau nama file (mis. 7A.csv)
+        if 'kelas' in df_jawaban.columns:
+            hasil.insert(1, 'kelas', df_jawaban['kelas'].fillna('').astype(str).to_numpy())
+        else:
+            hasil.insert(1, 'kelas', args.kelas or os.path.splitext(os.path.basename(path))[0])
+        hasil['nama_siswa'] = hasil['nama_siswa'].astype(str)
+
+        if not args.tanpa_simpan:
+            konteks = {**_konteks(args), 'fase': args.fase or '', 'nip_guru': args.nip_guru or '',
+                       'tanggal': tanggal}
+            penyimpanan.simpan_batch('asesmen', [{**baris, **konteks} for baris in hasil.to_dict('records')])
+        _cetak(f"{path}: {len(hasil)} siswa, rata-rata daya serap {hasil['daya_serap'].mean():.1f}%")
+        semua_hasil.append(hasil)
+
+    hasil = pd.concat(semua_hasil, ignore_index=True)
+    _cetak(f"Total {len(hasil):,} siswa dari {len(args.jawaban)} file"
+           + ("" if args.tanpa_simpan else " disimpan ke database"))
+    if args.output:
+        _tulis_csv(hasil, args.output)
+
+
+def perintah_p5(args, penyimpanan):
+    """Skor karakter projek P5 dari CSV: satu baris per siswa, satu kolom per dimensi"""
+    import pandas as pd
+
+    df = pd.read_csv(args.input)
+    dimensi = [d for d in DIMENSI_PANCASILA if d in df.columns]
+    if 'nama_siswa' not in df.columns or not dimensi:
+        raise ValueError(f"CSV P5 wajib berisi kolom nama_siswa dan minimal satu dimensi: "
+                         f"{', '.join(DIMENSI_PANCASILA)}")
+
+    tanggal = datetime.now().strftime("%Y-%m-%d")
+    baris = []
+    for data in df.to_dict('records'):
+        dimensi_scores = {d: float(data[d]) for d in dimensi if pd.notna(data[d])}
+        mapel = data.get('mata_pelajaran')
+        baris.append({
+            'nama_siswa': str(data['nama_siswa']),
+            'kelas': str(data.get('kelas') if pd.notna(data.get('kelas')) else args.kelas or ''),
+            **_konteks(args),
+            'tanggal': tanggal,
+            'nama_projek': data.get('nama_projek') if pd.notna(data.get('nama_projek')) else args.nama_projek,
+            'tema': data.get('tema') if pd.notna(data.get('tema')) else None,
+            'mata_pelajaran': [m.strip() for m in str(mapel).split(';')] if pd.notna(mapel) else [],
+            'durasi': int(data['durasi']) if pd.notna(data.get('durasi')) else None,
+            'progress': int(data['progress']) if pd.notna(data.get('progress')) else None,
+            'dimensi_scores': dimensi_scores,
+            'skor_karakter': hitung_skor_karakter(dimensi_scores),
+            'jurnal': data.get('jurnal') if pd.notna(data.get('jurnal')) else None,
+        })
+
+    if not args.tanpa_simpan:
+        penyimpanan.simpan_batch('projek_p5', baris)
+    hasil = pd.DataFrame([{'nama_siswa': b['nama_siswa'], 'kelas': b['kelas'], 'nama_projek': b['nama_projek'],
+                           'skor_karakter': b['skor_karakter']} for b in baris])
+    _cetak(f"{len(hasil):,} projek P5, rata-rata skor karakter {hasil['skor_karakter'].mean():.1f}/10"
+           + ("" if args.tanpa_simpan else " disimpan ke database"))
+    if args.output:
+        _tulis_csv(hasil, args.output)
+
+
+def perintah_optimasi(args, penyimpanan):
+    """Optimasi kohort untuk semua siswa tersimpan (atau satu kelas)"""
+    import pandas as pd
+
+    from edumerdeka.optimasi import baris_hasil_kohort, optimasi_kohort, profil_dari_penyimpanan
+
+    daftar_profil = profil_dari_penyimpanan(penyimpanan, args.tahun_ajaran, args.semester, args.kelas)
+    if not daftar_profil:
+        _cetak("Belum ada asesmen tersimpan untuk filter ini")
+        return
+
+    def progres(selesai, total):
+        _cetak(f"  {selesai}/{total} model selesai")
+
+    hasil_siswa, laporan = optimasi_kohort(daftar_profil, jam_tersedia=args.jam, gaya_default=args.gaya,
+                                           maks_worker=args.worker, progres=progres)
+    _cetak(f"{laporan['jumlah_siswa']:,} siswa, {laporan['jumlah_model']} model unik "
+           f"({laporan['model_di_solve']} di-solve, {laporan['jumlah_worker']} worker) "
+           f"dalam {laporan['waktu_total_ms'] / 1000:.1f} s")
+    df = pd.DataFrame(baris_hasil_kohort(hasil_siswa))
+    if args.output:
+        _tulis_csv(df, args.output)
+    else:
+        df.to_csv(sys.stdout, index=False)
+
+
+def perintah_ekspor(args, penyimpanan):
+    from edumerdeka.ekspor import FORMAT_EKSPOR
+
+    fungsi_ekspor, _ = FORMAT_EKSPOR[args.format]
+    filter = {'kelas': args.kelas, 'tahun_ajaran': args.tahun_ajaran, 'semester': args.semester}
+    if args.format == 'csv':
+        with open(args.output, 'wb') as f:
+            jumlah = fungsi_ekspor(penyimpanan, args.tabel, f, **filter)
+    else:
+        jumlah = fungsi_ekspor(penyimpanan, args.tabel, args.output, **filter)
+    _cetak(f"{jumlah:,} baris {args.tabel} ditulis ke {args.output}")
+
+
+def perintah_laporan(args, penyimpanan):
+    """ZIP laporan PDF per kelas; tanpa --kelas semua kelas yang memiliki asesmen"""
+    from edumerdeka.laporan import data_laporan_kelas, tulis_zip_laporan
+
+    daftar_kelas = args.kelas or penyimpanan.daftar_kelas('asesmen', args.tahun_ajaran, args.semester)
+    os.makedirs(args.output_dir, exist_ok=True)
+    tanggal = datetime.now().strftime('%Y%m%d')
+    total = 0
+    for kelas in daftar_kelas:
+        daftar_data = data_laporan_kelas(penyimpanan, kelas, args.tahun_ajaran, args.semester)
+        if not daftar_data:
+            continue
+        path = os.path.join(args.output_dir, f"laporan_kelas_{kelas or 'tanpa_kelas'}_{tanggal}.zip")
+        total += tulis_zip_laporan(daftar_data, path, maks_worker=args.worker)
+        _cetak(f"{kelas or '(tanpa kelas)'}: {len(daftar_data)} laporan -> {path}")
+    _cetak(f"Total {total:,} laporan dari {len(daftar_kelas)} kelas")
+
+
+def perintah_learning_path(args, penyimpanan):
+    """Learning path semua siswa (atau satu kelas) dari asesmen dan projek P5 terakhir"""
+    import pandas as pd
+
+    from edumerdeka.learning_path import indeks_learning_path
+    from edumerdeka.optimasi import profil_dari_penyimpanan
+
+    daftar_profil = profil_dari_penyimpanan(penyimpanan, args.tahun_ajaran, args.semester, args.kelas)
+    if not daftar_profil:
+        _cetak("Belum ada asesmen tersimpan untuk filter ini")
+        return
+    hasil = indeks_learning_path().rekomendasi_kelas(daftar_profil, args.mata_pelajaran, args.gaya,
+                                                     [args.dimensi] if args.dimensi else None)
+    df = pd.DataFrame([{**{k: h[k] for k in ('nama_siswa', 'kelas', 'daya_serap', 'band', 'dimensi')},
+                        'materi': " | ".join(h['materi']), 'aksi': " | ".join(h['aksi'])} for h in hasil])
+    _cetak(f"Learning path {len(df):,} siswa: " + ", ".join(f"{band} {n}" for band, n in
+                                                         df['band'].value_counts().items()))
+    if args.output:
+        _tulis_csv(df, args.output)
+    else:
+        df.to_csv(sys.stdout, index=False)
+
+
+def perintah_benchmark(args, penyimpanan):
+    """Ekspor sketsa benchmark sekolah, atau gabungkan file sketsa beberapa sekolah menjadi sketsa kabupaten"""
+    from edumerdeka.benchmark import ekspor_sketsa_sekolah, gabung_file_sketsa
+
+    if args.gabung:
+        jumlah = gabung_file_sketsa(args.gabung, args.output)
+        _cetak(f"Sketsa {jumlah} sekolah digabung ke {args.output}")
+    else:
+        jumlah = ekspor_sketsa_sekolah(penyimpanan, args.output)
+        _cetak(f"{jumlah} sketsa (metrik × periode) sekolah ditulis ke {args.output}")
+
+
+def perintah_peringatan(args, penyimpanan):
+    """Daftar siswa perlu intervensi seluruh sekolah (atau satu kelas), skor risiko tertinggi lebih dulu"""
+    import pandas as pd
+
+    from edumerdeka.peringatan import MesinPeringatan, muat_aturan
+
+    mesin = MesinPeringatan(penyimpanan, args.tahun_ajaran, args.semester)
+    daftar = mesin.daftar_intervensi(muat_aturan(args.aturan) if args.aturan else None, kelas=args.kelas)
+    ringkasan = mesin.ringkasan(args.kelas)
+    _cetak(f"{ringkasan['perlu_intervensi']:,} dari {ringkasan['jumlah_siswa']:,} siswa perlu intervensi "
+           f"({mesin.statistik['waktu_ms']:.0f} ms)")
+    if not daftar:
+        return
+    df = pd.DataFrame([{**{k: v for k, v in d.items() if k != 'peringatan'}, 'peringatan': " | ".join(d['peringatan'])}
+                       for d in daftar])
+    if args.output:
+        _tulis_csv(df, args.output)
+    else:
+        df.to_csv(sys.stdout, index=False)
+
+
+def _tambah_filter(parser, kelas_banyak=False):
+    parser.add_argument("--tahun-ajaran", default=None)
+    parser.add_argument("--semester", default=None)
+    if kelas_banyak:
+        parser.add_argument("--kelas", action="append", help="Boleh diulang; default semua kelas")
+    else:
+        parser.add_argument("--kelas", default=None)
+
+
+def buat_parser():
+    parser = argparse.ArgumentParser(prog="python -m edumerdeka",
+                                     description="Job batch EduMerdeka tanpa UI Streamlit")
+    parser.add_argument("--db", default=None, help="File SQLite (default: EDUMERDEKA_DB)")
+    sub = parser.add_subparsers(dest="perintah", required=True)
+
+    p = sub.add_parser("asesmen", help="Proses matriks jawaban satu sekolah (satu CSV per kelas)")
+    p.add_argument("jawaban", nargs="+", help="CSV matriks jawaban: nama_siswa + satu kolom per nomor soal")
+    p.add_argument("--soal", required=True, help="CSV bank soal (nomor,soal,tingkat_bloom,jawaban_benar[,tp])")
+    p.add_argument("--sudah-diskor", action="store_true",
+                   help="Sel matriks berisi 1/0 (sudah diskor), bukan pilihan jawaban")
+    _tambah_filter(p)
+    p.add_argument("--fase", default=None)
+    p.add_argument("--nip-guru", default=None)
+    p.add_argument("--output", default=None, help="Tulis hasil per siswa ke CSV")
+    p.add_argument("--tanpa-simpan", action="store_true", help="Jangan simpan ke database")
+    p.set_defaults(fungsi=perintah_asesmen)
+
+    p = sub.add_parser("p5", help="Hitung dan simpan skor karakter projek P5 dari CSV")
+    p.add_argument("input", help="CSV: nama_siswa[,kelas,nama_projek,tema,mata_pelajaran] + kolom dimensi")
+    _tambah_filter(p)
+    p.add_argument("--nama-projek", default=None, help="Nama projek jika tidak ada kolom nama_projek")
+    p.add_argument("--output", default=None)
+    p.add_argument("--tanpa-simpan", action="store_true")
+    p.set_defaults(fungsi=perintah_p5)
+
+    p = sub.add_parser("optimasi", help="Optimasi alokasi waktu kohort dari data tersimpan")
+    _tambah_filter(p)
+    p.add_argument("--jam", type=float, default=10, help="Jam belajar tersedia per minggu")
+    p.add_argument("--gaya", default="Visual", help="Gaya belajar default")
+    p.add_argument("--worker", type=int, default=None)
+    p.add_argument("--output", default=None, help="CSV hasil (default: stdout)")
+    p.set_defaults(fungsi=perintah_optimasi)
+
+    p = sub.add_parser("ekspor", help="Export satu tabel ke CSV/XLSX secara streaming")
+    p.add_argument("--tabel", choices=list(KOLOM_TABEL), default="asesmen")
+    p.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    p.add_argument("--output", required=True)
+    _tambah_filter(p)
+    p.set_defaults(fungsi=perintah_ekspor)
+
+    p = sub.add_parser("laporan", help="ZIP laporan PDF per kelas")
+    p.add_argument("--output-dir", default="laporan")
+    p.add_argument("--worker", type=int, default=None)
+    _tambah_filter(p, kelas_banyak=True)
+    p.set_defaults(fungsi=perintah_laporan)
+
+    p = sub.add_parser("learning-path", help="Learning path seluruh kelas dari indeks rekomendasi lokal")
+    _tambah_filter(p)
+    p.add_argument("--mata-pelajaran", default=None, help="Default: mata pelajaran projek P5 terakhir")
+    p.add_argument("--gaya", choices=GAYA_BELAJAR, default=None, help="Gaya belajar untuk semua siswa")
+    p.add_argument("--dimensi", choices=DIMENSI_PANCASILA, default=None,
+                   help="Dimensi fokus; default dimensi P5 terendah tiap siswa")
+    p.add_argument("--output", default=None, help="CSV hasil (default: stdout)")
+    p.set_defaults(fungsi=perintah_learning_path)
+
+    p = sub.add_parser("peringatan", help="Daftar siswa perlu intervensi dari threshold alert")
+    _tambah_filter(p)
+    p.add_argument("--aturan", default=None, help="File JSON aturan (default: EDUMERDEKA_ATURAN_PERINGATAN)")
+    p.add_argument("--output", default=None, help="CSV hasil (default: stdout)")
+    p.set_defaults(fungsi=perintah_peringatan)
+
+    p = sub.add_parser("benchmark", help="Ekspor/gabung sketsa benchmark untuk tingkat kabupaten")
+    p.add_argument("--gabung", nargs="+", default=None, help="File sketsa sekolah yang digabung")
+    p.add_argument("--output", required=True, help="File JSON sketsa hasil")
+    p.set_defaults(fungsi=perintah_benchmark)
+    return parser
+
+
+def main(argv=None):
+    args = buat_parser().parse_args(argv)
+    penyimpanan = PenyimpananSQLite(args.db) if args.db else PenyimpananSQLite()
+    mulai = time.perf_counter()
+    try:
+        args.fungsi(args, penyimpanan)
+    except (OSError, KeyError, ValueError) as e:
+        _cetak(f"Error: {e}")
+        return 1
+    _cetak(f"Selesai dalam {time.perf_counter() - mulai:.1f} s")
+    return 0
@@ -0,0 +1,93 @@
+"""Deret waktu kemajuan siswa dan downsampling LTTB untuk timeline panjang.
+
+Skor kemajuan diambil langsung dari data tersimpan (daya serap asesmen dan skor
+karakter P5, berskala 0-100) lewat indeks per siswa, sedangkan entry portofolio
+menjadi penanda peristiwa. Riwayat bertahun-tahun (mis. asesmen mingguan)
+diperkecil dengan Largest-Triangle-Three-Buckets sebelum digambar: bentuk
+kurva, puncak dan lembah tetap terlihat dengan jumlah titik yang terbatas.
+"""
+import numpy as np
+
+MAKS_TITIK_DEFAULT = 150
+
+# seri -> (tabel, kolom, faktor skala ke 0-100); tabel yang sama dengan benchmark
+SERI_KEMAJUAN = {
+    'Daya Serap': ('asesmen', 'daya_serap', 1),
+    'Skor Karakter': ('projek_p5', 'skor_karakter', 10),
+}
+SERI_PORTOFOLIO = 'Entry Portofolio'
+
+
+def _ke_tanggal(daftar_tanggal):
+    """Array datetime64[D] dari string tanggal ('YYYY-MM-DD ...'); tanggal tidak valid menjadi NaT"""
+    hasil = np.full(len(daftar_tanggal), np.datetime64('NaT'), dtype='datetime64[D]')
+    for i, tanggal in enumerate(daftar_tanggal):
+        try:
+            hasil[i] = np.datetime64(str(tanggal)[:10], 'D')
+        except ValueError:
+            pass
+    return hasil
+
+
+def muat_deret(penyimpanan, nama, kelas='', dari=None, sampai=None):
+    """Deret kemajuan satu siswa: {seri: (tanggal datetime64[D], nilai float)} terurut waktu.
+
+    Seri `SERI_PORTOFOLIO` berisi tanggal entry portofolio dengan nilai NaN.
+    `dari`/`sampai` (string 'YYYY-MM-DD') membatasi rentang waktu.
+    """
+    deret = {}
+    sumber = [(seri, tabel, kolom, skala) for seri, (tabel, kolom, skala) in SERI_KEMAJUAN.items()]
+    sumber.append((SERI_PORTOFOLIO, 'portofolio', None, 1))
+    for seri, tabel, kolom, skala in sumber:
+        baris = penyimpanan.deret_siswa(tabel, kolom, nama, kelas, dari=dari, sampai=sampai)
+        tanggal = _ke_tanggal([b[0] for b in baris])
+        nilai = np.array([np.nan if b[1] is None else b[1] * skala for b in baris], dtype=float)
+        valid = ~np.isnat(tanggal) & (np.isfinite(nilai) if kolom else True)
+        if valid.any():
+            urutan = np.argsort(tanggal[valid], kind='stable')
+            deret[seri] = (tanggal[valid][urutan], nilai[valid][urutan])
+    return deret
+
+
+def lttb(x, y, maks_titik):
+    """Indeks titik terpilih Largest-Triangle-Three-Buckets dari deret (x, y) terurut.
+
+    Titik pertama dan terakhir selalu dipertahankan; setiap bucket di antaranya
+    menyumbang titik yang membentuk segitiga terluas dengan titik terpilih
+    sebelumnya dan rata-rata bucket berikutnya.
+    """
+    n = len(x)
+    if maks_titik >= n or maks_titik < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    batas = np.linspace(1, n - 1, maks_titik - 1).astype(int)
+    terpilih = np.empty(maks_titik, dtype=int)
+    terpilih[0], terpilih[-1] = 0, n - 1
+    a = 0
+    for i in range(maks_titik - 2):
+        awal, akhir = batas[i], batas[i + 1]
+        # Rata-rata bucket berikutnya (bucket terakhir: titik terakhir)
+        awal_lanjut, akhir_lanjut = akhir, batas[i + 2] if i + 2 < len(batas) else n
+        rx, ry = x[awal_lanjut:akhir_lanjut].mean(), y[awal_lanjut:akhir_lanjut].mean()
+        luas = np.abs((x[a] - rx) * (y[awal:akhir] - y[a]) - (x[a] - x[awal:akhir]) * (ry - y[a]))
+        a = awal + int(np.argmax(luas))
+        terpilih[i + 1] = a
+    return terpilih
+
+
+def data_timeline(deret, maks_titik=MAKS_TITIK_DEFAULT):
+    """Data `buat_timeline_portofolio` (format panjang) dengan setiap seri skor di-downsample LTTB"""
+    data = {'Tanggal': [], 'Seri': [], 'Skor': []}
+    for seri, (tanggal, nilai) in deret.items():
+        if seri != SERI_PORTOFOLIO:
+            indeks = lttb(tanggal.astype('int64'), nilai, maks_titik)
+            tanggal, nilai = tanggal[indeks], nilai[indeks]
+        elif len(tanggal) > maks_titik:
+            # Penanda portofolio: cukup satu per hari
+            tanggal = np.unique(tanggal)[-maks_titik:]
+            nilai = np.full(len(tanggal), np.nan)
+        data['Tanggal'].extend(str(t) for t in tanggal)
+        data['Seri'].extend([seri] * len(tanggal))
+        data['Skor'].extend(None if np.isnan(v) else round(float(v), 1) for v in nilai)
+    return data
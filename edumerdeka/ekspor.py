@@ -0,0 +1,68 @@
+"""Export data sekolah ke CSV/XLSX secara streaming.
+
+Baris dibaca dari database per chunk dan langsung ditulis ke tujuan, sehingga
+pemakaian memori tetap datar berapa pun jumlah barisnya (ratusan ribu asesmen
+sekalipun). XLSX memakai mode write-only openpyxl.
+"""
+import csv
+import io
+
+from edumerdeka.penyimpanan import kolom_ekspor
+
+UKURAN_CHUNK = 5000
+
+
+def iter_csv(penyimpanan, tabel, ukuran_chunk=UKURAN_CHUNK, **filter):
+    """Menghasilkan potongan bytes CSV (UTF-8, diawali header) per chunk baris"""
+    buffer = io.StringIO()
+    penulis = csv.writer(buffer)
+
+    penulis.writerow(kolom_ekspor(tabel))
+    for chunk in penyimpanan.iter_data(tabel, ukuran_chunk=ukuran_chunk, **filter):
+        penulis.writerows(chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    sisa = buffer.getvalue()
+    if sisa:
+        yield sisa.encode("utf-8")
+
+
+def ekspor_csv(penyimpanan, tabel, tujuan, ukuran_chunk=UKURAN_CHUNK, **filter):
+    """Menulis export CSV ke file biner `tujuan`; mengembalikan jumlah baris data"""
+    jumlah = 0
+    teks = io.TextIOWrapper(tujuan, encoding="utf-8", newline="")
+    penulis = csv.writer(teks)
+    penulis.writerow(kolom_ekspor(tabel))
+    for chunk in penyimpanan.iter_data(tabel, ukuran_chunk=ukuran_chunk, **filter):
+        penulis.writerows(chunk)
+        jumlah += len(chunk)
+    teks.flush()
+    # Lepaskan wrapper tanpa menutup file milik pemanggil
+    teks.detach()
+    return jumlah
+
+
+def ekspor_xlsx(penyimpanan, tabel, tujuan, ukuran_chunk=UKURAN_CHUNK, **filter):
+    """Menulis export XLSX (openpyxl write-only) ke path/file `tujuan`; mengembalikan jumlah baris"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=tabel[:31])
+    sheet.append(list(kolom_ekspor(tabel)))
+
+    jumlah = 0
+    for chunk in penyimpanan.iter_data(tabel, ukuran_chunk=ukuran_chunk, **filter):
+        for baris in chunk:
+            sheet.append(baris)
+        jumlah += len(chunk)
+
+    workbook.save(tujuan)
+    return jumlah
+
+
+FORMAT_EKSPOR = {
+    'csv': (ekspor_csv, "text/csv"),
+    'xlsx': (ekspor_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
@@ -0,0 +1,305 @@
+"""Lapisan generasi learning path di depan backend LLM: dedup, coalescing dan cache disk.
+
+`generate_learning_path_prompt` menghasilkan prompt per siswa; dalam satu kelas
+banyak prompt identik (fase, mata pelajaran, gaya belajar dan target sama).
+`LayananGenerasi` menormalkan prompt (NFKC, huruf besar/kecil, spasi) menjadi
+kunci, lalu:
+
+- mengembalikan respons dari cache disk (SQLite, LRU dengan TTL) jika ada,
+- menggabungkan permintaan bersamaan untuk kunci yang sama menjadi satu
+  panggilan backend (yang lain menunggu hasil yang sama),
+- baru memanggil backend untuk kunci yang benar-benar baru.
+
+Angka di prompt tidak diubah secara default: daya serap 68 dan 72 jatuh di band
+learning path yang berbeda sehingga harus mendapat narasi sendiri. Pembulatan
+angka ke kelipatan `bulatkan` dapat diaktifkan jika narasi yang sedikit kurang
+presisi dapat diterima demi hit rate yang lebih tinggi.
+
+Backend adalah callable `prompt -> str`. `BackendStub` mensimulasikan latensi
+dan biaya token tanpa jaringan untuk benchmark:
+`python -m edumerdeka.generasi --benchmark`.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future
+
+from edumerdeka.penyimpanan import DIREKTORI_DATA
+
+PATH_CACHE_DEFAULT = os.path.join(DIREKTORI_DATA, "cache_llm.db")
+TTL_DEFAULT_S = float(os.environ.get("EDUMERDEKA_LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+MAKS_MB_DEFAULT = float(os.environ.get("EDUMERDEKA_LLM_CACHE_MB", "64"))
+LATENSI_STUB_S = float(os.environ.get("EDUMERDEKA_LLM_STUB_LATENSI_S", "0.5"))
+RESOLUSI_AKSES_S = 60
+
+# Perkiraan kasar token dan harga backend untuk statistik penghematan
+KARAKTER_PER_TOKEN = 4
+BIAYA_PER_1K_TOKEN = 0.002
+
+_ANGKA = re.compile(r"-?\d+(?:[.,]\d+)?")
+
+
+def normalisasi_prompt(prompt, bulatkan=None):
+    """Bentuk kanonik prompt: NFKC, huruf kecil, spasi dirapatkan; angka dibulatkan jika `bulatkan`"""
+    teks = unicodedata.normalize("NFKC", prompt).casefold()
+    if bulatkan:
+        def bulat(cocok):
+            nilai = float(cocok.group().replace(",", "."))
+            return str(int(round(nilai / bulatkan) * bulatkan))
+        teks = _ANGKA.sub(bulat, teks)
+    return " ".join(teks.split())
+
+
+def kunci_prompt(prompt, bulatkan=None):
+    teks = normalisasi_prompt(prompt, bulatkan)
+    # Kunci mode pembulatan dipisah agar tidak pernah bertabrakan dengan kunci prompt persis
+    if bulatkan:
+        teks = f"bulatkan={bulatkan}\n{teks}"
+    return hashlib.sha256(teks.encode("utf-8")).hexdigest()
+
+
+def perkiraan_token(teks):
+    return max(1, len(teks) // KARAKTER_PER_TOKEN)
+
+
+class CacheRespons:
+    """Cache respons di SQLite: LRU berdasarkan waktu akses, kedaluwarsa setelah `ttl_s`"""
+
+    def __init__(self, path=PATH_CACHE_DEFAULT, ttl_s=TTL_DEFAULT_S, maks_bytes=int(MAKS_MB_DEFAULT * 1024 * 1024)):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.maks_bytes = maks_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._kunci = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._kunci, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS respons (kunci TEXT PRIMARY KEY, respons TEXT NOT NULL, "
+                               "dibuat REAL NOT NULL, diakses REAL NOT NULL, bytes INTEGER NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_respons_diakses ON respons (diakses)")
+
+    def ambil(self, kunci):
+        sekarang = time.time()
+        with self._kunci, self._conn:
+            baris = self._conn.execute("SELECT respons, dibuat, diakses FROM respons WHERE kunci = ?",
+                                       (kunci,)).fetchone()
+            if baris is None:
+                return None
+            if sekarang - baris[1] > self.ttl_s:
+                self._conn.execute("DELETE FROM respons WHERE kunci = ?", (kunci,))
+                return None
+            # Waktu akses cukup diperbarui sesekali; urutan LRU tidak perlu presisi milidetik
+            if sekarang - baris[2] > RESOLUSI_AKSES_S:
+                self._conn.execute("UPDATE respons SET diakses = ? WHERE kunci = ?", (sekarang, kunci))
+            return baris[0]
+
+    def simpan(self, kunci, respons):
+        sekarang = time.time()
+        with self._kunci, self._conn:
+            self._conn.execute(
+                "INSERT INTO respons (kunci, respons, dibuat, diakses, bytes) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (kunci) DO UPDATE SET respons = excluded.respons, dibuat = excluded.dibuat, "
+                "diakses = excluded.diakses, bytes = excluded.bytes",
+                (kunci, respons, sekarang, sekarang, len(respons.encode("utf-8"))))
+            self._eviksi(sekarang)
+
+    def _eviksi(self, sekarang):
+        self._conn.execute("DELETE FROM respons WHERE dibuat < ?", (sekarang - self.ttl_s,))
+        total = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM respons").fetchone()[0]
+        if total <= self.maks_bytes:
+            return
+        # Entry yang paling lama tidak diakses dihapus sampai total kembali di bawah batas
+        terhapus = []
+        for kunci, ukuran in self._conn.execute("SELECT kunci, bytes FROM respons ORDER BY diakses"):
+            if total <= self.maks_bytes:
+                break
+            terhapus.append((kunci,))
+            total -= ukuran
+        self._conn.executemany("DELETE FROM respons WHERE kunci = ?", terhapus)
+
+    def statistik(self):
+        with self._kunci:
+            jumlah, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM respons").fetchone()
+        return {'jumlah_entri': jumlah, 'total_bytes': total}
+
+    def kosongkan(self):
+        with self._kunci, self._conn:
+            self._conn.execute("DELETE FROM respons")
+
+    def tutup(self):
+        with self._kunci:
+            self._conn.close()
+
+
+class BackendStub:
+    """Backend lokal tanpa jaringan: respons deterministik dari prompt dengan latensi tiruan"""
+
+    def __init__(self, latensi_s=LATENSI_STUB_S):
+        self.latensi_s = latensi_s
+        self.jumlah_panggilan = 0
+        self._kunci = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._kunci:
+            self.jumlah_panggilan += 1
+        time.sleep(self.latensi_s)
+        baris = [b.strip("- ") for b in prompt.splitlines() if b.startswith("- ")]
+        return ("Rencana belajar (stub):\n"
+                + "\n".join(f"{i}. Kegiatan untuk {b}" for i, b in enumerate(baris, 1))
+                + f"\n[ref {hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]}]")
+
+
+class LayananGenerasi:
+    """Generasi teks dengan cache respons dan coalescing permintaan yang sedang berjalan"""
+
+    def __init__(self, backend=None, cache=None, bulatkan=None):
+        self.backend = backend or BackendStub()
+        self.cache = cache if cache is not None else CacheRespons()
+        self.bulatkan = bulatkan
+        self._kunci = threading.Lock()
+        self._berjalan = {}
+        self._statistik = {'permintaan': 0, 'hit_cache': 0, 'digabung': 0, 'panggilan_backend': 0,
+                           'token_backend': 0, 'token_dihemat': 0}
+
+    def generate(self, prompt):
+        """Respons untuk `prompt`; backend hanya dipanggil sekali per prompt ternormalisasi"""
+        kunci = kunci_prompt(prompt, self.bulatkan)
+        with self._kunci:
+            self._statistik['permintaan'] += 1
+        respons = self.cache.ambil(kunci)
+        if respons is not None:
+            self._catat('hit_cache', prompt, respons)
+            return respons
+
+        with self._kunci:
+            future = self._berjalan.get(kunci)
+            pemilik = future is None
+            if pemilik:
+                future = self._berjalan[kunci] = Future()
+        if not pemilik:
+            respons = future.result()
+            self._catat('digabung', prompt, respons)
+            return respons
+
+        try:
+            # Permintaan lain dengan kunci sama mungkin selesai di antara cek cache dan pendaftaran
+            respons = self.cache.ambil(kunci)
+            if respons is not None:
+                future.set_result(respons)
+                self._catat('hit_cache', prompt, respons)
+                return respons
+            respons = self.backend(prompt)
+            self.cache.simpan(kunci, respons)
+            future.set_result(respons)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._kunci:
+                del self._berjalan[kunci]
+        with self._kunci:
+            self._statistik['panggilan_backend'] += 1
+            self._statistik['token_backend'] += perkiraan_token(prompt) + perkiraan_token(respons)
+        return respons
+
+    def _catat(self, jenis, prompt, respons):
+        with self._kunci:
+            self._statistik[jenis] += 1
+            self._statistik['token_dihemat'] += perkiraan_token(prompt) + perkiraan_token(respons)
+
+    def generate_banyak(self, daftar_prompt, maks_worker=8):
+        """Respons untuk banyak prompt secara paralel, urutan sama dengan input"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=maks_worker) as pool:
+            return list(pool.map(self.generate, daftar_prompt))
+
+    def statistik(self):
+        with self._kunci:
+            stat = dict(self._statistik)
+        stat['hit_rate'] = ((stat['hit_cache'] + stat['digabung']) / stat['permintaan']
+                            if stat['permintaan'] else 0.0)
+        stat['biaya_backend'] = stat['token_backend'] / 1000 * BIAYA_PER_1K_TOKEN
+        stat['biaya_dihemat'] = stat['token_dihemat'] / 1000 * BIAYA_PER_1K_TOKEN
+        return stat
+
+
+def _prompt_kelas(jumlah_siswa, seed=0):
+    """Prompt satu kelas sintetis, seperti dibuat dari hasil asesmen masing-masing siswa"""
+    import random
+
+    from edumerdeka.kalkulasi import hitung_daya_serap
+    from edumerdeka.learning_path import GAYA_BELAJAR, generate_learning_path_prompt
+
+    acak = random.Random(seed)
+    # Daya serap dari asesmen 20 soal, seperti hasil asesmen kelas yang sebenarnya
+    return [generate_learning_path_prompt("Fase D", "Matematika",
+                                          hitung_daya_serap(min(max(round(acak.gauss(13.5, 2.5)), 0), 20), 20),
+                                          acak.choice(GAYA_BELAJAR), "Mandiri, Bernalar Kritis")
+            for _ in range(jumlah_siswa)]
+
+
+def benchmark(jumlah_siswa=300, latensi_s=0.2, maks_worker=16, bulatkan=None):
+    """Membandingkan generasi langsung per siswa dengan lapisan cache + coalescing"""
+    import tempfile
+
+    daftar_prompt = _prompt_kelas(jumlah_siswa)
+    hasil = {'jumlah_siswa': jumlah_siswa, 'prompt_unik': len({kunci_prompt(p, bulatkan) for p in daftar_prompt}),
+             'latensi_backend_s': latensi_s}
+    # Tanpa lapisan: satu panggilan backend per siswa
+    from concurrent.futures import ThreadPoolExecutor
+
+    backend = BackendStub(latensi_s)
+    mulai = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=maks_worker) as pool:
+        daftar_respons = list(pool.map(backend, daftar_prompt))
+    hasil['langsung_s'] = time.perf_counter() - mulai
+    hasil['langsung_biaya'] = sum(perkiraan_token(p) + perkiraan_token(r)
+                                  for p, r in zip(daftar_prompt, daftar_respons)) / 1000 * BIAYA_PER_1K_TOKEN
+
+    with tempfile.TemporaryDirectory() as direktori:
+        cache = CacheRespons(os.path.join(direktori, "cache.db"))
+        layanan = LayananGenerasi(BackendStub(latensi_s), cache, bulatkan)
+        for tahap in ('dingin', 'hangat'):
+            mulai = time.perf_counter()
+            layanan.generate_banyak(daftar_prompt, maks_worker)
+            hasil[f'{tahap}_s'] = time.perf_counter() - mulai
+        cache.tutup()
+    hasil.update(layanan.statistik())
+    return hasil
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lapisan generasi learning path (cache + coalescing)")
+    parser.add_argument("--benchmark", action="store_true", help="Benchmark dengan backend stub")
+    parser.add_argument("--siswa", type=int, default=300)
+    parser.add_argument("--latensi", type=float, default=0.2, help="Latensi backend stub (detik)")
+    parser.add_argument("--worker", type=int, default=16)
+    parser.add_argument("--bulatkan", type=int, default=None,
+                        help="Bulatkan angka di prompt ke kelipatan ini sebelum dedup (default: tidak)")
+    args = parser.parse_args(argv)
+    if not args.benchmark:
+        parser.print_help()
+        return 0
+
+    h = benchmark(args.siswa, args.latensi, args.worker, args.bulatkan)
+    print(f"{h['jumlah_siswa']} prompt, {h['prompt_unik']} unik setelah normalisasi; "
+          f"latensi backend {h['latensi_backend_s'] * 1000:.0f} ms, {args.worker} worker")
+    print(f"  Tanpa cache            : {h['langsung_s']:.2f} s, biaya ${h['langsung_biaya']:.4f}")
+    print(f"  Cache dingin           : {h['dingin_s']:.2f} s")
+    print(f"  Cache hangat           : {h['hangat_s']:.3f} s")
+    print(f"  Panggilan backend {h['panggilan_backend']} dari {h['permintaan']} permintaan "
+          f"(hit cache {h['hit_cache']}, digabung {h['digabung']}, hit rate {h['hit_rate']:.1%})")
+    print(f"  Biaya backend ${h['biaya_backend']:.4f}, dihemat ${h['biaya_dihemat']:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
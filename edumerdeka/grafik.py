@@ -0,0 +1,211 @@
+"""Pembuat grafik Matplotlib untuk UI dan skrip batch.
+
+Setiap fungsi mengembalikan `Figure` tanpa menampilkannya; pemanggil yang
+menyimpan atau merender figure ke PNG/SVG (lihat `edumerdeka.cache_grafik`).
+Matplotlib baru diimpor saat grafik pertama dibuat.
+"""
+
+WARNA_SERI = ['#1f77b4', '#ff7f0e', '#2ca02c', '#9467bd', '#8c564b']
+
+
+def buat_visualisasi_karakter(dimensi_scores):
+    """Membuat bar chart untuk skor karakter per dimensi"""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    dimensi = list(dimensi_scores.keys())
+    scores = list(dimensi_scores.values())
+
+    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
+    bars = ax.bar(dimensi, scores, color=colors[:len(dimensi)])
+
+    ax.set_ylabel('Skor (0-10)', fontsize=12)
+    ax.set_title('Breakdown Skor Karakter per Dimensi Profil Pelajar Pancasila', fontsize=14, fontweight='bold')
+    ax.set_ylim(0, 10)
+    ax.grid(axis='y', alpha=0.3)
+
+    # Tambahkan nilai di atas bar
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.1f}',
+                ha='center', va='bottom', fontweight='bold')
+
+    plt.xticks(rotation=45, ha='right')
+    plt.tight_layout()
+    return fig
+
+
+def buat_pie_chart_gaya_belajar(gaya_belajar_dist):
+    """Membuat pie chart distribusi gaya belajar"""
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 8))
+    colors = ['#ff9999', '#66b3ff', '#99ff99']
+    explode = (0.05, 0.05, 0.05)
+
+    ax.pie(gaya_belajar_dist.values(), labels=gaya_belajar_dist.keys(),
+           autopct='%1.1f%%', startangle=90, colors=colors, explode=explode,
+           textprops={'fontsize': 12, 'fontweight': 'bold'})
+    ax.set_title('Distribusi Gaya Belajar Siswa', fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    return fig
+
+
+def buat_timeline_portofolio(data_kemajuan):
+    """Membuat timeline kemajuan siswa.
+
+    `data_kemajuan` berupa periode -> skor, atau kolom `Tanggal`, `Seri` dan
+    `Skor` dari `deret_waktu.data_timeline`; seri tanpa skor (entry portofolio)
+    digambar sebagai penanda di sumbu waktu.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+
+    if data_kemajuan and 'Seri' in data_kemajuan:
+        import numpy as np
+
+        tanggal = np.array(data_kemajuan['Tanggal'], dtype='datetime64[D]')
+        seri = np.array(data_kemajuan['Seri'])
+        skor = np.array([np.nan if v is None else v for v in data_kemajuan['Skor']], dtype=float)
+        for i, nama in enumerate(dict.fromkeys(data_kemajuan['Seri'])):
+            pilih = seri == nama
+            warna = WARNA_SERI[i % len(WARNA_SERI)]
+            if np.isnan(skor[pilih]).all():
+                ax.plot(tanggal[pilih], np.full(pilih.sum(), 2.0), linestyle='none', marker='|',
+                        markersize=16, color=warna, label=nama)
+            else:
+                ax.plot(tanggal[pilih], skor[pilih], marker='o' if pilih.sum() <= 40 else None,
+                        linewidth=2, markersize=6, color=warna, label=nama)
+
+        ax.set_xlabel('Tanggal', fontsize=12)
+        ax.set_ylabel('Skor Kemajuan (0-100)', fontsize=12)
+        ax.set_ylim(0, 100)
+        ax.set_title('Timeline Kemajuan Belajar Siswa', fontsize=14, fontweight='bold')
+        ax.legend(loc='lower right')
+        ax.grid(True, alpha=0.3)
+        fig.autofmt_xdate()
+        plt.tight_layout()
+    elif data_kemajuan:
+        tanggal = list(data_kemajuan.keys())
+        scores = list(data_kemajuan.values())
+
+        ax.plot(tanggal, scores, marker='o', linewidth=2, markersize=8, color='#1f77b4')
+        ax.fill_between(range(len(scores)), scores, alpha=0.3, color='#1f77b4')
+
+        ax.set_xlabel('Periode', fontsize=12)
+        ax.set_ylabel('Skor Kemajuan', fontsize=12)
+        ax.set_title('Timeline Kemajuan Belajar Siswa', fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        plt.xticks(rotation=45, ha='right')
+        plt.tight_layout()
+
+    return fig
+
+
+def buat_grafik_proyeksi(projection_data):
+    """Membuat line chart proyeksi daya serap multi-semester.
+
+    `projection_data` berupa label -> nilai, atau kolom `Semester`, `Median (%)`,
+    `P5 (%)` dan `P95 (%)` dari `proyeksi.data_grafik` untuk menggambar pita P5-P95.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    if 'Median (%)' in projection_data:
+        semesters = projection_data['Semester']
+        values = projection_data['Median (%)']
+        ax.fill_between(range(len(values)), projection_data['P5 (%)'], projection_data['P95 (%)'],
+                        alpha=0.25, color='#2ca02c', label='Rentang 90% (P5-P95)')
+        ax.legend(loc='lower right')
+    else:
+        semesters = list(projection_data.keys())
+        values = list(projection_data.values())
+        ax.fill_between(range(len(values)), values, alpha=0.3, color='#2ca02c')
+
+    ax.plot(semesters, values, marker='o', linewidth=2, markersize=10, color='#2ca02c')
+    ax.set_ylabel('Daya Serap (%)', fontsize=12)
+    ax.set_title('Proyeksi Kemajuan Daya Serap', fontsize=14, fontweight='bold')
+    ax.set_ylim(0, 100)
+    ax.grid(True, alpha=0.3)
+
+    for i, v in enumerate(values):
+        ax.text(i, v + 3, f'{v:.1f}%', ha='center', fontweight='bold')
+
+    plt.tight_layout()
+    return fig
+
+
+LABEL_BENCHMARK = {
+    'siswa': 'Siswa Ini',
+    'kelas': 'Rata-rata Kelas',
+    'sekolah': 'Rata-rata Sekolah',
+    'kabupaten': 'Rata-rata Kabupaten',
+    'nasional': 'Rata-rata Nasional',
+}
+
+
+def buat_grafik_benchmark(data_benchmark):
+    """Membuat bar chart perbandingan siswa vs rata-rata kelas, sekolah dan kabupaten.
+
+    `data_benchmark` berisi tingkat (lihat `LABEL_BENCHMARK`) -> tiga nilai; nilai
+    None (benchmark belum tersedia) tidak digambar.
+    """
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+
+    categories = ['Daya Serap', 'Ketercapaian ATP', 'Skor Karakter']
+    x = np.arange(len(categories))
+    width = 0.8 / len(data_benchmark)
+
+    for i, (tingkat, nilai) in enumerate(data_benchmark.items()):
+        nilai = [np.nan if v is None else v for v in nilai]
+        ax.bar(x + (i - (len(data_benchmark) - 1) / 2) * width, nilai, width,
+               label=LABEL_BENCHMARK.get(tingkat, tingkat), color=WARNA_SERI[i % len(WARNA_SERI)])
+
+    ax.set_ylabel('Skor', fontsize=12)
+    ax.set_title('Perbandingan Performance', fontsize=14, fontweight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(categories)
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+
+    plt.tight_layout()
+    return fig
+
+
+def buat_heatmap_skenario(data_skenario):
+    """Membuat heatmap hasil sweep What-If.
+
+    `data_skenario` dari `skenario.data_heatmap`: kolom pertama berisi label
+    baris (Δ daya serap), kolom lain satu per Δ minat. Nilai per sel tidak
+    ditulis agar PNG tetap kecil; angkanya ada di tabel mode hemat data.
+    """
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    kolom_baris, *kolom_nilai = data_skenario
+    nilai = np.array([data_skenario[k] for k in kolom_nilai], dtype=float).T
+
+    fig, ax = plt.subplots(figsize=(10, 7))
+    # Skala divergen simetris untuk perubahan level, sekuensial untuk persentase
+    if nilai.min() < 0:
+        batas = max(abs(nilai.min()), abs(nilai.max()), 1e-9)
+        gambar = ax.imshow(nilai, cmap='RdYlGn', vmin=-batas, vmax=batas, aspect='auto', origin='lower')
+    else:
+        gambar = ax.imshow(nilai, cmap='YlGn', aspect='auto', origin='lower')
+    fig.colorbar(gambar, ax=ax)
+
+    ax.set_xticks(range(len(kolom_nilai)))
+    ax.set_xticklabels([k.replace('Δ Minat ', '') for k in kolom_nilai])
+    ax.set_yticks(range(len(data_skenario[kolom_baris])))
+    ax.set_yticklabels(data_skenario[kolom_baris])
+    ax.set_xlabel('Δ Minat (%)', fontsize=12)
+    ax.set_ylabel(f'{kolom_baris} (%)', fontsize=12)
+    ax.set_title('Sweep Skenario What-If', fontsize=14, fontweight='bold')
+
+    plt.tight_layout()
+    return fig
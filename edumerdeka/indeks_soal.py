@@ -0,0 +1,178 @@
+"""Indeks bank soal di memori per tingkat Bloom, TP dan fase untuk sampling cepat.
+
+Posisi baris soal diurutkan sekali berdasarkan strata (tingkat Bloom, TP,
+fase) sehingga setiap strata menjadi satu irisan bersebelahan dari array
+`posisi`. Mengambil N soal acak dari satu strata cukup mencari batas irisan di
+dict lalu memilih N offset tanpa pengembalian, tanpa memfilter DataFrame.
+Semua array dibuat read-only agar satu indeks bisa dipakai bersama oleh banyak
+sesi dalam satu proses; generator acak default disimpan per thread.
+"""
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from edumerdeka.asesmen import LEVEL_BLOOM, normalisasi_bloom
+from edumerdeka.bank_soal import BankSoalError
+
+MAKS_CACHE_STRATA = 4096
+_JENIS_FILTER = ('tingkat_bloom', 'tp', 'fase')
+
+_lokal = threading.local()
+
+
+def _rng_default():
+    rng = getattr(_lokal, 'rng', None)
+    if rng is None:
+        rng = _lokal.rng = np.random.default_rng()
+    return rng
+
+
+def normalisasi_fase(fase):
+    """Mengubah label fase seperti 'd' atau 'Fase D' menjadi 'D'"""
+    return (pd.Series(fase, dtype="string").fillna('').str.strip().str.upper()
+            .str.replace(r'^FASE\s*', '', regex=True).to_numpy(dtype=object))
+
+
+def _normalisasi_filter(nilai, jenis):
+    """Versi skalar normalisasi label untuk nilai filter, tanpa melewati pandas"""
+    nilai = str(nilai).strip()
+    if jenis == 'tingkat_bloom':
+        return nilai.upper()[:2]
+    if jenis == 'fase':
+        return re.sub(r'^FASE\s*', '', nilai.upper())
+    return nilai
+
+
+def _sebagai_tuple(nilai):
+    if nilai is None or isinstance(nilai, str):
+        return nilai
+    return tuple(nilai)
+
+
+class IndeksBankSoal:
+    """Posisi soal dikelompokkan per strata (tingkat Bloom, TP, fase) untuk sampling bertingkat"""
+
+    def __init__(self, tingkat_bloom, tp=None, fase=None):
+        bloom = normalisasi_bloom(tingkat_bloom)
+        self.jumlah_item = len(bloom)
+        kode_bloom = pd.Series(bloom).map({level: i for i, level in enumerate(LEVEL_BLOOM)})
+        if kode_bloom.isna().any():
+            raise BankSoalError("tingkat_bloom harus C1-C6 untuk semua soal")
+        kode_bloom = kode_bloom.to_numpy(dtype=np.int64)
+        kosong = np.full(self.jumlah_item, '', dtype=object)
+        tp = kosong if tp is None else pd.Series(tp, dtype="string").fillna('').str.strip().to_numpy(dtype=object)
+        fase = kosong if fase is None else normalisasi_fase(fase)
+        self.daftar_tp, kode_tp = np.unique(tp.astype(str), return_inverse=True)
+        self.daftar_fase, kode_fase = np.unique(fase.astype(str), return_inverse=True)
+
+        kode = (kode_bloom * len(self.daftar_tp) + kode_tp) * len(self.daftar_fase) + kode_fase
+        urutan = np.argsort(kode, kind='stable')
+        kode_strata, awal, jumlah = np.unique(kode[urutan], return_index=True, return_counts=True)
+        self.posisi = urutan.astype(np.int32 if self.jumlah_item < 2 ** 31 else np.int64)
+        self.awal = awal.astype(np.int64)
+        self.jumlah = jumlah.astype(np.int64)
+        self.strata_fase = (kode_strata % len(self.daftar_fase)).astype(np.int32)
+        self.strata_tp = (kode_strata // len(self.daftar_fase) % len(self.daftar_tp)).astype(np.int32)
+        self.strata_bloom = (kode_strata // (len(self.daftar_fase) * len(self.daftar_tp))).astype(np.int32)
+        for arr in (self.posisi, self.awal, self.jumlah, self.strata_bloom, self.strata_tp, self.strata_fase):
+            arr.setflags(write=False)
+        self._strata = {
+            (LEVEL_BLOOM[b], self.daftar_tp[t], self.daftar_fase[f]): i
+            for i, (b, t, f) in enumerate(zip(self.strata_bloom, self.strata_tp, self.strata_fase))
+        }
+        self._cache_strata = {}
+
+    @classmethod
+    def dari_dataframe(cls, df_soal):
+        """Membuat indeks dari DataFrame bank soal; kolom `tp` dan `fase` opsional"""
+        if "tingkat_bloom" not in df_soal.columns:
+            raise BankSoalError("Bank soal tidak memiliki kolom tingkat_bloom")
+        return cls(df_soal["tingkat_bloom"], df_soal["tp"] if "tp" in df_soal.columns else None,
+                   df_soal["fase"] if "fase" in df_soal.columns else None)
+
+    def pilih_strata(self, tingkat_bloom=None, tp=None, fase=None):
+        """Indeks strata yang cocok; setiap filter boleh satu nilai, daftar nilai, atau None (semua)"""
+        kunci = (_sebagai_tuple(tingkat_bloom), _sebagai_tuple(tp), _sebagai_tuple(fase))
+        strata = self._cache_strata.get(kunci)
+        if strata is not None:
+            return strata
+        if all(isinstance(k, str) for k in kunci):
+            i = self._strata.get(tuple(_normalisasi_filter(nilai, jenis) for nilai, jenis in zip(kunci, _JENIS_FILTER)))
+            strata = np.array([] if i is None else [i], dtype=np.int64)
+        else:
+            mask = np.ones(len(self.jumlah), dtype=bool)
+            for nilai, jenis, daftar, kode in zip(kunci, _JENIS_FILTER, (LEVEL_BLOOM, self.daftar_tp, self.daftar_fase),
+                                                  (self.strata_bloom, self.strata_tp, self.strata_fase)):
+                if nilai is None:
+                    continue
+                nilai = {_normalisasi_filter(n, jenis) for n in ((nilai,) if isinstance(nilai, str) else nilai)}
+                mask &= np.isin(kode, [i for i, d in enumerate(daftar) if d in nilai])
+            strata = np.flatnonzero(mask)
+        strata.setflags(write=False)
+        # Cukup kecil untuk di-cache tanpa lock; dikosongkan jika filter bebas membuatnya membengkak
+        if len(self._cache_strata) >= MAKS_CACHE_STRATA:
+            self._cache_strata.clear()
+        self._cache_strata[kunci] = strata
+        return strata
+
+    def jumlah_tersedia(self, tingkat_bloom=None, tp=None, fase=None):
+        return int(self.jumlah[self.pilih_strata(tingkat_bloom, tp, fase)].sum())
+
+    def sampel(self, jumlah, tingkat_bloom=None, tp=None, fase=None, rng=None):
+        """Posisi baris (untuk `df_soal.iloc`) dari `jumlah` soal acak tanpa pengembalian"""
+        strata = self.pilih_strata(tingkat_bloom, tp, fase)
+        ukuran = self.jumlah[strata]
+        tersedia = int(ukuran.sum())
+        if jumlah > tersedia:
+            raise BankSoalError(f"Hanya {tersedia} soal tersedia untuk {self._deskripsi(tingkat_bloom, tp, fase)}, "
+                                f"diminta {jumlah}")
+        pilih = (rng or _rng_default()).choice(tersedia, size=jumlah, replace=False)
+        if len(strata) == 1:
+            return self.posisi[self.awal[strata[0]] + pilih]
+        # Offset gabungan dipetakan kembali ke strata masing-masing
+        kumulatif = np.cumsum(ukuran)
+        s = np.searchsorted(kumulatif, pilih, side='right')
+        return self.posisi[self.awal[strata[s]] + pilih - (kumulatif[s] - ukuran[s])]
+
+    def rakit_form(self, spesifikasi, rng=None):
+        """Posisi soal untuk satu form tes dari daftar spesifikasi.
+
+        Setiap spesifikasi berupa dict `jumlah` dengan filter opsional
+        `tingkat_bloom`, `tp` dan `fase`. Soal tidak pernah muncul dua kali
+        meskipun spesifikasi saling tumpang tindih.
+        """
+        rng = rng or _rng_default()
+        bagian = []
+        strata_terpakai = np.zeros(len(self.jumlah), dtype=bool)
+        for spek in spesifikasi:
+            filter_ = {k: spek.get(k) for k in ('tingkat_bloom', 'tp', 'fase')}
+            strata = self.pilih_strata(**filter_)
+            if not strata_terpakai[strata].any():
+                bagian.append(self.sampel(spek['jumlah'], rng=rng, **filter_))
+            else:
+                # Jalur lambat hanya untuk spesifikasi yang tumpang tindih: buang soal yang sudah terpilih
+                kandidat = np.concatenate([self.posisi[self.awal[i]:self.awal[i] + self.jumlah[i]] for i in strata])
+                kandidat = kandidat[~np.isin(kandidat, np.concatenate(bagian))]
+                if spek['jumlah'] > len(kandidat):
+                    raise BankSoalError(f"Hanya {len(kandidat)} soal tersisa untuk "
+                                        f"{self._deskripsi(**filter_)}, diminta {spek['jumlah']}")
+                bagian.append(rng.choice(kandidat, size=spek['jumlah'], replace=False))
+            strata_terpakai[strata] = True
+        return np.concatenate(bagian) if bagian else np.empty(0, dtype=self.posisi.dtype)
+
+    def ringkasan(self):
+        """Jumlah soal per strata sebagai dict kolom (siap untuk `pd.DataFrame`)"""
+        return {
+            'Tingkat Bloom': [LEVEL_BLOOM[b] for b in self.strata_bloom],
+            'TP': [self.daftar_tp[t] or '-' for t in self.strata_tp],
+            'Fase': [self.daftar_fase[f] or '-' for f in self.strata_fase],
+            'Jumlah Soal': self.jumlah.tolist(),
+        }
+
+    @staticmethod
+    def _deskripsi(tingkat_bloom=None, tp=None, fase=None):
+        bagian = [f"{nama} {nilai if isinstance(nilai, str) else ', '.join(map(str, nilai))}"
+                  for nama, nilai in (("Bloom", tingkat_bloom), ("TP", tp), ("Fase", fase)) if nilai is not None]
+        return " / ".join(bagian) or "seluruh bank"
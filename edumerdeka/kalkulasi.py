@@ -0,0 +1,51 @@
+"""Rumus dasar per siswa yang dipakai bersama oleh UI Streamlit dan REST API.
+
+Versi vektor untuk satu kelas sekaligus ada di `edumerdeka.asesmen`.
+"""
+
+# Ambang persentase jawaban benar untuk menaikkan/menurunkan level Bloom
+AMBANG_NAIK = 70
+AMBANG_TURUN = 40
+
+
+def hitung_daya_serap(tp_dikuasai, total_tp):
+    """Menghitung daya serap berdasarkan TP yang dikuasai"""
+    if total_tp == 0:
+        return 0
+    return (tp_dikuasai / total_tp) * 100
+
+
+def hitung_skor_karakter(dimensi_scores):
+    """Menghitung rata-rata skor karakter dari 6 dimensi Profil Pelajar Pancasila"""
+    if not dimensi_scores:
+        return 0
+    return sum(dimensi_scores.values()) / len(dimensi_scores)
+
+
+def hitung_kemajuan_karakter(skor_awal, skor_akhir):
+    """Menghitung persentase kemajuan karakter"""
+    if skor_awal == 0:
+        return 0
+    return ((skor_akhir - skor_awal) / skor_awal) * 100
+
+
+def hitung_ketercapaian_atp(materi_dikuasai, target_atp):
+    """Menghitung persentase ketercapaian ATP"""
+    if target_atp == 0:
+        return 0
+    return (materi_dikuasai / target_atp) * 100
+
+
+def hitung_tp_dikuasai(jawaban_benar_persen, jumlah_soal):
+    """TP dikuasai pada input manual: setiap soal dihitung sebagai satu TP"""
+    return int((jawaban_benar_persen / 100) * jumlah_soal)
+
+
+def adjust_kesulitan_adaptif(persentase_benar):
+    """Menyesuaikan tingkat Bloom berdasarkan jawaban benar"""
+    if persentase_benar > AMBANG_NAIK:
+        return "+1 level (meningkat)"
+    elif persentase_benar < AMBANG_TURUN:
+        return "-1 level (menurun)"
+    else:
+        return "Tetap"
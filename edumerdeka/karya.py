@@ -0,0 +1,156 @@
+"""Penyimpanan file karya portofolio berbasis hash isi.
+
+Foto diproses sekali saat diunggah: didekode (JPEG langsung pada resolusi
+yang diperkecil), diputar sesuai orientasi EXIF lalu seluruh metadata EXIF
+dibuang, kemudian disimpan sebagai salinan tampilan beresolusi terbatas dan
+thumbnail WebP kecil. Semua blob diberi nama menurut hash SHA-256 file asli,
+sehingga unggahan ulang file yang sama tidak memakan ruang maupun waktu proses.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+from edumerdeka.penyimpanan import DIREKTORI_DATA
+
+DIREKTORI_KARYA_DEFAULT = os.path.join(DIREKTORI_DATA, "karya")
+
+MAKS_BYTES_UNGGAH = 10 * 1024 * 1024
+# Batas piksel gambar asli, melindungi dari decompression bomb
+MAKS_PIKSEL = 50_000_000
+
+SISI_TAMPILAN = 1280
+SISI_THUMBNAIL = 320
+KUALITAS_TAMPILAN = 80
+KUALITAS_THUMBNAIL = 70
+
+EKSTENSI_DOKUMEN = {'application/pdf': '.pdf'}
+
+
+class KaryaError(ValueError):
+    """File karya tidak valid atau terlalu besar"""
+
+
+def hash_isi(isi):
+    return hashlib.sha256(isi).hexdigest()
+
+
+def _encode_webp(gambar, kualitas):
+    buffer = io.BytesIO()
+    gambar.save(buffer, format="WEBP", quality=kualitas, method=4)
+    return buffer.getvalue()
+
+
+def proses_gambar(isi):
+    """Mendekode gambar sekali; mengembalikan (bytes tampilan, bytes thumbnail, lebar, tinggi) WebP tanpa EXIF"""
+    from PIL import Image, ImageOps
+
+    try:
+        gambar = Image.open(io.BytesIO(isi))
+        if gambar.width * gambar.height > MAKS_PIKSEL:
+            raise KaryaError(f"Resolusi gambar terlalu besar ({gambar.width}x{gambar.height})")
+        # JPEG didekode langsung pada skala 1/2, 1/4 atau 1/8 yang masih >= ukuran tampilan
+        gambar.draft('RGB', (SISI_TAMPILAN, SISI_TAMPILAN))
+        gambar = ImageOps.exif_transpose(gambar)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise KaryaError(f"Gambar tidak dapat dibaca: {e}") from e
+
+    if gambar.mode not in ("RGB", "RGBA"):
+        gambar = gambar.convert("RGBA" if "transparency" in gambar.info or gambar.mode in ("LA", "PA") else "RGB")
+    # Salinan baru tanpa info/EXIF dari file asli
+    gambar = Image.frombytes(gambar.mode, gambar.size, gambar.tobytes())
+
+    gambar.thumbnail((SISI_TAMPILAN, SISI_TAMPILAN), Image.Resampling.LANCZOS)
+    tampilan = _encode_webp(gambar, KUALITAS_TAMPILAN)
+    lebar, tinggi = gambar.size
+
+    gambar.thumbnail((SISI_THUMBNAIL, SISI_THUMBNAIL), Image.Resampling.LANCZOS)
+    thumbnail = _encode_webp(gambar, KUALITAS_THUMBNAIL)
+    return tampilan, thumbnail, lebar, tinggi
+
+
+class PenyimpananKarya:
+    """Blob store karya: `<direktori>/<2 hex pertama>/<hash><akhiran>` plus metadata JSON"""
+
+    def __init__(self, direktori=DIREKTORI_KARYA_DEFAULT):
+        self.direktori = direktori
+
+    def _path(self, kode_hash, akhiran):
+        return os.path.join(self.direktori, kode_hash[:2], kode_hash + akhiran)
+
+    def _tulis(self, kode_hash, akhiran, isi):
+        path = self._path(kode_hash, akhiran)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Tulis ke file sementara lalu rename agar pembaca tidak melihat blob setengah jadi
+        fd, path_sementara = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(isi)
+            os.replace(path_sementara, path)
+        except BaseException:
+            os.remove(path_sementara)
+            raise
+
+    def info(self, kode_hash):
+        """Metadata karya yang tersimpan, atau None"""
+        if not kode_hash:
+            return None
+        try:
+            with open(self._path(kode_hash, ".json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def simpan(self, isi, nama_file, jenis_mime):
+        """Memproses dan menyimpan satu unggahan; mengembalikan metadata karyanya.
+
+        Gambar disimpan sebagai salinan tampilan dan thumbnail WebP, dokumen
+        (PDF) disimpan apa adanya. File yang isinya sudah pernah disimpan tidak
+        diproses ulang.
+        """
+        if len(isi) > MAKS_BYTES_UNGGAH:
+            raise KaryaError(f"Ukuran file melebihi {MAKS_BYTES_UNGGAH // (1024 * 1024)} MB")
+        kode_hash = hash_isi(isi)
+        info = self.info(kode_hash)
+        if info is not None:
+            return info
+
+        info = {'hash': kode_hash, 'nama': nama_file, 'bytes_asli': len(isi)}
+        if jenis_mime.startswith('image/'):
+            tampilan, thumbnail, lebar, tinggi = proses_gambar(isi)
+            self._tulis(kode_hash, ".webp", tampilan)
+            self._tulis(kode_hash, "_thumb.webp", thumbnail)
+            info.update(jenis='gambar', lebar=lebar, tinggi=tinggi,
+                        bytes_tampilan=len(tampilan), bytes_thumbnail=len(thumbnail))
+        elif jenis_mime in EKSTENSI_DOKUMEN:
+            self._tulis(kode_hash, EKSTENSI_DOKUMEN[jenis_mime], isi)
+            info.update(jenis='dokumen', ekstensi=EKSTENSI_DOKUMEN[jenis_mime])
+        else:
+            raise KaryaError(f"Jenis file tidak didukung: {jenis_mime}")
+
+        # Metadata ditulis terakhir: keberadaannya menandakan semua blob sudah lengkap
+        self._tulis(kode_hash, ".json", json.dumps(info, ensure_ascii=False).encode("utf-8"))
+        return info
+
+    def path_tampilan(self, kode_hash):
+        return self._path(kode_hash, ".webp")
+
+    def path_thumbnail(self, kode_hash):
+        return self._path(kode_hash, "_thumb.webp")
+
+    def path_dokumen(self, kode_hash, ekstensi=".pdf"):
+        return self._path(kode_hash, ekstensi)
+
+    def data_uri(self, kode_hash, thumbnail=True):
+        """Gambar WebP sebagai data URI.
+
+        `st.image` mengubah file WebP menjadi PNG/JPEG (jauh lebih besar), sedangkan
+        data URI diteruskan ke browser apa adanya.
+        """
+        path = self.path_thumbnail(kode_hash) if thumbnail else self.path_tampilan(kode_hash)
+        with open(path, 'rb') as f:
+            return "data:image/webp;base64," + base64.b64encode(f.read()).decode("ascii")
@@ -0,0 +1,179 @@
+"""Pembuatan laporan PDF kemajuan belajar, satu siswa atau satu kelas sekaligus.
+
+Template halaman (ukuran kertas, font inti, teks footer) disiapkan sekali per
+proses lalu dipakai ulang untuk setiap dokumen. Mode batch membagi siswa ke
+dalam chunk yang dirender di process pool dan hasilnya langsung ditulis ke ZIP.
+"""
+import copy
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+# Di bawah jumlah ini laporan dirender di proses pemanggil; biaya start worker lebih besar
+MIN_SISWA_PARALEL = 200
+UKURAN_CHUNK = 50
+
+FOOTER_LAPORAN = "EduMerdeka Optimizer - aryhharyanto@proton.me"
+
+
+def _teks(nilai):
+    """FPDF 1.7 hanya mendukung latin-1; karakter lain diganti '?' agar tidak gagal"""
+    return str(nilai).encode("latin-1", "replace").decode("latin-1")
+
+
+def _angka(nilai, format_angka=".1f"):
+    """Nilai numerik terformat; "-" jika kosong (NULL di database atau NaN) agar satu baris tidak menggagalkan ZIP"""
+    if nilai is None or nilai != nilai:
+        return "-"
+    return format(nilai, format_angka)
+
+
+class TemplateLaporan:
+    """Prototipe dokumen dengan font yang sudah terdaftar, disalin untuk setiap siswa"""
+
+    GAYA_FONT = (('B', 16), ('', 12), ('B', 14), ('I', 10))
+
+    def __init__(self, waktu_dibuat=None):
+        from fpdf import FPDF
+
+        self.waktu_dibuat = waktu_dibuat or datetime.now().strftime('%Y-%m-%d %H:%M')
+        self._prototipe = FPDF()
+        for gaya, ukuran in self.GAYA_FONT:
+            self._prototipe.set_font("Arial", gaya, ukuran)
+
+    def _dokumen_baru(self):
+        pdf = copy.copy(self._prototipe)
+        # Container state disalin dangkal; metrik font di dalamnya tetap dipakai bersama
+        for nama, nilai in vars(self._prototipe).items():
+            if isinstance(nilai, (dict, list)):
+                setattr(pdf, nama, copy.copy(nilai))
+        pdf.add_page()
+        return pdf
+
+    def render(self, data):
+        """Merender laporan satu siswa menjadi bytes PDF.
+
+        `data` berisi nama_siswa, kelas, tahun_ajaran, semester serta opsional
+        `hasil_asesmen` dan `projek_p5` dengan format yang sama seperti session state.
+        """
+        pdf = self._dokumen_baru()
+
+        # Header
+        pdf.set_font("Arial", 'B', 16)
+        pdf.cell(0, 10, "LAPORAN KEMAJUAN BELAJAR", ln=True, align='C')
+        pdf.set_font("Arial", '', 12)
+        pdf.cell(0, 10, _teks(f"Nama Siswa: {data.get('nama_siswa', '')}"), ln=True)
+        pdf.cell(0, 10, _teks(f"Kelas: {data.get('kelas', '')}"), ln=True)
+        pdf.cell(0, 10, _teks(f"Tahun Ajaran: {data.get('tahun_ajaran', '')} - Semester {data.get('semester', '')}"),
+                 ln=True)
+        pdf.ln(10)
+
+        # Hasil Asesmen
+        hasil = data.get('hasil_asesmen')
+        if hasil:
+            pdf.set_font("Arial", 'B', 14)
+            pdf.cell(0, 10, "Hasil Asesmen Diagnostik", ln=True)
+            pdf.set_font("Arial", '', 12)
+            pdf.cell(0, 8, f"Daya Serap: {_angka(hasil.get('daya_serap'))}%", ln=True)
+            pdf.cell(0, 8, f"TP Dikuasai: {_angka(hasil.get('tp_dikuasai'), '')}/{_angka(hasil.get('jumlah_soal'), '')}",
+                     ln=True)
+            pdf.ln(5)
+
+        # Projek P5
+        p5 = data.get('projek_p5')
+        if p5:
+            pdf.set_font("Arial", 'B', 14)
+            pdf.cell(0, 10, "Projek P5", ln=True)
+            pdf.set_font("Arial", '', 12)
+            pdf.cell(0, 8, _teks(f"Nama Projek: {p5.get('nama_projek') or ''}"), ln=True)
+            pdf.cell(0, 8, f"Skor Karakter: {_angka(p5.get('skor_karakter'))}/10", ln=True)
+            pdf.ln(5)
+
+        # Footer
+        pdf.set_font("Arial", 'I', 10)
+        pdf.cell(0, 10, f"Dibuat: {self.waktu_dibuat}", ln=True)
+        pdf.cell(0, 10, FOOTER_LAPORAN, ln=True)
+
+        return pdf.output(dest='S').encode('latin-1')
+
+
+def buat_laporan_pdf(data):
+    """Laporan PDF satu siswa (bytes)"""
+    return TemplateLaporan().render(data)
+
+
+def nama_file_laporan(data, tanggal=None):
+    tanggal = tanggal or datetime.now().strftime('%Y%m%d')
+    nama = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(data.get('nama_siswa', 'siswa')))
+    return f"laporan_{nama}_{tanggal}.pdf"
+
+
+# Template milik proses worker, dibuat sekali di initializer pool
+_template_worker = None
+
+
+def _inisialisasi_worker(waktu_dibuat):
+    global _template_worker
+    _template_worker = TemplateLaporan(waktu_dibuat)
+
+
+def _render_chunk(chunk):
+    return [(nama_file_laporan(data), _template_worker.render(data)) for data in chunk]
+
+
+def tulis_zip_laporan(daftar_data, tujuan, progres=None, maks_worker=None):
+    """Merender laporan semua siswa ke file ZIP `tujuan` (path atau file biner).
+
+    `progres(selesai, total)` dipanggil setiap satu chunk selesai. Nama file yang
+    sama (siswa bernama sama) diberi akhiran angka. Mengembalikan jumlah laporan.
+    """
+    total = len(daftar_data)
+    waktu_dibuat = datetime.now().strftime('%Y-%m-%d %H:%M')
+    chunks = [daftar_data[i:i + UKURAN_CHUNK] for i in range(0, total, UKURAN_CHUNK)]
+    nama_terpakai = {}
+    selesai = 0
+
+    with zipfile.ZipFile(tujuan, 'w', compression=zipfile.ZIP_DEFLATED) as arsip:
+        def tulis(hasil_chunk):
+            nonlocal selesai
+            for nama_file, isi in hasil_chunk:
+                ke = nama_terpakai.get(nama_file, 0)
+                nama_terpakai[nama_file] = ke + 1
+                if ke:
+                    nama_file = nama_file.replace(".pdf", f"_{ke + 1}.pdf")
+                arsip.writestr(nama_file, isi)
+            selesai += len(hasil_chunk)
+            if progres:
+                progres(selesai, total)
+
+        if total < MIN_SISWA_PARALEL:
+            _inisialisasi_worker(waktu_dibuat)
+            for chunk in chunks:
+                tulis(_render_chunk(chunk))
+        else:
+            maks_worker = maks_worker or min(len(chunks), os.cpu_count() or 1)
+            # spawn: aman dipakai dari server Streamlit yang multi-thread
+            with ProcessPoolExecutor(max_workers=maks_worker, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_inisialisasi_worker, initargs=(waktu_dibuat,)) as pool:
+                for future in as_completed([pool.submit(_render_chunk, chunk) for chunk in chunks]):
+                    tulis(future.result())
+
+    return total
+
+
+def data_laporan_kelas(penyimpanan, kelas, tahun_ajaran=None, semester=None):
+    """Menyusun data laporan per siswa dari asesmen dan projek P5 terakhir di database"""
+    siswa = {}
+    for tabel, kunci in (('asesmen', 'hasil_asesmen'), ('projek_p5', 'projek_p5')):
+        # data_kelas terurut menurut tanggal, sehingga baris terakhir menimpa yang lama
+        for baris in penyimpanan.data_kelas(tabel, kelas, tahun_ajaran, semester):
+            data = siswa.setdefault(baris['nama_siswa'], {
+                'nama_siswa': baris['nama_siswa'],
+                'kelas': kelas,
+                'tahun_ajaran': tahun_ajaran or baris['tahun_ajaran'],
+                'semester': semester or baris['semester'],
+            })
+            data[kunci] = baris
+    return [siswa[nama] for nama in sorted(siswa)]
@@ -0,0 +1,207 @@
+"""Rekomendasi learning path adaptif, dipakai bersama oleh UI Streamlit, REST API dan CLI.
+
+Rekomendasi disusun dari katalog konten lokal (elemen Capaian Pembelajaran per
+mata pelajaran, kegiatan per gaya belajar, projek per dimensi Profil Pelajar
+Pancasila) yang dikompilasi sekali menjadi indeks berkunci fase, mata
+pelajaran, band daya serap, gaya belajar dan dimensi target. Satu siswa cukup
+satu lookup dict, sehingga learning path seluruh kelas tersedia seketika dan
+tanpa koneksi. Prompt LLM tetap dibuat sebagai hook integrasi.
+"""
+import threading
+
+from edumerdeka.kalkulasi import AMBANG_NAIK, AMBANG_TURUN
+
+MATA_PELAJARAN = ("Matematika", "Bahasa Indonesia", "IPA", "IPS", "Bahasa Inggris",
+                  "Pendidikan Pancasila", "PJOK", "Seni & Budaya", "Informatika")
+GAYA_BELAJAR = ("Visual", "Auditori", "Kinestetik")
+DIMENSI_PANCASILA = ("Beriman & Bertakwa", "Mandiri", "Bergotong Royong",
+                     "Berkebinekaan Global", "Bernalar Kritis", "Kreatif")
+FASE = ("A", "B", "C", "D", "E", "F")
+
+# Elemen Capaian Pembelajaran per mata pelajaran ('' = mata pelajaran tidak diketahui)
+ELEMEN_MAPEL = {
+    "Matematika": ("Bilangan", "Aljabar", "Pengukuran", "Geometri", "Analisis Data & Peluang"),
+    "Bahasa Indonesia": ("Menyimak", "Membaca & Memirsa", "Berbicara & Mempresentasikan", "Menulis"),
+    "IPA": ("Pemahaman IPA", "Keterampilan Proses"),
+    "IPS": ("Pemahaman Konsep", "Keterampilan Proses"),
+    "Bahasa Inggris": ("Listening-Speaking", "Reading-Viewing", "Writing-Presenting"),
+    "Pendidikan Pancasila": ("Pancasila", "UUD 1945", "Bhinneka Tunggal Ika", "NKRI"),
+    "PJOK": ("Keterampilan Gerak", "Pengetahuan Gerak", "Pemanfaatan Gerak", "Pengembangan Karakter"),
+    "Seni & Budaya": ("Mengalami", "Menciptakan", "Merefleksikan", "Berpikir & Bekerja Artistik"),
+    "Informatika": ("Berpikir Komputasional", "Algoritma & Pemrograman", "Analisis Data",
+                    "Teknologi Informasi dan Komunikasi"),
+    "": ("Literasi", "Numerasi"),
+}
+
+# band -> (judul, level Bloom, asesmen formatif, modul penutup)
+BAND_DAYA_SERAP = {
+    "Remedial": ("Remedial", "C1-C2", "Asesmen formatif singkat setiap pertemuan",
+                 "Asesmen ulang TP yang belum tuntas"),
+    "Penguatan": ("Penguatan", "C2-C3", "Asesmen formatif lanjutan",
+                  "Pengayaan bertahap menuju C4"),
+    "Pengayaan": ("Pengayaan", "C4-C5", "Asesmen formatif berbasis kinerja",
+                  "Tantangan tingkat tinggi dan projek mandiri (C6)"),
+}
+
+KEGIATAN_GAYA = {
+    "Visual": ("peta konsep, infografis dan video",
+               "🎨 Sesuaikan konten dengan lebih banyak diagram, infografis, dan video"),
+    "Auditori": ("diskusi kelompok, podcast dan penjelasan lisan",
+                 "🎧 Perbanyak diskusi, tanya jawab, dan penjelasan lisan"),
+    "Kinestetik": ("eksperimen, simulasi dan praktik langsung",
+                   "🤸 Tambah aktivitas hands-on, eksperimen, dan praktik langsung"),
+}
+
+PROJEK_DIMENSI = {
+    "Beriman & Bertakwa": "refleksi nilai dan kepedulian terhadap lingkungan",
+    "Mandiri": "belajar mandiri dengan target dan jurnal refleksi",
+    "Bergotong Royong": "kolaborasi kelompok untuk masalah di sekolah",
+    "Berkebinekaan Global": "eksplorasi budaya daerah dan perbandingan global",
+    "Bernalar Kritis": "investigasi data dan argumentasi berbasis bukti",
+    "Kreatif": "merancang karya atau solusi orisinal",
+    "": "penguatan karakter",
+}
+
+AMBANG_MINAT = 60
+
+
+def generate_learning_path_prompt(fase, mata_pelajaran, skor_bloom, gaya_belajar, target_pancasila):
+    """Generate prompt untuk LLM (placeholder untuk future API integration)"""
+    prompt = f"""Buat path belajar untuk:
+- Fase: {fase}
+- Mata Pelajaran: {mata_pelajaran}
+- Skor Bloom saat ini: {skor_bloom}
+- Gaya Belajar: {gaya_belajar}
+- Target Profil Pelajar Pancasila: {target_pancasila}
+
+Berikan rekomendasi materi, aktivitas, dan projek yang sesuai."""
+    return prompt
+
+
+def kode_fase(fase):
+    """'Fase D (Kelas 7-9)', 'Fase D' atau 'D' -> 'D'; '' jika tidak dikenali"""
+    teks = str(fase or '').strip()
+    if teks.lower().startswith('fase'):
+        teks = teks[4:].strip()
+    return teks[:1].upper() if teks[:1].upper() in FASE else ''
+
+
+def band_daya_serap(daya_serap):
+    if daya_serap < AMBANG_TURUN:
+        return "Remedial"
+    if daya_serap < AMBANG_NAIK:
+        return "Penguatan"
+    return "Pengayaan"
+
+
+def _susun(fase, mapel, band, gaya, dimensi):
+    """Materi dan aksi untuk satu kunci indeks"""
+    judul, level, formatif, penutup = BAND_DAYA_SERAP[band]
+    elemen = ELEMEN_MAPEL[mapel]
+    # Elemen yang diutamakan bergeser antar fase
+    geser = FASE.index(fase) if fase else 0
+    elemen_1, elemen_2 = elemen[geser % len(elemen)], elemen[(geser + 1) % len(elemen)]
+    nama_mapel = mapel or "mata pelajaran"
+    label_fase = f" Fase {fase}" if fase else ""
+    kegiatan, aksi_gaya = KEGIATAN_GAYA[gaya]
+
+    materi = (
+        f"Modul 1: {judul} {elemen_1} — {nama_mapel}{label_fase} (Level {level})",
+        f"Modul 2: {elemen_2} melalui {kegiatan}",
+        f"Modul 3: Projek {PROJEK_DIMENSI[dimensi]}" + (f" ({dimensi})" if dimensi else ""),
+        f"Modul 4: {formatif}",
+        f"Modul 5: {penutup}",
+    )
+    aksi = []
+    if band != "Pengayaan":
+        aksi.append("📉 Tambah sesi remedial untuk meningkatkan daya serap minimal 15%")
+    aksi.append(aksi_gaya)
+    if dimensi:
+        aksi.append(f"🌟 Fokus pada projek yang mengembangkan {dimensi} melalui kolaborasi")
+    return materi, tuple(aksi)
+
+
+class IndeksLearningPath:
+    """Indeks rekomendasi yang dikompilasi sekali; lookup O(1) dan aman dibaca bersama antar thread"""
+
+    def __init__(self):
+        self._indeks = {
+            (fase, mapel, band, gaya, dimensi): _susun(fase, mapel, band, gaya, dimensi)
+            for fase in FASE + ('',)
+            for mapel in ELEMEN_MAPEL
+            for band in BAND_DAYA_SERAP
+            for gaya in GAYA_BELAJAR
+            for dimensi in PROJEK_DIMENSI
+        }
+
+    def __len__(self):
+        return len(self._indeks)
+
+    @staticmethod
+    def kunci(fase, mata_pelajaran, daya_serap, gaya_belajar, dimensi):
+        return (kode_fase(fase),
+                mata_pelajaran if mata_pelajaran in ELEMEN_MAPEL else '',
+                band_daya_serap(daya_serap or 0),
+                gaya_belajar if gaya_belajar in KEGIATAN_GAYA else GAYA_BELAJAR[0],
+                dimensi if dimensi in PROJEK_DIMENSI else '')
+
+    def cari(self, fase, mata_pelajaran, daya_serap, gaya_belajar, dimensi, minat_persen=None):
+        """Dict `materi`, `aksi` dan `band` untuk satu siswa"""
+        kunci = self.kunci(fase, mata_pelajaran, daya_serap, gaya_belajar, dimensi)
+        materi, aksi = self._indeks[kunci]
+        aksi = list(aksi)
+        if minat_persen is not None and minat_persen < AMBANG_MINAT:
+            # Aksi minat ditempatkan sebelum fokus dimensi
+            aksi.insert(len(aksi) - 1 if kunci[4] else len(aksi),
+                        "🎯 Tingkatkan engagement dengan gamifikasi atau topik kontekstual")
+        return {'materi': list(materi), 'aksi': aksi, 'band': kunci[2]}
+
+    def rekomendasi_kelas(self, daftar_profil, mata_pelajaran=None, gaya_belajar=None, dimensi_target=None,
+                          minat_persen=None):
+        """Learning path seluruh kelas dalam satu panggilan.
+
+        `daftar_profil` berisi dict per siswa (`nama_siswa`, `daya_serap`, dan
+        opsional `kelas`, `fase`, `mata_pelajaran`, `gaya_belajar`, `minat`,
+        `dimensi_scores`), mis. dari `optimasi.profil_dari_penyimpanan`. Argumen
+        lain menjadi nilai untuk semua siswa; tanpa `dimensi_target`, dimensi
+        dengan skor P5 terendah siswa yang difokuskan.
+        """
+        hasil = []
+        for profil in daftar_profil:
+            dimensi = dimensi_target[0] if dimensi_target else dimensi_terlemah(profil.get('dimensi_scores'))
+            minat = profil.get('minat', minat_persen)
+            rekomendasi = self.cari(profil.get('fase'), mata_pelajaran or profil.get('mata_pelajaran'),
+                                    profil.get('daya_serap'), gaya_belajar or profil.get('gaya_belajar'),
+                                    dimensi, minat)
+            hasil.append({'nama_siswa': profil['nama_siswa'], 'kelas': profil.get('kelas', ''),
+                          'daya_serap': profil.get('daya_serap'), 'dimensi': dimensi or None, **rekomendasi})
+        return hasil
+
+
+def dimensi_terlemah(dimensi_scores):
+    if not dimensi_scores:
+        return ''
+    return min(dimensi_scores, key=dimensi_scores.get)
+
+
+_indeks = None
+_kunci_indeks = threading.Lock()
+
+
+def indeks_learning_path():
+    """Indeks bersama satu proses, dikompilasi saat pertama dipakai"""
+    global _indeks
+    if _indeks is None:
+        with _kunci_indeks:
+            if _indeks is None:
+                _indeks = IndeksLearningPath()
+    return _indeks
+
+
+def rekomendasi_learning_path(fase, mata_pelajaran, daya_serap, gaya_belajar, dimensi_target, minat_persen):
+    """Menyusun learning path satu siswa: dict berisi `prompt`, `materi`, `aksi` dan `band`"""
+    prompt = generate_learning_path_prompt(fase, mata_pelajaran, daya_serap, gaya_belajar,
+                                           ", ".join(dimensi_target))
+    hasil = indeks_learning_path().cari(fase, mata_pelajaran, daya_serap, gaya_belajar,
+                                        dimensi_target[0] if dimensi_target else '', minat_persen)
+    return {'prompt': prompt, **hasil}
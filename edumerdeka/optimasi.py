@@ -0,0 +1,434 @@
+"""Optimasi alokasi waktu belajar mingguan dengan PuLP (MILP).
+
+Waktu dibagi ke materi ATP (per tingkatan Bloom, dalam tiga mode penyajian)
+dan ke enam dimensi Profil Pelajar Pancasila. Dampak setiap jam dihitung dari
+daya serap, kecocokan gaya belajar dan skor dimensi, dengan hasil yang menurun
+(jam ke-2 dan ke-3 pada aktivitas yang sama bernilai lebih kecil). Alokasi
+dibulatkan ke blok 30 menit dan jumlah aktivitas per minggu dibatasi.
+
+Solver CBC dijalankan dengan batas waktu dan warm start dari solusi profil
+sebelumnya; solusi disimpan di cache LRU dengan kunci input yang dinormalisasi
+sehingga profil yang sama tidak pernah di-solve dua kali.
+
+Mode kohort mengelompokkan siswa dengan profil ternormalisasi yang sama (fase,
+mapel, band Bloom, gaya belajar, dimensi terlemah), menyelesaikan setiap model
+unik sekali saja dan membagi model yang belum ada di cache ke process pool.
+"""
+import bisect
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# (nama materi, selisih gap terhadap rata-rata, daya serap prasyarat)
+MATERI_ATP = (
+    ("Penguatan konsep dasar (C1-C2)", -20, 0),
+    ("Aplikasi (C3)", 0, 40),
+    ("Analisis & evaluasi (C4-C5)", 15, 60),
+    ("Kreasi (C6)", 30, 75),
+)
+
+MODE_GAYA = {
+    "Visual": "konten visual",
+    "Auditori": "diskusi & audio",
+    "Kinestetik": "praktik langsung",
+}
+GAYA_BELAJAR = tuple(MODE_GAYA)
+
+DIMENSI_P5 = ("Beriman & Bertakwa", "Mandiri", "Bergotong Royong",
+              "Berkebinekaan Global", "Bernalar Kritis", "Kreatif")
+
+# Efektivitas mode penyajian yang cocok / tidak cocok dengan gaya belajar
+EFEKTIVITAS_COCOK = 1.0
+EFEKTIVITAS_LAIN = 0.6
+
+# Estimasi kenaikan per jam pada gap penuh: % daya serap dan poin dimensi (skala 1-10)
+LAJU_KOGNITIF = 6.0
+LAJU_DIMENSI = 1.5
+
+# Faktor hasil jam ke-1, ke-2 dan ke-3 pada satu aktivitas
+SEGMEN_JAM = (1.0, 0.6, 0.3)
+MAKS_JAM_AKTIVITAS = float(len(SEGMEN_JAM))
+BLOK_JAM = 0.5
+MAKS_AKTIVITAS = 5
+
+JAM_DEFAULT = 10.0
+SKOR_KARAKTER_MIN_DEFAULT = 50.0
+PENALTI_KARAKTER = 100.0
+
+BATAS_WAKTU_SOLVER = float(os.environ.get("EDUMERDEKA_OPTIMASI_TIMEOUT_S", "2"))
+
+# Band Bloom kohort (C1..C6) dari daya serap, beserta daya serap wakil tiap band
+BATAS_BAND_BLOOM = (20, 40, 55, 70, 85)
+DAYA_SERAP_BAND = (10, 30, 48, 62, 78, 92)
+# Skor dimensi wakil kohort: dimensi terlemah dan dimensi lainnya
+SKOR_DIMENSI_TERLEMAH = 4
+SKOR_DIMENSI_LAIN = 7
+
+# Di bawah jumlah model ini solve dilakukan di proses pemanggil; biaya start worker lebih besar
+MIN_MODEL_PARALEL = 16
+UKURAN_CHUNK_MODEL = 8
+
+
+def normalisasi_input(daya_serap, gaya_belajar, dimensi_scores=None, jam_tersedia=JAM_DEFAULT,
+                      skor_karakter_min=SKOR_KARAKTER_MIN_DEFAULT):
+    """Input optimasi dalam bentuk kanonik (tuple), dipakai sebagai kunci cache.
+
+    Daya serap dibulatkan ke 1%, skor dimensi ke bilangan bulat 1-10 (default 5
+    untuk dimensi tanpa data) dan jam ke blok 30 menit.
+    """
+    if gaya_belajar not in MODE_GAYA:
+        raise ValueError(f"Gaya belajar tidak dikenal: {gaya_belajar}")
+    dimensi_scores = dimensi_scores or {}
+    skor = tuple(int(min(max(round(float(dimensi_scores.get(d, 5))), 1), 10)) for d in DIMENSI_P5)
+    return (
+        int(min(max(round(float(daya_serap)), 0), 100)),
+        gaya_belajar,
+        skor,
+        round(max(float(jam_tersedia), 0) / BLOK_JAM) * BLOK_JAM,
+        int(round(float(skor_karakter_min))),
+    )
+
+
+def _daftar_aktivitas(daya_serap, gaya_belajar, skor):
+    """List (jenis, nama, target, dampak per jam pada gap penuh) untuk semua aktivitas"""
+    aktivitas = []
+    for nama, selisih, prasyarat in MATERI_ATP:
+        gap = min(max(100 - daya_serap + selisih, 0), 100) / 100
+        # Materi tingkat tinggi kurang efektif jika prasyaratnya belum dikuasai
+        kesiapan = min(max((daya_serap - prasyarat + 30) / 30, 0.2), 1.0)
+        for gaya, mode in MODE_GAYA.items():
+            efektivitas = EFEKTIVITAS_COCOK if gaya == gaya_belajar else EFEKTIVITAS_LAIN
+            aktivitas.append(('ATP', f"{nama} - {mode}", nama,
+                              LAJU_KOGNITIF * gap * kesiapan * efektivitas))
+    for dimensi, nilai in zip(DIMENSI_P5, skor):
+        aktivitas.append(('P5', f"Projek {dimensi}", dimensi, LAJU_DIMENSI * (10 - nilai) / 10))
+    return aktivitas
+
+
+def _susun_model(kunci):
+    import pulp
+
+    daya_serap, gaya_belajar, skor, jam_tersedia, skor_karakter_min = kunci
+    aktivitas = _daftar_aktivitas(daya_serap, gaya_belajar, skor)
+    skor_karakter = sum(skor) / len(skor) * 10
+
+    model = pulp.LpProblem("alokasi_waktu", pulp.LpMaximize)
+    maks_blok = int(MAKS_JAM_AKTIVITAS / BLOK_JAM)
+    blok = [pulp.LpVariable(f"blok_{i}", 0, maks_blok, cat="Integer") for i in range(len(aktivitas))]
+    dipilih = [pulp.LpVariable(f"pilih_{i}", cat="Binary") for i in range(len(aktivitas))]
+    segmen = [[pulp.LpVariable(f"seg_{i}_{k}", 0, 1) for k in range(len(SEGMEN_JAM))]
+              for i in range(len(aktivitas))]
+    kurang_karakter = pulp.LpVariable("kurang_karakter", 0)
+
+    dampak = []
+    for i, (_, _, _, laju) in enumerate(aktivitas):
+        model += pulp.lpSum(segmen[i]) == BLOK_JAM * blok[i]
+        model += blok[i] <= maks_blok * dipilih[i]
+        dampak.append(pulp.lpSum(laju * f * s for f, s in zip(SEGMEN_JAM, segmen[i])))
+
+    model += BLOK_JAM * pulp.lpSum(blok) <= jam_tersedia, "jam_tersedia"
+    model += pulp.lpSum(dipilih) <= MAKS_AKTIVITAS, "maks_aktivitas"
+
+    # Skor karakter (0-100) = rata-rata dimensi x 10; target minimal dibuat lunak
+    indeks_p5 = [i for i, a in enumerate(aktivitas) if a[0] == 'P5']
+    kenaikan_karakter = pulp.lpSum(dampak[i] for i in indeks_p5) * 10 / len(DIMENSI_P5)
+    model += skor_karakter + kenaikan_karakter + kurang_karakter >= skor_karakter_min, "skor_karakter_min"
+
+    model += (pulp.lpSum(dampak[i] for i, a in enumerate(aktivitas) if a[0] == 'ATP')
+              + kenaikan_karakter - PENALTI_KARAKTER * kurang_karakter)
+    return model, aktivitas, blok, dipilih, segmen, kurang_karakter, skor_karakter
+
+
+class OptimasiWaktu:
+    """Solver alokasi waktu dengan cache solusi LRU, aman dipakai bersama antar sesi"""
+
+    def __init__(self, maks_cache=512, batas_waktu=BATAS_WAKTU_SOLVER):
+        self.maks_cache = maks_cache
+        self.batas_waktu = batas_waktu
+        self._cache = OrderedDict()
+        # Solusi terakhir per gaya belajar, dipakai sebagai warm start
+        self._solusi_terakhir = {}
+        self._lock = threading.Lock()
+        self.hit = 0
+        self.miss = 0
+        self.total_waktu_solve_ms = 0.0
+
+    def optimasi(self, daya_serap, gaya_belajar, dimensi_scores=None, jam_tersedia=JAM_DEFAULT,
+                 skor_karakter_min=SKOR_KARAKTER_MIN_DEFAULT):
+        """Alokasi jam per minggu untuk satu profil siswa (lihat `solve`)"""
+        return self.solve(normalisasi_input(daya_serap, gaya_belajar, dimensi_scores,
+                                            jam_tersedia, skor_karakter_min))
+
+    def solve(self, kunci):
+        """Menyelesaikan model untuk input ternormalisasi `kunci`.
+
+        Mengembalikan dict berisi `alokasi` (list aktivitas dengan jam dan
+        estimasi dampaknya), estimasi daya serap dan skor karakter setelah
+        intervensi, status solver, waktu solve dan penanda `dari_cache`.
+        """
+        hasil = self.ambil(kunci)
+        if hasil is not None:
+            return dict(hasil, dari_cache=True)
+
+        with self._lock:
+            warm_start = self._solusi_terakhir.get(kunci[1])
+        hasil, nilai_blok = _solve_model(kunci, self.batas_waktu, warm_start)
+        self.simpan(kunci, hasil, nilai_blok)
+        return dict(hasil, dari_cache=False)
+
+    def ambil(self, kunci):
+        """Solusi tersimpan untuk `kunci`, atau None (dihitung sebagai miss)"""
+        with self._lock:
+            hasil = self._cache.get(kunci)
+            if hasil is None:
+                self.miss += 1
+                return None
+            self._cache.move_to_end(kunci)
+            self.hit += 1
+            return hasil
+
+    def simpan(self, kunci, hasil, nilai_blok=None):
+        """Mencatat hasil solve; hanya solusi optimal yang masuk cache"""
+        with self._lock:
+            self.total_waktu_solve_ms += hasil['waktu_solve_ms']
+            if nilai_blok is not None:
+                self._solusi_terakhir[kunci[1]] = nilai_blok
+            if hasil['optimal']:
+                self._cache[kunci] = hasil
+                while len(self._cache) > self.maks_cache:
+                    self._cache.popitem(last=False)
+
+    def statistik(self):
+        with self._lock:
+            total = self.hit + self.miss
+            return {
+                'hit': self.hit,
+                'miss': self.miss,
+                'hit_rate': self.hit / total if total else 0.0,
+                'jumlah_model': len(self._cache),
+                'rata_waktu_solve_ms': self.total_waktu_solve_ms / self.miss if self.miss else 0.0,
+            }
+
+
+def _solve_model(kunci, batas_waktu, warm_start=None):
+    """Solve satu model; mengembalikan (hasil, nilai blok per aktivitas untuk warm start)"""
+    import pulp
+
+    mulai = time.perf_counter()
+    model, aktivitas, blok, dipilih, segmen, kurang_karakter, skor_karakter = _susun_model(kunci)
+    if warm_start is not None and len(warm_start) == len(blok):
+        for var_blok, var_pilih, nilai in zip(blok, dipilih, warm_start):
+            var_blok.setInitialValue(nilai)
+            var_pilih.setInitialValue(1 if nilai else 0)
+    solver = pulp.PULP_CBC_CMD(msg=False, timeLimit=batas_waktu, warmStart=warm_start is not None)
+    model.solve(solver)
+    waktu_solve_ms = (time.perf_counter() - mulai) * 1000
+
+    status = pulp.LpStatus[model.status]
+    punya_solusi = model.sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible)
+    hasil = {
+        'status': status,
+        'optimal': model.sol_status == pulp.LpSolutionOptimal,
+        'alokasi': [],
+        'total_jam': 0.0,
+        'estimasi_daya_serap': float(kunci[0]),
+        'estimasi_skor_karakter': skor_karakter,
+        'target_karakter_tercapai': skor_karakter >= kunci[4],
+        'waktu_solve_ms': waktu_solve_ms,
+    }
+    if not punya_solusi:
+        return hasil, None
+
+    nilai_blok = [int(round(v.varValue or 0)) for v in blok]
+    kenaikan_serap = kenaikan_karakter = 0.0
+    for (jenis, nama, target, laju), n, seg in zip(aktivitas, nilai_blok, segmen):
+        if not n:
+            continue
+        dampak = sum(laju * f * (s.varValue or 0) for f, s in zip(SEGMEN_JAM, seg))
+        hasil['alokasi'].append({'jenis': jenis, 'aktivitas': nama, 'target': target,
+                                 'jam': n * BLOK_JAM, 'dampak': dampak})
+        if jenis == 'ATP':
+            kenaikan_serap += dampak
+        else:
+            kenaikan_karakter += dampak * 10 / len(DIMENSI_P5)
+
+    hasil['alokasi'].sort(key=lambda a: (-a['jam'], -a['dampak']))
+    hasil['total_jam'] = sum(a['jam'] for a in hasil['alokasi'])
+    hasil['estimasi_daya_serap'] = min(kunci[0] + kenaikan_serap, 100.0)
+    hasil['estimasi_skor_karakter'] = skor_karakter + kenaikan_karakter
+    hasil['target_karakter_tercapai'] = (kurang_karakter.varValue or 0) < 1e-6
+    return hasil, nilai_blok
+
+
+def band_bloom(daya_serap):
+    """Indeks band Bloom kohort (0 = C1 ... 5 = C6) untuk suatu daya serap"""
+    return bisect.bisect_right(BATAS_BAND_BLOOM, float(daya_serap))
+
+
+def kunci_kohort(profil, gaya_default="Visual"):
+    """Profil ternormalisasi seorang siswa: (fase, mapel, band Bloom, gaya belajar, dimensi terlemah)"""
+    dimensi_scores = profil.get('dimensi_scores') or {}
+    terlemah = min(DIMENSI_P5, key=lambda d: dimensi_scores.get(d, 5)) if dimensi_scores else None
+    return (
+        profil.get('fase') or '',
+        profil.get('mata_pelajaran') or '',
+        band_bloom(profil.get('daya_serap') or 0),
+        profil.get('gaya_belajar') or gaya_default,
+        terlemah,
+    )
+
+
+def kunci_model_kohort(kohort, jam_tersedia=JAM_DEFAULT, skor_karakter_min=SKOR_KARAKTER_MIN_DEFAULT):
+    """Input model wakil satu kohort; fase dan mapel tidak mengubah modelnya"""
+    _, _, band, gaya_belajar, terlemah = kohort
+    if terlemah is None:
+        dimensi_scores = None
+    else:
+        dimensi_scores = {d: SKOR_DIMENSI_TERLEMAH if d == terlemah else SKOR_DIMENSI_LAIN for d in DIMENSI_P5}
+    return normalisasi_input(DAYA_SERAP_BAND[band], gaya_belajar, dimensi_scores, jam_tersedia, skor_karakter_min)
+
+
+def _solve_chunk(daftar_kunci, batas_waktu):
+    """Solve beberapa model berurutan di worker; solusi sebelumnya menjadi warm start"""
+    warm_start = {}
+    hasil_chunk = []
+    for kunci in daftar_kunci:
+        hasil, nilai_blok = _solve_model(kunci, batas_waktu, warm_start.get(kunci[1]))
+        if nilai_blok is not None:
+            warm_start[kunci[1]] = nilai_blok
+        hasil_chunk.append((kunci, hasil, nilai_blok))
+    return hasil_chunk
+
+
+def optimasi_kohort(daftar_profil, optimasi=None, jam_tersedia=JAM_DEFAULT,
+                    skor_karakter_min=SKOR_KARAKTER_MIN_DEFAULT, gaya_default="Visual",
+                    maks_worker=None, progres=None):
+    """Alokasi waktu untuk banyak siswa sekaligus.
+
+    Setiap profil adalah dict berisi `daya_serap` serta opsional `fase`,
+    `mata_pelajaran`, `gaya_belajar` dan `dimensi_scores`; kunci lain (nama,
+    kelas) ikut disalin ke hasil. Mengembalikan (hasil per siswa, laporan) dengan
+    laporan berisi jumlah kohort, model unik, cache hit dan waktu solve.
+    `progres(selesai, total)` dipanggil setiap kali sekelompok model selesai.
+    """
+    mulai = time.perf_counter()
+    optimasi = optimasi or OptimasiWaktu()
+
+    kohort_siswa = [kunci_kohort(p, gaya_default) for p in daftar_profil]
+    model_kohort = {k: kunci_model_kohort(k, jam_tersedia, skor_karakter_min) for k in set(kohort_siswa)}
+
+    hasil_model = {}
+    belum = []
+    for kunci in sorted(set(model_kohort.values()), key=lambda k: (k[1], k[0], k[2])):
+        hasil = optimasi.ambil(kunci)
+        if hasil is None:
+            belum.append(kunci)
+        else:
+            hasil_model[kunci] = hasil
+    dari_cache = len(hasil_model)
+    total = len(belum)
+
+    waktu_solve = []
+
+    def catat(hasil_chunk):
+        for kunci, hasil, nilai_blok in hasil_chunk:
+            optimasi.simpan(kunci, hasil, nilai_blok)
+            hasil_model[kunci] = hasil
+            waktu_solve.append(hasil['waktu_solve_ms'])
+        if progres:
+            progres(len(waktu_solve), total)
+
+    # Urutan kunci per gaya belajar membuat warm start di dalam chunk lebih sering cocok
+    chunks = [belum[i:i + UKURAN_CHUNK_MODEL] for i in range(0, total, UKURAN_CHUNK_MODEL)]
+    jumlah_worker = min(maks_worker or os.cpu_count() or 1, len(chunks)) if total >= MIN_MODEL_PARALEL else 1
+    if jumlah_worker <= 1:
+        for chunk in chunks:
+            catat(_solve_chunk(chunk, optimasi.batas_waktu))
+    else:
+        # spawn: aman dipakai dari server Streamlit yang multi-thread
+        with ProcessPoolExecutor(max_workers=jumlah_worker, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for future in as_completed([pool.submit(_solve_chunk, chunk, optimasi.batas_waktu)
+                                        for chunk in chunks]):
+                catat(future.result())
+
+    hasil_siswa = []
+    for profil, kohort in zip(daftar_profil, kohort_siswa):
+        hasil = hasil_model[model_kohort[kohort]]
+        baris = {k: v for k, v in profil.items() if k != 'dimensi_scores'}
+        baris.update(
+            band_bloom=f"C{kohort[2] + 1}",
+            gaya_belajar=kohort[3],
+            dimensi_terlemah=kohort[4],
+            alokasi=hasil['alokasi'],
+            total_jam=hasil['total_jam'],
+            target_karakter_tercapai=hasil['target_karakter_tercapai'],
+        )
+        hasil_siswa.append(baris)
+
+    jumlah_model = len(set(model_kohort.values()))
+    laporan = {
+        'jumlah_siswa': len(hasil_siswa),
+        'jumlah_kohort': len(model_kohort),
+        'jumlah_model': jumlah_model,
+        'model_dari_cache': dari_cache,
+        'model_di_solve': total,
+        'hit_rate_cache': dari_cache / jumlah_model if jumlah_model else 0.0,
+        # Bagian siswa yang tidak membutuhkan solve sendiri
+        'rasio_dedup': 1 - total / len(hasil_siswa) if hasil_siswa else 0.0,
+        'jumlah_worker': jumlah_worker,
+        'total_waktu_solve_ms': sum(waktu_solve),
+        'maks_waktu_solve_ms': max(waktu_solve, default=0.0),
+        'waktu_total_ms': (time.perf_counter() - mulai) * 1000,
+    }
+    return hasil_siswa, laporan
+
+
+def baris_hasil_kohort(hasil_siswa):
+    """Hasil optimasi kohort sebagai baris tabel datar (untuk CSV), satu per siswa"""
+    return [{
+        'nama_siswa': h['nama_siswa'],
+        'kelas': h['kelas'],
+        'fase': h['fase'],
+        'band_bloom': h['band_bloom'],
+        'gaya_belajar': h['gaya_belajar'],
+        'dimensi_terlemah': h['dimensi_terlemah'] or '-',
+        'total_jam': h['total_jam'],
+        'alokasi': "; ".join(f"{a['jam']:g} jam {a['aktivitas']}" for a in h['alokasi']),
+    } for h in hasil_siswa]
+
+
+def profil_dari_penyimpanan(penyimpanan, tahun_ajaran=None, semester=None, kelas=None):
+    """Profil kohort per siswa dari asesmen dan projek P5 terakhir di database"""
+    from edumerdeka.penyimpanan import kolom_ekspor
+
+    profil = {}
+    kolom = kolom_ekspor('asesmen')
+    for chunk in penyimpanan.iter_data('asesmen', kelas=kelas, tahun_ajaran=tahun_ajaran, semester=semester):
+        for baris in chunk:
+            data = dict(zip(kolom, baris))
+            # Baris terurut menurut id, sehingga asesmen terakhir menimpa yang lama
+            profil[(data['nama_siswa'], data['kelas'])] = {
+                'nama_siswa': data['nama_siswa'],
+                'kelas': data['kelas'],
+                'fase': data['fase'],
+                'mata_pelajaran': '',
+                'daya_serap': data['daya_serap'] or 0,
+                'dimensi_scores': None,
+            }
+
+    kolom = kolom_ekspor('projek_p5')
+    for chunk in penyimpanan.iter_data('projek_p5', kelas=kelas, tahun_ajaran=tahun_ajaran, semester=semester):
+        for baris in chunk:
+            data = dict(zip(kolom, baris))
+            siswa = profil.get((data['nama_siswa'], data['kelas']))
+            if siswa is None:
+                continue
+            mapel = json.loads(data['mata_pelajaran']) if data['mata_pelajaran'] else []
+            siswa['mata_pelajaran'] = mapel[0] if mapel else ''
+            siswa['dimensi_scores'] = json.loads(data['dimensi_scores']) if data['dimensi_scores'] else None
+
+    return [profil[k] for k in sorted(profil)]
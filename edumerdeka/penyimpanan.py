@@ -0,0 +1,466 @@
+"""Penyimpanan persisten berbasis SQLite (mode WAL) untuk data asesmen, P5 dan portofolio.
+
+Satu file database melayani seluruh sekolah: tabel diindeks per siswa, kelas,
+tahun ajaran dan semester sehingga riwayat satu siswa terbuka dalam hitungan
+milidetik meskipun menyimpan data bertahun-tahun. Setiap thread memakai koneksinya
+sendiri; insert massal dilakukan dalam satu transaksi dengan `executemany`.
+
+Setiap penyimpanan juga dicatat di log operasi append-only (transaksi yang sama)
+yang menjadi sumber sinkronisasi offline-first, lihat `edumerdeka.sinkron`, dan
+ditambahkan ke sketsa kuantil benchmark kelas/sekolah, lihat `edumerdeka.benchmark`.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from edumerdeka.benchmark import VERSI_SKETSA, SketsaKuantil, bangun_ulang_sketsa, perbarui_sketsa
+
+DIREKTORI_DATA = os.environ.get("EDUMERDEKA_DATA_DIR", "data")
+PATH_DB_DEFAULT = os.environ.get("EDUMERDEKA_DB", os.path.join(DIREKTORI_DATA, "edumerdeka.db"))
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS siswa (
+    id INTEGER PRIMARY KEY,
+    nama TEXT NOT NULL,
+    kelas TEXT NOT NULL DEFAULT '',
+    UNIQUE (nama, kelas)
+);
+CREATE INDEX IF NOT EXISTS idx_siswa_kelas ON siswa (kelas);
+
+CREATE TABLE IF NOT EXISTS asesmen (
+    id INTEGER PRIMARY KEY,
+    siswa_id INTEGER NOT NULL REFERENCES siswa (id),
+    kelas TEXT NOT NULL DEFAULT '',
+    tahun_ajaran TEXT NOT NULL DEFAULT '',
+    semester TEXT NOT NULL DEFAULT '',
+    fase TEXT NOT NULL DEFAULT '',
+    tanggal TEXT NOT NULL,
+    jumlah_soal INTEGER,
+    tp_dikuasai INTEGER,
+    daya_serap REAL,
+    jawaban_benar_persen REAL,
+    rekomendasi_bloom TEXT,
+    nip_guru TEXT,
+    id_entri TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_asesmen_siswa ON asesmen (siswa_id, tahun_ajaran, semester, tanggal);
+CREATE INDEX IF NOT EXISTS idx_asesmen_kelas ON asesmen (kelas, tahun_ajaran, semester);
+
+CREATE TABLE IF NOT EXISTS projek_p5 (
+    id INTEGER PRIMARY KEY,
+    siswa_id INTEGER NOT NULL REFERENCES siswa (id),
+    kelas TEXT NOT NULL DEFAULT '',
+    tahun_ajaran TEXT NOT NULL DEFAULT '',
+    semester TEXT NOT NULL DEFAULT '',
+    tanggal TEXT NOT NULL,
+    nama_projek TEXT,
+    tema TEXT,
+    mata_pelajaran TEXT,
+    durasi INTEGER,
+    progress INTEGER,
+    dimensi_scores TEXT,
+    skor_karakter REAL,
+    jurnal TEXT,
+    id_entri TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_p5_siswa ON projek_p5 (siswa_id, tahun_ajaran, semester, tanggal);
+CREATE INDEX IF NOT EXISTS idx_p5_kelas ON projek_p5 (kelas, tahun_ajaran, semester);
+
+CREATE TABLE IF NOT EXISTS portofolio (
+    id INTEGER PRIMARY KEY,
+    siswa_id INTEGER NOT NULL REFERENCES siswa (id),
+    kelas TEXT NOT NULL DEFAULT '',
+    tahun_ajaran TEXT NOT NULL DEFAULT '',
+    semester TEXT NOT NULL DEFAULT '',
+    tanggal TEXT NOT NULL,
+    periode TEXT,
+    narasi TEXT,
+    kompetensi TEXT,
+    karya TEXT,
+    karya_hash TEXT,
+    id_entri TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_portofolio_siswa ON portofolio (siswa_id, tahun_ajaran, semester, tanggal);
+CREATE INDEX IF NOT EXISTS idx_portofolio_kelas ON portofolio (kelas, tahun_ajaran, semester);
+
+CREATE TABLE IF NOT EXISTS log_operasi (
+    urutan INTEGER PRIMARY KEY,
+    op_id TEXT NOT NULL UNIQUE,
+    perangkat TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    tabel TEXT NOT NULL,
+    id_entri TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_log_ts ON log_operasi (ts);
+
+CREATE TABLE IF NOT EXISTS sketsa_benchmark (
+    metrik TEXT NOT NULL,
+    kelas TEXT NOT NULL,
+    tahun_ajaran TEXT NOT NULL,
+    semester TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (metrik, kelas, tahun_ajaran, semester)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    kunci TEXT PRIMARY KEY,
+    nilai TEXT NOT NULL
+);
+"""
+
+# Kolom yang disimpan sebagai JSON karena berisi list/dict
+KOLOM_JSON = {'mata_pelajaran', 'dimensi_scores', 'kompetensi'}
+
+KOLOM_TABEL = {
+    'asesmen': ('tanggal', 'jumlah_soal', 'tp_dikuasai', 'daya_serap', 'jawaban_benar_persen',
+                'rekomendasi_bloom', 'nip_guru'),
+    'projek_p5': ('tanggal', 'nama_projek', 'tema', 'mata_pelajaran', 'durasi', 'progress',
+                  'dimensi_scores', 'skor_karakter', 'jurnal'),
+    'portofolio': ('tanggal', 'periode', 'narasi', 'kompetensi', 'karya', 'karya_hash'),
+}
+KOLOM_KONTEKS = ('kelas', 'tahun_ajaran', 'semester')
+
+# Kolom yang ditambahkan setelah rilis pertama skema; dibuat otomatis pada database lama
+MIGRASI_KOLOM = (
+    ('portofolio', 'karya_hash', 'TEXT'),
+    ('asesmen', 'id_entri', 'TEXT'),
+    ('projek_p5', 'id_entri', 'TEXT'),
+    ('portofolio', 'id_entri', 'TEXT'),
+)
+# Kolom yang diganti namanya: (tabel, nama lama, nama baru)
+MIGRASI_NAMA_KOLOM = (
+    ('log_operasi', 'kunci_alami', 'id_entri'),
+)
+# Dijalankan setelah migrasi: baris lama diberi id_entri acak, lalu indeks atas kolom hasil migrasi dibuat
+SKEMA_INDEKS = """
+UPDATE asesmen SET id_entri = lower(hex(randomblob(16))) WHERE id_entri IS NULL;
+UPDATE projek_p5 SET id_entri = lower(hex(randomblob(16))) WHERE id_entri IS NULL;
+UPDATE portofolio SET id_entri = lower(hex(randomblob(16))) WHERE id_entri IS NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_asesmen_entri ON asesmen (id_entri);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_p5_entri ON projek_p5 (id_entri);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_portofolio_entri ON portofolio (id_entri);
+DROP INDEX IF EXISTS idx_log_kunci;
+CREATE INDEX IF NOT EXISTS idx_log_entri ON log_operasi (tabel, id_entri);
+"""
+
+# Batas parameter per query `IN (...)` SQLite
+_UKURAN_IN = 900
+
+
+def _ke_kolom(nama_kolom, nilai):
+    if nama_kolom in KOLOM_JSON and nilai is not None:
+        return json.dumps(nilai, ensure_ascii=False)
+    return nilai
+
+
+def _ke_json(nilai):
+    # Skalar NumPy (dari DataFrame asesmen kelas) menjadi tipe Python
+    if hasattr(nilai, "item"):
+        return nilai.item()
+    return str(nilai)
+
+
+def hapus_entri(conn, tabel, daftar_id_entri):
+    """Menghapus baris `tabel` ber-`id_entri` tertentu di dalam transaksi `conn` (untuk diganti versi baru)"""
+    daftar_id_entri = list(daftar_id_entri)
+    for i in range(0, len(daftar_id_entri), _UKURAN_IN):
+        bagian = daftar_id_entri[i:i + _UKURAN_IN]
+        where = f"id_entri IN ({', '.join('?' * len(bagian))})"
+        # Baris yang diganti dikurangkan dari sketsa benchmark sebelum dihapus
+        dihapus = conn.execute(f"SELECT * FROM {tabel} WHERE {where}", bagian)
+        kolom = [d[0] for d in dihapus.description]
+        perbarui_sketsa(conn, tabel, [dict(zip(kolom, b)) for b in dihapus], bobot=-1)
+        conn.execute(f"DELETE FROM {tabel} WHERE {where}", bagian)
+
+
+def _kolom_konteks(tabel):
+    return KOLOM_KONTEKS + (('fase',) if tabel == 'asesmen' else ())
+
+
+def _validasi_tabel(tabel):
+    if tabel not in KOLOM_TABEL:
+        raise ValueError(f"Tabel tidak dikenal: {tabel}")
+
+
+def kolom_ekspor(tabel):
+    """Urutan kolom hasil export satu tabel"""
+    _validasi_tabel(tabel)
+    return ('nama_siswa',) + _kolom_konteks(tabel) + KOLOM_TABEL[tabel]
+
+
+def _klausa_filter(tabel, **filter):
+    """Klausa WHERE (beralias `t`) dan parameternya dari filter yang tidak None"""
+    kondisi, parameter = [], []
+    for kolom, nilai in filter.items():
+        if nilai is None:
+            continue
+        if kolom not in KOLOM_KONTEKS + ('fase',) or (kolom == 'fase' and tabel != 'asesmen'):
+            raise ValueError(f"Filter '{kolom}' tidak tersedia untuk tabel {tabel}")
+        kondisi.append(f"t.{kolom} = ?")
+        parameter.append(nilai)
+    return (" WHERE " + " AND ".join(kondisi) if kondisi else ""), parameter
+
+
+def _dari_baris(baris):
+    data = dict(baris)
+    for nama_kolom in KOLOM_JSON & data.keys():
+        if data[nama_kolom] is not None:
+            data[nama_kolom] = json.loads(data[nama_kolom])
+    return data
+
+
+class PenyimpananSQLite:
+    """Akses database SQLite dengan satu koneksi per thread"""
+
+    def __init__(self, path=PATH_DB_DEFAULT):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lokal = threading.local()
+        with self.transaksi() as conn:
+            conn.executescript(SKEMA)
+            for tabel, lama, baru in MIGRASI_NAMA_KOLOM:
+                if lama in {b['name'] for b in conn.execute(f"PRAGMA table_info({tabel})")}:
+                    conn.execute(f"ALTER TABLE {tabel} RENAME COLUMN {lama} TO {baru}")
+            for tabel, kolom, tipe in MIGRASI_KOLOM:
+                kolom_ada = {b['name'] for b in conn.execute(f"PRAGMA table_info({tabel})")}
+                if kolom not in kolom_ada:
+                    conn.execute(f"ALTER TABLE {tabel} ADD COLUMN {kolom} {tipe}")
+            conn.executescript(SKEMA_INDEKS)
+            # Identitas acak perangkat ini untuk log operasi, dibuat sekali
+            conn.execute("INSERT OR IGNORE INTO meta (kunci, nilai) VALUES ('perangkat', ?)", (uuid.uuid4().hex[:16],))
+            # Database lama (atau format sketsa lama): sketsa benchmark dibangun dari data yang ada
+            if self.baca_meta('versi_sketsa', conn=conn) != str(VERSI_SKETSA):
+                bangun_ulang_sketsa(conn)
+                self.tulis_meta('versi_sketsa', VERSI_SKETSA, conn=conn)
+
+    def koneksi(self):
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._lokal.conn = conn
+        return conn
+
+    @contextmanager
+    def transaksi(self):
+        conn = self.koneksi()
+        with conn:
+            yield conn
+
+    def tutup(self):
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._lokal.conn = None
+
+    def id_siswa(self, nama, kelas='', conn=None):
+        """Mengembalikan id siswa, membuat baris baru jika belum ada"""
+        conn = conn or self.koneksi()
+        conn.execute("INSERT OR IGNORE INTO siswa (nama, kelas) VALUES (?, ?)", (nama, kelas or ''))
+        return conn.execute("SELECT id FROM siswa WHERE nama = ? AND kelas = ?",
+                            (nama, kelas or '')).fetchone()[0]
+
+    def simpan_batch(self, tabel, baris, log_operasi=True):
+        """Menyimpan banyak baris sekaligus dalam satu transaksi.
+
+        Setiap baris adalah dict berisi `nama_siswa` dan konteks (`kelas`,
+        `tahun_ajaran`, `semester`, serta `fase` untuk asesmen) ditambah kolom data tabel.
+        Setiap baris menjadi entry baru dengan `id_entri` acak, kecuali baris yang
+        membawa `id_entri`: baris itu pembaruan eksplisit dan menggantikan entry
+        ber-id sama. Jika `log_operasi`, setiap baris juga dicatat sebagai operasi
+        yang akan disinkronkan; aturan konflik pembaruan sama dengan saat operasi
+        diterapkan di perangkat lain (`sinkron.terapkan_operasi`). Mengembalikan
+        jumlah baris yang disimpan.
+        """
+        _validasi_tabel(tabel)
+        baris = list(baris)
+        diperbarui = {data['id_entri'] for data in baris if data.get('id_entri')}
+        baris = [data if data.get('id_entri') else {**data, 'id_entri': uuid.uuid4().hex} for data in baris]
+        with self.transaksi() as conn:
+            urutan = [op[0] for op in self._catat_operasi(conn, tabel, baris)] if log_operasi else range(len(baris))
+            if diperbarui:
+                # ts operasi lokal selalu di atas semua operasi yang sudah terlihat, jadi hanya pembaruan
+                # entry yang sama di dalam batch ini yang perlu diadu: op_id terbesar menang
+                pemenang = {}
+                for kunci, data in zip(urutan, baris):
+                    if data['id_entri'] not in pemenang or kunci > pemenang[data['id_entri']][0]:
+                        pemenang[data['id_entri']] = (kunci, data)
+                baris = [data for _, data in pemenang.values()]
+                hapus_entri(conn, tabel, diperbarui)
+            self.sisipkan(conn, tabel, baris)
+        return len(baris)
+
+    def sisipkan(self, conn, tabel, baris):
+        """Insert baris data berisi `id_entri` (beserta sketsa benchmark) di transaksi `conn` pemanggil, tanpa log operasi"""
+        kolom_data = KOLOM_TABEL[tabel]
+        kolom_konteks = _kolom_konteks(tabel)
+        kolom = ('siswa_id', 'id_entri') + kolom_konteks + kolom_data
+        sql = f"INSERT INTO {tabel} ({', '.join(kolom)}) VALUES ({', '.join('?' * len(kolom))})"
+
+        cache_id = {}
+        nilai = []
+        for data in baris:
+            kunci_siswa = (data['nama_siswa'], data.get('kelas') or '')
+            if kunci_siswa not in cache_id:
+                cache_id[kunci_siswa] = self.id_siswa(*kunci_siswa, conn=conn)
+            nilai.append(
+                (cache_id[kunci_siswa], data['id_entri'])
+                + tuple(data.get(k) or '' for k in kolom_konteks)
+                + tuple(_ke_kolom(k, data.get(k)) for k in kolom_data)
+            )
+        conn.executemany(sql, nilai)
+        perbarui_sketsa(conn, tabel, baris)
+
+    def baca_meta(self, kunci, default=None, conn=None):
+        baris = (conn or self.koneksi()).execute("SELECT nilai FROM meta WHERE kunci = ?", (kunci,)).fetchone()
+        return default if baris is None else baris[0]
+
+    def tulis_meta(self, kunci, nilai, conn=None):
+        """Menulis nilai meta di transaksi `conn`, atau di transaksi sendiri jika tidak diberikan"""
+        if conn is None:
+            with self.transaksi() as conn:
+                return self.tulis_meta(kunci, nilai, conn=conn)
+        conn.execute(
+            "INSERT INTO meta (kunci, nilai) VALUES (?, ?) ON CONFLICT (kunci) DO UPDATE SET nilai = excluded.nilai",
+            (kunci, str(nilai)))
+
+    def id_perangkat(self, conn=None):
+        """Identitas acak perangkat ini (dibuat saat database diinisialisasi)"""
+        return self.baca_meta('perangkat', conn=conn)
+
+    def _catat_operasi(self, conn, tabel, baris):
+        perangkat = self.id_perangkat(conn)
+        # Hybrid logical clock: tidak pernah mundur dari operasi mana pun yang sudah terlihat
+        ts_terakhir = conn.execute("SELECT MAX(ts) FROM log_operasi").fetchone()[0] or 0
+        ts = max(int(time.time() * 1000), ts_terakhir + 1)
+        kolom = ('nama_siswa', 'id_entri') + _kolom_konteks(tabel) + KOLOM_TABEL[tabel]
+        operasi = []
+        for data in baris:
+            isi = {k: data.get(k) for k in kolom}
+            operasi.append((uuid.uuid4().hex, perangkat, ts, tabel, data['id_entri'],
+                            json.dumps(isi, ensure_ascii=False, default=_ke_json, separators=(",", ":"))))
+        conn.executemany("INSERT INTO log_operasi (op_id, perangkat, ts, tabel, id_entri, data) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", operasi)
+        return operasi
+
+    def simpan(self, tabel, data):
+        return self.simpan_batch(tabel, [data])
+
+    def riwayat_siswa(self, nama, kelas='', tahun_ajaran=None, semester=None, batas=200):
+        """Riwayat asesmen, projek P5 dan portofolio satu siswa, terbaru lebih dulu"""
+        conn = self.koneksi()
+        baris_siswa = conn.execute("SELECT id FROM siswa WHERE nama = ? AND kelas = ?",
+                                   (nama, kelas or '')).fetchone()
+        riwayat = {tabel: [] for tabel in KOLOM_TABEL}
+        if baris_siswa is None:
+            return riwayat
+
+        filter_sql = ""
+        parameter = [baris_siswa[0]]
+        if tahun_ajaran is not None:
+            filter_sql += " AND tahun_ajaran = ?"
+            parameter.append(tahun_ajaran)
+        if semester is not None:
+            filter_sql += " AND semester = ?"
+            parameter.append(semester)
+
+        for tabel in KOLOM_TABEL:
+            sql = (f"SELECT * FROM {tabel} WHERE siswa_id = ?{filter_sql} "
+                   f"ORDER BY tanggal DESC, id DESC LIMIT ?")
+            riwayat[tabel] = [_dari_baris(b) for b in conn.execute(sql, parameter + [batas])]
+        return riwayat
+
+    def deret_siswa(self, tabel, kolom, nama, kelas='', dari=None, sampai=None):
+        """Pasangan (tanggal, nilai `kolom`) satu siswa terurut waktu; `kolom` None hanya tanggal"""
+        _validasi_tabel(tabel)
+        if kolom is not None and kolom not in KOLOM_TABEL[tabel]:
+            raise ValueError(f"Kolom {kolom} tidak ada di tabel {tabel}")
+        sql = (f"SELECT t.tanggal, {'t.' + kolom if kolom else 'NULL'} FROM {tabel} t "
+               f"JOIN siswa s ON s.id = t.siswa_id WHERE s.nama = ? AND s.kelas = ?")
+        parameter = [nama, kelas or '']
+        if dari is not None:
+            sql += " AND t.tanggal >= ?"
+            parameter.append(dari)
+        if sampai is not None:
+            # Tanggal asesmen dapat berisi jam ('YYYY-MM-DD HH:MM')
+            sql += " AND t.tanggal < ?"
+            parameter.append(sampai + "~")
+        return self.koneksi().execute(sql + " ORDER BY t.tanggal, t.id", parameter).fetchall()
+
+    def data_kelas(self, tabel, kelas, tahun_ajaran=None, semester=None):
+        """Semua baris satu tabel untuk satu kelas, lengkap dengan nama siswa"""
+        _validasi_tabel(tabel)
+        where, parameter = _klausa_filter(tabel, kelas=kelas, tahun_ajaran=tahun_ajaran, semester=semester)
+        sql = (f"SELECT s.nama AS nama_siswa, t.* FROM {tabel} t JOIN siswa s ON s.id = t.siswa_id"
+               f"{where} ORDER BY t.tanggal, t.id")
+        return [_dari_baris(b) for b in self.koneksi().execute(sql, parameter)]
+
+    def iter_data(self, tabel, ukuran_chunk=5000, **filter):
+        """Membaca baris satu tabel per chunk (list of tuple) untuk export berukuran besar.
+
+        Urutan kolom mengikuti `kolom_ekspor(tabel)`; kolom JSON dibiarkan sebagai
+        string. Filter yang didukung: kelas, tahun_ajaran, semester dan fase (asesmen).
+        """
+        _validasi_tabel(tabel)
+        kolom = kolom_ekspor(tabel)
+        where, parameter = _klausa_filter(tabel, **filter)
+        sql = (f"SELECT s.nama, {', '.join('t.' + k for k in kolom[1:])} "
+               f"FROM {tabel} t JOIN siswa s ON s.id = t.siswa_id{where} ORDER BY t.id")
+        # Koneksi terpisah agar pembacaan panjang tidak menahan transaksi thread ini
+        terpisah = self.path != ":memory:"
+        conn = sqlite3.connect(self.path, timeout=30) if terpisah else self.koneksi()
+        try:
+            cursor = conn.execute(sql, parameter)
+            while True:
+                chunk = cursor.fetchmany(ukuran_chunk)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            if terpisah:
+                conn.close()
+
+    def daftar_kelas(self, tabel='asesmen', tahun_ajaran=None, semester=None):
+        """Kelas yang memiliki data di `tabel`, terurut"""
+        _validasi_tabel(tabel)
+        where, parameter = _klausa_filter(tabel, tahun_ajaran=tahun_ajaran, semester=semester)
+        sql = f"SELECT DISTINCT t.kelas FROM {tabel} t{where} ORDER BY t.kelas"
+        return [b[0] for b in self.koneksi().execute(sql, parameter)]
+
+    def sketsa(self, metrik, kelas=None, tahun_ajaran=None, semester=None):
+        """Sketsa kuantil satu metrik, digabung dari semua sketsa yang cocok dengan filter"""
+        kondisi, parameter = ["metrik = ?"], [metrik]
+        for kolom, nilai in (('kelas', kelas), ('tahun_ajaran', tahun_ajaran), ('semester', semester)):
+            if nilai is not None:
+                kondisi.append(f"{kolom} = ?")
+                parameter.append(nilai)
+        hasil = SketsaKuantil()
+        for (data,) in self.koneksi().execute(
+                f"SELECT data FROM sketsa_benchmark WHERE {' AND '.join(kondisi)}", parameter):
+            hasil.gabung(SketsaKuantil.dari_bytes(data))
+        return hasil
+
+    def jumlah_baris(self, tabel):
+        _validasi_tabel(tabel)
+        return self.koneksi().execute(f"SELECT COUNT(*) FROM {tabel}").fetchone()[0]
+
+    def watermark(self, tabel, kolom, conn=None):
+        """(id terbesar, jumlah baris, total `kolom`) sebuah tabel sebagai versi data untuk cache.
+
+        Berbeda dengan jumlah baris saja, watermark ini ikut berubah saat baris
+        diganti (hapus lalu insert oleh sinkronisasi) dengan jumlah yang sama.
+        """
+        _validasi_tabel(tabel)
+        if kolom not in KOLOM_TABEL[tabel]:
+            raise ValueError(f"Kolom '{kolom}' tidak tersedia untuk tabel {tabel}")
+        return tuple((conn or self.koneksi()).execute(
+            f"SELECT IFNULL(MAX(id), 0), COUNT(*), TOTAL({kolom}) FROM {tabel}").fetchone())
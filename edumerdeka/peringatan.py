@@ -0,0 +1,329 @@
+"""Mesin aturan threshold alert untuk seluruh siswa sekolah.
+
+Indikator per siswa (daya serap asesmen terakhir, ketercapaian ATP dan skor
+karakter P5 terakhir, semuanya berskala 0-100) disimpan sebagai kolom NumPy,
+satu baris per siswa. Setiap aturan membandingkan satu indikator dengan ambang
+dan dievaluasi untuk semua siswa sekaligus; hasilnya berupa matriks
+pelanggaran siswa × aturan dan skor risiko yang menjadi urutan daftar "siswa
+perlu intervensi".
+
+Perubahan data dideteksi dari id terbesar, jumlah baris dan total nilai per
+tabel: jika tabel hanya bertambah baris, hanya siswa pemilik baris baru yang
+indikatornya dibaca ulang dan dievaluasi ulang. Baris yang dihapus atau diganti
+(mis. saat sinkronisasi) memicu satu pass penuh.
+"""
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# Kriteria Ketercapaian Tujuan Pembelajaran: asesmen dengan daya serap >= KKTP dihitung tuntas
+KKTP = 70
+
+# indikator -> (label, satuan)
+INDIKATOR = {
+    'ketercapaian_atp': ("Ketercapaian ATP", "%"),
+    'skor_karakter': ("Skor Karakter", ""),
+    'daya_serap': ("Daya Serap", "%"),
+}
+
+OPERATOR = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}
+
+ATURAN_DEFAULT = (
+    {'indikator': 'ketercapaian_atp', 'operator': '<', 'ambang': 70},
+    {'indikator': 'skor_karakter', 'operator': '<', 'ambang': 50},
+    {'indikator': 'daya_serap', 'operator': '<', 'ambang': 60},
+)
+
+PATH_ATURAN = os.environ.get("EDUMERDEKA_ATURAN_PERINGATAN", "")
+
+# tabel -> kolom nilai yang dipantau untuk mendeteksi perubahan
+_SUMBER = {'asesmen': 'daya_serap', 'projek_p5': 'skor_karakter'}
+
+# Batas parameter per query `IN (...)` SQLite
+_UKURAN_IN = 900
+
+
+def validasi_aturan(daftar_aturan):
+    """Menormalkan daftar aturan (dict `indikator`, `operator`, `ambang`) menjadi tuple; ValueError jika tidak valid"""
+    hasil = []
+    for aturan in daftar_aturan:
+        indikator, operator = aturan.get('indikator'), aturan.get('operator', '<')
+        if indikator not in INDIKATOR:
+            raise ValueError(f"Indikator aturan tidak dikenal: {indikator}")
+        if operator not in OPERATOR:
+            raise ValueError(f"Operator aturan tidak didukung: {operator}")
+        hasil.append((indikator, operator, float(aturan['ambang'])))
+    return tuple(hasil)
+
+
+def muat_aturan(path=PATH_ATURAN):
+    """Aturan dari file JSON (list of dict) jika dikonfigurasi, selain itu `ATURAN_DEFAULT`"""
+    if path and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return validasi_aturan(json.load(f))
+    return validasi_aturan(ATURAN_DEFAULT)
+
+
+def pesan_peringatan(aturan, nilai):
+    indikator, operator, ambang = aturan
+    label, satuan = INDIKATOR[indikator]
+    arah = "di bawah" if operator in ('<', '<=') else "di atas"
+    return f"🔴 {label} ({nilai:.1f}{satuan}) {arah} threshold {ambang:g}{satuan}"
+
+
+def evaluasi_nilai(aturan, nilai):
+    """Pesan peringatan untuk satu set nilai indikator (mis. siswa aktif di sesi), urut sesuai aturan"""
+    pesan = []
+    for satu in aturan:
+        indikator, operator, ambang = satu
+        if nilai.get(indikator) is not None and OPERATOR[operator](nilai[indikator], ambang):
+            pesan.append(pesan_peringatan(satu, nilai[indikator]))
+    return pesan
+
+
+def ketercapaian_atp(daftar_daya_serap):
+    """Persentase asesmen dengan daya serap >= KKTP; None jika belum ada asesmen"""
+    daya_serap = np.asarray(daftar_daya_serap, dtype=float)
+    return float((daya_serap >= KKTP).mean() * 100) if len(daya_serap) else None
+
+
+def _potong(daftar, ukuran=_UKURAN_IN):
+    for i in range(0, len(daftar), ukuran):
+        yield daftar[i:i + ukuran]
+
+
+class MesinPeringatan:
+    """Indikator kolumnar semua siswa satu periode, diperbarui inkremental dari database.
+
+    Aman dipakai bersama antar sesi/thread; setiap pemanggilan `daftar_intervensi`
+    memeriksa data baru terlebih dahulu.
+    """
+
+    def __init__(self, penyimpanan, tahun_ajaran=None, semester=None):
+        self.penyimpanan = penyimpanan
+        self.tahun_ajaran = tahun_ajaran
+        self.semester = semester
+        self._kunci = threading.Lock()
+        self._posisi = {}
+        self._watermark = None
+        self._aturan = None
+        self.statistik = {'pass_penuh': 0, 'pass_inkremental': 0, 'siswa_dievaluasi_ulang': 0, 'waktu_ms': 0.0}
+        self._kosongkan()
+
+    def _kosongkan(self):
+        self.siswa_id = np.zeros(0, dtype=np.int64)
+        self.nama = np.zeros(0, dtype=object)
+        self.kelas = np.zeros(0, dtype=object)
+        self.nilai = {indikator: np.zeros(0) for indikator in INDIKATOR}
+        self.pelanggaran = np.zeros((0, 0), dtype=bool)
+        self.skor = np.zeros(0)
+        self._posisi = {}
+
+    def __len__(self):
+        return len(self.siswa_id)
+
+    def _filter_periode(self):
+        kondisi, parameter = [], []
+        for kolom, nilai in (('tahun_ajaran', self.tahun_ajaran), ('semester', self.semester)):
+            if nilai is not None:
+                kondisi.append(f"{kolom} = ?")
+                parameter.append(nilai)
+        return kondisi, parameter
+
+    def _watermark_sekarang(self, conn):
+        """(id terbesar, jumlah baris, total nilai) per tabel sumber indikator"""
+        return {tabel: self.penyimpanan.watermark(tabel, kolom, conn) for tabel, kolom in _SUMBER.items()}
+
+    def _hanya_tambahan(self, conn, watermark):
+        """True jika sejak watermark lama tabel hanya bertambah baris (tanpa hapus/ubah)"""
+        for tabel, kolom in _SUMBER.items():
+            id_lama, jumlah_lama, total_lama = self._watermark[tabel]
+            _, jumlah, total = watermark[tabel]
+            jumlah_baru, total_baru = conn.execute(f"SELECT COUNT(*), TOTAL({kolom}) FROM {tabel} WHERE id > ?",
+                                                   (id_lama,)).fetchone()
+            if jumlah != jumlah_lama + jumlah_baru or abs(total - total_lama - total_baru) > 1e-6 * max(total, 1):
+                return False
+        return True
+
+    def _baca_kolom(self, conn, tabel, kolom, daftar_id=None):
+        """Array (siswa_id, nilai) satu tabel terurut siswa lalu waktu, untuk semua siswa atau `daftar_id`"""
+        kondisi, parameter = self._filter_periode()
+        kondisi.append(f"{kolom} IS NOT NULL")
+        potongan = [None] if daftar_id is None else list(_potong(daftar_id))
+        sid, nilai = [], []
+        for bagian in potongan:
+            kondisi_bagian, parameter_bagian = list(kondisi), list(parameter)
+            if bagian is not None:
+                kondisi_bagian.append(f"siswa_id IN ({', '.join('?' * len(bagian))})")
+                parameter_bagian.extend(bagian)
+            baris = conn.execute(f"SELECT siswa_id, {kolom} FROM {tabel} WHERE {' AND '.join(kondisi_bagian)} "
+                                 f"ORDER BY siswa_id, tanggal, id", parameter_bagian).fetchall()
+            sid.extend(b[0] for b in baris)
+            nilai.extend(b[1] for b in baris)
+        return np.array(sid, dtype=np.int64), np.array(nilai, dtype=float)
+
+    def _indikator(self, conn, daftar_id=None):
+        """{siswa_id: {indikator: nilai}} dihitung vektor dari baris mentah"""
+        hasil = {}
+        sid, daya_serap = self._baca_kolom(conn, 'asesmen', 'daya_serap', daftar_id)
+        if len(sid):
+            unik, awal, jumlah = np.unique(sid, return_index=True, return_counts=True)
+            terakhir = awal + jumlah - 1
+            tuntas = np.add.reduceat((daya_serap >= KKTP).astype(float), awal) / jumlah * 100
+            for i, s in enumerate(unik.tolist()):
+                hasil[s] = {'daya_serap': daya_serap[terakhir[i]], 'ketercapaian_atp': tuntas[i]}
+        sid, skor = self._baca_kolom(conn, 'projek_p5', 'skor_karakter', daftar_id)
+        if len(sid):
+            unik, awal, jumlah = np.unique(sid, return_index=True, return_counts=True)
+            for s, nilai in zip(unik.tolist(), skor[awal + jumlah - 1] * 10):
+                hasil.setdefault(s, {})['skor_karakter'] = nilai
+        return hasil
+
+    def _identitas(self, conn, daftar_id):
+        identitas = {}
+        for bagian in _potong(daftar_id):
+            for sid, nama, kelas in conn.execute(
+                    f"SELECT id, nama, kelas FROM siswa WHERE id IN ({', '.join('?' * len(bagian))})", bagian):
+                identitas[sid] = (nama, kelas)
+        return identitas
+
+    def _muat_penuh(self, conn):
+        indikator = self._indikator(conn)
+        daftar_id = sorted(indikator)
+        identitas = self._identitas(conn, daftar_id)
+        self._kosongkan()
+        self.siswa_id = np.array(daftar_id, dtype=np.int64)
+        self.nama = np.array([identitas[s][0] for s in daftar_id], dtype=object)
+        self.kelas = np.array([identitas[s][1] for s in daftar_id], dtype=object)
+        for nama_indikator in INDIKATOR:
+            self.nilai[nama_indikator] = np.array([indikator[s].get(nama_indikator, np.nan) for s in daftar_id])
+        self._posisi = {s: i for i, s in enumerate(daftar_id)}
+        return np.arange(len(daftar_id))
+
+    def _muat_inkremental(self, conn, watermark_lama):
+        """Membaca ulang indikator siswa yang memiliki baris baru; mengembalikan indeks baris yang berubah"""
+        berubah = set()
+        for tabel, (id_lama, _, _) in watermark_lama.items():
+            berubah.update(b[0] for b in conn.execute(f"SELECT DISTINCT siswa_id FROM {tabel} WHERE id > ?",
+                                                      (id_lama,)))
+        if not berubah:
+            return np.zeros(0, dtype=int)
+        daftar_id = sorted(berubah)
+        indikator = self._indikator(conn, daftar_id)
+        baru = [s for s in daftar_id if s not in self._posisi and s in indikator]
+        if baru:
+            identitas = self._identitas(conn, baru)
+            self.siswa_id = np.concatenate([self.siswa_id, np.array(baru, dtype=np.int64)])
+            self.nama = np.concatenate([self.nama, np.array([identitas[s][0] for s in baru], dtype=object)])
+            self.kelas = np.concatenate([self.kelas, np.array([identitas[s][1] for s in baru], dtype=object)])
+            for nama_indikator in INDIKATOR:
+                self.nilai[nama_indikator] = np.concatenate([self.nilai[nama_indikator], np.full(len(baru), np.nan)])
+            self.pelanggaran = np.vstack([self.pelanggaran, np.zeros((len(baru), self.pelanggaran.shape[1]), bool)])
+            self.skor = np.concatenate([self.skor, np.zeros(len(baru))])
+            for s in baru:
+                self._posisi[s] = len(self._posisi)
+        # Baris baru di luar periode mesin ini tidak mengubah indikator
+        indeks = np.array([self._posisi[s] for s in daftar_id if s in self._posisi], dtype=int)
+        for nama_indikator in INDIKATOR:
+            self.nilai[nama_indikator][indeks] = [indikator.get(s, {}).get(nama_indikator, np.nan)
+                                                  for s in self.siswa_id[indeks].tolist()]
+        return indeks
+
+    def _evaluasi(self, indeks):
+        """Mengisi matriks pelanggaran dan skor risiko untuk baris `indeks` (semua jika None)"""
+        baris = slice(None) if indeks is None else indeks
+        if indeks is None:
+            self.pelanggaran = np.zeros((len(self), len(self._aturan)), dtype=bool)
+            self.skor = np.zeros(len(self))
+        skor = np.zeros(len(self.siswa_id[baris]))
+        for j, (indikator, operator, ambang) in enumerate(self._aturan):
+            nilai = self.nilai[indikator][baris]
+            # NaN (indikator belum ada) tidak pernah melanggar
+            with np.errstate(invalid='ignore'):
+                melanggar = OPERATOR[operator](nilai, ambang)
+            self.pelanggaran[baris, j] = melanggar
+            # Skor risiko: jarak relatif dari ambang, dijumlahkan untuk semua aturan yang dilanggar
+            skor += np.where(melanggar, np.abs(nilai - ambang) / max(abs(ambang), 1.0), 0.0)
+        self.skor[baris] = skor
+
+    def perbarui(self, aturan=None):
+        """Menyinkronkan indikator dengan database dan mengevaluasi aturan; mengembalikan jumlah siswa dievaluasi"""
+        aturan = muat_aturan() if aturan is None else aturan
+        mulai = time.perf_counter()
+        conn = self.penyimpanan.koneksi()
+        with self._kunci:
+            watermark = self._watermark_sekarang(conn)
+            if watermark == self._watermark and aturan == self._aturan:
+                return 0
+            if self._watermark is None or not self._hanya_tambahan(conn, watermark):
+                indeks, penuh = self._muat_penuh(conn), True
+            else:
+                indeks = self._muat_inkremental(conn, self._watermark)
+                penuh = aturan != self._aturan
+            self._watermark = watermark
+            self._aturan = aturan
+            self._evaluasi(None if penuh else indeks)
+            jumlah = len(self) if penuh else len(indeks)
+            self.statistik['pass_penuh' if penuh else 'pass_inkremental'] += 1
+            self.statistik['siswa_dievaluasi_ulang'] += jumlah
+            self.statistik['waktu_ms'] = (time.perf_counter() - mulai) * 1000
+            return jumlah
+
+    def indikator_siswa(self, nama, kelas=''):
+        """Nilai indikator satu siswa dari data tersimpan periode ini, dihitung sama seperti daftar intervensi"""
+        conn = self.penyimpanan.koneksi()
+        baris = conn.execute("SELECT id FROM siswa WHERE nama = ? AND kelas = ?", (nama, kelas or '')).fetchone()
+        if baris is None:
+            return {}
+        return {k: float(v) for k, v in self._indikator(conn, [baris[0]]).get(baris[0], {}).items()}
+
+    def rata_rata_indikator(self, indikator, kelas=None):
+        """Rata-rata satu indikator periode ini untuk satu kelas atau seluruh sekolah; None jika belum ada nilai.
+
+        Memakai aturan terakhir sehingga tidak memicu evaluasi ulang penuh.
+        """
+        self.perbarui(self._aturan)
+        with self._kunci:
+            nilai = self.nilai[indikator] if kelas is None else self.nilai[indikator][self.kelas == kelas]
+            nilai = nilai[~np.isnan(nilai)]
+            return float(nilai.mean()) if len(nilai) else None
+
+    def daftar_intervensi(self, aturan=None, kelas=None, batas=None):
+        """Siswa yang melanggar minimal satu aturan, skor risiko tertinggi lebih dulu.
+
+        Setiap item berisi `nama_siswa`, `kelas`, `skor_risiko`, `jumlah_peringatan`,
+        `peringatan` (list pesan) dan nilai setiap indikator.
+        """
+        self.perbarui(aturan)
+        with self._kunci:
+            pilih = self.pelanggaran.any(axis=1) if len(self) else np.zeros(0, dtype=bool)
+            if kelas is not None:
+                pilih &= self.kelas == kelas
+            indeks = np.flatnonzero(pilih)
+            # Skor turun, lalu nama untuk skor yang sama
+            indeks = indeks[np.lexsort((self.nama[indeks].astype(str), -self.skor[indeks]))]
+            if batas is not None:
+                indeks = indeks[:batas]
+            hasil = []
+            for i in indeks.tolist():
+                nilai = {k: (None if np.isnan(v[i]) else round(float(v[i]), 1)) for k, v in self.nilai.items()}
+                hasil.append({
+                    'nama_siswa': self.nama[i], 'kelas': self.kelas[i], 'skor_risiko': round(float(self.skor[i]), 3),
+                    'jumlah_peringatan': int(self.pelanggaran[i].sum()),
+                    'peringatan': [pesan_peringatan(a, self.nilai[a[0]][i])
+                                   for a, aktif in zip(self._aturan, self.pelanggaran[i]) if aktif],
+                    **nilai,
+                })
+            return hasil
+
+    def ringkasan(self, kelas=None):
+        """Jumlah siswa, jumlah yang perlu intervensi dan jumlah pelanggaran per indikator"""
+        with self._kunci:
+            pilih = np.ones(len(self), dtype=bool) if kelas is None else self.kelas == kelas
+            pelanggaran = self.pelanggaran[pilih]
+            return {'jumlah_siswa': int(pilih.sum()),
+                    'perlu_intervensi': int(pelanggaran.any(axis=1).sum()) if len(pelanggaran) else 0,
+                    'per_aturan': {a: int(pelanggaran[:, j].sum()) for j, a in enumerate(self._aturan or ())}}
@@ -0,0 +1,215 @@
+"""Proyeksi daya serap multi-semester dengan pita ketidakpastian Monte Carlo.
+
+Riwayat daya serap setiap siswa (rata-rata per semester) ditransformasi ke skala
+logit sehingga proyeksi selalu berada di 0-100% dan kenaikan melambat mendekati
+batas. Tren per siswa diestimasi dengan regresi linear yang dihitung untuk seluruh
+kohort sekaligus pada matriks siswa × semester bermask, lalu di-shrink ke tren
+kohort (normal-normal): siswa dengan satu atau dua titik riwayat mengikuti tren
+kelasnya, siswa dengan riwayat panjang mengikuti trennya sendiri.
+
+Ketidakpastian disampling dalam satu operasi NumPy untuk semua siswa × draw ×
+semester (slope, level awal dan random walk antar semester), diproses per chunk
+siswa agar memori tetap terbatas.
+"""
+import time
+
+import numpy as np
+
+HORIZON_DEFAULT = 2
+JUMLAH_DRAW_DEFAULT = 2000
+PERSENTIL = (5, 25, 50, 75, 95)
+AMBANG_RISIKO = 60
+# Riwayat yang dipakai per siswa (semester terakhir)
+MAKS_TITIK = 8
+
+# Nilai awal (skala logit) jika kohort belum punya cukup riwayat untuk diestimasi
+SIGMA_DEFAULT = 0.35
+TAU_SLOPE_DEFAULT = 0.25
+TAU_SLOPE_MIN = 0.05
+BATAS_PROPORSI = 0.01
+# Batas elemen siswa × draw × semester per chunk (float32, ~32 MB)
+MAKS_ELEMEN_CHUNK = 8_000_000
+
+SEMESTER_KE_INDEKS = {'Ganjil': 0, 'Genap': 1}
+
+
+def indeks_semester(tahun_ajaran, semester, tanggal=None):
+    """Nomor urut semester: 2025/2026 Ganjil -> 4050, Genap -> 4051.
+
+    Tanpa tahun ajaran/semester, semester ditentukan dari tanggal (Juli-Desember
+    Ganjil, Januari-Juni Genap tahun ajaran sebelumnya). None jika tidak diketahui.
+    """
+    try:
+        if tahun_ajaran and semester in SEMESTER_KE_INDEKS:
+            return int(str(tahun_ajaran)[:4]) * 2 + SEMESTER_KE_INDEKS[semester]
+        if tanggal:
+            tahun, bulan = int(str(tanggal)[:4]), int(str(tanggal)[5:7])
+            return tahun * 2 if bulan >= 7 else (tahun - 1) * 2 + 1
+    except ValueError:
+        pass
+    return None
+
+
+def riwayat_dari_baris(daftar_baris):
+    """Mengelompokkan baris asesmen (dict) menjadi {(nama, kelas): {indeks_semester: [daya_serap]}}"""
+    riwayat = {}
+    for baris in daftar_baris:
+        indeks = indeks_semester(baris.get('tahun_ajaran'), baris.get('semester'), baris.get('tanggal'))
+        if indeks is None or baris.get('daya_serap') is None:
+            continue
+        siswa = riwayat.setdefault((baris['nama_siswa'], baris.get('kelas') or ''), {})
+        siswa.setdefault(indeks, []).append(float(baris['daya_serap']))
+    return riwayat
+
+
+def riwayat_dari_penyimpanan(penyimpanan, kelas=None):
+    """Riwayat daya serap semua siswa (atau satu kelas) dari database"""
+    from edumerdeka.penyimpanan import kolom_ekspor
+
+    kolom = kolom_ekspor('asesmen')
+    return riwayat_dari_baris(dict(zip(kolom, baris))
+                              for chunk in penyimpanan.iter_data('asesmen', kelas=kelas)
+                              for baris in chunk)
+
+
+def _logit(persen):
+    p = np.clip(np.asarray(persen, dtype=float) / 100, BATAS_PROPORSI, 1 - BATAS_PROPORSI)
+    return np.log(p / (1 - p))
+
+
+def _matriks_riwayat(riwayat, daftar_siswa):
+    """Matriks (siswa × titik) waktu dan daya serap (logit), rata-rata per semester, plus mask"""
+    jumlah_titik = max((min(len(riwayat[s]), MAKS_TITIK) for s in daftar_siswa), default=1)
+    waktu = np.zeros((len(daftar_siswa), jumlah_titik))
+    nilai = np.zeros_like(waktu)
+    mask = np.zeros_like(waktu, dtype=bool)
+    for i, siswa in enumerate(daftar_siswa):
+        semester = sorted(riwayat[siswa])[-MAKS_TITIK:]
+        n = len(semester)
+        waktu[i, :n] = semester
+        nilai[i, :n] = [sum(riwayat[siswa][s]) / len(riwayat[siswa][s]) for s in semester]
+        mask[i, :n] = True
+    return waktu, _logit(nilai), mask
+
+
+def estimasi_tren(waktu, nilai, mask):
+    """Regresi linear per siswa (vektor) yang di-shrink ke tren kohort.
+
+    Mengembalikan dict berisi level dan slope posterior (skala logit, per
+    semester), simpangan bakunya, sigma residual kohort dan semester terakhir.
+    """
+    n = mask.sum(axis=1)
+    n_aman = np.maximum(n, 1)
+    t_rata = (waktu * mask).sum(axis=1) / n_aman
+    z_rata = (nilai * mask).sum(axis=1) / n_aman
+    dt = np.where(mask, waktu - t_rata[:, None], 0.0)
+    dz = np.where(mask, nilai - z_rata[:, None], 0.0)
+    stt = (dt * dt).sum(axis=1)
+    slope_ols = np.divide((dt * dz).sum(axis=1), stt, out=np.zeros_like(stt), where=stt > 0)
+
+    # Sigma residual dan sebaran slope dari seluruh kohort
+    residu = np.where(mask, dz - slope_ols[:, None] * dt, 0.0)
+    dof = np.maximum(n - 2, 0)
+    sigma = np.sqrt((residu ** 2).sum() / dof.sum()) if dof.sum() > 0 else SIGMA_DEFAULT
+    sigma = max(sigma, 0.05)
+    ada_tren = stt > 0
+    if ada_tren.sum() >= 2:
+        slope_prior = float(np.median(slope_ols[ada_tren]))
+        tau = max(float(np.std(slope_ols[ada_tren])), TAU_SLOPE_MIN)
+    else:
+        slope_prior, tau = 0.0, TAU_SLOPE_DEFAULT
+
+    presisi = 1 / tau ** 2 + stt / sigma ** 2
+    slope = (slope_prior / tau ** 2 + slope_ols * stt / sigma ** 2) / presisi
+    t_akhir = np.where(mask, waktu, -np.inf).max(axis=1)
+    return {
+        'level': z_rata + slope * (t_akhir - t_rata),
+        'sd_level': sigma / np.sqrt(n_aman),
+        'slope': slope,
+        'sd_slope': 1 / np.sqrt(presisi),
+        'sigma': sigma,
+        'slope_kohort': slope_prior,
+        'semester_akhir': t_akhir,
+        'jumlah_titik': n,
+    }
+
+
+def proyeksi_kohort(riwayat, horizon=HORIZON_DEFAULT, jumlah_draw=JUMLAH_DRAW_DEFAULT, semester_awal=None,
+                    geser=None, ambang=AMBANG_RISIKO, seed=0):
+    """Proyeksi seluruh kohort dalam satu panggilan.
+
+    `riwayat` adalah {kunci_siswa: {indeks_semester: [daya_serap, ...]}} (lihat
+    `riwayat_dari_baris`). Proyeksi dimulai dari `semester_awal` (default
+    semester terakhir tiap siswa) hingga `horizon` semester berikutnya. `geser`
+    (dict kunci -> poin daya serap) menggeser titik awal untuk simulasi What-If.
+
+    Mengembalikan dict: `siswa`, `persentil` {p: array (siswa × horizon+1)},
+    `kelas` {p: array (horizon+1)} untuk rata-rata kohort, `peluang_di_bawah_ambang`
+    di semester terakhir proyeksi, `jumlah_titik` dan `waktu_ms`.
+    """
+    mulai = time.perf_counter()
+    daftar_siswa = [s for s in riwayat if riwayat[s]]
+    jumlah_siswa = len(daftar_siswa)
+    hasil = {'siswa': daftar_siswa, 'horizon': horizon, 'jumlah_draw': jumlah_draw,
+             'persentil': {p: np.zeros((jumlah_siswa, horizon + 1)) for p in PERSENTIL},
+             'kelas': {p: np.zeros(horizon + 1) for p in PERSENTIL},
+             'peluang_di_bawah_ambang': np.zeros(jumlah_siswa), 'jumlah_titik': np.zeros(jumlah_siswa, dtype=int)}
+    if not jumlah_siswa:
+        hasil['waktu_ms'] = (time.perf_counter() - mulai) * 1000
+        return hasil
+
+    tren = estimasi_tren(*_matriks_riwayat(riwayat, daftar_siswa))
+    level = tren['level']
+    # Tren diteruskan dari semester terakhir tiap siswa sampai semester awal proyeksi
+    jarak = np.zeros(jumlah_siswa) if semester_awal is None else np.maximum(semester_awal - tren['semester_akhir'], 0)
+    level = level + tren['slope'] * jarak
+    if geser:
+        awal = 100 / (1 + np.exp(-level))
+        tambahan = np.array([geser.get(s, 0.0) for s in daftar_siswa])
+        level = np.where(tambahan != 0, _logit(awal + tambahan), level)
+
+    rng = np.random.default_rng(seed)
+    langkah = np.arange(horizon + 1, dtype=np.float32)
+    ukuran_chunk = max(1, MAKS_ELEMEN_CHUNK // (jumlah_draw * (horizon + 1)))
+    jumlah_kelas = np.zeros((jumlah_draw, horizon + 1), dtype=np.float64)
+
+    for a in range(0, jumlah_siswa, ukuran_chunk):
+        b = min(a + ukuran_chunk, jumlah_siswa)
+        m = b - a
+        slope = (tren['slope'][a:b, None]
+                 + tren['sd_slope'][a:b, None] * rng.standard_normal((m, jumlah_draw), dtype=np.float32))
+        awal = (level[a:b, None]
+                + tren['sd_level'][a:b, None] * rng.standard_normal((m, jumlah_draw), dtype=np.float32))
+        # Random walk antar semester (semester ini tanpa langkah acak)
+        acak = rng.standard_normal((m, jumlah_draw, horizon + 1), dtype=np.float32) * np.float32(tren['sigma'])
+        acak[:, :, 0] = 0
+        z = awal[:, :, None] + slope[:, :, None] * langkah + np.cumsum(acak, axis=2)
+        y = 100 / (1 + np.exp(-z))
+
+        for p, nilai in zip(PERSENTIL, np.percentile(y, PERSENTIL, axis=1)):
+            hasil['persentil'][p][a:b] = nilai
+        hasil['peluang_di_bawah_ambang'][a:b] = (y[:, :, -1] < ambang).mean(axis=1)
+        jumlah_kelas += y.sum(axis=0)
+
+    for p, nilai in zip(PERSENTIL, np.percentile(jumlah_kelas / jumlah_siswa, PERSENTIL, axis=0)):
+        hasil['kelas'][p] = nilai
+    hasil['jumlah_titik'] = tren['jumlah_titik']
+    hasil['slope_kohort'] = tren['slope_kohort']
+    hasil['waktu_ms'] = (time.perf_counter() - mulai) * 1000
+    return hasil
+
+
+def label_semester(horizon=HORIZON_DEFAULT):
+    return ["Semester Ini"] + [f"Semester +{h}" for h in range(1, horizon + 1)]
+
+
+def data_grafik(persentil, indeks=None):
+    """Data `buat_grafik_proyeksi` (median + pita P5-P95) untuk satu siswa, atau kohort jika `indeks` None"""
+    ambil = (lambda p: persentil[p]) if indeks is None else (lambda p: persentil[p][indeks])
+    horizon = len(ambil(50)) - 1
+    return {
+        'Semester': label_semester(horizon),
+        'Median (%)': [round(float(v), 1) for v in ambil(50)],
+        'P5 (%)': [round(float(v), 1) for v in ambil(5)],
+        'P95 (%)': [round(float(v), 1) for v in ambil(95)],
+    }
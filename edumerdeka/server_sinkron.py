@@ -0,0 +1,159 @@
+"""Server sinkronisasi pengganti (stand-in) untuk pengujian dan uji coba lokal.
+
+Mengimplementasikan protokol `POST /sync` yang dipakai `edumerdeka.sinkron`
+dengan penyimpanan SQLite, plus `GET /status` untuk melihat isi server.
+Server produksi (sekolah/dinas) cukup mengikuti kontrak yang sama.
+
+Jalankan: `python -m edumerdeka.server_sinkron --port 8765`, lalu set
+`EDUMERDEKA_SYNC_URL=http://127.0.0.1:8765` pada app Streamlit.
+"""
+import argparse
+import json
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from edumerdeka.penyimpanan import KOLOM_TABEL
+from edumerdeka.sinkron import SinkronError, VERSI_PROTOKOL, dekompres, id_entri_operasi, kompres, urutan_konflik
+
+MAKS_BATAS = 2000
+
+SKEMA_SERVER = """
+CREATE TABLE IF NOT EXISTS operasi (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op_id TEXT NOT NULL UNIQUE,
+    perangkat TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    tabel TEXT NOT NULL,
+    id_entri TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+
+class PenyimpananServer:
+    """Log operasi gabungan semua perangkat; satu koneksi dilindungi lock"""
+
+    def __init__(self, path=":memory:"):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SKEMA_SERVER)
+        # File server versi lama menyimpan kunci konflik di kolom `kunci_alami`
+        if 'kunci_alami' in {b[1] for b in self._conn.execute("PRAGMA table_info(operasi)")}:
+            self._conn.executescript("DROP INDEX IF EXISTS idx_operasi_kunci; "
+                                     "ALTER TABLE operasi RENAME COLUMN kunci_alami TO id_entri;")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_operasi_entri ON operasi (tabel, id_entri)")
+        self._lock = threading.Lock()
+
+    def terima(self, daftar_op):
+        """Menyimpan operasi baru; op_id yang sudah ada diabaikan. Mengembalikan (baru, duplikat)."""
+        baru = 0
+        with self._lock, self._conn:
+            for op_id, perangkat, ts, tabel, data in daftar_op:
+                if tabel not in KOLOM_TABEL or not isinstance(data, dict):
+                    raise SinkronError(f"Operasi tidak valid: {op_id}")
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO operasi (op_id, perangkat, ts, tabel, id_entri, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (op_id, perangkat, int(ts), tabel, id_entri_operasi(op_id, data),
+                     json.dumps(data, ensure_ascii=False, separators=(",", ":"))))
+                baru += cursor.rowcount
+        return baru, len(daftar_op) - baru
+
+    def ambil_sejak(self, cursor, kecuali_perangkat, batas):
+        """Operasi perangkat lain dengan seq > cursor: (ops, cursor baru, masih ada lagi)"""
+        with self._lock:
+            baris = self._conn.execute(
+                "SELECT seq, op_id, perangkat, ts, tabel, data FROM operasi "
+                "WHERE seq > ? AND perangkat != ? ORDER BY seq LIMIT ?",
+                (cursor, kecuali_perangkat, batas + 1)).fetchall()
+            lagi = len(baris) > batas
+            baris = baris[:batas]
+            if lagi:
+                cursor_baru = baris[-1][0]
+            else:
+                # Operasi milik pengirim sendiri tidak perlu dikirim balik; cursor langsung ke ujung log
+                cursor_baru = self._conn.execute("SELECT IFNULL(MAX(seq), 0) FROM operasi").fetchone()[0]
+        return [[b[1], b[2], b[3], b[4], json.loads(b[5])] for b in baris], max(cursor_baru, cursor), lagi
+
+    def keadaan(self, tabel):
+        """Isi akhir satu tabel setelah konflik diselesaikan (pemenang per `id_entri`)"""
+        pemenang = {}
+        with self._lock:
+            for op_id, perangkat, ts, kunci, data in self._conn.execute(
+                    "SELECT op_id, perangkat, ts, id_entri, data FROM operasi WHERE tabel = ?", (tabel,)):
+                op = [op_id, perangkat, ts, tabel, data]
+                if kunci not in pemenang or urutan_konflik(op) > urutan_konflik(pemenang[kunci]):
+                    pemenang[kunci] = op
+        return [json.loads(op[4]) for _, op in sorted(pemenang.items())]
+
+    def jumlah_operasi(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM operasi").fetchone()[0]
+
+
+class HandlerSinkron(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _balas(self, status, objek):
+        isi = kompres(objek)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(isi)))
+        self.end_headers()
+        self.wfile.write(isi)
+
+    def do_POST(self):
+        if self.path != "/sync":
+            self._balas(404, {'error': 'tidak ditemukan'})
+            return
+        try:
+            panjang = int(self.headers.get("Content-Length", 0))
+            payload = dekompres(self.rfile.read(panjang))
+            if payload.get('v') != VERSI_PROTOKOL:
+                raise SinkronError(f"Versi protokol tidak didukung: {payload.get('v')}")
+            baru, duplikat = self.server.penyimpanan.terima(payload.get('ops') or [])
+            ops, cursor, lagi = self.server.penyimpanan.ambil_sejak(
+                int(payload.get('cursor') or 0), payload['perangkat'],
+                min(int(payload.get('batas') or MAKS_BATAS), MAKS_BATAS))
+        except (SinkronError, OSError, EOFError, ValueError, KeyError, TypeError) as e:
+            self._balas(400, {'error': str(e)})
+            return
+        self._balas(200, {'diterima': baru, 'duplikat': duplikat, 'ops': ops, 'cursor': cursor, 'lagi': lagi})
+
+    def do_GET(self):
+        if self.path != "/status":
+            self._balas(404, {'error': 'tidak ditemukan'})
+            return
+        self._balas(200, {'jumlah_operasi': self.server.penyimpanan.jumlah_operasi()})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def buat_server(host="127.0.0.1", port=0, path_db=":memory:"):
+    """Server siap `serve_forever()`; port 0 memilih port bebas (lihat `server.server_address`)"""
+    server = ThreadingHTTPServer((host, port), HandlerSinkron)
+    server.penyimpanan = PenyimpananServer(path_db)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server sinkronisasi EduMerdeka (stand-in lokal)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default=":memory:", help="File SQLite server (default: di memori)")
+    args = parser.parse_args()
+
+    server = buat_server(args.host, args.port, args.db)
+    print(f"Server sinkronisasi berjalan di http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""Sinkronisasi offline-first log operasi lokal ke server sekolah/dinas.
+
+Semua penyimpanan asesmen, projek P5 dan portofolio tercatat di tabel
+`log_operasi` (append-only) dengan `op_id` unik, sehingga pengiriman ulang
+setelah koneksi putus tidak pernah menggandakan data. Satu round trip `POST
+/sync` sekaligus mengirim batch operasi lokal dan menarik operasi perangkat lain
+sejak cursor terakhir; body request dan respons dikompres gzip.
+
+Setiap entry membawa `id_entri` acak sehingga entry baru dari perangkat mana
+pun tidak pernah saling menimpa. Konflik hanya terjadi antar pembaruan
+eksplisit entry yang sama (`id_entri` sama) dan diselesaikan secara
+deterministik: operasi dengan (ts, perangkat, op_id) terbesar menang, di
+perangkat mana pun aturan itu dijalankan.
+"""
+import gzip
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from edumerdeka.penyimpanan import KOLOM_TABEL, hapus_entri
+
+VERSI_PROTOKOL = 1
+URL_SINKRON = os.environ.get("EDUMERDEKA_SYNC_URL", "")
+INTERVAL_SINKRON_S = float(os.environ.get("EDUMERDEKA_SYNC_INTERVAL_S", "60"))
+
+UKURAN_BATCH = 500
+TIMEOUT_S = 15
+MAKS_PERCOBAAN = 3
+# Batas ukuran respons setelah dekompresi
+MAKS_BYTES_PAYLOAD = 64 * 1024 * 1024
+
+META_TERKIRIM = 'sinkron_urutan_terkirim'
+META_CURSOR = 'sinkron_cursor_server'
+
+logger = logging.getLogger("edumerdeka.sinkron")
+
+
+class SinkronError(RuntimeError):
+    """Server tidak dapat dihubungi atau membalas dengan respons yang tidak valid"""
+
+
+def id_entri_operasi(op_id, data):
+    """Entry yang diubah operasi; operasi versi lama tanpa `id_entri` selalu entry baru"""
+    return data.get('id_entri') or op_id
+
+
+def urutan_konflik(op):
+    """Kunci pengurutan last-writer-wins; `op` = [op_id, perangkat, ts, tabel, data]"""
+    return (op[2], op[1], op[0])
+
+
+def kompres(objek):
+    return gzip.compress(json.dumps(objek, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def dekompres(isi):
+    with gzip.GzipFile(fileobj=io.BytesIO(isi)) as f:
+        mentah = f.read(MAKS_BYTES_PAYLOAD + 1)
+    if len(mentah) > MAKS_BYTES_PAYLOAD:
+        raise SinkronError("Payload sinkronisasi melebihi batas ukuran")
+    return json.loads(mentah)
+
+
+def operasi_tertunda(penyimpanan, batas=UKURAN_BATCH):
+    """Operasi perangkat ini yang belum dikonfirmasi server: list (urutan, op)"""
+    conn = penyimpanan.koneksi()
+    terkirim = int(penyimpanan.baca_meta(META_TERKIRIM, 0))
+    baris = conn.execute(
+        "SELECT urutan, op_id, perangkat, ts, tabel, data FROM log_operasi "
+        "WHERE urutan > ? AND perangkat = ? ORDER BY urutan LIMIT ?",
+        (terkirim, penyimpanan.id_perangkat(), batas))
+    return [(b[0], [b[1], b[2], b[3], b[4], json.loads(b[5])]) for b in baris]
+
+
+def jumlah_tertunda(penyimpanan):
+    terkirim = int(penyimpanan.baca_meta(META_TERKIRIM, 0))
+    return penyimpanan.koneksi().execute(
+        "SELECT COUNT(*) FROM log_operasi WHERE urutan > ? AND perangkat = ?",
+        (terkirim, penyimpanan.id_perangkat())).fetchone()[0]
+
+
+def terapkan_operasi(penyimpanan, daftar_op, conn):
+    """Menerapkan operasi dari perangkat lain di dalam transaksi `conn`.
+
+    Operasi yang sudah ada di log dilewati (idempoten). Operasi baru selalu
+    masuk log; datanya hanya menggantikan baris lokal ber-`id_entri` sama jika
+    operasi itu pemenang konflik. Mengembalikan dict jumlah per hasil.
+    """
+    hasil = {'diterapkan': 0, 'kalah_konflik': 0, 'duplikat': 0}
+    for op in daftar_op:
+        op_id, perangkat, ts, tabel, data = op
+        if tabel not in KOLOM_TABEL or not isinstance(data, dict):
+            raise SinkronError(f"Operasi tidak valid: {op_id}")
+        id_entri = id_entri_operasi(op_id, data)
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO log_operasi (op_id, perangkat, ts, tabel, id_entri, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (op_id, perangkat, int(ts), tabel, id_entri, json.dumps(data, ensure_ascii=False, separators=(",", ":"))))
+        if cursor.rowcount == 0:
+            hasil['duplikat'] += 1
+            continue
+        pemenang = conn.execute(
+            "SELECT op_id FROM log_operasi WHERE tabel = ? AND id_entri = ? "
+            "ORDER BY ts DESC, perangkat DESC, op_id DESC LIMIT 1", (tabel, id_entri)).fetchone()[0]
+        if pemenang != op_id:
+            hasil['kalah_konflik'] += 1
+            continue
+        hapus_entri(conn, tabel, [id_entri])
+        penyimpanan.sisipkan(conn, tabel, [{**data, 'id_entri': id_entri}])
+        hasil['diterapkan'] += 1
+    return hasil
+
+
+class KlienSinkron:
+    """Klien HTTP untuk protokol `/sync`; hanya memakai pustaka standar"""
+
+    def __init__(self, penyimpanan, url=URL_SINKRON, ukuran_batch=UKURAN_BATCH, timeout=TIMEOUT_S,
+                 maks_percobaan=MAKS_PERCOBAAN):
+        self.penyimpanan = penyimpanan
+        self.url = url.rstrip("/")
+        self.ukuran_batch = ukuran_batch
+        self.timeout = timeout
+        self.maks_percobaan = maks_percobaan
+
+    def _kirim(self, payload, statistik):
+        body = kompres(payload)
+        request = urllib.request.Request(
+            self.url + "/sync", data=body, method="POST",
+            headers={'Content-Type': 'application/json', 'Content-Encoding': 'gzip',
+                     'Accept-Encoding': 'gzip'})
+        jeda = 1.0
+        for percobaan in range(1, self.maks_percobaan + 1):
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as respons:
+                    isi = respons.read()
+                break
+            except urllib.error.HTTPError as e:
+                # Kesalahan dari sisi klien tidak akan berhasil jika diulang
+                if e.code < 500 or percobaan == self.maks_percobaan:
+                    raise SinkronError(f"Server menolak sinkronisasi (HTTP {e.code})") from e
+            except (urllib.error.URLError, OSError) as e:
+                if percobaan == self.maks_percobaan:
+                    raise SinkronError(f"Server sinkronisasi tidak dapat dihubungi: {e}") from e
+            time.sleep(jeda)
+            jeda *= 2
+
+        statistik['round_trip'] += 1
+        statistik['bytes_kirim'] += len(body)
+        statistik['bytes_terima'] += len(isi)
+        try:
+            respons = dekompres(isi)
+        except (OSError, EOFError, ValueError) as e:
+            raise SinkronError(f"Respons sinkronisasi tidak valid: {e}") from e
+        if not isinstance(respons, dict) or not isinstance(respons.get('ops'), list):
+            raise SinkronError("Respons sinkronisasi tidak valid")
+        return respons
+
+    def sinkronkan(self):
+        """Mengirim semua operasi tertunda dan menarik operasi perangkat lain.
+
+        Setiap batch dikonfirmasi server sebelum cursor lokal dimajukan, sehingga
+        sinkronisasi yang terputus aman diulang. Mengembalikan ringkasan statistik.
+        """
+        statistik = {'terkirim': 0, 'ditarik': 0, 'diterapkan': 0, 'kalah_konflik': 0, 'duplikat': 0,
+                     'round_trip': 0, 'bytes_kirim': 0, 'bytes_terima': 0}
+        mulai = time.perf_counter()
+        perangkat = self.penyimpanan.id_perangkat()
+
+        while True:
+            tertunda = operasi_tertunda(self.penyimpanan, self.ukuran_batch)
+            respons = self._kirim({
+                'v': VERSI_PROTOKOL,
+                'perangkat': perangkat,
+                'cursor': int(self.penyimpanan.baca_meta(META_CURSOR, 0)),
+                'batas': self.ukuran_batch,
+                'ops': [op for _, op in tertunda],
+            }, statistik)
+
+            with self.penyimpanan.transaksi() as conn:
+                if tertunda:
+                    self.penyimpanan.tulis_meta(META_TERKIRIM, tertunda[-1][0], conn=conn)
+                hasil = terapkan_operasi(self.penyimpanan, respons['ops'], conn)
+                self.penyimpanan.tulis_meta(META_CURSOR, int(respons['cursor']), conn=conn)
+
+            statistik['terkirim'] += len(tertunda)
+            statistik['ditarik'] += len(respons['ops'])
+            for kunci, jumlah in hasil.items():
+                statistik[kunci] += jumlah
+            if len(tertunda) < self.ukuran_batch and not respons.get('lagi'):
+                break
+
+        statistik['durasi_ms'] = (time.perf_counter() - mulai) * 1000
+        return statistik
+
+
+class SinkronOtomatis:
+    """Menjalankan sinkronisasi di thread latar paling sering sekali per `interval` detik"""
+
+    def __init__(self, klien, interval=INTERVAL_SINKRON_S):
+        self.klien = klien
+        self.interval = interval
+        self.hasil_terakhir = None
+        self.error_terakhir = None
+        self.waktu_terakhir = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def sedang_berjalan(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def picu(self, paksa=False):
+        """Memulai sinkronisasi latar jika interval sudah lewat; mengembalikan True jika dimulai"""
+        with self._lock:
+            if self.sedang_berjalan():
+                return False
+            if not paksa and self.waktu_terakhir is not None and time.time() - self.waktu_terakhir < self.interval:
+                return False
+            self.waktu_terakhir = time.time()
+            self._thread = threading.Thread(target=self._jalankan, name="edumerdeka-sinkron", daemon=True)
+            self._thread.start()
+            return True
+
+    def _jalankan(self):
+        try:
+            self.hasil_terakhir = self.klien.sinkronkan()
+            self.error_terakhir = None
+        except (SinkronError, ValueError) as e:
+            # Offline adalah kondisi normal; dicoba lagi pada interval berikutnya
+            self.error_terakhir = str(e)
+        except (sqlite3.Error, OSError) as e:
+            # Database lokal sibuk/terkunci atau disk penuh: dicatat, sinkronisasi dicoba lagi pada interval berikutnya
+            logger.warning("Sinkronisasi latar gagal: %s", e)
+            self.error_terakhir = f"Database lokal tidak dapat diakses: {e}"
+        finally:
+            self.klien.penyimpanan.tutup()
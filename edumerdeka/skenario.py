@@ -0,0 +1,117 @@
+"""Sweep skenario What-If untuk seluruh kelas dalam satu komputasi NumPy.
+
+Setiap skenario adalah kombinasi perubahan daya serap, perubahan minat dan jam
+belajar tambahan per minggu. Daya serap prediksi semua siswa × skenario
+dihitung sekaligus lewat broadcasting array berbentuk (siswa, Δ daya serap,
+Δ minat, jam), lalu dipetakan ke band Bloom yang sama dengan optimasi kohort
+(`BATAS_BAND_BLOOM`). Hasilnya adalah perubahan level Bloom per siswa per
+skenario dan ringkasan per skenario untuk heatmap.
+
+Efek jam tambahan memakai laju dan hasil menurun per jam dari model optimasi
+(`LAJU_KOGNITIF`, `SEGMEN_JAM`); minat menggeser daya serap secara linear dan
+menentukan seberapa efektif jam tambahan.
+"""
+import time
+
+import numpy as np
+
+from edumerdeka.optimasi import BATAS_BAND_BLOOM, LAJU_KOGNITIF, SEGMEN_JAM
+
+DELTA_SERAP_DEFAULT = tuple(range(-30, 35, 5))
+DELTA_MINAT_DEFAULT = tuple(range(-30, 40, 10))
+JAM_TAMBAHAN_DEFAULT = (0, 1, 2, 3, 4)
+
+# Poin daya serap per poin perubahan minat
+KOEF_MINAT = 0.15
+MINAT_DEFAULT = 75
+# Efektivitas jam tambahan minimal saat minat sangat rendah
+FAKTOR_MINAT_MIN = 0.2
+
+LEVEL_BLOOM = ("C1", "C2", "C3", "C4", "C5", "C6")
+
+# Kumulatif faktor SEGMEN_JAM: jam ke-1 penuh, jam berikutnya menurun, di atas 3 jam datar
+_JAM_KURVA = np.arange(len(SEGMEN_JAM) + 1, dtype=float)
+_HASIL_KURVA = np.concatenate([[0.0], np.cumsum(SEGMEN_JAM)])
+
+# Metrik ringkasan yang dapat digambar sebagai heatmap
+METRIK_SKENARIO = {
+    'rata_perubahan': "Rata-rata perubahan level Bloom",
+    'persen_naik': "% siswa naik level",
+    'persen_turun': "% siswa turun level",
+    'rata_daya_serap': "Rata-rata daya serap prediksi (%)",
+}
+
+
+def band_bloom(daya_serap):
+    """Indeks level Bloom (0 = C1 ... 5 = C6) dari daya serap, versi vektor"""
+    return np.searchsorted(BATAS_BAND_BLOOM, daya_serap, side='right')
+
+
+def prediksi_daya_serap(daya_serap, minat, delta_serap, delta_minat, jam_tambahan):
+    """Daya serap prediksi, di-broadcast dari semua argumen (array atau skalar), dibatasi 0-100"""
+    daya_serap = np.asarray(daya_serap, dtype=float)
+    minat_baru = np.asarray(minat, dtype=float) + delta_minat
+    gap = (100 - daya_serap) / 100
+    efektivitas = np.clip(minat_baru / 100, FAKTOR_MINAT_MIN, 1.0)
+    efek_jam = LAJU_KOGNITIF * gap * np.interp(jam_tambahan, _JAM_KURVA, _HASIL_KURVA) * efektivitas
+    return np.clip(daya_serap + delta_serap + KOEF_MINAT * np.asarray(delta_minat, dtype=float) + efek_jam, 0, 100)
+
+
+def sweep_kelas(daya_serap, minat=MINAT_DEFAULT, delta_serap=DELTA_SERAP_DEFAULT, delta_minat=DELTA_MINAT_DEFAULT,
+                jam_tambahan=JAM_TAMBAHAN_DEFAULT):
+    """Semua skenario untuk semua siswa dalam satu panggilan.
+
+    `daya_serap` dan `minat` berupa array per siswa (minat boleh skalar).
+    Mengembalikan dict berisi sumbu grid (`delta_serap`, `delta_minat`,
+    `jam_tambahan`), `level_awal` per siswa, `transisi` (int8, siswa × Δ serap ×
+    Δ minat × jam), ringkasan per skenario untuk setiap `METRIK_SKENARIO`
+    (array Δ serap × Δ minat × jam), `jumlah_skenario` dan `waktu_ms`.
+    """
+    mulai = time.perf_counter()
+    daya_serap = np.asarray(daya_serap, dtype=float)
+    minat = np.broadcast_to(np.asarray(minat, dtype=float), daya_serap.shape)
+    sumbu = {
+        'delta_serap': np.asarray(delta_serap, dtype=float),
+        'delta_minat': np.asarray(delta_minat, dtype=float),
+        'jam_tambahan': np.asarray(jam_tambahan, dtype=float),
+    }
+    level_awal = band_bloom(daya_serap)
+    prediksi = prediksi_daya_serap(daya_serap[:, None, None, None], minat[:, None, None, None],
+                                   sumbu['delta_serap'][None, :, None, None],
+                                   sumbu['delta_minat'][None, None, :, None],
+                                   sumbu['jam_tambahan'][None, None, None, :])
+    transisi = (band_bloom(prediksi) - level_awal[:, None, None, None]).astype(np.int8)
+
+    jumlah_siswa = max(len(daya_serap), 1)
+    return {
+        **sumbu,
+        'level_awal': level_awal,
+        'transisi': transisi,
+        'rata_perubahan': transisi.sum(axis=0) / jumlah_siswa,
+        'persen_naik': (transisi > 0).sum(axis=0) / jumlah_siswa * 100,
+        'persen_turun': (transisi < 0).sum(axis=0) / jumlah_siswa * 100,
+        'rata_daya_serap': prediksi.sum(axis=0) / jumlah_siswa,
+        'jumlah_siswa': len(daya_serap),
+        'jumlah_skenario': int(np.prod(transisi.shape[1:])),
+        'waktu_ms': (time.perf_counter() - mulai) * 1000,
+    }
+
+
+def data_heatmap(hasil, metrik='rata_perubahan', jam_tambahan=0):
+    """Data `buat_heatmap_skenario` untuk satu nilai jam tambahan: kolom pertama Δ daya serap,
+    satu kolom per Δ minat"""
+    j = int(np.argmin(np.abs(hasil['jam_tambahan'] - jam_tambahan)))
+    nilai = hasil[metrik][:, :, j]
+    data = {'Δ Daya Serap': [f"{d:+g}" for d in hasil['delta_serap']]}
+    for k, delta in enumerate(hasil['delta_minat']):
+        data[f"Δ Minat {delta:+g}"] = [round(float(v), 2) for v in nilai[:, k]]
+    return data
+
+
+def matriks_transisi(hasil, i_serap, i_minat, i_jam):
+    """Jumlah siswa per (level awal, level prediksi) untuk satu skenario, matriks 6 × 6"""
+    awal = hasil['level_awal']
+    akhir = awal + hasil['transisi'][:, i_serap, i_minat, i_jam]
+    matriks = np.zeros((len(LEVEL_BLOOM), len(LEVEL_BLOOM)), dtype=int)
+    np.add.at(matriks, (awal, akhir), 1)
+    return matriks
@@ -0,0 +1,245 @@
+"""Format snapshot sesi yang ringkas, berversi dan aman dimuat dari file tak dipercaya.
+
+Struktur file: 4 byte magic `EDMS`, 1 byte versi format, 1 byte kompresi
+(1 = zlib, 2 = zstd), lalu payload JSON terkompresi. Payload hanya berisi tipe
+JSON sehingga memuat file tidak pernah mengeksekusi kode (berbeda dengan pickle).
+
+Snapshot delta hanya menyimpan bagian yang berubah sejak snapshot basis,
+dirujuk lewat hash isi basis. Entry portofolio yang hanya bertambah disimpan
+sebagai tambahan di ujung list saja.
+"""
+import hashlib
+import json
+import zlib
+
+MAGIC = b"EDMS"
+VERSI_FORMAT = 1
+SKEMA = "edumerdeka.sesi"
+
+KOMPRESI_ZLIB = 1
+KOMPRESI_ZSTD = 2
+
+# Batas ukuran hasil dekompresi untuk mencegah zip bomb
+MAKS_BYTES_PAYLOAD = 64 * 1024 * 1024
+
+KUNCI_SESI = ('data_siswa', 'hasil_asesmen', 'portofolio', 'projek_p5')
+
+
+class SnapshotError(ValueError):
+    """File snapshot rusak, tidak dikenal, atau tidak cocok dengan basisnya"""
+
+
+def _angka(nilai):
+    return isinstance(nilai, (int, float)) and not isinstance(nilai, bool)
+
+
+def _teks(nilai):
+    return isinstance(nilai, str)
+
+
+def _daftar_teks(nilai):
+    return isinstance(nilai, list) and all(isinstance(v, str) for v in nilai)
+
+
+def _skor_dimensi(nilai):
+    return isinstance(nilai, dict) and all(_angka(v) for v in nilai.values())
+
+
+def _skalar(nilai):
+    return nilai is None or isinstance(nilai, (str, int, float, bool))
+
+
+# (kunci wajib, kunci opsional yang boleh null) beserta validator nilainya, sesuai data yang ditulis app;
+# bagian kosong ({}) selalu valid dan kunci lain dibiarkan agar snapshot versi baru tetap terbaca
+SKEMA_BAGIAN = {
+    'hasil_asesmen': ({'daya_serap': _angka},
+                      {'nama_siswa': _teks, 'jumlah_soal': _angka, 'tp_dikuasai': _angka,
+                       'jawaban_benar_persen': _angka, 'rekomendasi_bloom': _teks, 'tanggal': _teks}),
+    'projek_p5': ({'nama_projek': _teks, 'dimensi_scores': _skor_dimensi, 'skor_karakter': _angka},
+                  {'tema': _teks, 'mata_pelajaran': _daftar_teks, 'durasi': _angka, 'progress': _angka,
+                   'jurnal': _teks, 'tanggal': _teks}),
+}
+SKEMA_ENTRY_PORTOFOLIO = ({'tanggal': _teks, 'periode': _teks, 'narasi': _teks, 'kompetensi': _daftar_teks,
+                           'karya': lambda nilai: nilai is None or _teks(nilai)},
+                          {'karya_hash': _teks})
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def _kanonik(data):
+    return json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def hash_data(data):
+    """Hash isi sesi, dipakai untuk menautkan snapshot delta ke basisnya"""
+    return hashlib.sha256(_kanonik(data).encode("utf-8")).hexdigest()
+
+
+def normalisasi_data(data):
+    """Data sesi dalam bentuk JSON murni (tuple menjadi list, tipe lain menjadi str)"""
+    return json.loads(_kanonik({k: data.get(k) or {} for k in KUNCI_SESI}))
+
+
+def hitung_delta(basis, data):
+    """Perubahan dari `basis` ke `data` per kunci sesi"""
+    delta = {'ganti': {}, 'tambah_portofolio': {}}
+    for kunci in KUNCI_SESI:
+        lama, baru = basis.get(kunci) or {}, data.get(kunci) or {}
+        if kunci == 'portofolio':
+            ganti = {}
+            for nama, entries in baru.items():
+                entries_lama = lama.get(nama, [])
+                if entries[:len(entries_lama)] == entries_lama:
+                    if len(entries) > len(entries_lama):
+                        delta['tambah_portofolio'][nama] = entries[len(entries_lama):]
+                else:
+                    ganti[nama] = entries
+            hapus = [nama for nama in lama if nama not in baru]
+            if ganti or hapus:
+                delta['ganti']['portofolio'] = {'ganti': ganti, 'hapus': hapus}
+        elif lama != baru:
+            delta['ganti'][kunci] = baru
+    return delta
+
+
+def terapkan_delta(basis, delta):
+    data = {k: basis.get(k) or {} for k in KUNCI_SESI}
+    for kunci, nilai in delta['ganti'].items():
+        if kunci == 'portofolio':
+            portofolio = dict(data['portofolio'])
+            for nama in nilai['hapus']:
+                portofolio.pop(nama, None)
+            portofolio.update(nilai['ganti'])
+            data['portofolio'] = portofolio
+        else:
+            data[kunci] = nilai
+    if delta['tambah_portofolio']:
+        portofolio = dict(data['portofolio'])
+        for nama, entries in delta['tambah_portofolio'].items():
+            portofolio[nama] = list(portofolio.get(nama, [])) + entries
+        data['portofolio'] = portofolio
+    return data
+
+
+def buat_snapshot(data, basis=None, timestamp=None, kompresi=None):
+    """Menyusun bytes snapshot. Jika `basis` diberikan, hasilnya snapshot delta."""
+    data = normalisasi_data(data)
+    payload = {'skema': SKEMA, 'versi': VERSI_FORMAT, 'timestamp': timestamp}
+    if basis is None:
+        payload.update(jenis='penuh', data=data)
+    else:
+        basis = normalisasi_data(basis)
+        payload.update(jenis='delta', basis=hash_data(basis), delta=hitung_delta(basis, data))
+    mentah = _kanonik(payload).encode("utf-8")
+
+    zstd = _zstd()
+    if kompresi is None:
+        kompresi = KOMPRESI_ZSTD if zstd else KOMPRESI_ZLIB
+    if kompresi == KOMPRESI_ZSTD:
+        if zstd is None:
+            raise SnapshotError("Kompresi zstd membutuhkan paket zstandard")
+        isi = zstd.ZstdCompressor(level=10).compress(mentah)
+    else:
+        isi = zlib.compress(mentah, 9)
+    return MAGIC + bytes([VERSI_FORMAT, kompresi]) + isi
+
+
+def _dekompresi(kompresi, isi):
+    if kompresi == KOMPRESI_ZLIB:
+        d = zlib.decompressobj()
+        mentah = d.decompress(isi, MAKS_BYTES_PAYLOAD)
+        if d.unconsumed_tail:
+            raise SnapshotError("Snapshot melebihi batas ukuran")
+        return mentah
+    if kompresi == KOMPRESI_ZSTD:
+        zstd = _zstd()
+        if zstd is None:
+            raise SnapshotError("Snapshot memakai kompresi zstd; install paket zstandard untuk membukanya")
+        try:
+            return zstd.ZstdDecompressor().decompress(isi, max_output_size=MAKS_BYTES_PAYLOAD)
+        except zstd.ZstdError as e:
+            raise SnapshotError(f"Snapshot rusak: {e}") from e
+    raise SnapshotError(f"Jenis kompresi tidak dikenal: {kompresi}")
+
+
+def _masalah_isi(isi, skema):
+    """Alasan pertama `isi` tidak sesuai skema (kunci wajib, kunci opsional), None jika valid"""
+    wajib, opsional = skema
+    for kunci, valid in wajib.items():
+        if kunci not in isi:
+            return f"kunci '{kunci}' wajib ada"
+        if not valid(isi[kunci]):
+            return f"nilai '{kunci}' bertipe salah"
+    for kunci, valid in opsional.items():
+        if isi.get(kunci) is not None and not valid(isi[kunci]):
+            return f"nilai '{kunci}' bertipe salah"
+    return None
+
+
+def _validasi_data(data):
+    if not isinstance(data, dict):
+        raise SnapshotError("Isi snapshot tidak valid")
+    for kunci in KUNCI_SESI:
+        isi = data.get(kunci, {})
+        if not isinstance(isi, dict):
+            raise SnapshotError(f"Bagian '{kunci}' pada snapshot tidak valid")
+        if isi and kunci in SKEMA_BAGIAN:
+            masalah = _masalah_isi(isi, SKEMA_BAGIAN[kunci])
+            if masalah:
+                raise SnapshotError(f"Bagian '{kunci}' pada snapshot tidak valid: {masalah}")
+    for kunci, nilai in data.get('data_siswa', {}).items():
+        if not _skalar(nilai):
+            raise SnapshotError(f"Bagian 'data_siswa' pada snapshot tidak valid: nilai '{kunci}' bertipe salah")
+    for nama, entries in data.get('portofolio', {}).items():
+        if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+            raise SnapshotError(f"Portofolio '{nama}' pada snapshot tidak valid")
+        for i, entry in enumerate(entries, start=1):
+            masalah = _masalah_isi(entry, SKEMA_ENTRY_PORTOFOLIO)
+            if masalah:
+                raise SnapshotError(f"Portofolio '{nama}' entry {i} pada snapshot tidak valid: {masalah}")
+    return {k: data.get(k, {}) for k in KUNCI_SESI}
+
+
+def baca_snapshot(isi_file, basis=None):
+    """Membaca bytes snapshot dan mengembalikan (data_sesi, payload).
+
+    Snapshot delta membutuhkan `basis` berupa data sesi yang hash-nya sama
+    dengan basis saat delta dibuat.
+    """
+    if len(isi_file) < 6 or isi_file[:4] != MAGIC:
+        raise SnapshotError("Bukan file snapshot EduMerdeka")
+    versi, kompresi = isi_file[4], isi_file[5]
+    if versi > VERSI_FORMAT:
+        raise SnapshotError(f"Versi snapshot {versi} lebih baru dari yang didukung ({VERSI_FORMAT})")
+
+    try:
+        payload = json.loads(_dekompresi(kompresi, isi_file[6:]))
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise SnapshotError(f"Snapshot rusak: {e}") from e
+    if not isinstance(payload, dict) or payload.get('skema') != SKEMA:
+        raise SnapshotError("Skema snapshot tidak dikenal")
+
+    if payload.get('jenis') == 'penuh':
+        return _validasi_data(payload.get('data')), payload
+    if payload.get('jenis') == 'delta':
+        if basis is None:
+            raise SnapshotError("Snapshot delta membutuhkan snapshot basisnya dimuat terlebih dahulu")
+        basis = normalisasi_data(basis)
+        if hash_data(basis) != payload.get('basis'):
+            raise SnapshotError("Snapshot delta tidak cocok dengan data sesi saat ini")
+        delta = payload.get('delta')
+        if (not isinstance(delta, dict) or not isinstance(delta.get('ganti'), dict)
+                or not isinstance(delta.get('tambah_portofolio'), dict)):
+            raise SnapshotError("Isi snapshot delta tidak valid")
+        try:
+            data = terapkan_delta(basis, delta)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise SnapshotError("Isi snapshot delta tidak valid") from e
+        return _validasi_data(data), payload
+    raise SnapshotError("Jenis snapshot tidak dikenal")
@@ -0,0 +1,60 @@
+"""Pengukuran waktu cold start dan render terhadap budget yang bisa dikonfigurasi.
+
+Modul ini sengaja tidak mengimpor dependency berat apa pun; state-nya hidup selama
+proses server karena modul Python hanya dimuat sekali, sementara script Streamlit
+dijalankan ulang di setiap rerun.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger("edumerdeka.startup")
+
+BUDGET_COLD_START_MS = float(os.environ.get("EDUMERDEKA_BUDGET_COLD_START_MS", "1500"))
+BUDGET_RENDER_MS = float(os.environ.get("EDUMERDEKA_BUDGET_RENDER_MS", "500"))
+
+# Dependency berat yang dimuat lazy; dicatat kapan pertama kali masuk sys.modules
+MODUL_BERAT = ("numpy", "pandas", "matplotlib", "PIL", "fpdf", "pulp", "openpyxl")
+
+_kunci = threading.Lock()
+_laporan = {
+    'cold_start_ms': None,
+    'render_terakhir_ms': None,
+    'jumlah_run': 0,
+    'modul_saat_cold_start': [],
+}
+
+
+def modul_berat_termuat():
+    return [nama for nama in MODUL_BERAT if nama in sys.modules]
+
+
+def catat_run(waktu_mulai):
+    """Mencatat durasi satu run script; run pertama di proses dilaporkan sebagai cold start"""
+    durasi_ms = (time.perf_counter() - waktu_mulai) * 1000
+    with _kunci:
+        _laporan['jumlah_run'] += 1
+        _laporan['render_terakhir_ms'] = durasi_ms
+        pertama = _laporan['cold_start_ms'] is None
+        if pertama:
+            _laporan['cold_start_ms'] = durasi_ms
+            _laporan['modul_saat_cold_start'] = modul_berat_termuat()
+
+    if pertama:
+        dalam_budget = durasi_ms <= BUDGET_COLD_START_MS
+        logger.log(
+            logging.INFO if dalam_budget else logging.WARNING,
+            "Cold start render %.0f ms (budget %.0f ms, %s); modul berat termuat: %s",
+            durasi_ms, BUDGET_COLD_START_MS, "OK" if dalam_budget else "MELEBIHI BUDGET",
+            ", ".join(_laporan['modul_saat_cold_start']) or "-",
+        )
+    elif durasi_ms > BUDGET_RENDER_MS:
+        logger.warning("Render %.0f ms melebihi budget %.0f ms", durasi_ms, BUDGET_RENDER_MS)
+    return durasi_ms
+
+
+def laporan_startup():
+    with _kunci:
+        return dict(_laporan, budget_cold_start_ms=BUDGET_COLD_START_MS, budget_render_ms=BUDGET_RENDER_MS)
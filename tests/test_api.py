@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from edumerdeka.api import ApiError, PoolPenyimpanan, proses_bulk_asesmen, proses_bulk_p5
+from edumerdeka.penyimpanan import PenyimpananSQLite
+
+KONTEKS = {'kelas': '7A', 'tahun_ajaran': '2025/2026', 'semester': 'Ganjil'}
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = PoolPenyimpanan(PenyimpananSQLite(str(tmp_path / "api.db")), ukuran=1, ukuran_stream=1)
+    yield pool
+    pool.tutup()
+
+
+def _body(**payload):
+    return json.dumps({**KONTEKS, **payload}).encode()
+
+
+def _projek(**kolom):
+    return {'nama_siswa': 'A', 'nama_projek': 'Kebun', 'dimensi_scores': {'Mandiri': 8}, **kolom}
+
+
+def test_p5_menghitung_baris_tersimpan(pool):
+    hasil = proses_bulk_p5(pool, _body(projek=[_projek(), _projek(durasi=10, progress=50, tema=2025)]))
+    assert hasil['disimpan'] == 2
+    assert pool.penyimpanan.jumlah_baris('projek_p5') == 2
+
+
+@pytest.mark.parametrize("kolom, nilai", [
+    ('durasi', {'jam': 4}), ('durasi', -1), ('durasi', 2.5), ('progress', 150), ('progress', "50"),
+    ('tanggal', {'hari': 1}), ('nama_projek', ['a']), ('tema', {'x': 1}), ('kelas', [7]),
+    ('mata_pelajaran', "IPA"),
+])
+def test_p5_kolom_skalar_tidak_valid(pool, kolom, nilai):
+    with pytest.raises(ApiError, match=r"\(baris 1\)") as e:
+        proses_bulk_p5(pool, _body(projek=[_projek(), _projek(**{kolom: nilai})]))
+    assert e.value.status == 400
+    assert pool.penyimpanan.jumlah_baris('projek_p5') == 0
+
+
+@pytest.mark.parametrize("tp_dikuasai", [11, -1, 2.5])
+def test_asesmen_tp_dikuasai_di_luar_rentang(pool, tp_dikuasai):
+    asesmen = [{'nama_siswa': 'A', 'jumlah_soal': 10, 'jawaban_benar_persen': 80},
+               {'nama_siswa': 'B', 'jumlah_soal': 10, 'jawaban_benar_persen': 80, 'tp_dikuasai': tp_dikuasai}]
+    with pytest.raises(ApiError, match=r"tp_dikuasai.*\[1\]"):
+        proses_bulk_asesmen(pool, _body(asesmen=asesmen))
+
+
+def test_asesmen_tp_dikuasai_opsional_per_baris(pool):
+    asesmen = [{'nama_siswa': 'A', 'jumlah_soal': 10, 'jawaban_benar_persen': 80},
+               {'nama_siswa': 'A', 'jumlah_soal': 10, 'jawaban_benar_persen': 80, 'tp_dikuasai': 10}]
+    hasil = proses_bulk_asesmen(pool, _body(asesmen=asesmen), detail=True)
+    assert hasil['disimpan'] == 2
+    assert [h['daya_serap'] for h in hasil['hasil']][1] == 100
+    assert all(0 <= h['daya_serap'] <= 100 for h in hasil['hasil'])
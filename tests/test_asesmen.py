@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from edumerdeka.asesmen import proses_asesmen_kelas, skor_matriks_jawaban
+
+
+@pytest.fixture
+def df_soal():
+    return pd.DataFrame({'nomor': [1, 2, 3], 'soal': ['a', 'b', 'c'], 'tingkat_bloom': ['C1', 'C2', 'C3'],
+                         'jawaban_benar': ['2', '4', '1']})
+
+
+def _daya_serap(hasil):
+    return dict(zip(hasil['nama_siswa'], hasil['daya_serap'].round(1)))
+
+
+def test_kode_opsi_angka_dibandingkan_dengan_kunci(df_soal):
+    jawaban = pd.DataFrame({'nama_siswa': ['A', 'B', 'C'], '1': [2, 1, np.nan], '2': [4, 4, 3], '3': [1, 2, 1]})
+    assert _daya_serap(proses_asesmen_kelas(jawaban, df_soal)) == {'A': 100.0, 'B': 33.3, 'C': 33.3}
+
+
+def test_matriks_sudah_diskor(df_soal):
+    jawaban = pd.DataFrame({'nama_siswa': ['A', 'B'], '1': [1, 0], '2': [True, False], '3': [1, 1]})
+    assert _daya_serap(proses_asesmen_kelas(jawaban, df_soal, sudah_diskor=True)) == {'A': 100.0, 'B': 33.3}
+    # Tanpa kunci di bank soal, matriks 1/0 dipakai apa adanya
+    tanpa_kunci = df_soal.drop(columns='jawaban_benar')
+    assert _daya_serap(proses_asesmen_kelas(jawaban, tanpa_kunci)) == {'A': 100.0, 'B': 33.3}
+
+
+def test_matriks_tanpa_kunci_harus_1_0(df_soal):
+    jawaban = pd.DataFrame({'nama_siswa': ['A'], '1': [2], '2': [4], '3': [1]})
+    with pytest.raises(ValueError, match="sudah diskor"):
+        proses_asesmen_kelas(jawaban, df_soal.drop(columns='jawaban_benar'))
+    with pytest.raises(ValueError, match="sudah diskor"):
+        proses_asesmen_kelas(jawaban, df_soal, sudah_diskor=True)
+    with pytest.raises(ValueError, match="jawaban_benar"):
+        proses_asesmen_kelas(jawaban, df_soal.assign(jawaban_benar=None), sudah_diskor=False)
+
+
+def test_skor_huruf_tidak_peka_spasi_dan_kapital():
+    benar = skor_matriks_jawaban(pd.DataFrame({'1': [' a', 'B', None]}), ['A'])
+    assert benar[:, 0].tolist() == [True, False, False]
@@ -0,0 +1,67 @@
+from edumerdeka import bandwidth
+from edumerdeka.bandwidth import PengukurPayload, pasang_pengukur, pengukur_aktif, ukur_fragment
+
+
+class Pesan:
+    def __init__(self, ukuran):
+        self.ukuran = ukuran
+
+    def ByteSize(self):
+        return self.ukuran
+
+
+class Konteks:
+    """Pengganti ScriptRunContext: hanya pengirim pesan dan fragment rerun ini"""
+
+    def __init__(self, fragment_ids_this_run=None):
+        self.terkirim = []
+        self._enqueue = self.terkirim.append
+        self.fragment_ids_this_run = fragment_ids_this_run
+
+
+def test_pesan_dihitung_ke_pengukur_aktif():
+    ctx = Konteks()
+    pertama, kedua = PengukurPayload(), PengukurPayload()
+    assert pasang_pengukur(ctx, pertama)
+    ctx._enqueue(Pesan(100))
+    # Rerun berikutnya: pengirim tidak dibungkus dua kali
+    assert pasang_pengukur(ctx, kedua)
+    ctx._enqueue(Pesan(40))
+    assert (pertama.bytes_pesan, kedua.bytes_pesan, kedua.jumlah_pesan) == (100, 40, 1)
+    assert len(ctx.terkirim) == 2
+
+
+def test_rerun_fragment_diukur_terpisah():
+    ctx = Konteks()
+    penuh = PengukurPayload()
+    pasang_pengukur(ctx, penuh)
+    with ukur_fragment(ctx, "tab_asesmen") as pengukur:
+        assert pengukur is None
+        ctx._enqueue(Pesan(10))
+    assert penuh.bytes_pesan == 10
+
+    ctx.fragment_ids_this_run = ["abc"]
+    with ukur_fragment(ctx, "tab_asesmen", mode_hemat=True) as pengukur:
+        ctx._enqueue(Pesan(25))
+        pengukur_aktif(ctx).catat_media(5)
+    assert penuh.bytes_pesan == 10
+    assert pengukur.ringkasan()['total_bytes'] == 30
+    assert pengukur.ringkasan()['jenis'] == "fragment tab_asesmen" and pengukur.mode_hemat
+    assert pengukur_aktif(ctx) is None
+
+
+def test_versi_streamlit_tidak_didukung(monkeypatch):
+    monkeypatch.setattr(bandwidth, "VERSI_STREAMLIT_DIDUKUNG", ((0, 1), (0, 2)))
+    ctx = Konteks()
+    pengukur = PengukurPayload()
+    assert not pasang_pengukur(ctx, pengukur)
+    ctx._enqueue(Pesan(100))
+    pengukur_aktif(ctx).catat_media(7)
+    assert pengukur.ringkasan()['pesan_terukur'] is False
+    assert pengukur.total_bytes == 7
+
+
+def test_tanpa_context():
+    assert not pasang_pengukur(None, PengukurPayload())
+    with ukur_fragment(None, "x") as pengukur:
+        assert pengukur is None
@@ -0,0 +1,82 @@
+import pytest
+
+from edumerdeka import bank_soal
+from edumerdeka.bank_soal import BankSoalError, muat_bank_soal, parse_bank_soal
+
+CSV = (
+    "nomor,soal,tingkat_bloom,jawaban_benar,a,b\n"
+    "1,Soal satu,C1,A,1.2,-0.5\n"
+    "2,Soal dua,c2,B,0.8,0.1\n"
+    "1,Nomor ganda,C3,C,1.0,0.0\n"
+    "3,Bloom salah,C9,D,1.0,0.0\n"
+    "4,Parameter rusak,C4,A,x,0.3\n"
+    "5,Kolom kurang,C5\n"
+    "6,Soal enam,C6 (Mencipta),B,1.5,1.0\n"
+).encode()
+
+
+@pytest.mark.parametrize("ukuran_chunk", [2, bank_soal.UKURAN_CHUNK])
+def test_baris_rusak_dilaporkan_dengan_nomor_baris(ukuran_chunk):
+    pytest.importorskip("pyarrow")
+    hasil = parse_bank_soal(CSV, ukuran_chunk=ukuran_chunk)
+    assert hasil['df']['nomor'].tolist() == [1, 2, 6]
+    assert hasil['df']['tingkat_bloom'].tolist() == ['C1', 'C2', 'C6']
+    assert hasil['jumlah_baris'] == 7
+    assert hasil['jumlah_error'] == 4
+    assert hasil['error'] == [[4, "nomor duplikat"], [5, "tingkat_bloom bukan C1-C6"], [6, "a bukan angka"],
+                              [7, "jumlah kolom tidak sesuai header"]]
+
+
+def test_kolom_wajib_hilang():
+    with pytest.raises(BankSoalError, match="jawaban_benar"):
+        parse_bank_soal(b"nomor,soal,tingkat_bloom\n1,Soal,C1\n")
+
+
+def test_tanpa_soal_valid():
+    with pytest.raises(BankSoalError, match="baris 2"):
+        parse_bank_soal(b"nomor,soal,tingkat_bloom,jawaban_benar\n0,Soal,C1,A\n")
+
+
+def test_cache_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    pertama = muat_bank_soal(CSV, direktori_cache=str(tmp_path))
+    kedua = muat_bank_soal(CSV, direktori_cache=str(tmp_path))
+    assert not pertama['dari_cache'] and kedua['dari_cache']
+    assert kedua['df'].equals(pertama['df'])
+    assert kedua['error'] == [list(e) for e in pertama['error']]
+
+
+def test_tanpa_pyarrow(monkeypatch):
+    monkeypatch.setattr(bank_soal, "_pyarrow", lambda: None)
+    hasil = parse_bank_soal(CSV + b"7,Kolom lebih,C2,A,1.0,0.0,ekstra\n", ukuran_chunk=3)
+    assert hasil['mesin'] == 'csv'
+    assert hasil['df']['nomor'].tolist() == [1, 2, 6]
+    assert hasil['jumlah_baris'] == 8
+    assert hasil['error'] == [[4, "nomor duplikat"], [5, "tingkat_bloom bukan C1-C6"], [6, "a bukan angka"],
+                              [7, "jumlah kolom tidak sesuai header"], [9, "jumlah kolom tidak sesuai header"]]
+
+
+CSV_BARIS_KOSONG = (
+    "nomor,soal,tingkat_bloom,jawaban_benar\n"
+    "1,Soal satu,C1,A\n"
+    "\n"
+    "2,Kolom kurang,C2\n"
+    '3,"Soal\nmulti\nbaris",C3,B\n'
+    "4,Bloom salah,C9,A\n"
+    "5,Kolom lebih,C1,A,x\n"
+    "\n\n"
+    "6,Soal enam,C2,A\n"
+    "0,Nomor nol,C2,A\n"
+).encode()
+
+
+@pytest.mark.parametrize("mesin", ["pyarrow", "csv"])
+def test_nomor_baris_file_dengan_baris_kosong_dan_multi_baris(monkeypatch, mesin):
+    if mesin == "pyarrow":
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr(bank_soal, "_pyarrow", lambda: None)
+    hasil = parse_bank_soal(CSV_BARIS_KOSONG, ukuran_chunk=2)
+    assert hasil['df']['soal'].tolist() == ["Soal satu", "Soal\nmulti\nbaris", "Soal enam"]
+    assert hasil['error'] == [[4, "jumlah kolom tidak sesuai header"], [8, "tingkat_bloom bukan C1-C6"],
+                              [9, "jumlah kolom tidak sesuai header"], [13, "nomor bukan bilangan bulat positif"]]
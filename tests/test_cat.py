@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from edumerdeka.cat import BankItemIRT, SesiCAT
+
+
+@pytest.fixture
+def bank():
+    return BankItemIRT(np.ones(20), np.linspace(-2, 2, 20))
+
+
+def test_item_tidak_bisa_dijawab_dua_kali(bank):
+    sesi = SesiCAT(bank, seed=0)
+    item = sesi.item_berikutnya()
+    sesi.catat_jawaban(True)
+    theta, se = sesi.theta, sesi.se
+    with pytest.raises(ValueError, match="sudah dijawab"):
+        sesi.catat_jawaban(False, item=item)
+    assert (sesi.theta, sesi.se, len(sesi.riwayat)) == (theta, se, 1)
+
+
+def test_jawaban_setelah_selesai_ditolak(bank):
+    sesi = SesiCAT(bank, maks_soal=3, seed=0)
+    while sesi.item_berikutnya() is not None:
+        sesi.catat_jawaban(True)
+    assert sesi.selesai and len(sesi.riwayat) == 3
+    sisa = next(i for i in range(bank.jumlah_item) if i not in sesi.dipakai)
+    with pytest.raises(ValueError, match="selesai"):
+        sesi.catat_jawaban(True, item=sisa)
+    assert len(sesi.riwayat) == 3
@@ -0,0 +1,24 @@
+from edumerdeka.generasi import BackendStub, CacheRespons, LayananGenerasi
+from edumerdeka.learning_path import generate_learning_path_prompt
+
+
+def _prompt(daya_serap, gaya="Visual"):
+    return generate_learning_path_prompt("Fase D (Kelas 7-9)", "Matematika", daya_serap, gaya, "Mandiri")
+
+
+def test_dedup_persis_secara_default():
+    backend = BackendStub(latensi_s=0)
+    layanan = LayananGenerasi(backend, CacheRespons(":memory:"))
+    # Band berbeda (Penguatan vs Pengayaan): masing-masing mendapat narasi sendiri
+    assert layanan.generate(_prompt(68)) != layanan.generate(_prompt(72))
+    # Perbedaan spasi dan huruf besar/kecil tetap digabung
+    layanan.generate("  " + _prompt(68).upper())
+    assert backend.jumlah_panggilan == 2
+    assert "Kelas 7-9" in layanan.generate(_prompt(68))
+
+
+def test_pembulatan_opsional():
+    backend = BackendStub(latensi_s=0)
+    layanan = LayananGenerasi(backend, CacheRespons(":memory:"), bulatkan=5)
+    layanan.generate_banyak([_prompt(68), _prompt(69)])
+    assert backend.jumlah_panggilan == 1
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from edumerdeka.bank_soal import BankSoalError
+from edumerdeka.indeks_soal import IndeksBankSoal
+
+
+@pytest.fixture
+def df_soal():
+    n = 600
+    return pd.DataFrame({
+        'nomor': np.arange(1, n + 1),
+        'tingkat_bloom': [f"C{i % 6 + 1}" for i in range(n)],
+        'tp': [f"TP{i % 4 + 1}" for i in range(n)],
+        'fase': ['D' if i % 3 else 'fase e' for i in range(n)],
+    })
+
+
+def test_sampel_sesuai_strata(df_soal):
+    indeks = IndeksBankSoal.dari_dataframe(df_soal)
+    rng = np.random.default_rng(1)
+    posisi = indeks.sampel(20, tingkat_bloom='c2', tp='TP2', fase='Fase D', rng=rng)
+    pilih = df_soal.iloc[posisi]
+    assert len(set(posisi.tolist())) == 20
+    assert set(pilih['tingkat_bloom']) == {'C2'} and set(pilih['tp']) == {'TP2'}
+    assert set(pilih['fase']) == {'D'}
+
+    posisi = indeks.sampel(50, tingkat_bloom=['C1', 'C3'], fase='E', rng=rng)
+    pilih = df_soal.iloc[posisi]
+    assert set(pilih['tingkat_bloom']) <= {'C1', 'C3'} and set(pilih['fase']) == {'fase e'}
+    assert indeks.jumlah_tersedia(tingkat_bloom=['C1', 'C3'], fase='E') == \
+        ((df_soal['tingkat_bloom'].isin(['C1', 'C3'])) & (df_soal['fase'] == 'fase e')).sum()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rakit_form_tanpa_soal_berulang(df_soal, seed):
+    indeks = IndeksBankSoal.dari_dataframe(df_soal)
+    spesifikasi = [
+        {'jumlah': 30, 'tingkat_bloom': 'C1'},
+        # Tumpang tindih dengan spesifikasi lain: C1 dan TP1 sudah sebagian terpakai
+        {'jumlah': 40, 'tp': 'TP1'},
+        {'jumlah': 60, 'tingkat_bloom': ['C1', 'C2']},
+        {'jumlah': 100},
+    ]
+    posisi = indeks.rakit_form(spesifikasi, rng=np.random.default_rng(seed))
+    assert len(posisi) == 230
+    assert len(np.unique(posisi)) == len(posisi)
+    pilih = df_soal.iloc[posisi]
+    assert set(pilih['tingkat_bloom'].iloc[:30]) == {'C1'}
+    assert set(pilih['tp'].iloc[30:70]) == {'TP1'}
+    assert set(pilih['tingkat_bloom'].iloc[70:130]) <= {'C1', 'C2'}
+
+
+def test_rakit_form_kurang_soal(df_soal):
+    indeks = IndeksBankSoal.dari_dataframe(df_soal)
+    # 100 soal C1 tersedia; 80 sudah dipakai spesifikasi pertama
+    with pytest.raises(BankSoalError, match="Hanya 20 soal tersisa"):
+        indeks.rakit_form([{'jumlah': 80, 'tingkat_bloom': 'C1'}, {'jumlah': 21, 'tingkat_bloom': 'C1'}])
+    with pytest.raises(BankSoalError, match="Hanya 100 soal tersedia"):
+        indeks.sampel(101, tingkat_bloom='C1')
+
+
+def test_bloom_tidak_valid():
+    with pytest.raises(BankSoalError):
+        IndeksBankSoal(['C1', 'X9'])
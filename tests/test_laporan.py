@@ -0,0 +1,31 @@
+import io
+import zipfile
+
+import pytest
+
+from edumerdeka.laporan import data_laporan_kelas, tulis_zip_laporan
+from edumerdeka.penyimpanan import PenyimpananSQLite
+
+pytest.importorskip("fpdf")
+
+KONTEKS = {'kelas': '7A', 'tahun_ajaran': '2025/2026', 'semester': 'Ganjil'}
+
+
+def test_zip_kelas_dengan_nilai_null(tmp_path):
+    penyimpanan = PenyimpananSQLite(str(tmp_path / "db.sqlite"))
+    penyimpanan.simpan_batch('asesmen', [
+        {'nama_siswa': 'Ani', **KONTEKS, 'tanggal': '2025-08-01', 'daya_serap': 80.0, 'tp_dikuasai': 8,
+         'jumlah_soal': 10},
+        {'nama_siswa': 'Budi', **KONTEKS, 'tanggal': '2025-08-01', 'daya_serap': None},
+    ])
+    penyimpanan.simpan('projek_p5', {'nama_siswa': 'Budi', **KONTEKS, 'tanggal': '2025-08-02',
+                                     'nama_projek': 'Kebun', 'skor_karakter': None})
+    daftar_data = data_laporan_kelas(penyimpanan, '7A')
+    assert daftar_data[1]['hasil_asesmen']['daya_serap'] is None
+
+    tujuan = io.BytesIO()
+    assert tulis_zip_laporan(daftar_data, tujuan) == 2
+    with zipfile.ZipFile(tujuan) as arsip:
+        nama_file = arsip.namelist()
+        assert len(nama_file) == 2
+        assert all(arsip.read(nama).startswith(b"%PDF") for nama in nama_file)
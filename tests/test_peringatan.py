@@ -0,0 +1,83 @@
+import pytest
+
+from edumerdeka.peringatan import ATURAN_DEFAULT, MesinPeringatan, ketercapaian_atp, validasi_aturan
+from edumerdeka.penyimpanan import PenyimpananSQLite
+
+KONTEKS = {'tahun_ajaran': '2025/2026', 'semester': 'Ganjil'}
+ATURAN = validasi_aturan(ATURAN_DEFAULT)
+
+
+def _asesmen(nama, kelas, tanggal, daya_serap, **konteks):
+    return {'nama_siswa': nama, 'kelas': kelas, **KONTEKS, **konteks, 'tanggal': tanggal, 'daya_serap': daya_serap}
+
+
+@pytest.fixture
+def penyimpanan(tmp_path):
+    penyimpanan = PenyimpananSQLite(str(tmp_path / "db.sqlite"))
+    penyimpanan.simpan_batch('asesmen', [
+        _asesmen(f"S{i}", f"K{i % 3}", f"2025-08-0{hari}", 30 + (i * 7 + hari * 11) % 60)
+        for i in range(30) for hari in range(1, 4)])
+    penyimpanan.simpan_batch('projek_p5', [
+        {'nama_siswa': f"S{i}", 'kelas': f"K{i % 3}", **KONTEKS, 'tanggal': '2025-08-05',
+         'skor_karakter': (i % 10) + 0.5} for i in range(0, 30, 2)])
+    return penyimpanan
+
+
+def _mesin_baru(penyimpanan):
+    return MesinPeringatan(penyimpanan, **KONTEKS)
+
+
+def test_ketercapaian_atp():
+    assert ketercapaian_atp([]) is None
+    assert ketercapaian_atp([69.9, 70, 85, 40]) == 50.0
+
+
+def test_inkremental_sama_dengan_pass_penuh(penyimpanan):
+    mesin = _mesin_baru(penyimpanan)
+    mesin.daftar_intervensi(ATURAN)
+    assert mesin.statistik['pass_penuh'] == 1
+
+    penyimpanan.simpan_batch('asesmen', [
+        _asesmen("S1", "K1", "2025-08-10", 95), _asesmen("S2", "K2", "2025-08-10", 20),
+        _asesmen("Baru", "K0", "2025-08-10", 50),
+        # Periode lain tidak boleh mengubah indikator periode ini
+        _asesmen("S3", "K0", "2026-02-10", 5, semester='Genap')])
+    penyimpanan.simpan('projek_p5', {'nama_siswa': "S5", 'kelas': "K2", **KONTEKS,
+                                     'tanggal': '2025-08-12', 'skor_karakter': 1.0})
+
+    inkremental = mesin.daftar_intervensi(ATURAN)
+    assert mesin.statistik['pass_inkremental'] == 1
+    assert mesin.statistik['pass_penuh'] == 1
+    assert inkremental == _mesin_baru(penyimpanan).daftar_intervensi(ATURAN)
+    assert any(item['nama_siswa'] == "Baru" for item in inkremental)
+
+
+def test_perubahan_non_tambahan_memicu_pass_penuh(penyimpanan):
+    mesin = _mesin_baru(penyimpanan)
+    mesin.perbarui(ATURAN)
+    with penyimpanan.koneksi() as conn:
+        conn.execute("UPDATE asesmen SET daya_serap = 100 WHERE id = 1")
+    hasil = mesin.daftar_intervensi(ATURAN)
+    assert mesin.statistik['pass_penuh'] == 2
+    assert hasil == _mesin_baru(penyimpanan).daftar_intervensi(ATURAN)
+
+
+def test_indikator_siswa_sama_dengan_daftar(penyimpanan):
+    mesin = _mesin_baru(penyimpanan)
+    daftar = {item['nama_siswa']: item for item in mesin.daftar_intervensi(ATURAN)}
+    nama, item = next(iter(daftar.items()))
+    indikator = mesin.indikator_siswa(nama, item['kelas'])
+    for kunci, nilai in indikator.items():
+        assert round(nilai, 1) == item[kunci]
+    assert mesin.indikator_siswa("Tidak Ada", "K0") == {}
+
+
+def test_rata_rata_indikator_sama_dengan_indikator_siswa(penyimpanan):
+    mesin = _mesin_baru(penyimpanan)
+    mesin.perbarui(ATURAN)
+    nilai_k1 = [mesin.indikator_siswa(f"S{i}", "K1")['ketercapaian_atp'] for i in range(1, 30, 3)]
+    assert mesin.rata_rata_indikator('ketercapaian_atp', "K1") == pytest.approx(sum(nilai_k1) / len(nilai_k1))
+    assert mesin.rata_rata_indikator('ketercapaian_atp', "Tidak Ada") is None
+    # Tidak mengganti aturan terakhir, sehingga tidak memicu pass penuh
+    mesin.rata_rata_indikator('ketercapaian_atp')
+    assert mesin.statistik['pass_penuh'] == 1
@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+from edumerdeka.penyimpanan import PenyimpananSQLite
+from edumerdeka.server_sinkron import buat_server
+from edumerdeka.sinkron import KlienSinkron
+
+KONTEKS = {'kelas': '7A', 'tahun_ajaran': '2025/2026', 'semester': 'Ganjil'}
+
+
+@pytest.fixture
+def url_server():
+    server = buat_server()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _isi(penyimpanan, tabel):
+    kolom = 'tanggal, periode, narasi' if tabel == 'portofolio' else 'tanggal, daya_serap'
+    return sorted(tuple(b) for b in penyimpanan.koneksi().execute(
+        f"SELECT s.nama, t.id_entri, {kolom} FROM {tabel} t JOIN siswa s ON s.id = t.siswa_id"))
+
+
+def _portofolio(narasi, nama='Budi'):
+    return {'nama_siswa': nama, **KONTEKS, 'tanggal': '2025-08-01', 'periode': 'Mingguan', 'narasi': narasi}
+
+
+def _sinkronkan(url, *daftar_penyimpanan):
+    for penyimpanan in daftar_penyimpanan:
+        KlienSinkron(penyimpanan, url=url).sinkronkan()
+
+
+def test_dua_perangkat_konvergen(tmp_path, url_server):
+    a = PenyimpananSQLite(str(tmp_path / "a.db"))
+    b = PenyimpananSQLite(str(tmp_path / "b.db"))
+    # Entry di hari dan periode yang sama tetap entry terpisah
+    for narasi in ("Pertama", "Kedua"):
+        a.simpan('portofolio', _portofolio(narasi))
+    # Nama siswa ganda di satu CSV kelas
+    assert a.simpan_batch('asesmen', [{'nama_siswa': nama, **KONTEKS, 'tanggal': '2025-08-01 08:00',
+                                       'daya_serap': nilai}
+                                      for nama, nilai in (('Ani', 60), ('Ani', 80), ('Budi', 70))]) == 3
+    b.simpan('portofolio', _portofolio("Dari B"))
+    b.simpan('portofolio', _portofolio("Citra", nama='Citra'))
+
+    _sinkronkan(url_server, a, b, a)
+
+    for tabel in ('portofolio', 'asesmen'):
+        assert _isi(a, tabel) == _isi(b, tabel)
+    assert sorted(b[4] for b in _isi(a, 'portofolio')) == ['Citra', 'Dari B', 'Kedua', 'Pertama']
+    assert sorted(b[3] for b in _isi(a, 'asesmen')) == [60, 70, 80]
+
+
+def test_simpan_ulang_menambah_entry(tmp_path):
+    penyimpanan = PenyimpananSQLite(str(tmp_path / "a.db"))
+    for narasi in ("Pertama", "Kedua"):
+        assert penyimpanan.simpan('portofolio', _portofolio(narasi)) == 1
+    isi = _isi(penyimpanan, 'portofolio')
+    assert sorted(b[4] for b in isi) == ["Kedua", "Pertama"]
+    assert len({b[1] for b in isi}) == 2
+    assert penyimpanan.koneksi().execute("SELECT COUNT(*) FROM log_operasi").fetchone()[0] == 2
+
+
+def test_pembaruan_eksplisit_konvergen(tmp_path, url_server):
+    a = PenyimpananSQLite(str(tmp_path / "a.db"))
+    b = PenyimpananSQLite(str(tmp_path / "b.db"))
+    a.simpan('portofolio', _portofolio("Draf"))
+    a.simpan('portofolio', _portofolio("Lain"))
+    _sinkronkan(url_server, a, b)
+    id_entri = next(b[1] for b in _isi(b, 'portofolio') if b[4] == "Draf")
+
+    # Kedua perangkat memperbarui entry yang sama saat offline: satu pemenang di semua perangkat
+    a.simpan('portofolio', {**_portofolio("Revisi A"), 'id_entri': id_entri})
+    b.simpan('portofolio', {**_portofolio("Revisi B"), 'id_entri': id_entri})
+    _sinkronkan(url_server, a, b, a)
+
+    assert _isi(a, 'portofolio') == _isi(b, 'portofolio')
+    narasi = [b[4] for b in _isi(a, 'portofolio')]
+    assert len(narasi) == 2 and "Lain" in narasi and ("Revisi A" in narasi) != ("Revisi B" in narasi)
+
+
+def test_migrasi_database_lama(tmp_path):
+    path = str(tmp_path / "lama.db")
+    penyimpanan = PenyimpananSQLite(path)
+    penyimpanan.simpan('portofolio', _portofolio("Lama"))
+    with penyimpanan.transaksi() as conn:
+        # Skema sebelum id_entri
+        conn.executescript("""
+            DROP INDEX idx_asesmen_entri; DROP INDEX idx_p5_entri; DROP INDEX idx_portofolio_entri;
+            DROP INDEX idx_log_entri;
+            ALTER TABLE asesmen DROP COLUMN id_entri; ALTER TABLE projek_p5 DROP COLUMN id_entri;
+            ALTER TABLE portofolio DROP COLUMN id_entri;
+            ALTER TABLE log_operasi RENAME COLUMN id_entri TO kunci_alami;
+            CREATE INDEX idx_log_kunci ON log_operasi (tabel, kunci_alami);
+        """)
+    penyimpanan.tutup()
+
+    penyimpanan = PenyimpananSQLite(path)
+    penyimpanan.simpan('portofolio', _portofolio("Baru"))
+    isi = _isi(penyimpanan, 'portofolio')
+    assert sorted(b[4] for b in isi) == ["Baru", "Lama"]
+    assert all(b[1] for b in isi)
+
+
+def test_watermark_berubah_saat_baris_diganti(tmp_path):
+    penyimpanan = PenyimpananSQLite(str(tmp_path / "a.db"))
+    asesmen = {'nama_siswa': 'Ani', **KONTEKS, 'tanggal': '2025-08-01 08:00', 'daya_serap': 60}
+    penyimpanan.simpan('asesmen', asesmen)
+    sebelum = penyimpanan.watermark('asesmen', 'daya_serap')
+    id_entri = penyimpanan.riwayat_siswa('Ani', '7A')['asesmen'][0]['id_entri']
+    penyimpanan.simpan('asesmen', {**asesmen, 'daya_serap': 85, 'id_entri': id_entri})
+    assert penyimpanan.jumlah_baris('asesmen') == 1
+    assert penyimpanan.watermark('asesmen', 'daya_serap') != sebelum
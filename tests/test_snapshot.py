@@ -0,0 +1,76 @@
+import copy
+
+import pytest
+
+from edumerdeka.snapshot import KOMPRESI_ZLIB, SnapshotError, baca_snapshot, buat_snapshot, normalisasi_data
+
+
+def _entry(tanggal, narasi):
+    return {'tanggal': tanggal, 'periode': 'Mingguan', 'narasi': narasi, 'kompetensi': ['Numerasi'],
+            'karya': None, 'karya_hash': None}
+
+
+def _sesi():
+    return {
+        'data_siswa': {'nama': 'Budi', 'kelas': '7A'},
+        'hasil_asesmen': {'daya_serap': 72.5, 'rekomendasi_bloom': 'C3'},
+        'portofolio': {'Budi': [_entry('2025-08-01', 'Awal')]},
+        'projek_p5': {},
+    }
+
+
+def test_penuh_lalu_delta_setelah_diubah_in_place():
+    sesi = _sesi()
+    penuh = buat_snapshot(sesi, kompresi=KOMPRESI_ZLIB)
+    basis = normalisasi_data(sesi)
+
+    # Seperti app: data sesi diubah in-place setelah snapshot penuh disimpan
+    sesi['portofolio']['Budi'].append(_entry('2025-08-08', 'Kedua'))
+    sesi['hasil_asesmen']['daya_serap'] = 80.0
+    delta = buat_snapshot(sesi, basis=basis, kompresi=KOMPRESI_ZLIB)
+
+    data_penuh, _ = baca_snapshot(penuh)
+    data_akhir, info = baca_snapshot(delta, basis=data_penuh)
+    assert info['jenis'] == 'delta'
+    assert info['delta']['tambah_portofolio'] == {'Budi': [sesi['portofolio']['Budi'][-1]]}
+    assert set(info['delta']['ganti']) == {'hasil_asesmen'}
+    assert data_akhir == normalisasi_data(sesi)
+
+
+def test_delta_basis_berbeda_ditolak():
+    sesi = _sesi()
+    delta = buat_snapshot(sesi, basis=_sesi(), kompresi=KOMPRESI_ZLIB)
+    basis_lain = copy.deepcopy(sesi)
+    basis_lain['data_siswa']['nama'] = 'Ani'
+    with pytest.raises(SnapshotError):
+        baca_snapshot(delta, basis=basis_lain)
+
+
+def test_file_bukan_snapshot_ditolak():
+    with pytest.raises(SnapshotError):
+        baca_snapshot(b"bukan snapshot")
+
+
+@pytest.mark.parametrize("ubah, pesan", [
+    (lambda sesi: sesi['hasil_asesmen'].pop('daya_serap'), "hasil_asesmen.*'daya_serap' wajib"),
+    (lambda sesi: sesi['hasil_asesmen'].update(daya_serap="72"), "hasil_asesmen.*'daya_serap' bertipe salah"),
+    (lambda sesi: sesi['portofolio']['Budi'][0].pop('karya'), "Budi' entry 1.*'karya' wajib"),
+    (lambda sesi: sesi['portofolio']['Budi'][0].update(kompetensi="Numerasi"), "'kompetensi' bertipe salah"),
+    (lambda sesi: sesi['portofolio']['Budi'][0].pop('tanggal'), "'tanggal' wajib"),
+    (lambda sesi: sesi.update(projek_p5={'nama_projek': 'Kebun', 'skor_karakter': 8.0}), "'dimensi_scores' wajib"),
+    (lambda sesi: sesi['data_siswa'].update(nama={'x': 1}), "data_siswa.*'nama' bertipe salah"),
+])
+def test_isi_bagian_tidak_valid_ditolak(ubah, pesan):
+    sesi = _sesi()
+    ubah(sesi)
+    with pytest.raises(SnapshotError, match=pesan):
+        baca_snapshot(buat_snapshot(sesi, kompresi=KOMPRESI_ZLIB))
+
+
+def test_delta_dengan_entry_tidak_valid_ditolak():
+    sesi = _sesi()
+    basis = normalisasi_data(sesi)
+    sesi['portofolio']['Budi'].append({'tanggal': '2025-08-08'})
+    delta = buat_snapshot(sesi, basis=basis, kompresi=KOMPRESI_ZLIB)
+    with pytest.raises(SnapshotError, match="entry 2"):
+        baca_snapshot(delta, basis=basis)